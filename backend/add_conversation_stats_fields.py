@@ -0,0 +1,74 @@
+"""
+添加 message_count / last_message_preview / last_message_at 字段到 conversations 表，
+根据已有消息回填，并创建对话列表使用的索引
+运行方式: python add_conversation_stats_fields.py
+"""
+
+import asyncio
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+
+COLUMNS = [
+    ("message_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("last_message_preview", "VARCHAR(200) NULL"),
+    ("last_message_at", "TIMESTAMPTZ NULL"),
+]
+
+
+async def add_conversation_stats_fields():
+    """添加对话消息统计字段"""
+    async with engine.begin() as conn:
+        try:
+            for column, definition in COLUMNS:
+                result = await conn.execute(text("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name = 'conversations'
+                    AND column_name = :column
+                """), {"column": column})
+
+                if result.fetchone():
+                    print(f"✅ {column} 字段已存在，无需添加")
+                    continue
+
+                print(f"📝 正在添加 {column} 字段...")
+                await conn.execute(text(f"ALTER TABLE conversations ADD COLUMN {column} {definition}"))
+                print("✅ 字段添加成功")
+
+            # 按已有消息回填统计（最后一条消息按创建时间取最新）
+            print("📝 正在回填消息统计...")
+            result = await conn.execute(text("""
+                UPDATE conversations c
+                SET message_count = s.message_count,
+                    last_message_preview = LEFT(s.last_content, 100),
+                    last_message_at = s.last_created_at
+                FROM (
+                    SELECT DISTINCT ON (conversation_id)
+                        conversation_id,
+                        COUNT(*) OVER (PARTITION BY conversation_id) AS message_count,
+                        content AS last_content,
+                        created_at AS last_created_at
+                    FROM messages
+                    ORDER BY conversation_id, created_at DESC, id DESC
+                ) s
+                WHERE s.conversation_id = c.id
+            """))
+            print(f"✅ 已回填 {result.rowcount} 个对话")
+
+            print("📝 正在创建索引...")
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_conversations_tenant_status_created
+                ON conversations(tenant_id, status, created_at)
+            """))
+            print("✅ 索引创建成功")
+
+            print("\n🎉 数据库迁移完成！")
+
+        except Exception as e:
+            print(f"❌ 迁移失败: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(add_conversation_stats_fields())
@@ -0,0 +1,80 @@
+"""
+添加 embedding_status 等字段到 resumes 表，并根据已有向量回填状态
+运行方式: python add_embedding_status_fields.py
+"""
+
+import asyncio
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+
+COLUMNS = [
+    ("embedding_status", "VARCHAR(20) NOT NULL DEFAULT 'pending'"),
+    ("embedding_attempts", "INTEGER NOT NULL DEFAULT 0"),
+    ("embedding_error", "TEXT NULL"),
+    ("embedding_next_retry_at", "TIMESTAMPTZ NULL"),
+]
+
+
+async def add_embedding_status_fields():
+    """添加 embedding 状态字段"""
+    async with engine.begin() as conn:
+        try:
+            for column, definition in COLUMNS:
+                result = await conn.execute(text("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name = 'resumes'
+                    AND column_name = :column
+                """), {"column": column})
+
+                if result.fetchone():
+                    print(f"✅ {column} 字段已存在，无需添加")
+                    continue
+
+                print(f"📝 正在添加 {column} 字段...")
+                await conn.execute(text(f"ALTER TABLE resumes ADD COLUMN {column} {definition}"))
+                print("✅ 字段添加成功")
+
+            # 已写入向量表的简历标记为 embedded
+            print("📝 正在回填 embedding_status...")
+            result = await conn.execute(text("""
+                UPDATE resumes r
+                SET embedding_status = 'embedded'
+                FROM resume_embeddings e
+                WHERE e.resume_id = r.id
+                AND r.embedding_status <> 'embedded'
+            """))
+            print(f"✅ 已标记 {result.rowcount} 份简历为 embedded")
+
+            # 已完成但没有有效向量（包括历史零向量）的简历放入重试队列，立即到期
+            result = await conn.execute(text("""
+                UPDATE resumes r
+                SET embedding_status = 'failed',
+                    embedding_error = COALESCE(r.parsed_content->>'embedding_error', '历史数据缺少有效向量'),
+                    embedding_next_retry_at = now()
+                WHERE r.status = 'completed'
+                AND r.extracted_text IS NOT NULL
+                AND r.embedding_status = 'pending'
+                AND NOT EXISTS (SELECT 1 FROM resume_embeddings e WHERE e.resume_id = r.id)
+            """))
+            print(f"✅ 已将 {result.rowcount} 份简历加入向量重试队列")
+
+            # 重试队列使用的部分索引
+            print("📝 正在创建索引...")
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_resumes_embedding_retry
+                ON resumes(embedding_next_retry_at)
+                WHERE embedding_status = 'failed'
+            """))
+            print("✅ 索引创建成功")
+
+            print("\n🎉 数据库迁移完成！")
+
+        except Exception as e:
+            print(f"❌ 迁移失败: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(add_embedding_status_fields())
@@ -0,0 +1,36 @@
+"""
+创建游标分页使用的复合索引：
+messages(conversation_id, created_at, id)、conversations(tenant_id, status, created_at)、resumes(uploaded_by, upload_time)
+运行方式: python add_pagination_indexes.py
+"""
+
+import asyncio
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+
+INDEXES = [
+    ("ix_messages_conversation_created", "messages(conversation_id, created_at, id)"),
+    ("ix_conversations_tenant_status_created", "conversations(tenant_id, status, created_at)"),
+    ("ix_resumes_uploaded_by_upload_time", "resumes(uploaded_by, upload_time)"),
+]
+
+
+async def add_pagination_indexes():
+    """创建复合索引"""
+    async with engine.begin() as conn:
+        try:
+            for name, definition in INDEXES:
+                print(f"📝 正在创建索引 {name}...")
+                await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+                print("✅ 索引创建成功")
+
+            print("\n🎉 数据库迁移完成！")
+
+        except Exception as e:
+            print(f"❌ 迁移失败: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(add_pagination_indexes())
@@ -0,0 +1,196 @@
+"""
+扩展 resume_analyses 表：维度评分列、分析配置/模型/租户/对话字段、JSONB 详情与查询索引，
+并把历史对话消息中的分析报告回填为分析记录
+运行方式: python add_resume_analysis_fields.py
+"""
+
+import asyncio
+import json
+import re
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+from app.infrastructure.repositories.resume_analysis_repository import (
+    DIMENSION_SCORE_COLUMNS,
+    _dimension_score,
+)
+
+BATCH_SIZE = 200
+
+COLUMNS = [
+    ("tenant_id", "UUID NULL"),
+    ("conversation_id", "UUID NULL REFERENCES conversations(id) ON DELETE SET NULL"),
+    ("analysis_profile", "VARCHAR(50) NOT NULL DEFAULT 'standard'"),
+    ("model_name", "VARCHAR(255) NULL"),
+    ("education_score", "DOUBLE PRECISION NULL"),
+    ("soft_skills_score", "DOUBLE PRECISION NULL"),
+    ("stability_score", "DOUBLE PRECISION NULL"),
+    ("work_attitude_score", "DOUBLE PRECISION NULL"),
+    ("potential_score", "DOUBLE PRECISION NULL"),
+]
+
+JSON_BLOCK = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+
+
+async def alter_table():
+    """调整表结构"""
+    async with engine.begin() as conn:
+        print("📝 正在将 job_position_id / ai_model_id 改为可空...")
+        await conn.execute(text("ALTER TABLE resume_analyses ALTER COLUMN job_position_id DROP NOT NULL"))
+        await conn.execute(text("ALTER TABLE resume_analyses ALTER COLUMN ai_model_id DROP NOT NULL"))
+        print("✅ 修改成功")
+
+        for column, definition in COLUMNS:
+            result = await conn.execute(text("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = 'resume_analyses'
+                AND column_name = :column
+            """), {"column": column})
+
+            if result.fetchone():
+                print(f"✅ {column} 字段已存在，无需添加")
+                continue
+
+            print(f"📝 正在添加 {column} 字段...")
+            await conn.execute(text(f"ALTER TABLE resume_analyses ADD COLUMN {column} {definition}"))
+            print("✅ 字段添加成功")
+
+        result = await conn.execute(text("""
+            SELECT data_type
+            FROM information_schema.columns
+            WHERE table_name = 'resume_analyses'
+            AND column_name = 'detailed_analysis'
+        """))
+        if result.scalar() != "jsonb":
+            print("📝 正在将 detailed_analysis 转换为 JSONB...")
+            await conn.execute(text("""
+                ALTER TABLE resume_analyses
+                ALTER COLUMN detailed_analysis TYPE JSONB USING detailed_analysis::jsonb
+            """))
+            print("✅ 转换成功")
+
+        print("📝 正在回填 tenant_id...")
+        result = await conn.execute(text("""
+            UPDATE resume_analyses a
+            SET tenant_id = r.uploaded_by
+            FROM resumes r
+            WHERE r.id = a.resume_id
+            AND a.tenant_id IS NULL
+        """))
+        print(f"✅ 已回填 {result.rowcount} 条")
+
+        print("📝 正在创建索引...")
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_resume_analyses_lookup
+            ON resume_analyses(resume_id, job_position_id, analysis_profile, model_name, created_at)
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_resume_analyses_conversation
+            ON resume_analyses(conversation_id, created_at)
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_resume_analyses_tenant_id
+            ON resume_analyses(tenant_id)
+        """))
+        print("✅ 索引创建成功")
+
+
+def _find_report(rows):
+    """从最新的助手消息开始查找完整分析报告的 JSON 代码块，返回 (报告, 消息时间)"""
+    for content, created_at in rows:
+        match = JSON_BLOCK.search(content or "")
+        if not match:
+            continue
+        try:
+            report = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(report, dict) and "overall_score" in report and not report.get("error"):
+            return report, created_at
+    return None, None
+
+
+async def backfill_from_conversations():
+    """按对话ID分批回填：关联简历、尚无分析记录的对话，取最新一份报告，可重复执行"""
+    last_id = None
+    migrated = 0
+
+    while True:
+        async with engine.begin() as conn:
+            params = {"limit": BATCH_SIZE}
+            where = ""
+            if last_id is not None:
+                where = "AND c.id > :last_id"
+                params["last_id"] = last_id
+
+            result = await conn.execute(text(f"""
+                SELECT c.id, c.resume_id, c.tenant_id
+                FROM conversations c
+                WHERE c.resume_id IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM resume_analyses a WHERE a.conversation_id = c.id)
+                {where}
+                ORDER BY c.id
+                LIMIT :limit
+            """), params)
+            conversations = result.fetchall()
+
+            if not conversations:
+                break
+
+            for conversation_id, resume_id, tenant_id in conversations:
+                messages = await conn.execute(text("""
+                    SELECT content, created_at
+                    FROM messages
+                    WHERE conversation_id = :conversation_id
+                    AND role = 'assistant'
+                    AND content LIKE '%```json%'
+                    ORDER BY created_at DESC
+                """), {"conversation_id": conversation_id})
+                report, created_at = _find_report(messages.fetchall())
+                if report is None:
+                    continue
+
+                params = {
+                    "resume_id": resume_id,
+                    "tenant_id": tenant_id,
+                    "conversation_id": conversation_id,
+                    "overall_score": _dimension_score({"score": report.get("overall_score")}),
+                    "detail": json.dumps(report, ensure_ascii=False),
+                    "created_at": created_at,
+                }
+                for dimension, column in DIMENSION_SCORE_COLUMNS.items():
+                    params[column] = _dimension_score(report.get(dimension))
+
+                score_columns = ", ".join(DIMENSION_SCORE_COLUMNS.values())
+                score_values = ", ".join(f":{column}" for column in DIMENSION_SCORE_COLUMNS.values())
+                await conn.execute(text(f"""
+                    INSERT INTO resume_analyses (
+                        id, resume_id, tenant_id, conversation_id, analysis_profile,
+                        overall_score, {score_columns}, detailed_analysis, created_at
+                    )
+                    VALUES (
+                        gen_random_uuid(), :resume_id, :tenant_id, :conversation_id, 'standard',
+                        :overall_score, {score_values}, CAST(:detail AS JSONB), :created_at
+                    )
+                """), params)
+                migrated += 1
+
+            last_id = conversations[-1][0]
+            print(f"📝 已回填 {migrated} 份报告...")
+
+    print(f"✅ 报告回填完成: {migrated} 份")
+
+
+async def migrate():
+    try:
+        await alter_table()
+        await backfill_from_conversations()
+        print("\n🎉 数据库迁移完成！")
+    except Exception as e:
+        print(f"❌ 迁移失败: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(migrate())
@@ -0,0 +1,123 @@
+"""
+创建 resume_embeddings 表，并从 parsed_content["embedding"] 回填向量
+运行方式: python add_resume_embeddings_table.py
+"""
+
+import asyncio
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+from app.infrastructure.search.vector_index import encode_vector
+
+BATCH_SIZE = 500
+
+
+async def create_table():
+    """创建 resume_embeddings 表"""
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT table_name
+            FROM information_schema.tables
+            WHERE table_name = 'resume_embeddings'
+        """))
+
+        if result.fetchone():
+            print("✅ resume_embeddings 表已存在，无需创建")
+            return
+
+        print("📝 正在创建 resume_embeddings 表...")
+        await conn.execute(text("""
+            CREATE TABLE resume_embeddings (
+                id UUID PRIMARY KEY,
+                resume_id UUID NOT NULL UNIQUE REFERENCES resumes(id) ON DELETE CASCADE,
+                embedding_model VARCHAR(100) NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BYTEA NOT NULL,
+                created_at TIMESTAMPTZ DEFAULT now(),
+                updated_at TIMESTAMPTZ DEFAULT now()
+            )
+        """))
+        print("✅ 表创建成功")
+
+        print("📝 正在创建索引...")
+        await conn.execute(text("""
+            CREATE INDEX ix_resume_embeddings_resume_id
+            ON resume_embeddings(resume_id)
+        """))
+        await conn.execute(text("""
+            CREATE INDEX ix_resume_embeddings_model_updated
+            ON resume_embeddings(embedding_model, updated_at)
+        """))
+        print("✅ 索引创建成功")
+
+
+async def backfill():
+    """按主键分批回填向量，每批独立事务，可重复执行"""
+    last_id = None
+    migrated = 0
+    skipped = 0
+
+    while True:
+        async with engine.begin() as conn:
+            params = {"limit": BATCH_SIZE}
+            where = ""
+            if last_id is not None:
+                where = "AND r.id > :last_id"
+                params["last_id"] = last_id
+
+            result = await conn.execute(text(f"""
+                SELECT r.id, COALESCE(r.embedding_model, 'unknown'), r.parsed_content->>'embedding'
+                FROM resumes r
+                LEFT JOIN resume_embeddings e ON e.resume_id = r.id
+                WHERE r.parsed_content->>'embedding' IS NOT NULL
+                AND e.id IS NULL
+                {where}
+                ORDER BY r.id
+                LIMIT :limit
+            """), params)
+            rows = result.fetchall()
+
+            if not rows:
+                break
+
+            for resume_id, model, embedding_str in rows:
+                try:
+                    vector = [float(x) for x in embedding_str.split(",")]
+                except ValueError:
+                    vector = []
+                blob = encode_vector(vector) if vector else None
+                if blob is None:
+                    # 历史数据中 embedding 失败时写入的零向量无法参与检索
+                    skipped += 1
+                    continue
+
+                await conn.execute(text("""
+                    INSERT INTO resume_embeddings (id, resume_id, embedding_model, dimension, vector)
+                    VALUES (gen_random_uuid(), :resume_id, :model, :dimension, :vector)
+                    ON CONFLICT (resume_id) DO NOTHING
+                """), {
+                    "resume_id": resume_id,
+                    "model": model,
+                    "dimension": len(vector),
+                    "vector": blob,
+                })
+                migrated += 1
+
+            last_id = rows[-1][0]
+            print(f"📝 已回填 {migrated} 条，跳过 {skipped} 条...")
+
+    print(f"✅ 回填完成: {migrated} 条，跳过零向量/无效向量 {skipped} 条")
+
+
+async def migrate():
+    try:
+        await create_table()
+        await backfill()
+        print("\n🎉 数据库迁移完成！")
+    except Exception as e:
+        print(f"❌ 迁移失败: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(migrate())
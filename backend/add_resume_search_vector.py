@@ -0,0 +1,93 @@
+"""
+添加 search_vector 字段（关键词检索的倒排索引文档）与 GIN 索引到 resumes 表，并为已有简历回填
+中文二元切分在 Python 中完成（见 app/infrastructure/search/fulltext.py），回填按主键分批执行，可重复运行
+运行方式: python add_resume_search_vector.py
+"""
+
+import asyncio
+from sqlalchemy import text, update
+from app.infrastructure.database.database import engine
+from app.infrastructure.database.models import Resume
+from app.infrastructure.search.fulltext import search_vector_expression
+
+BATCH_SIZE = 200
+
+
+async def add_search_vector_column():
+    """添加字段与索引"""
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_name = 'resumes'
+            AND column_name = 'search_vector'
+        """))
+
+        if result.fetchone():
+            print("✅ search_vector 字段已存在，无需添加")
+        else:
+            print("📝 正在添加 search_vector 字段...")
+            await conn.execute(text("ALTER TABLE resumes ADD COLUMN search_vector TSVECTOR NULL"))
+            print("✅ 字段添加成功")
+
+        print("📝 正在创建索引...")
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_resumes_search_vector
+            ON resumes USING GIN (search_vector)
+        """))
+        print("✅ 索引创建成功")
+
+
+async def backfill():
+    """按主键分批为尚无 search_vector 的简历生成检索文档，每批独立事务"""
+    last_id = None
+    updated = 0
+
+    while True:
+        async with engine.begin() as conn:
+            params = {"limit": BATCH_SIZE}
+            where = ""
+            if last_id is not None:
+                where = "AND id > :last_id"
+                params["last_id"] = last_id
+
+            result = await conn.execute(text(f"""
+                SELECT id, filename, candidate_name, extracted_text
+                FROM resumes
+                WHERE search_vector IS NULL
+                {where}
+                ORDER BY id
+                LIMIT :limit
+            """), params)
+            rows = result.fetchall()
+
+            if not rows:
+                break
+
+            for resume_id, filename, candidate_name, extracted_text in rows:
+                await conn.execute(
+                    update(Resume)
+                    .where(Resume.id == resume_id)
+                    .values(search_vector=search_vector_expression(filename, candidate_name, extracted_text))
+                )
+                updated += 1
+
+            last_id = rows[-1][0]
+            print(f"📝 已处理 {updated} 份简历...")
+
+    print(f"✅ 检索文档回填完成: {updated} 份")
+
+
+async def migrate():
+    try:
+        await add_search_vector_column()
+        await backfill()
+        print("\n🎉 数据库迁移完成！")
+    except Exception as e:
+        print(f"❌ 迁移失败: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(migrate())
@@ -0,0 +1,101 @@
+"""
+创建批量筛选任务表 screening_jobs / screening_job_items
+运行方式: python add_screening_jobs_table.py
+"""
+
+import asyncio
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+
+
+async def create_tables():
+    """创建批量筛选任务表"""
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT table_name
+            FROM information_schema.tables
+            WHERE table_name = 'screening_jobs'
+        """))
+
+        if result.fetchone():
+            print("✅ screening_jobs 表已存在，无需创建")
+        else:
+            print("📝 正在创建 screening_jobs 表...")
+            await conn.execute(text("""
+                CREATE TABLE screening_jobs (
+                    id UUID PRIMARY KEY,
+                    tenant_id UUID NOT NULL,
+                    job_position_id UUID NOT NULL REFERENCES job_positions(id),
+                    status VARCHAR(20) NOT NULL DEFAULT 'running',
+                    analysis_profile VARCHAR(50) NOT NULL DEFAULT 'standard',
+                    params JSONB,
+                    token_budget INTEGER,
+                    tokens_used INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    reused INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    started_at TIMESTAMPTZ,
+                    finished_at TIMESTAMPTZ,
+                    created_at TIMESTAMPTZ DEFAULT now(),
+                    updated_at TIMESTAMPTZ
+                )
+            """))
+            await conn.execute(text("CREATE INDEX ix_screening_jobs_id ON screening_jobs(id)"))
+            await conn.execute(text("CREATE INDEX ix_screening_jobs_tenant_id ON screening_jobs(tenant_id)"))
+            print("✅ 表创建成功")
+
+        result = await conn.execute(text("""
+            SELECT table_name
+            FROM information_schema.tables
+            WHERE table_name = 'screening_job_items'
+        """))
+
+        if result.fetchone():
+            print("✅ screening_job_items 表已存在，无需创建")
+            return
+
+        print("📝 正在创建 screening_job_items 表...")
+        await conn.execute(text("""
+            CREATE TABLE screening_job_items (
+                id UUID PRIMARY KEY,
+                job_id UUID NOT NULL REFERENCES screening_jobs(id) ON DELETE CASCADE,
+                resume_id UUID NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                analysis_id UUID REFERENCES resume_analyses(id) ON DELETE SET NULL,
+                overall_score DOUBLE PRECISION,
+                tokens_used INTEGER,
+                error TEXT,
+                created_at TIMESTAMPTZ DEFAULT now(),
+                updated_at TIMESTAMPTZ,
+                CONSTRAINT uq_screening_job_items_resume UNIQUE (job_id, resume_id)
+            )
+        """))
+        print("✅ 表创建成功")
+
+        print("📝 正在创建索引...")
+        await conn.execute(text("CREATE INDEX ix_screening_job_items_id ON screening_job_items(id)"))
+        await conn.execute(text("""
+            CREATE INDEX ix_screening_job_items_status
+            ON screening_job_items(job_id, status, id)
+        """))
+        await conn.execute(text("""
+            CREATE INDEX ix_screening_job_items_score
+            ON screening_job_items(job_id, overall_score)
+        """))
+        print("✅ 索引创建成功")
+
+
+async def migrate():
+    try:
+        await create_tables()
+        print("\n🎉 数据库迁移完成！")
+    except Exception as e:
+        print(f"❌ 迁移失败: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(migrate())
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import resumes, ai_models, ragflow, auth, llm_config, llm_init, agent_analysis, stats
+from app.api.v1.endpoints import resumes, ai_models, ragflow, auth, llm_config, llm_init, agent_analysis, stats, screening
 
 api_router = APIRouter()
 
@@ -22,4 +22,7 @@ api_router.include_router(ragflow.router, prefix="/ragflow", tags=["ragflow"])
 api_router.include_router(llm_config.router, prefix="/llm", tags=["llm"])
 
 # 智能体分析路由
-api_router.include_router(agent_analysis.router, prefix="/agent-analysis", tags=["agent-analysis"])
\ No newline at end of file
+api_router.include_router(agent_analysis.router, prefix="/agent-analysis", tags=["agent-analysis"])
+
+# 批量筛选路由
+api_router.include_router(screening.router, prefix="/screening", tags=["screening"])
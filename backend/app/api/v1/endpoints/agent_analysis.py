@@ -3,9 +3,10 @@ Agent Analysis API Endpoints
 智能体分析相关的 API 端点
 """
 
+import json
 import logging
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
@@ -22,6 +23,9 @@ from app.application.schemas.agent_analysis import (
     Conversation,
 )
 from app.application.services.conversation_service import ConversationService
+from app.application.services.resume_content import lean_parsed_content
+from app.core.pagination import next_cursor
+from app.core.sse import SSEStreamEncoder, DEFAULT_PROTOCOL, PROTOCOL_HEADER, negotiate_protocol
 
 logger = logging.getLogger(__name__)
 
@@ -35,23 +39,42 @@ print("=== agent_analysis.py MODULE LOADED === If you see this, the code is acti
 # 简历分析端点
 # ============================================================================
 
+async def _stream_analysis_events(use_case: ResumeAnalysisUseCase, request: ResumeAnalysisRequest,
+                                  tenant_id: str, encoder: SSEStreamEncoder):
+    """将渐进式分析事件编码为 SSE：维度结果与综合评分为独立事件，摘要按 token 事件流式输出"""
+    try:
+        async for event in use_case.analyze_with_agents_stream(request, tenant_id):
+            if event["type"] == "summary_token":
+                yield encoder.token(event["token"])
+            else:
+                yield encoder.event(event)
+    except Exception as e:
+        logger.error(f"渐进式简历分析失败: {e}", exc_info=True)
+        yield encoder.event({'type': 'error', 'error': str(e)})
+
+
 @router.post("/analyze/resume", response_model=ResumeAnalysisResponse)
 async def analyze_resume_with_agents(
     request: ResumeAnalysisRequest,
+    stream: bool = Query(False, description="是否以 SSE 渐进式返回各维度结果"),
+    protocol: Optional[str] = Query(None, description="SSE 协议版本: v1(全量) / v2(增量)"),
+    sse_protocol: Optional[str] = Header(None, alias=PROTOCOL_HEADER),
     db: AsyncSession = Depends(get_db),
     tenant_id: str = Depends(get_current_tenant_id)
 ):
     """
     使用多智能体系统分析简历
 
-    并行调用四个专家智能体进行多维度分析：
-    - 技能匹配度专家
-    - 工作经验评估专家
-    - 教育背景分析专家
-    - 软技能评估专家
+    并行调用七个专家智能体进行多维度分析（技能、经验、教育、软技能、稳定性、工作态度、发展潜力）。
+
+    stream=true 时返回 SSE 流：每个专家完成即推送 dimension 事件，随后推送 overall_score 事件，
+    摘要以 token 事件流式输出，最后的 done 事件携带完整分析结果。
 
     Args:
         request: 分析请求，包含简历ID和职位要求
+        stream: 是否渐进式返回
+        protocol: SSE 协议版本（查询参数）
+        sse_protocol: SSE 协议版本（请求头）
         db: 数据库会话
         tenant_id: 租户ID
 
@@ -64,11 +87,30 @@ async def analyze_resume_with_agents(
         HTTPException 500: 分析过程出错
     """
     try:
-        logger.info(f"收到简历分析请求，简历ID: {request.resume_id}, 租户: {tenant_id}")
+        logger.info(f"收到简历分析请求，简历ID: {request.resume_id}, 租户: {tenant_id}, 流式: {stream}")
 
         # 创建用例实例
         use_case = ResumeAnalysisUseCase(db)
 
+        if stream:
+            if not await use_case.get_resume_by_id(request.resume_id, tenant_id):
+                raise ValueError(f"简历不存在: {request.resume_id}")
+
+            from app.core.config import settings
+
+            negotiated_protocol = negotiate_protocol(protocol, sse_protocol)
+            encoder = SSEStreamEncoder(negotiated_protocol, settings.SSE_CHECKPOINT_INTERVAL)
+            return StreamingResponse(
+                _stream_analysis_events(use_case, request, tenant_id, encoder),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "X-Accel-Buffering": "no",
+                    PROTOCOL_HEADER: negotiated_protocol
+                }
+            )
+
         # 执行分析
         result = await use_case.analyze_with_agents(
             request=request,
@@ -95,14 +137,18 @@ async def analyze_resume_with_agents(
 @router.get("/analyze/{resume_id}", response_model=ResumeAnalysisResponse)
 async def get_resume_analysis(
     resume_id: str,
+    job_position_id: Optional[str] = Query(None, description="职位ID"),
+    analysis_profile: Optional[str] = Query(None, description="分析配置类型"),
     db: AsyncSession = Depends(get_db),
     tenant_id: str = Depends(get_current_tenant_id)
 ):
     """
-    获取简历的分析结果（如果已存在）
+    获取简历最新的分析结果（如果已存在）
 
     Args:
         resume_id: 简历ID
+        job_position_id: 只返回该职位的分析结果
+        analysis_profile: 只返回该分析配置的结果
         db: 数据库会话
         tenant_id: 租户ID
 
@@ -111,7 +157,7 @@ async def get_resume_analysis(
     """
     try:
         use_case = ResumeAnalysisUseCase(db)
-        resume = await use_case.get_resume_by_id(resume_id)
+        resume = await use_case.get_resume_by_id(resume_id, tenant_id)
 
         if not resume:
             raise HTTPException(
@@ -119,11 +165,18 @@ async def get_resume_analysis(
                 detail=f"简历不存在: {resume_id}"
             )
 
-        # TODO: 从数据库获取已保存的分析结果
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="分析结果不存在，请先执行分析"
+        result = await use_case.get_saved_analysis(
+            resume_id,
+            job_position_id=job_position_id,
+            analysis_profile=analysis_profile,
+            tenant_id=tenant_id
         )
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="分析结果不存在，请先执行分析"
+            )
+        return result
 
     except HTTPException:
         raise
@@ -135,6 +188,49 @@ async def get_resume_analysis(
         )
 
 
+@router.delete("/analyze/cache")
+async def clear_analysis_cache(
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    清除当前租户的专家分析结果缓存
+
+    Args:
+        tenant_id: 租户ID
+
+    Returns:
+        清除的缓存条目数量
+    """
+    try:
+        from app.infrastructure.cache.analysis_cache import get_analysis_cache
+
+        cache = get_analysis_cache()
+        evicted = await cache.evict_tenant(tenant_id) if cache else 0
+
+        return {"success": True, "evicted": evicted}
+
+    except Exception as e:
+        logger.error(f"清除分析缓存失败: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"清除失败: {str(e)}"
+        )
+
+
+@router.get("/analyze/cache/stats")
+async def get_analysis_cache_stats():
+    """
+    获取专家分析结果缓存的命中统计
+
+    Returns:
+        缓存统计信息
+    """
+    from app.infrastructure.cache.analysis_cache import get_analysis_cache
+
+    cache = get_analysis_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
 # ============================================================================
 # 对话管理端点
 # ============================================================================
@@ -204,7 +300,9 @@ async def _extract_report_from_conversation(
     conversation_id: str,
     service: ConversationService
 ) -> Optional[dict]:
-    """从对话历史中提取报告数据
+    """获取对话中已生成的分析报告
+
+    完整分析完成时结果会写入 resume_analyses 并关联对话ID，这里按对话ID索引读取最新一条
 
     Args:
         conversation_id: 对话ID
@@ -213,52 +311,19 @@ async def _extract_report_from_conversation(
     Returns:
         报告数据字典，如果找不到则返回None
     """
-    import json
-    import re
-
-    # 获取对话历史消息
-    messages = await service.get_conversation_messages(conversation_id)
-
-    # 从最新的消息开始查找
-    for msg in reversed(messages):
-        if msg["role"] == "assistant":
-            content = msg["content"]
-
-            # 查找JSON格式的报告数据
-            # 尝试1: 查找 ```json 代码块
-            json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-                try:
-                    report_data = json.loads(json_str)
-                    # 验证是否是报告格式（包含 overall_score 或 dimensions）
-                    if ("overall_score" in report_data or "dimensions" in report_data or
-                        any(key in report_data for key in ["skills", "experience", "education",
-                                                            "soft_skills", "stability",
-                                                            "work_attitude", "development_potential"])):
-                        return report_data
-                except json.JSONDecodeError:
-                    pass
-
-            # 尝试2: 查找直接的JSON对象（不含代码块）
-            # 查找包含 score 和维度名的模式
-            if any(keyword in content for keyword in ["综合评分", "各维度评分", "技能匹配度",
-                                                      "工作经验", "教育背景", "软技能"]):
-                # 这看起来像是一个报告，但可能不是纯JSON
-                # 返回一个简化的报告表示
-                return {
-                    "is_text_report": True,
-                    "content": content,
-                    "summary": content[:500] + "..." if len(content) > 500 else content
-                }
+    from app.infrastructure.repositories.resume_analysis_repository import ResumeAnalysisRepository
 
-    return None
+    record = await ResumeAnalysisRepository(service.db).get_latest_for_conversation(conversation_id)
+    if record is None:
+        return None
+    return ResumeAnalysisRepository.to_report_context(record)
 
 
 @router.get("/conversations")
 async def list_conversations(
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     tenant_id: str = Depends(get_current_tenant_id_optional)
 ):
@@ -267,12 +332,13 @@ async def list_conversations(
 
     Args:
         limit: 限制数量
-        offset: 偏移量
+        offset: 偏移量（兼容参数，提供 cursor 时忽略）
+        cursor: 上一页返回的 next_cursor
         db: 数据库会话
         tenant_id: 租户ID
 
     Returns:
-        对话列表
+        对话列表，next_cursor 为空表示没有更多
     """
     try:
         service = ConversationService(db)
@@ -280,35 +346,32 @@ async def list_conversations(
         conversations, total = await service.list_conversations(
             tenant_id=tenant_id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
 
-        # 转换为响应格式
+        # 转换为响应格式（消息数量与最后一条消息预览为对话表上的统计字段，无需逐个查询消息）
         items = []
         for conv in conversations:
-            # 获取最后一条消息
-            messages = await service.get_messages(str(conv.id), limit=1)
-            last_message = messages[0].content if messages else "暂无消息"
-
-            # 获取消息数量
-            all_messages = await service.get_messages(str(conv.id))
-            message_count = len(all_messages)
-
             items.append({
                 "id": str(conv.id),
                 "title": conv.title,
-                "last_message": last_message[:100],
+                "last_message": conv.last_message_preview or "暂无消息",
+                "last_message_at": conv.last_message_at.isoformat() if conv.last_message_at else None,
                 "timestamp": conv.created_at.isoformat(),
                 "is_starred": False,
-                "message_count": message_count,
+                "message_count": conv.message_count or 0,
                 "resume_id": str(conv.resume_id) if conv.resume_id else None  # 添加 resume_id 字段
             })
 
         return {
             "items": items,
-            "total": total
+            "total": total,
+            "next_cursor": next_cursor(conversations, limit, "created_at")
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取对话列表失败: {e}", exc_info=True)
         raise HTTPException(
@@ -491,6 +554,7 @@ async def get_messages(
     conversation_id: str,
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     tenant_id: str = Depends(get_current_tenant_id_optional)
 ):
@@ -500,12 +564,13 @@ async def get_messages(
     Args:
         conversation_id: 对话ID
         limit: 限制数量
-        offset: 偏移量
+        offset: 偏移量（兼容参数，提供 cursor 时忽略）
+        cursor: 上一页返回的 next_cursor
         db: 数据库会话
         tenant_id: 租户ID
 
     Returns:
-        消息列表
+        消息列表，next_cursor 为空表示没有更多
     """
     try:
         service = ConversationService(db)
@@ -518,7 +583,7 @@ async def get_messages(
                 detail=f"对话不存在: {conversation_id}"
             )
 
-        messages = await service.get_messages(conversation_id, limit, offset)
+        messages = await service.get_messages(conversation_id, limit, offset, cursor=cursor)
 
         # 转换为响应格式
         items = []
@@ -531,17 +596,17 @@ async def get_messages(
                 "created_at": msg.created_at.isoformat()
             })
 
-        # 获取总数
-        all_messages = await service.get_messages(conversation_id)
-        total = len(all_messages)
-
         return {
             "items": items,
-            "total": total
+            # 总数取对话表上维护的消息统计，无需加载全部消息
+            "total": conversation.message_count or 0,
+            "next_cursor": next_cursor(messages, limit, "created_at")
         }
 
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取消息历史失败: {e}", exc_info=True)
         raise HTTPException(
@@ -554,12 +619,52 @@ async def get_messages(
 # 流式响应端点
 # ============================================================================
 
+async def _stream_llm_tokens(llm, langchain_messages, encoder: SSEStreamEncoder, tenant_id: str):
+    """调用 LLM 的 astream 接口，收到增量即编码为 token 事件转发
+
+    对话回复以最高优先级经全局调度器执行，不会排在批量分析之后。
+    消息超出模型的输入预算时先按优先级裁剪（丢弃最早的历史消息，再截断最后一条消息附带的简历上下文）。
+
+    Args:
+        llm: ChatOpenAI 实例
+        langchain_messages: LangChain 消息列表
+        encoder: 本次回复的事件编码器，结束后通过 encoder.content 取得完整回复
+        tenant_id: 租户ID
+    """
+    from app.core.config import settings
+    from app.application.services.prompt_budget import PromptBudget
+    from app.infrastructure.external_services.llm_scheduler import (
+        PRIORITY_INTERACTIVE,
+        estimate_tokens,
+        get_llm_scheduler,
+        provider_of,
+    )
+
+    langchain_messages = PromptBudget.for_llm(llm).fit_messages(langchain_messages)
+    max_tokens = getattr(llm, "max_tokens", None) or settings.DEFAULT_MAX_TOKENS
+    async with get_llm_scheduler().slot(
+        tenant_id,
+        provider_of(llm),
+        estimated_tokens=estimate_tokens(langchain_messages) + max_tokens,
+        priority=PRIORITY_INTERACTIVE,
+    ) as lease:
+        acc = None
+        async for chunk in llm.astream(langchain_messages, stream_usage=True):
+            acc = chunk if acc is None else acc + chunk
+            delta = chunk.content
+            if not delta or not isinstance(delta, str):
+                continue
+            yield encoder.token(delta)
+        lease.record_usage(acc)
+
+
 async def generate_streaming_response(
     conversation_id: str,
     user_message: str,
     tenant_id: str,
     service: ConversationService,
-    use_agent: bool = False
+    use_agent: bool = False,
+    protocol: str = DEFAULT_PROTOCOL
 ):
     """生成流式响应
 
@@ -569,9 +674,11 @@ async def generate_streaming_response(
         tenant_id: 租户ID
         service: 对话服务
         use_agent: 是否使用智能体模式
+        protocol: SSE 协议版本（v1 兼容全量 / v2 增量 + checkpoint）
     """
-    import json
-    from datetime import datetime
+    from app.core.config import settings
+
+    encoder = SSEStreamEncoder(protocol, settings.SSE_CHECKPOINT_INTERVAL)
 
     # TEST LOG at the very beginning of the streaming response generator
     print(f"=== generate_streaming_response START === conv_id={conversation_id}, use_agent={use_agent}, message={user_message[:50]}")
@@ -585,10 +692,10 @@ async def generate_streaming_response(
         )
 
         # 发送用户消息事件
-        yield f"data: {json.dumps({'type': 'user_message', 'message': {'id': str(user_msg.id), 'role': 'user', 'content': user_message}}, ensure_ascii=False)}\n\n"
+        yield encoder.event({'type': 'user_message', 'message': {'id': str(user_msg.id), 'role': 'user', 'content': user_message}})
 
-        # 2. 获取对话历史
-        history = await service.get_conversation_messages(conversation_id)
+        # 2. 获取对话历史（滚动摘要 + 最近消息）
+        history = await service.get_conversation_context(conversation_id)
 
         # 3. 根据模式选择响应方式
         print(f"=== MODE SELECTION === use_agent={use_agent}, type={type(use_agent)}")
@@ -596,20 +703,20 @@ async def generate_streaming_response(
             # 智能体模式
             print(f"=== ENTERING AGENT MODE === conversation_id={conversation_id}")
             logger.info(f"使用智能体模式处理消息: conversation_id={conversation_id}")
-            async for chunk in _generate_agent_mode_response(history, conversation_id, tenant_id, service):
+            async for chunk in _generate_agent_mode_response(history, conversation_id, tenant_id, service, encoder):
                 yield chunk
         else:
             # 简单对话模式
             print(f"=== ENTERING SIMPLE MODE === conversation_id={conversation_id}")
-            async for chunk in _generate_simple_mode_response(history, conversation_id, tenant_id, service):
+            async for chunk in _generate_simple_mode_response(history, conversation_id, tenant_id, service, encoder):
                 yield chunk
 
     except Exception as e:
         logger.error(f"流式响应生成失败: {e}", exc_info=True)
-        yield f"data: {json.dumps({'type': 'error', 'error': str(e)}, ensure_ascii=False)}\n\n"
+        yield encoder.event({'type': 'error', 'error': str(e)})
 
 
-async def _generate_simple_mode_response(history, conversation_id: str, tenant_id: str, service):
+async def _generate_simple_mode_response(history, conversation_id: str, tenant_id: str, service, encoder: SSEStreamEncoder):
     """生成简单对话响应（直接调用LLM）"""
     import json
 
@@ -655,9 +762,9 @@ async def _generate_simple_mode_response(history, conversation_id: str, tenant_i
                     print(f"[简单模式] 使用extracted_text作为简历上下文，长度: {len(resume.extracted_text)}")
                 else:
                     # fallback to parsed_content
-                    if resume.parsed_content and len(resume.parsed_content) > 0:
+                    parsed = lean_parsed_content(resume.parsed_content)
+                    if parsed:
                         resume_context = f"\n\n【关联简历信息】\n候选人姓名：{resume.candidate_name or '未知'}\n"
-                        parsed = resume.parsed_content
 
                         # 检查是否有结构化数据（basic_info, work_experience等）
                         has_structured_data = any(key in parsed for key in ['basic_info', 'work_experience', 'education', 'skills', 'projects'])
@@ -740,20 +847,21 @@ async def _generate_simple_mode_response(history, conversation_id: str, tenant_i
         messages.extend(history)
 
     # 调用LLM
-    from app.application.services.llm_service import TenantLLMService, TenantService
+    from app.application.services.model_config_cache import get_model_config_cache
     from app.core.config import settings
     from app.core.llm_init import DEFAULT_TENANT_ID
     import os
 
-    # 获取租户信息
-    tenant = await TenantService.get_by_id(service.db, tenant_id)
+    # 获取租户默认模型（带缓存）
+    config_cache = get_model_config_cache()
+    tenant_llm_id = await config_cache.get_tenant_llm_id(service.db, tenant_id)
     model_to_use = settings.DEFAULT_AI_MODEL
-    if tenant and tenant.llm_id:
-        model_to_use = tenant.llm_id
+    if tenant_llm_id:
+        model_to_use = tenant_llm_id
     elif tenant_id == DEFAULT_TENANT_ID:
         model_to_use = "glm-4@ZHIPU-AI"
 
-    llm_config = await TenantLLMService.get_api_key(
+    llm_config = await config_cache.get_model_config(
         service.db, tenant_id, model_to_use
     )
 
@@ -772,38 +880,33 @@ async def _generate_simple_mode_response(history, conversation_id: str, tenant_i
 2. 添加您的OpenAI API密钥
 3. 设置默认模型后即可使用"""
 
-        # 发送错误消息作为token流
-        words = error_msg.split()
-        accumulated = ""
-        for word in words:
-            accumulated += word + " "
-            yield f"data: {json.dumps({'type': 'token', 'token': word + ' ', 'accumulated': accumulated.strip()}, ensure_ascii=False)}\n\n"
+        yield encoder.token(error_msg)
 
         await service.create_message(
             conversation_id=conversation_id,
             role="assistant",
             content=error_msg
         )
-        yield f"data: {json.dumps({'type': 'done', 'message': {'role': 'assistant', 'content': error_msg}}, ensure_ascii=False)}\n\n"
+        yield encoder.event({'type': 'done', 'message': {'role': 'assistant', 'content': error_msg}})
         return
 
     # 调用LLM - 使用较低温度使回复更严谨
+    from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
     if llm_config:
-        from langchain_openai import ChatOpenAI
-        llm = ChatOpenAI(
-            model=llm_config.llm_name,
-            openai_api_key=api_key,
-            base_url=llm_config.api_base or None,
+        llm = get_llm_client_pool().get_client(
+            tenant_id,
+            llm_config.llm_name,
+            api_key=api_key,
+            api_base=llm_config.api_base,
             temperature=0.3,
-            max_tokens=llm_config.max_tokens or settings.DEFAULT_MAX_TOKENS,
+            max_tokens=llm_config.max_tokens,
         )
     else:
-        from langchain_openai import ChatOpenAI
-        llm = ChatOpenAI(
-            model=settings.DEFAULT_AI_MODEL,
-            openai_api_key=api_key,
+        llm = get_llm_client_pool().get_client(
+            tenant_id,
+            settings.DEFAULT_AI_MODEL,
+            api_key=api_key,
             temperature=0.3,
-            max_tokens=settings.DEFAULT_MAX_TOKENS,
         )
 
     # 生成回复
@@ -818,15 +921,10 @@ async def _generate_simple_mode_response(history, conversation_id: str, tenant_i
         elif msg["role"] == "assistant":
             langchain_messages.append(AIMessage(content=msg["content"]))
 
-    response = await llm.ainvoke(langchain_messages)
-    ai_reply = response.content
-
-    # 模拟流式输出
-    words = ai_reply.split()
-    accumulated = ""
-    for word in words:
-        accumulated += word + " "
-        yield f"data: {json.dumps({'type': 'token', 'token': word + ' ', 'accumulated': accumulated.strip()}, ensure_ascii=False)}\n\n"
+    # 流式输出，收到增量即转发
+    async for event in _stream_llm_tokens(llm, langchain_messages, encoder, tenant_id):
+        yield event
+    ai_reply = encoder.content
 
     # 保存AI回复
     await service.create_message(
@@ -835,8 +933,11 @@ async def _generate_simple_mode_response(history, conversation_id: str, tenant_i
         content=ai_reply
     )
 
+    # 摘要在后台任务中更新（独立的数据库会话），done 事件不等待摘要的LLM调用
+    service.schedule_memory_update(conversation_id, llm, tenant_id)
+
     # 发送完成事件
-    yield f"data: {json.dumps({'type': 'done', 'message': {'role': 'assistant', 'content': ai_reply}}, ensure_ascii=False)}\n\n"
+    yield encoder.event({'type': 'done', 'message': {'role': 'assistant', 'content': ai_reply}})
 
 
 async def _generate_report_based_response(
@@ -844,7 +945,8 @@ async def _generate_report_based_response(
     report_context: dict,
     conversation_id: str,
     tenant_id: str,
-    service: ConversationService
+    service: ConversationService,
+    encoder: SSEStreamEncoder
 ):
     """生成基于报告的对话响应（限制在报告相关范围内）
 
@@ -854,9 +956,9 @@ async def _generate_report_based_response(
         conversation_id: 对话ID
         tenant_id: 租户ID
         service: 对话服务
+        encoder: SSE 事件编码器
     """
     import json
-    from langchain_openai import ChatOpenAI
     from langchain_core.messages import HumanMessage, SystemMessage
     from app.core.config import settings
 
@@ -911,24 +1013,25 @@ async def _generate_report_based_response(
 """
 
     # 获取LLM配置
-    from app.application.services.llm_service import TenantLLMService, TenantService
+    from app.application.services.model_config_cache import get_model_config_cache
     from app.core.config import settings
     from app.core.llm_init import DEFAULT_TENANT_ID
     import os
 
-    # 首先获取租户信息，看看租户配置了什么默认模型
-    tenant = await TenantService.get_by_id(service.db, tenant_id)
+    # 首先获取租户配置的默认模型（带缓存）
+    config_cache = get_model_config_cache()
+    tenant_llm_id = await config_cache.get_tenant_llm_id(service.db, tenant_id)
 
     # 确定要使用的模型
     model_to_use = settings.DEFAULT_AI_MODEL  # 默认值
-    if tenant and tenant.llm_id:
-        model_to_use = tenant.llm_id
+    if tenant_llm_id:
+        model_to_use = tenant_llm_id
     elif tenant_id == DEFAULT_TENANT_ID:
         # 对于默认租户，尝试从初始化配置获取
         model_to_use = "glm-4@ZHIPU-AI"  # 或从配置读取
 
     # 获取租户的LLM配置
-    llm_config = await TenantLLMService.get_api_key(
+    llm_config = await config_cache.get_model_config(
         service.db, tenant_id, model_to_use
     )
 
@@ -943,48 +1046,46 @@ async def _generate_report_based_response(
     if not api_key:
         # 没有配置API密钥
         error_msg = "抱歉，AI服务未配置。请联系管理员配置API密钥。"
-        yield f"data: {json.dumps({'type': 'error', 'error': error_msg}, ensure_ascii=False)}\n\n"
+        yield encoder.event({'type': 'error', 'error': error_msg})
         return
 
     # 创建LLM - 使用较低温度使回复更严谨
+    from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
     if llm_config:
-        llm = ChatOpenAI(
-            model=llm_config.llm_name,
-            openai_api_key=api_key,
-            base_url=llm_config.api_base or None,
+        llm = get_llm_client_pool().get_client(
+            tenant_id,
+            llm_config.llm_name,
+            api_key=api_key,
+            api_base=llm_config.api_base,
             temperature=0.3,
-            max_tokens=llm_config.max_tokens or settings.DEFAULT_MAX_TOKENS,
+            max_tokens=llm_config.max_tokens,
         )
     else:
-        llm = ChatOpenAI(
-            model=settings.DEFAULT_AI_MODEL,
-            openai_api_key=api_key,
+        llm = get_llm_client_pool().get_client(
+            tenant_id,
+            settings.DEFAULT_AI_MODEL,
+            api_key=api_key,
             temperature=0.3,
-            max_tokens=settings.DEFAULT_MAX_TOKENS,
         )
 
-    # 构建消息历史（只包含最近的几条消息）
-    messages = await service.get_conversation_messages(conversation_id)
+    # 构建消息历史（滚动摘要 + 最近消息，报告本身已在系统提示词中）
+    messages = await service.get_conversation_context(conversation_id)
     langchain_messages = [SystemMessage(content=system_prompt)]
 
-    # 只添加最近的5条消息以保持上下文
-    for msg in messages[-5:]:
-        if msg["role"] == "user":
+    for msg in messages:
+        if msg["role"] == "system":
+            langchain_messages.append(SystemMessage(content=msg["content"]))
+        elif msg["role"] == "user":
             langchain_messages.append(HumanMessage(content=msg["content"]))
         elif msg["role"] == "assistant":
             from langchain_core.messages import AIMessage
             langchain_messages.append(AIMessage(content=msg["content"]))
 
     # 生成回复
-    response = await llm.ainvoke(langchain_messages)
-    ai_reply = response.content
-
-    # 模拟流式输出
-    words = ai_reply.split()
-    accumulated = ""
-    for word in words:
-        accumulated += word + " "
-        yield f"data: {json.dumps({'type': 'token', 'token': word + ' ', 'accumulated': accumulated.strip()}, ensure_ascii=False)}\n\n"
+    # 流式输出，收到增量即转发
+    async for event in _stream_llm_tokens(llm, langchain_messages, encoder, tenant_id):
+        yield event
+    ai_reply = encoder.content
 
     # 保存AI回复
     await service.create_message(
@@ -993,11 +1094,14 @@ async def _generate_report_based_response(
         content=ai_reply
     )
 
+    # 摘要在后台任务中更新（独立的数据库会话），done 事件不等待摘要的LLM调用
+    service.schedule_memory_update(conversation_id, llm, tenant_id)
+
     # 发送完成事件
-    yield f"data: {json.dumps({'type': 'done', 'message': {'role': 'assistant', 'content': ai_reply}}, ensure_ascii=False)}\n\n"
+    yield encoder.event({'type': 'done', 'message': {'role': 'assistant', 'content': ai_reply}})
 
 
-async def _generate_agent_mode_response(history, conversation_id: str, tenant_id: str, service):
+async def _generate_agent_mode_response(history, conversation_id: str, tenant_id: str, service, encoder: SSEStreamEncoder):
     """生成智能体响应（支持多轮对话记忆 + 动态调用专家智能体）"""
     import json
     import logging
@@ -1034,7 +1138,8 @@ async def _generate_agent_mode_response(history, conversation_id: str, tenant_id
             report_context,
             conversation_id,
             tenant_id,
-            service
+            service,
+            encoder
         ):
             yield chunk
         return
@@ -1072,16 +1177,18 @@ async def _generate_agent_mode_response(history, conversation_id: str, tenant_id
                     logger.info(f"[智能体模式] 使用extracted_text作为简历数据，长度: {len(resume_obj.extracted_text)}")
 
                     # 如果 parsed_content 有结构化数据,也包含进来
-                    if resume_obj.parsed_content and len(resume_obj.parsed_content) > 0:
-                        has_structured_data = any(key in resume_obj.parsed_content for key in ['basic_info', 'work_experience', 'education', 'skills', 'projects'])
+                    parsed = lean_parsed_content(resume_obj.parsed_content)
+                    if parsed:
+                        has_structured_data = any(key in parsed for key in ['basic_info', 'work_experience', 'education', 'skills', 'projects'])
                         if has_structured_data:
                             # 合并结构化数据
-                            resume_data.update(resume_obj.parsed_content)
+                            resume_data.update(parsed)
                             logger.info(f"[智能体模式] 已合并结构化数据")
                 else:
                     # fallback to parsed_content
-                    if resume_obj.parsed_content and len(resume_obj.parsed_content) > 0:
-                        resume_data = resume_obj.parsed_content
+                    parsed = lean_parsed_content(resume_obj.parsed_content)
+                    if parsed:
+                        resume_data = parsed
                         logger.info(f"[智能体模式] 使用parsed_content作为简历数据")
                     else:
                         logger.warning(f"[智能体模式] 简历数据为空,既没有extracted_text也没有parsed_content")
@@ -1114,17 +1221,50 @@ async def _generate_agent_mode_response(history, conversation_id: str, tenant_id
     logger.info(f"[智能体模式] should_call_agents结果: {should_call}")
 
     expert_analysis = None
+    # 完整分析报告在后续轮次的历史中以引用代替全文
+    message_meta = None
 
     if should_call and resume_data:
         print("=== [智能体模式] 需要调用专家智能体 ===")
         logger.info(f"[智能体模式] 需要调用专家智能体")
         try:
-            print("=== 开始调用 route_to_expert ===")
-            expert_result = await router.route_to_expert(last_user_message, history, resume_data)
+            intent, _ = await router.identify_intent(last_user_message, history)
+            if intent == "full_analysis":
+                # 完整分析渐进输出：每个维度完成即推送，摘要边生成边推送
+                expert_result = None
+                async for event in router.stream_full_analysis(resume_data):
+                    if event["type"] == "result":
+                        expert_result = event["result"]
+                    else:
+                        yield encoder.event({**event, 'type': f"analysis_{event['type']}"})
+            else:
+                print("=== 开始调用 route_to_expert ===")
+                expert_result = await router.route_to_expert(last_user_message, history, resume_data)
             print(f"=== route_to_expert 返回: {expert_result is not None} ===")
             if expert_result:
                 print("=== 开始格式化专家结果 ===")
                 expert_analysis = router.format_expert_result(expert_result)
+
+                # 完整分析结果落库并关联对话，后续追问按对话ID直接读取报告
+                full_result = expert_result.get("result") or {}
+                if resume_obj and expert_result.get("expert") == "多智能体协调系统" and not full_result.get("error"):
+                    from app.application.services.conversation_memory import report_reference
+                    from app.infrastructure.repositories.resume_analysis_repository import ResumeAnalysisRepository
+                    try:
+                        record = await ResumeAnalysisRepository(service.db).save(
+                            resume_obj.id,
+                            full_result,
+                            tenant_id=tenant_id,
+                            model_name=router.coordinator.model_id or router.coordinator.skills_expert.model_id,
+                            conversation_id=conversation_id,
+                        )
+                        message_meta = {
+                            "analysis_id": str(record.id),
+                            "memory_ref": report_reference(record.id, full_result),
+                        }
+                    except Exception as save_error:
+                        await service.db.rollback()
+                        logger.error(f"[智能体模式] 保存分析结果失败: {save_error}", exc_info=True)
                 print(f"=== 专家分析完成，长度: {len(expert_analysis)}, 包含JSON: {'```json' in expert_analysis} ===")
                 logger.info(f"[智能体模式] 专家分析完成，长度: {len(expert_analysis)}")
             else:
@@ -1293,63 +1433,57 @@ async def _generate_agent_mode_response(history, conversation_id: str, tenant_id
         # 🎯 关键修改：如果有JSON数据，通过隐藏事件发送
         if json_data:
             # 发送隐藏的JSON数据事件（不显示在聊天界面）
-            yield f"data: {json.dumps({'type': 'json_data', 'data': json_data}, ensure_ascii=False)}\n\n"
+            yield encoder.event({'type': 'json_data', 'data': json_data})
             logger.info(f"[智能体模式] 已发送隐藏的JSON数据事件")
 
         # 流式输出显示文本（不包含JSON代码块）
         if display_text.strip():
-            words = display_text.split()
-            accumulated = ""
-            for word in words:
-                accumulated += word + " "
-                yield f"data: {json.dumps({'type': 'token', 'token': word + ' ', 'accumulated': accumulated.strip()}, ensure_ascii=False)}\n\n"
+            yield encoder.token(display_text)
 
         # 保存到数据库（保存完整内容，包括JSON）
         await service.create_message(
             conversation_id=conversation_id,
             role="assistant",
-            content=expert_analysis
+            content=expert_analysis,
+            meta_data=message_meta
         )
 
-        yield f"data: {json.dumps({'type': 'done', 'message': {'role': 'assistant', 'content': display_text}}, ensure_ascii=False)}\n\n"
+        yield encoder.event({'type': 'done', 'message': {'role': 'assistant', 'content': display_text}})
         return
 
     # 没有专家分析时，调用LLM生成响应
-    from app.application.services.llm_service import TenantLLMService, TenantService
+    from app.application.services.model_config_cache import get_model_config_cache
     from app.core.config import settings
     import os
 
-    tenant = await TenantService.get_by_id(service.db, tenant_id)
-    model_to_use = tenant.llm_id if tenant else settings.DEFAULT_AI_MODEL
+    config_cache = get_model_config_cache()
+    model_to_use = await config_cache.get_tenant_llm_id(service.db, tenant_id) or settings.DEFAULT_AI_MODEL
 
-    llm_config = await TenantLLMService.get_api_key(service.db, tenant_id, model_to_use)
+    llm_config = await config_cache.get_model_config(service.db, tenant_id, model_to_use)
     api_key = llm_config.api_key if llm_config else os.getenv("OPENAI_API_KEY")
 
     if not api_key:
         simple_reply = "抱歉，智能体模式需要配置API密钥。请先在「AI模型管理」中配置。"
-        words = simple_reply.split()
-        accumulated = ""
-        for word in words:
-            accumulated += word + " "
-            yield f"data: {json.dumps({'type': 'token', 'token': word + ' ', 'accumulated': accumulated.strip()}, ensure_ascii=False)}\n\n"
+        yield encoder.token(simple_reply)
 
         await service.create_message(
             conversation_id=conversation_id,
             role="assistant",
             content=simple_reply
         )
-        yield f"data: {json.dumps({'type': 'done', 'message': {'role': 'assistant', 'content': simple_reply}}, ensure_ascii=False)}\n\n"
+        yield encoder.event({'type': 'done', 'message': {'role': 'assistant', 'content': simple_reply}})
         return
 
-    from langchain_openai import ChatOpenAI
     from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+    from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
 
-    llm = ChatOpenAI(
-        model=llm_config.llm_name,
-        openai_api_key=api_key,
-        base_url=llm_config.api_base or None,
+    llm = get_llm_client_pool().get_client(
+        tenant_id,
+        llm_config.llm_name,
+        api_key=api_key,
+        api_base=llm_config.api_base,
         temperature=0.3,
-        max_tokens=llm_config.max_tokens or settings.DEFAULT_MAX_TOKENS,
+        max_tokens=llm_config.max_tokens,
     )
 
     # 转换为 LangChain 消息格式
@@ -1362,15 +1496,10 @@ async def _generate_agent_mode_response(history, conversation_id: str, tenant_id
         elif msg["role"] == "assistant":
             langchain_messages.append(AIMessage(content=msg["content"]))
 
-    response = await llm.ainvoke(langchain_messages)
-    ai_reply = response.content
-
-    # 流式输出
-    words = ai_reply.split()
-    accumulated = ""
-    for word in words:
-        accumulated += word + " "
-        yield f"data: {json.dumps({'type': 'token', 'token': word + ' ', 'accumulated': accumulated.strip()}, ensure_ascii=False)}\n\n"
+    # 流式输出，收到增量即转发
+    async for event in _stream_llm_tokens(llm, langchain_messages, encoder, tenant_id):
+        yield event
+    ai_reply = encoder.content
 
     await service.create_message(
         conversation_id=conversation_id,
@@ -1378,22 +1507,32 @@ async def _generate_agent_mode_response(history, conversation_id: str, tenant_id
         content=ai_reply
     )
 
-    yield f"data: {json.dumps({'type': 'done', 'message': {'role': 'assistant', 'content': ai_reply}}, ensure_ascii=False)}\n\n"
+    # 摘要在后台任务中更新（独立的数据库会话），done 事件不等待摘要的LLM调用
+    service.schedule_memory_update(conversation_id, llm, tenant_id)
+    yield encoder.event({'type': 'done', 'message': {'role': 'assistant', 'content': ai_reply}})
 
 
 @router.post("/conversations/{conversation_id}/stream")
 async def send_message_stream(
     conversation_id: str,
     request: SendMessageRequest,
+    protocol: Optional[str] = Query(None, description="SSE 协议版本: v1(全量) / v2(增量)"),
+    sse_protocol: Optional[str] = Header(None, alias=PROTOCOL_HEADER),
     db: AsyncSession = Depends(get_db),
     tenant_id: str = Depends(get_current_tenant_id_optional)
 ):
     """
     发送消息并获取流式AI回复
 
+    协议版本可通过查询参数 ?protocol= 或请求头 X-SSE-Protocol 协商：
+    - v1（默认）：token 事件附带 accumulated 全量文本，兼容旧客户端
+    - v2：token 事件只携带增量和序号，每隔若干 token 发送 checkpoint 事件（含完整文本）供客户端校准
+
     Args:
         conversation_id: 对话ID
         request: 消息请求
+        protocol: SSE 协议版本（查询参数）
+        sse_protocol: SSE 协议版本（请求头）
         db: 数据库会话
         tenant_id: 租户ID
 
@@ -1414,19 +1553,23 @@ async def send_message_stream(
                 detail=f"对话不存在: {conversation_id}"
             )
 
+        negotiated_protocol = negotiate_protocol(protocol, sse_protocol)
+
         return StreamingResponse(
             generate_streaming_response(
                 conversation_id=conversation_id,
                 user_message=request.content,
                 tenant_id=tenant_id,
                 service=service,
-                use_agent=request.use_agent
+                use_agent=request.use_agent,
+                protocol=negotiated_protocol
             ),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
-                "X-Accel-Buffering": "no"
+                "X-Accel-Buffering": "no",
+                PROTOCOL_HEADER: negotiated_protocol
             }
         )
 
@@ -32,6 +32,7 @@ from app.application.services.llm_service import (
     TenantLLMService,
     TenantService,
 )
+from app.application.services.model_config_cache import get_model_config_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -48,6 +49,11 @@ def create_response(data: Any = None, code: int = 0, message: str = None) -> Dic
     return response
 
 
+def _invalidate_model_config(tenant_id: str):
+    """租户模型配置变更后，失效模型配置缓存"""
+    get_model_config_cache().invalidate(tenant_id)
+
+
 @router.get("/factories", response_model=ApiResponse)
 async def get_factories(
     db: AsyncSession = Depends(get_db),
@@ -158,6 +164,7 @@ async def set_api_key(
                 max_tokens=llm.max_tokens or 8192
             )
 
+        _invalidate_model_config(tenant_id)
         return create_response(data=True)
 
     except HTTPException:
@@ -286,6 +293,7 @@ async def add_llm(
             max_tokens=request.max_tokens or 8192
         )
 
+        _invalidate_model_config(tenant_id)
         return create_response(data=True)
 
     except HTTPException:
@@ -319,6 +327,7 @@ async def delete_llm(
                 detail="未找到指定的模型配置"
             )
 
+        _invalidate_model_config(tenant_id)
         return create_response(data=True)
 
     except HTTPException:
@@ -353,6 +362,7 @@ async def enable_llm(
                 detail="未找到指定的模型配置"
             )
 
+        _invalidate_model_config(tenant_id)
         return create_response(data=True)
 
     except HTTPException:
@@ -379,6 +389,7 @@ async def delete_factory(
             llm_factory=request.llm_factory
         )
 
+        _invalidate_model_config(tenant_id)
         return create_response(data=True)
 
     except Exception as e:
@@ -534,6 +545,7 @@ async def get_tenant_info(
             db.add(tenant)
             await db.commit()
             await db.refresh(tenant)
+            _invalidate_model_config(tenant_id)
 
         data = {
             "tenant_id": str(tenant.id),
@@ -582,6 +594,16 @@ async def set_tenant_info(
                 detail="租户不存在"
             )
 
+        _invalidate_model_config(request.tenant_id)
+
+        # embedding 模型变化后，已有简历的向量需要用新模型重建
+        if request.embd_id:
+            try:
+                from app.application.services.reembedding_service import get_reembedding_service
+                await get_reembedding_service().start(db, request.tenant_id)
+            except Exception as e:
+                logger.warning(f"启动向量重建任务失败: {str(e)}")
+
         return create_response(data=True)
 
     except HTTPException:
@@ -589,3 +611,38 @@ async def set_tenant_info(
     except Exception as e:
         logger.error(f"设置租户信息失败: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache_stats", response_model=ApiResponse)
+async def get_cache_stats():
+    """
+    获取模型配置缓存与 LLM 客户端池的命中统计
+    GET /api/v1/llm/cache_stats
+    """
+    try:
+        from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
+
+        return create_response(data={
+            "model_config_cache": get_model_config_cache().stats(),
+            "llm_client_pool": get_llm_client_pool().stats(),
+        })
+
+    except Exception as e:
+        logger.error(f"获取缓存统计失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/scheduler_stats", response_model=ApiResponse)
+async def get_scheduler_stats():
+    """
+    获取 LLM 调度器的并发占用、各优先级排队深度与等待时间
+    GET /api/v1/llm/scheduler_stats
+    """
+    try:
+        from app.infrastructure.external_services.llm_scheduler import get_llm_scheduler
+
+        return create_response(data=get_llm_scheduler().stats())
+
+    except Exception as e:
+        logger.error(f"获取调度统计失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,18 +1,24 @@
 """简历管理API端点"""
 
+import asyncio
 import logging
 import os
 from typing import Any, List, Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Form
 from fastapi.responses import JSONResponse, FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
+from sqlalchemy import select, and_
+from sqlalchemy.orm import defer
 
 from app.core.dependencies import get_db, get_current_tenant_id_optional, get_current_user
 from app.infrastructure.database.models import Resume, User
 from app.application.services.resume_upload_service import get_upload_service
-from app.application.services.embedding_service import VectorStoreService
+from app.application.services.embedding_service import EmbeddingError, VectorStoreService
 from app.core.config import settings
+from app.core.pagination import keyset_condition, next_cursor
+from app.infrastructure.search.fulltext import highlight, ranked_matches, ts_query
+from app.infrastructure.search.hybrid import metadata_filters, scoped_ids
 
 logger = logging.getLogger(__name__)
 
@@ -23,64 +29,148 @@ router = APIRouter()
 async def list_resumes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor，提供时忽略 skip"),
     keyword: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     tenant_id: str = Depends(get_current_tenant_id_optional),
     current_user: User = Depends(get_current_user),
 ) -> Any:
-    """获取简历列表（仅返回当前用户的简历）"""
+    """获取简历列表（仅返回当前用户的简历）
+
+    提供 keyword 时按倒排索引检索，结果按相关度排序并附带命中片段（highlight），使用 skip 分页
+    """
     try:
-        # 构建查询 - 只查询当前用户的简历
-        query = select(Resume).where(Resume.uploaded_by == current_user.id)
+        filters = [Resume.uploaded_by == current_user.id]
 
         # 状态过滤
         if status:
-            query = query.where(Resume.status == status)
-
-        # 关键词搜索
-        if keyword:
-            search_pattern = f"%{keyword}%"
-            query = query.where(
-                or_(
-                    Resume.filename.ilike(search_pattern),
-                    Resume.candidate_name.ilike(search_pattern),
-                    Resume.extracted_text.ilike(search_pattern),
-                )
+            filters.append(Resume.status == status)
+
+        # 关键词检索（没有可检索的词元时忽略关键词）
+        tsquery = ts_query(keyword) if keyword else None
+        ranks = {}
+
+        if tsquery is not None:
+            if cursor:
+                raise ValueError("关键词检索按相关度排序，不支持游标分页，请使用 skip")
+
+            # 只对最近上传的 RESUME_SEARCH_MAX_CANDIDATES 条命中计算相关度
+            matched = ranked_matches(tsquery, filters, settings.RESUME_SEARCH_MAX_CANDIDATES)
+            # 正文用于生成命中片段，只读取本页的简历
+            query = (
+                select(Resume, matched.c.rank)
+                .options(defer(Resume.parsed_content), defer(Resume.original_content))
+                .join(matched, matched.c.id == Resume.id)
+                .order_by(matched.c.rank.desc(), Resume.upload_time.desc(), Resume.id.desc())
+                .offset(skip)
+                .limit(limit)
+            )
+            result = await db.execute(query)
+            rows = result.all()
+            resumes = [row[0] for row in rows]
+            ranks = {row[0].id: row[1] for row in rows}
+        else:
+            # 构建查询 - 只查询当前用户的简历（列表不需要正文和解析内容）
+            query = (
+                select(Resume)
+                .options(defer(Resume.parsed_content), defer(Resume.extracted_text), defer(Resume.original_content))
+                .where(*filters)
             )
 
-        # 排序和分页
-        query = query.order_by(Resume.upload_time.desc()).offset(skip).limit(limit)
-
-        result = await db.execute(query)
-        resumes = result.scalars().all()
+            # 排序和分页：游标分页按 (upload_time, id) 倒序从上一页末尾继续，命中 (uploaded_by, upload_time) 索引；
+            # skip 为兼容旧客户端的偏移分页
+            if cursor:
+                query = query.where(keyset_condition(Resume.upload_time, Resume.id, cursor))
+            else:
+                query = query.offset(skip)
+            query = query.order_by(Resume.upload_time.desc(), Resume.id.desc()).limit(limit)
+
+            result = await db.execute(query)
+            resumes = result.scalars().all()
+
+        items = []
+        for r in resumes:
+            item = {
+                "id": str(r.id),
+                "filename": r.filename,
+                "file_type": r.file_type,
+                "file_size": r.file_size,
+                "upload_time": r.upload_time.isoformat() if r.upload_time else None,
+                "status": r.status,
+                "embedding_status": r.embedding_status,
+                "candidate_name": r.candidate_name,
+                "candidate_email": r.candidate_email,
+                "candidate_phone": r.candidate_phone,
+                "candidate_location": r.candidate_location,
+            }
+            if tsquery is not None:
+                item["score"] = round(float(ranks[r.id] or 0.0), 4)
+                item["highlight"] = highlight(r.extracted_text, keyword)
+            items.append(item)
 
         # 转换为响应格式
         return {
             "code": 0,
-            "data": [
-                {
-                    "id": str(r.id),
-                    "filename": r.filename,
-                    "file_type": r.file_type,
-                    "file_size": r.file_size,
-                    "upload_time": r.upload_time.isoformat() if r.upload_time else None,
-                    "status": r.status,
-                    "candidate_name": r.candidate_name,
-                    "candidate_email": r.candidate_email,
-                    "candidate_phone": r.candidate_phone,
-                    "candidate_location": r.candidate_location,
-                }
-                for r in resumes
-            ],
-            "total": len(resumes)
+            "data": items,
+            "total": len(resumes),
+            "next_cursor": next_cursor(resumes, limit, "upload_time") if tsquery is None else None
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取简历列表失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取简历列表失败: {str(e)}")
 
 
+@router.get("/events")
+async def resume_status_events(
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    简历处理状态事件流 (SSE)
+
+    推送当前用户简历的状态变化：uploaded → parsing → completed / failed
+    """
+    import asyncio
+    from fastapi.responses import StreamingResponse
+    from app.core.sse import encode_event
+    from app.infrastructure.queue.status_events import get_status_broadcaster
+
+    async def event_stream():
+        events = get_status_broadcaster().subscribe(current_user.id).__aiter__()
+        yield encode_event({"type": "connected"})
+        next_event = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_event}, timeout=15.0)
+                if not done:
+                    # 心跳，防止代理断开空闲连接
+                    yield ": keep-alive\n\n"
+                    continue
+                yield encode_event(next_event.result())
+                next_event = asyncio.ensure_future(events.__anext__())
+        finally:
+            # 客户端断开：取消等待中的读取（订阅在生成器的 finally 中注销）
+            next_event.cancel()
+            try:
+                await next_event
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 @router.post("/upload")
 async def upload_resume(
     file: UploadFile = File(...),
@@ -133,6 +223,10 @@ async def upload_resume(
         )
         logger.info(f"文件上传完成: {resume.id}")
 
+        # 加入解析队列，解析进度通过 /resumes/events 推送
+        from app.application.services.ingestion_service import get_ingestion_service
+        await get_ingestion_service().enqueue(resume)
+
         return {
             "code": 0,
             "data": {
@@ -141,7 +235,7 @@ async def upload_resume(
                 "status": resume.status,
                 "file_size": resume.file_size,
             },
-            "message": "文件上传成功"
+            "message": "文件上传成功，已加入解析队列"
         }
 
     except HTTPException:
@@ -164,7 +258,9 @@ async def download_resume(
     """下载简历文件（仅限下载当前用户上传的简历）"""
     try:
         result = await db.execute(
-            select(Resume).where(
+            select(Resume)
+            .options(defer(Resume.parsed_content), defer(Resume.extracted_text), defer(Resume.original_content))
+            .where(
                 and_(
                     Resume.id == resume_id,
                     Resume.uploaded_by == current_user.id
@@ -223,6 +319,8 @@ async def get_resume(
                 "file_size": resume.file_size,
                 "upload_time": resume.upload_time.isoformat() if resume.upload_time else None,
                 "status": resume.status,
+                "embedding_status": resume.embedding_status,
+                "embedding_error": resume.embedding_error,
                 "candidate_name": resume.candidate_name,
                 "candidate_email": resume.candidate_email,
                 "candidate_phone": resume.candidate_phone,
@@ -243,12 +341,32 @@ async def get_resume(
 async def parse_resume(
     resume_id: str,
     db: AsyncSession = Depends(get_db),
-    tenant_id: str = Depends(get_current_tenant_id_optional),
+    current_user: User = Depends(get_current_user),
 ) -> Any:
-    """解析简历文件"""
+    """
+    重新解析简历文件
+
+    将简历放回解析队列后立即返回，解析进度通过 /resumes/events 推送
+    """
     try:
-        upload_service = get_upload_service(db)
-        resume = await upload_service.parse_resume(resume_id, tenant_id)
+        from app.application.services.ingestion_service import get_ingestion_service
+
+        result = await db.execute(
+            select(Resume).where(
+                and_(
+                    Resume.id == resume_id,
+                    Resume.uploaded_by == current_user.id
+                )
+            )
+        )
+        resume = result.scalar_one_or_none()
+
+        if not resume:
+            raise HTTPException(status_code=404, detail="简历不存在或无权访问")
+        if not resume.file_path or not os.path.exists(resume.file_path):
+            raise HTTPException(status_code=400, detail=f"文件不存在: {resume.file_path}")
+
+        resume = await get_ingestion_service().requeue(db, resume)
 
         return {
             "code": 0,
@@ -262,101 +380,318 @@ async def parse_resume(
                 "candidate_location": resume.candidate_location,
                 "extracted_text": resume.extracted_text,
             },
-            "message": "简历解析成功"
+            "message": "简历已加入解析队列"
         }
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"简历解析失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"简历解析失败: {str(e)}")
 
 
+async def _hybrid_search(db, query, embedding_service, configs, tenant_id, *, top_k, threshold, scope, filters) -> Any:
+    """混合检索并回表读取展示字段"""
+    from sqlalchemy import func
+    from app.infrastructure.search.hybrid import hybrid_search
+
+    async def embed_query():
+        # 只发起 embedding 请求，不使用数据库会话（与关键词召回并发执行）
+        vectors = await asyncio.gather(*[
+            embedding_service.embed_text(query, tenant_id, config=config) for config in configs
+        ])
+        return [(config["model"], vector) for config, vector in zip(configs, vectors)]
+
+    hits = await hybrid_search(
+        db, query, embed_query, scope=scope, top_k=top_k, filters=filters, threshold=threshold
+    )
+    if not hits:
+        return {"code": 0, "data": [], "total": 0, "message": "没有匹配的简历"}
+
+    result = await db.execute(
+        select(
+            Resume.id,
+            Resume.filename,
+            Resume.candidate_name,
+            Resume.candidate_email,
+            Resume.candidate_phone,
+            Resume.candidate_location,
+            # 命中片段只在正文开头一段内查找，不读取整份正文
+            func.left(Resume.extracted_text, 4000).label("body"),
+        ).where(Resume.id.in_([hit["resume_id"] for hit in hits]))
+    )
+    row_of = {str(row.id): row for row in result.all()}
+
+    data = []
+    for hit in hits:
+        row = row_of.get(hit["resume_id"])
+        if row is None:
+            continue
+        text = row.body or ""
+        preview = text[:501]
+        data.append({
+            "id": str(row.id),
+            "filename": row.filename,
+            "candidate_name": row.candidate_name,
+            "candidate_email": row.candidate_email,
+            "candidate_phone": row.candidate_phone,
+            "candidate_location": row.candidate_location,
+            "score": round(hit["score"], 6),
+            "similarity": round(hit["similarity"], 3) if hit["similarity"] is not None else None,
+            "lexical_rank": hit["lexical_rank"],
+            "vector_rank": hit["vector_rank"],
+            "highlight": highlight(text, query),
+            "extracted_text_preview": preview[:500] + "..." if len(preview) > 500 else preview
+        })
+
+    return {"code": 0, "data": data, "total": len(data)}
+
+
 @router.post("/search")
 async def search_resumes(
     query: str = Form(...),
     top_k: int = Form(10, ge=1, le=50),
     threshold: float = Form(0.5, ge=0, le=1),
+    mode: str = Form("hybrid", description="hybrid（关键词 + 向量融合）/ vector（仅向量）"),
+    status: Optional[str] = Form("completed", description="按简历状态过滤，为空不过滤（仅 hybrid）"),
+    location: Optional[str] = Form(None, description="按所在地过滤（仅 hybrid）"),
+    uploaded_by: Optional[str] = Form(None, description="在当前用户的简历范围内按上传者ID进一步过滤（仅 hybrid）"),
     db: AsyncSession = Depends(get_db),
     tenant_id: str = Depends(get_current_tenant_id_optional),
+    current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    语义搜索简历
+    搜索简历（只检索当前用户上传的简历）
+
+    - hybrid：关键词倒排索引与向量索引两路召回，按倒数排名融合排序，支持元数据预过滤；
+      查询向量生成失败时只返回关键词结果
+    - vector：基于查询文本的向量相似度搜索
 
-    基于查询文本的向量相似度搜索
+    都从预建的索引召回，只回表读取命中简历的展示字段
     """
     try:
-        # 获取所有已完成处理的简历
-        result = await db.execute(
-            select(Resume).where(
-                and_(
-                    Resume.status == "completed",
-                    Resume.extracted_text.isnot(None)
-                )
+        if mode not in ("hybrid", "vector"):
+            raise HTTPException(status_code=400, detail=f"不支持的检索模式: {mode}")
+
+        from sqlalchemy import func
+        from app.application.services.embedding_service import EmbeddingService
+        from app.application.services.reembedding_service import get_reembedding_service
+        embedding_service = EmbeddingService(db)
+
+        # 向量只与同一 embedding 模型生成的向量比较；
+        # 切换模型后的重建任务未完成时，同时用旧模型生成查询向量检索旧向量（双读）
+        config = await embedding_service._get_embedding_config(tenant_id)
+        configs = [config]
+        for model in await get_reembedding_service().get_dual_read_models(db, tenant_id):
+            if model == config["model"]:
+                continue
+            old_config = await embedding_service.get_model_config(tenant_id, model)
+            if old_config:
+                configs.append(old_config)
+
+        # 租户范围总是生效，uploaded_by 等元数据条件只在此范围内进一步缩小结果
+        scope = [Resume.uploaded_by == current_user.id]
+
+        if mode == "hybrid":
+            return await _hybrid_search(
+                db, query, embedding_service, configs, tenant_id,
+                top_k=top_k,
+                threshold=threshold,
+                scope=scope,
+                filters=metadata_filters(status, location, UUID(uploaded_by) if uploaded_by else None),
             )
-        )
-        resumes = result.scalars().all()
 
-        if not resumes:
+        # 向量索引是全局的，只在当前用户的简历中做子集检索；多取一些，抵消回表时按状态过滤掉的简历
+        allowed = await scoped_ids(db, scope)
+        fetch = top_k * 2
+        hits = []
+        for model_config in configs:
+            query_vector = await embedding_service.embed_text(query, tenant_id, config=model_config)
+            hits.extend(await VectorStoreService.search(
+                db,
+                model=model_config["model"],
+                query_vector=query_vector,
+                top_k=fetch,
+                threshold=threshold,
+                allowed=allowed
+            ))
+
+        if not hits:
             return {
                 "code": 0,
                 "data": [],
                 "message": "暂无简历数据"
             }
 
-        # 生成查询向量
-        from app.application.services.embedding_service import EmbeddingService
-        embedding_service = EmbeddingService(db)
-        query_vector = await embedding_service.embed_text(query, tenant_id)
-
-        # 准备候选文档
-        candidates = []
-        for resume in resumes:
-            embedding_str = resume.parsed_content.get("embedding") if resume.parsed_content else None
-            if embedding_str:
-                candidates.append({
-                    "id": str(resume.id),
-                    "filename": resume.filename,
-                    "candidate_name": resume.candidate_name,
-                    "candidate_email": resume.candidate_email,
-                    "candidate_phone": resume.candidate_phone,
-                    "candidate_location": resume.candidate_location,
-                    "extracted_text": resume.extracted_text[:500] + "..." if resume.extracted_text and len(resume.extracted_text) > 500 else resume.extracted_text,
-                    "embedding": embedding_str
-                })
-
-        # 执行向量搜索
-        vector_store = VectorStoreService()
-        results = await vector_store.search_similar(
-            query_vector=query_vector,
-            candidates=candidates,
-            top_k=top_k,
-            threshold=threshold
+        similarity_of = {}
+        for hit in hits:
+            similarity_of[hit["resume_id"]] = max(hit["similarity"], similarity_of.get(hit["resume_id"], 0.0))
+        result = await db.execute(
+            select(
+                Resume.id,
+                Resume.filename,
+                Resume.candidate_name,
+                Resume.candidate_email,
+                Resume.candidate_phone,
+                Resume.candidate_location,
+                func.left(Resume.extracted_text, 501).label("preview"),
+            ).where(
+                and_(
+                    Resume.id.in_(list(similarity_of.keys())),
+                    *scope,
+                    Resume.status == "completed",
+                    Resume.embedding_status == "embedded",
+                    Resume.extracted_text.isnot(None)
+                )
+            )
         )
+        rows = sorted(result.all(), key=lambda row: similarity_of[str(row.id)], reverse=True)[:top_k]
 
         return {
             "code": 0,
             "data": [
                 {
-                    "id": r["id"],
-                    "filename": r["filename"],
-                    "candidate_name": r["candidate_name"],
-                    "candidate_email": r["candidate_email"],
-                    "candidate_phone": r["candidate_phone"],
-                    "candidate_location": r["candidate_location"],
-                    "similarity": round(r["similarity"], 3),
-                    "extracted_text_preview": r["extracted_text"]
+                    "id": str(row.id),
+                    "filename": row.filename,
+                    "candidate_name": row.candidate_name,
+                    "candidate_email": row.candidate_email,
+                    "candidate_phone": row.candidate_phone,
+                    "candidate_location": row.candidate_location,
+                    "similarity": round(similarity_of[str(row.id)], 3),
+                    "extracted_text_preview": row.preview[:500] + "..." if len(row.preview) > 500 else row.preview
                 }
-                for r in results
+                for row in rows
             ],
-            "total": len(results)
+            "total": len(rows)
         }
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"参数错误: {str(e)}")
+    except EmbeddingError as e:
+        logger.error(f"语义搜索失败，查询向量生成失败: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Embedding 服务暂不可用: {str(e)}")
     except Exception as e:
         logger.error(f"语义搜索失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"语义搜索失败: {str(e)}")
 
 
+@router.post("/reembed")
+async def start_reembedding(
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id_optional),
+) -> Any:
+    """
+    启动（或继续）向量重建任务
+
+    使用租户当前的 embedding 模型为尚未使用该模型的简历重新生成向量，任务在后台分批执行
+    """
+    try:
+        from app.application.services.reembedding_service import get_reembedding_service
+
+        state = await get_reembedding_service().start(db, tenant_id)
+        return {
+            "code": 0,
+            "data": state
+        }
+
+    except Exception as e:
+        logger.error(f"启动向量重建任务失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"启动向量重建任务失败: {str(e)}")
+
+
+@router.get("/reembed/status")
+async def get_reembedding_status(
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id_optional),
+) -> Any:
+    """获取向量重建任务进度"""
+    try:
+        from app.application.services.reembedding_service import get_reembedding_service
+
+        state = await get_reembedding_service().get_status(db, tenant_id)
+        return {
+            "code": 0,
+            "data": state
+        }
+
+    except Exception as e:
+        logger.error(f"获取向量重建任务进度失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取向量重建任务进度失败: {str(e)}")
+
+
+@router.post("/reembed/cancel")
+async def cancel_reembedding(
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id_optional),
+) -> Any:
+    """暂停向量重建任务（再次调用 /reembed 从断点继续）"""
+    try:
+        from app.application.services.reembedding_service import get_reembedding_service
+
+        state = await get_reembedding_service().cancel(db, tenant_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="没有向量重建任务")
+        return {
+            "code": 0,
+            "data": state
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"暂停向量重建任务失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"暂停向量重建任务失败: {str(e)}")
+
+
+@router.post("/embeddings/retry")
+async def retry_failed_embeddings(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    批量重试向量生成失败的简历
+
+    管理员重试全部失败简历，其他用户只重试自己上传的简历；重置重试次数后由后台队列分批处理
+    """
+    try:
+        from app.application.services.embedding_retry_service import get_embedding_retry_service
+
+        uploaded_by = None if current_user.role == "admin" else current_user.id
+        queued = await get_embedding_retry_service().requeue_failed(db, uploaded_by=uploaded_by)
+        return {
+            "code": 0,
+            "data": {"queued": queued},
+            "message": f"已将 {queued} 份简历加入向量重试队列"
+        }
+
+    except Exception as e:
+        logger.error(f"批量重试向量生成失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"批量重试向量生成失败: {str(e)}")
+
+
+@router.get("/embeddings/stats")
+async def get_embedding_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """获取各向量生成状态的简历数量"""
+    try:
+        from app.application.services.embedding_retry_service import get_embedding_retry_service
+
+        uploaded_by = None if current_user.role == "admin" else current_user.id
+        stats = await get_embedding_retry_service().stats(db, uploaded_by=uploaded_by)
+        return {
+            "code": 0,
+            "data": stats
+        }
+
+    except Exception as e:
+        logger.error(f"获取向量生成状态失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取向量生成状态失败: {str(e)}")
+
+
 @router.delete("/{resume_id}")
 async def delete_resume(
     resume_id: str,
@@ -410,9 +745,10 @@ async def delete_resume(
             except Exception as e:
                 logger.warning(f"删除文件失败: {str(e)}")
 
-        # 4. 删除数据库记录
+        # 4. 删除数据库记录（resume_embeddings 随之级联删除）
         await db.delete(resume)
         await db.commit()
+        VectorStoreService.remove_embedding(resume_id)
 
         return {
             "code": 0,
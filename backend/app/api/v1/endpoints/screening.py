@@ -0,0 +1,170 @@
+"""批量筛选API端点"""
+
+import logging
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_db, get_current_tenant_id
+from app.application.schemas.screening import ScreeningJobCreateRequest, ScreeningJobResumeRequest
+from app.application.services.screening_service import get_screening_service, job_to_dict
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _get_job_or_404(db: AsyncSession, tenant_id: str, job_id: str):
+    job = await get_screening_service().get_job(db, tenant_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="筛选任务不存在")
+    return job
+
+
+@router.post("/jobs", status_code=status.HTTP_201_CREATED)
+async def create_screening_job(
+    request: ScreeningJobCreateRequest,
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id),
+) -> Any:
+    """
+    创建职位批量筛选任务，任务在后台执行
+
+    POST /api/v1/screening/jobs
+    """
+    try:
+        job = await get_screening_service().create_job(
+            db,
+            tenant_id,
+            request.job_position_id,
+            resume_ids=request.resume_ids,
+            filters=request.filter.model_dump() if request.filter else None,
+            analysis_profile=request.analysis_profile,
+            analysis_mode=request.analysis_mode,
+            cascade_threshold=request.cascade_threshold,
+            token_budget=request.token_budget,
+            reuse_existing=request.reuse_existing,
+        )
+        return job_to_dict(job)
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"创建筛选任务失败: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"创建筛选任务失败: {str(e)}"
+        )
+
+
+@router.get("/jobs")
+async def list_screening_jobs(
+    job_position_id: Optional[str] = Query(None, description="只返回该职位的任务"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id),
+) -> Any:
+    """
+    获取最近的批量筛选任务
+
+    GET /api/v1/screening/jobs
+    """
+    try:
+        jobs = await get_screening_service().list_jobs(db, tenant_id, job_position_id, limit)
+        return [job_to_dict(job) for job in jobs]
+
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的职位ID")
+    except Exception as e:
+        logger.error(f"获取筛选任务列表失败: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取失败: {str(e)}"
+        )
+
+
+@router.get("/jobs/{job_id}")
+async def get_screening_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id),
+) -> Any:
+    """
+    获取批量筛选任务的状态与进度
+
+    GET /api/v1/screening/jobs/{job_id}
+    """
+    return job_to_dict(await _get_job_or_404(db, tenant_id, job_id))
+
+
+@router.post("/jobs/{job_id}/pause")
+async def pause_screening_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id),
+) -> Any:
+    """
+    暂停批量筛选任务
+
+    POST /api/v1/screening/jobs/{job_id}/pause
+    """
+    job = await _get_job_or_404(db, tenant_id, job_id)
+    try:
+        return job_to_dict(await get_screening_service().pause(db, job))
+    except Exception as e:
+        logger.error(f"暂停筛选任务失败: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"暂停失败: {str(e)}"
+        )
+
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_screening_job(
+    job_id: str,
+    request: Optional[ScreeningJobResumeRequest] = None,
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id),
+) -> Any:
+    """
+    继续暂停、失败或预算用尽的批量筛选任务
+
+    POST /api/v1/screening/jobs/{job_id}/resume
+    """
+    job = await _get_job_or_404(db, tenant_id, job_id)
+    try:
+        token_budget = request.token_budget if request else None
+        return job_to_dict(await get_screening_service().resume(db, job, token_budget))
+    except Exception as e:
+        logger.error(f"继续筛选任务失败: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"继续失败: {str(e)}"
+        )
+
+
+@router.get("/jobs/{job_id}/shortlist")
+async def get_screening_shortlist(
+    job_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="名单长度"),
+    min_score: Optional[float] = Query(None, ge=0, le=100, description="最低综合评分"),
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id),
+) -> Any:
+    """
+    获取按综合评分排序的候选名单（任务执行中也可获取，包含已完成的候选人）
+
+    GET /api/v1/screening/jobs/{job_id}/shortlist
+    """
+    job = await _get_job_or_404(db, tenant_id, job_id)
+    try:
+        return {
+            "job": job_to_dict(job),
+            "candidates": await get_screening_service().shortlist(db, job, limit, min_score),
+        }
+    except Exception as e:
+        logger.error(f"获取候选名单失败: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取失败: {str(e)}"
+        )
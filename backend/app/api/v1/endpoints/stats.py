@@ -7,7 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 
 from app.core.dependencies import get_db, get_current_user
-from app.infrastructure.database.models import Resume, User, ResumeAnalysis
+from app.infrastructure.database.models import Resume, User
+from app.infrastructure.repositories.resume_analysis_repository import ResumeAnalysisRepository
 
 logger = logging.getLogger(__name__)
 
@@ -60,14 +61,8 @@ async def get_dashboard_stats(
         )
         pending = pending_result.scalar() or 0
 
-        # 4. AI分析数 - 当前用户的简历被分析的次数
-        ai_analyzed_result = await db.execute(
-            select(func.count(ResumeAnalysis.id))
-            .select_from(ResumeAnalysis)
-            .join(Resume, ResumeAnalysis.resume_id == Resume.id)
-            .where(Resume.uploaded_by == current_user.id)
-        )
-        ai_analyzed = ai_analyzed_result.scalar() or 0
+        # 4. AI分析数 - 当前用户（租户）的分析次数，走 resume_analyses.tenant_id 索引
+        ai_analyzed = await ResumeAnalysisRepository(db).count_for_tenant(current_user.id)
 
         return {
             "code": 0,
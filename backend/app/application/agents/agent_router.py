@@ -5,7 +5,7 @@ Agent Router
 
 import logging
 import json
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.application.agents.coordinator import ResumeAnalysisCoordinator
@@ -18,6 +18,16 @@ from app.application.agents.experts import (
     WorkAttitudeExpertAgent,
     DevelopmentPotentialExpertAgent
 )
+from app.application.services.resume_sections import (
+    SECTION_EDUCATION,
+    SECTION_EXPERIENCE,
+    SECTION_PROJECTS,
+    SECTION_SELF_EVALUATION,
+    SECTION_SKILLS,
+    focus_resume_data,
+    resume_sections,
+    sections_text,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -196,13 +206,15 @@ class AgentRouter:
 
         return None
 
-    def _prepare_resume_context(self, resume_data: Dict) -> Dict[str, Any]:
+    def _prepare_resume_context(self, resume_data: Dict, dimension: Optional[str] = None) -> Dict[str, Any]:
         """准备简历上下文数据
 
-        将原始简历数据转换为专家智能体期望的格式
+        将原始简历数据转换为专家智能体期望的格式：各专家字段只填入相关段落（未识别出段落时为完整文本）；
+        指定维度时 resume_data 也只保留该维度相关的段落
 
         Args:
             resume_data: 原始简历数据
+            dimension: 单独调用的专家维度（skills/experience/...），为空时保留完整简历数据
 
         Returns:
             转换后的上下文数据
@@ -231,63 +243,68 @@ class AgentRouter:
 
         logger.info(f"[AgentRouter] 最终 resume_text 长度={len(resume_text)}")
 
+        sections = resume_sections(resume_data) if isinstance(resume_data, dict) else {}
+
+        def section_text(*keys: str) -> str:
+            return sections_text(sections, keys) or resume_text
+
         return {
             "resume_text": resume_text,  # 通用简历文本
-            "resume_skills": resume_text,  # 技能专家使用完整文本
-            "work_experience": resume_text,  # 经验专家使用完整文本
-            "project_experience": "",  # 项目经验（从完整文本中提取）
-            "education": resume_text,  # 教育背景
-            "education_background": resume_text,  # 教育专家
-            "resume_summary": resume_text,  # 软技能专家
-            "resume_data": resume_data  # 原始数据
+            "resume_skills": section_text(SECTION_SKILLS, SECTION_PROJECTS),  # 技能专家
+            "work_experience": section_text(SECTION_EXPERIENCE),  # 经验专家
+            "project_experience": "",  # 项目经验（已包含在经验专家的段落中）
+            "education": section_text(SECTION_EDUCATION),  # 教育背景
+            "education_background": section_text(SECTION_EDUCATION),  # 教育专家
+            "resume_summary": section_text(SECTION_SELF_EVALUATION, SECTION_EXPERIENCE, SECTION_PROJECTS),  # 软技能专家
+            "resume_data": focus_resume_data(resume_data, dimension) if dimension else resume_data  # 原始数据
         }
 
     async def _call_skills_expert(self, resume_data: Dict) -> Dict[str, Any]:
         """调用技能专家"""
         logger.info("[专家] 调用技能匹配度专家")
-        context = self._prepare_resume_context(resume_data)
+        context = self._prepare_resume_context(resume_data, "skills")
         result = await self.coordinator.skills_expert.analyze(context)
         return {"expert": "技能匹配度专家", "result": result}
 
     async def _call_experience_expert(self, resume_data: Dict) -> Dict[str, Any]:
         """调用经验专家"""
         logger.info("[专家] 调用工作经验评估专家")
-        context = self._prepare_resume_context(resume_data)
+        context = self._prepare_resume_context(resume_data, "experience")
         result = await self.coordinator.experience_expert.analyze(context)
         return {"expert": "工作经验评估专家", "result": result}
 
     async def _call_education_expert(self, resume_data: Dict) -> Dict[str, Any]:
         """调用教育专家"""
         logger.info("[专家] 调用教育背景分析专家")
-        context = self._prepare_resume_context(resume_data)
+        context = self._prepare_resume_context(resume_data, "education")
         result = await self.coordinator.education_expert.analyze(context)
         return {"expert": "教育背景分析专家", "result": result}
 
     async def _call_soft_skills_expert(self, resume_data: Dict) -> Dict[str, Any]:
         """调用软技能专家"""
         logger.info("[专家] 调用软技能评估专家")
-        context = self._prepare_resume_context(resume_data)
+        context = self._prepare_resume_context(resume_data, "soft_skills")
         result = await self.coordinator.soft_skills_expert.analyze(context)
         return {"expert": "软技能评估专家", "result": result}
 
     async def _call_stability_expert(self, resume_data: Dict) -> Dict[str, Any]:
         """调用稳定性/忠诚度专家"""
         logger.info("[专家] 调用稳定性/忠诚度专家")
-        context = self._prepare_resume_context(resume_data)
+        context = self._prepare_resume_context(resume_data, "stability")
         result = await self.coordinator.stability_expert.analyze(context)
         return {"expert": "稳定性/忠诚度专家", "result": result}
 
     async def _call_attitude_expert(self, resume_data: Dict) -> Dict[str, Any]:
         """调用工作态度/抗压专家"""
         logger.info("[专家] 调用工作态度/抗压专家")
-        context = self._prepare_resume_context(resume_data)
+        context = self._prepare_resume_context(resume_data, "work_attitude")
         result = await self.coordinator.work_attitude_expert.analyze(context)
         return {"expert": "工作态度/抗压专家", "result": result}
 
     async def _call_potential_expert(self, resume_data: Dict) -> Dict[str, Any]:
         """调用发展潜力专家"""
         logger.info("[专家] 调用发展潜力专家")
-        context = self._prepare_resume_context(resume_data)
+        context = self._prepare_resume_context(resume_data, "development_potential")
         result = await self.coordinator.development_potential_expert.analyze(context)
         return {"expert": "发展潜力专家", "result": result}
 
@@ -301,6 +318,16 @@ class AgentRouter:
         )
         return {"expert": "多智能体协调系统", "result": result}
 
+    async def stream_full_analysis(self, resume_data: Dict) -> AsyncIterator[Dict[str, Any]]:
+        """渐进式完整分析：转发协调器的分析事件，最后的 result 事件包装为与 route_to_expert 相同的格式"""
+        logger.info("[专家] 渐进式调用完整多智能体分析系统")
+        context = self._prepare_resume_context(resume_data)
+        async for event in self.coordinator.analyze_stream(resume_data=context, job_requirements={}):
+            if event["type"] == "result":
+                yield {"type": "result", "result": {"expert": "多智能体协调系统", "result": event["result"]}}
+            else:
+                yield event
+
     def format_expert_result(self, expert_result: Dict[str, Any]) -> str:
         """将专家结果格式化为对话文本
 
@@ -6,12 +6,20 @@ Base Agent Module
 import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
 from langchain_openai import ChatOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.application.services.llm_service import TenantLLMService
+from app.application.services.model_config_cache import get_model_config_cache
+from app.application.services.prompt_budget import PromptBudget
+from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
+from app.infrastructure.external_services.llm_scheduler import (
+    estimate_tokens,
+    get_llm_scheduler,
+    provider_of,
+)
+from app.infrastructure.external_services.tokenizer import truncate_tokens
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -43,12 +51,14 @@ class BaseAgent(ABC):
         self.model_name = model_name
         self.temperature = temperature
         self.llm: Optional[ChatOpenAI] = None
+        self.model_id: Optional[str] = None  # 实际使用的模型ID，初始化LLM后确定
+        self.pinned_model: Optional[str] = None  # 固定使用的模型ID（模型名@厂商），设置后忽略租户全局配置
 
     async def _initialize_llm(self) -> ChatOpenAI:
         """初始化LLM实例
 
         优先使用租户全局配置的模型 (Tenant.llm_id)，其次使用传入的 model_name，
-        最后使用系统默认配置
+        最后使用系统默认配置。实例取自进程级客户端池，同配置的智能体共享连接。
 
         Returns:
             ChatOpenAI实例
@@ -57,8 +67,8 @@ class BaseAgent(ABC):
         if self.llm:
             return self.llm
 
-        # 1. 优先从租户全局配置获取模型
-        model_to_use = await self._get_tenant_model()
+        # 1. 优先从租户全局配置获取模型（固定模型的智能体除外，如对冲请求）
+        model_to_use = self.pinned_model or await self._get_tenant_model()
 
         # 2. 如果租户没有配置，使用传入的模型名
         if not model_to_use:
@@ -70,7 +80,7 @@ class BaseAgent(ABC):
 
         # 尝试获取租户的 API 配置
         try:
-            tenant_llm = await TenantLLMService.get_api_key(
+            tenant_llm = await get_model_config_cache().get_model_config(
                 self.db, self.tenant_id, model_to_use
             )
 
@@ -79,12 +89,14 @@ class BaseAgent(ABC):
                     f"使用租户 {self.tenant_id} 配置的模型: {tenant_llm.llm_name} "
                     f"({tenant_llm.llm_factory}), 温度: {self.temperature}"
                 )
-                self.llm = ChatOpenAI(
-                    model=tenant_llm.llm_name,
-                    openai_api_key=tenant_llm.api_key,
-                    base_url=tenant_llm.api_base or None,
+                self.model_id = f"{tenant_llm.llm_name}@{tenant_llm.llm_factory}"
+                self.llm = get_llm_client_pool().get_client(
+                    self.tenant_id,
+                    tenant_llm.llm_name,
+                    api_key=tenant_llm.api_key,
+                    api_base=tenant_llm.api_base,
                     temperature=self.temperature,
-                    max_tokens=tenant_llm.max_tokens or settings.DEFAULT_MAX_TOKENS,
+                    max_tokens=tenant_llm.max_tokens,
                 )
                 return self.llm
         except Exception as e:
@@ -92,35 +104,22 @@ class BaseAgent(ABC):
 
         # 使用默认配置（无 API Key 的情况）
         logger.info(f"使用系统默认模型: {model_to_use}, 温度: {self.temperature}")
-        self.llm = ChatOpenAI(
-            model=model_to_use,
+        self.model_id = model_to_use
+        self.llm = get_llm_client_pool().get_client(
+            self.tenant_id,
+            model_to_use,
             temperature=self.temperature,
-            max_tokens=settings.DEFAULT_MAX_TOKENS,
         )
         return self.llm
 
     async def _get_tenant_model(self) -> Optional[str]:
-        """获取租户的全局模型配置 (Tenant.llm_id)
+        """获取租户的全局模型配置 (Tenant.llm_id)，结果来自进程级缓存
 
         Returns:
             模型ID字符串 (格式: "模型名@厂商") 或 None
         """
         try:
-            from sqlalchemy import select
-            from app.infrastructure.database.llm_models import Tenant
-
-            # 转换 tenant_id 为 UUID
-            from uuid import UUID
-            try:
-                tenant_uuid = UUID(self.tenant_id) if isinstance(self.tenant_id, str) else self.tenant_id
-            except ValueError:
-                logger.warning(f"无效的租户ID格式: {self.tenant_id}")
-                return None
-
-            # 查询租户配置
-            query = select(Tenant.llm_id).where(Tenant.id == tenant_uuid)
-            result = await self.db.execute(query)
-            llm_id = result.scalar_one_or_none()
+            llm_id = await get_model_config_cache().get_tenant_llm_id(self.db, self.tenant_id)
 
             if llm_id:
                 logger.info(f"从租户 {self.tenant_id} 获取到全局模型配置: {llm_id}")
@@ -215,8 +214,39 @@ class BaseAgent(ABC):
         logger.error(error_msg)
         raise ValueError(error_msg)
 
+    async def _fit_resume_prompt(self, build_prompt: Callable[[str], str], resume_text: str) -> str:
+        """按模型的输入预算组装“提示词模板 + 简历文本”，超出时从末尾截断简历文本，模板与输出要求完整保留
+
+        Args:
+            build_prompt: 由简历文本生成完整提示词的函数
+            resume_text: 简历文本
+
+        Returns:
+            提示词
+        """
+        llm = await self._initialize_llm()
+        return PromptBudget.for_llm(llm).fit_text(build_prompt, resume_text)
+
+    async def _fit_resume_data_prompt(self, build_prompt: Callable[[Any], str], resume_data: Any) -> str:
+        """同 _fit_resume_prompt，用于由简历数据字典生成提示词的专家，截断的是其中的 extracted_text"""
+        if not isinstance(resume_data, dict) or not resume_data.get("extracted_text"):
+            return build_prompt(resume_data)
+        return await self._fit_resume_prompt(
+            lambda text: build_prompt({**resume_data, "extracted_text": text}),
+            resume_data["extracted_text"],
+        )
+
+    def _llm_slot(self, llm: ChatOpenAI, prompt: str):
+        """向全局调度器申请一次LLM调用的执行名额（优先级取当前上下文的 llm_priority）"""
+        max_tokens = getattr(llm, "max_tokens", None) or settings.DEFAULT_MAX_TOKENS
+        return get_llm_scheduler().slot(
+            self.tenant_id,
+            provider_of(llm),
+            estimated_tokens=estimate_tokens(prompt) + max_tokens,
+        )
+
     async def _invoke_llm(self, prompt: str, **kwargs) -> str:
-        """调用LLM
+        """调用LLM（经全局调度器限流，超出模型输入预算的提示词先裁剪）
 
         Args:
             prompt: 提示词
@@ -226,9 +256,87 @@ class BaseAgent(ABC):
             LLM响应文本
         """
         llm = await self._initialize_llm()
-        response = await llm.ainvoke(prompt, **kwargs)
+        prompt = PromptBudget.for_llm(llm).fit_prompt(prompt)
+        async with self._llm_slot(llm, prompt) as lease:
+            response = await llm.ainvoke(prompt, **kwargs)
+            lease.record_usage(response)
         return response.content
 
+    async def _invoke_llm_cached(self, prompt: str, parse_json: bool = True) -> Any:
+        """调用LLM，结果按内容寻址缓存
+
+        相同的提示词（模板 + 简历内容）、模型、温度和智能体命中缓存时直接返回，
+        不再调用LLM。解析失败的响应不会写入缓存。
+
+        Args:
+            prompt: 提示词
+            parse_json: 是否将响应解析为JSON
+
+        Returns:
+            解析后的字典（parse_json=True）或响应文本
+        """
+        from app.infrastructure.cache.analysis_cache import get_analysis_cache
+
+        cache = get_analysis_cache()
+        if cache is None:
+            response = await self._invoke_llm(prompt)
+            return self._parse_json_response(response) if parse_json else response
+
+        await self._initialize_llm()
+        kind = "json" if parse_json else "text"
+        key = cache.make_key(f"{self.__class__.__name__}:{kind}", prompt, self.model_id, self.temperature)
+
+        cached = await cache.get(self.tenant_id, key)
+        if cached is not None:
+            logger.info(f"{self.__class__.__name__} 命中分析缓存")
+            return cached
+
+        response = await self._invoke_llm(prompt)
+        result = self._parse_json_response(response) if parse_json else response
+        await cache.set(self.tenant_id, key, result)
+        return result
+
+    async def _stream_llm_cached(self, prompt: str) -> AsyncIterator[str]:
+        """流式调用LLM，逐段返回文本；与 _invoke_llm_cached(parse_json=False) 共用缓存
+
+        命中缓存时一次性返回完整文本，未命中时流式输出，结束后写入缓存。
+
+        Args:
+            prompt: 提示词
+
+        Yields:
+            文本增量
+        """
+        from app.infrastructure.cache.analysis_cache import get_analysis_cache
+
+        llm = await self._initialize_llm()
+        cache = get_analysis_cache()
+        key = None
+        if cache is not None:
+            key = cache.make_key(f"{self.__class__.__name__}:text", prompt, self.model_id, self.temperature)
+            cached = await cache.get(self.tenant_id, key)
+            if cached is not None:
+                logger.info(f"{self.__class__.__name__} 命中分析缓存")
+                yield cached
+                return
+
+        parts = []
+        acc = None
+        prompt = PromptBudget.for_llm(llm).fit_prompt(prompt)
+        async with self._llm_slot(llm, prompt) as lease:
+            # stream_usage 让最后一个分块带上 usage_metadata，合并后即为本次调用的实际用量
+            async for chunk in llm.astream(prompt, stream_usage=True):
+                acc = chunk if acc is None else acc + chunk
+                delta = chunk.content
+                if not delta or not isinstance(delta, str):
+                    continue
+                parts.append(delta)
+                yield delta
+            lease.record_usage(acc)
+
+        if cache is not None and parts:
+            await cache.set(self.tenant_id, key, "".join(parts))
+
     def _format_resume_data(self, resume_data: Dict[str, Any]) -> str:
         """格式化简历数据为可读文本
 
@@ -286,10 +394,12 @@ class BaseAgent(ABC):
             extracted_text = resume_data.get("extracted_text", "")
             if extracted_text:
                 lines.append("简历内容:")
-                # 限制长度，避免token过多
-                if len(extracted_text) > 2000:
-                    extracted_text = extracted_text[:2000] + "..."
-                lines.append(extracted_text)
+                # 按 token 限制长度（而非字符数，中英文简历的截断量一致）
+                lines.append(truncate_tokens(
+                    extracted_text,
+                    settings.PROMPT_RESUME_EXCERPT_TOKENS,
+                    getattr(self.llm, "model_name", None),
+                ))
             else:
                 lines.append("简历数据格式未知")
 
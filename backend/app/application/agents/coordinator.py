@@ -6,7 +6,8 @@ Coordinator Agent
 import asyncio
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
 
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.tools import Tool
@@ -20,13 +21,61 @@ from app.application.agents.experts import (
     SoftSkillsExpertAgent,
     StabilityExpertAgent,
     WorkAttitudeExpertAgent,
-    DevelopmentPotentialExpertAgent
+    DevelopmentPotentialExpertAgent,
+    FusedAnalysisAgent
 )
 from app.application.agents.prompts.coordinator import get_coordinator_prompt
+from app.application.services.resume_sections import focus_resume_data
 from app.core.analysis_weights import get_weights, AnalysisProfile
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 分析模式
+MODE_FULL = "full"  # 七个专家全部执行
+MODE_CASCADE = "cascade"  # 先执行初筛维度，初筛评分达到阈值才执行其余专家与摘要
+MODE_FUSED = "fused"  # 单次LLM调用完成七个维度与摘要，缺失的维度由对应专家补齐
+
+# 级联模式初筛阶段的维度
+CASCADE_SCREEN_DIMENSIONS = ("skills", "experience")
+
+# 分析阶段（记录在结果的 stages_run 中）
+STAGE_SCREEN = "screen"  # 级联初筛
+STAGE_FUSED = "fused"  # 合并分析
+STAGE_EXPERTS = "experts"  # 专家分析（级联模式下为初筛之外的维度）
+STAGE_SUMMARY = "summary"  # 综合摘要
+
+# 各维度结构化字段的中性默认值（维度待定、未分析或专家未给出时使用，与 AnalysisResult 的维度模型对应）
+DIMENSION_FIELD_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "experience": {"total_years": None, "relevant_years": None},
+    "stability": {"job_tenure_avg": None, "job_changes_count": None, "career_progression_score": None},
+}
+
+# 每个专家保留的最近耗时样本数
+_LATENCY_SAMPLES = 200
+
+# 各专家在各模型上最近的耗时（秒），用于计算对冲请求的触发时间；
+# 按 (专家, 模型ID) 分开统计，某个租户的慢模型不会影响其他模型的对冲阈值
+_expert_latencies: Dict[tuple, Deque[float]] = {}
+
+
+def _latency_key(expert: BaseAgent) -> tuple:
+    return type(expert).__name__, expert.model_id
+
+
+def _record_latency(expert: BaseAgent, seconds: float):
+    samples = _expert_latencies.setdefault(_latency_key(expert), deque(maxlen=_LATENCY_SAMPLES))
+    samples.append(seconds)
+
+
+def _latency_p95(expert: BaseAgent) -> Optional[float]:
+    """专家在其模型上耗时的 p95，样本不足时返回 None"""
+    samples = _expert_latencies.get(_latency_key(expert))
+    if not samples or len(samples) < settings.ANALYSIS_HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
 
 class ResumeAnalysisCoordinator(BaseAgent):
     """简历分析主协调智能体 (7维度版本)
@@ -34,16 +83,31 @@ class ResumeAnalysisCoordinator(BaseAgent):
     协调七个专家智能体进行简历分析，使用可配置的权重计算综合评分
     """
 
-    def __init__(self, db, tenant_id: str, analysis_profile: str = "standard"):
+    def __init__(
+        self,
+        db,
+        tenant_id: str,
+        analysis_profile: str = "standard",
+        mode: str = MODE_FULL,
+        cascade_threshold: Optional[int] = None
+    ):
         """初始化协调智能体
 
         Args:
             db: 数据库会话
             tenant_id: 租户ID
             analysis_profile: 分析配置类型 (standard/tech_focused/leadership/junior/senior)
+            mode: 分析模式 (full/cascade/fused)
+            cascade_threshold: 级联模式的初筛阈值，默认 ANALYSIS_CASCADE_THRESHOLD
         """
         super().__init__(db, tenant_id, temperature=0.3)
 
+        if mode not in (MODE_FULL, MODE_CASCADE, MODE_FUSED):
+            logger.warning(f"未知的分析模式: {mode}, 使用完整分析")
+            mode = MODE_FULL
+        self.mode = mode
+        self.cascade_threshold = settings.ANALYSIS_CASCADE_THRESHOLD if cascade_threshold is None else cascade_threshold
+
         # 获取权重配置
         try:
             profile = AnalysisProfile(analysis_profile)
@@ -65,160 +129,438 @@ class ResumeAnalysisCoordinator(BaseAgent):
         self.work_attitude_expert = WorkAttitudeExpertAgent(db, tenant_id)
         self.development_potential_expert = DevelopmentPotentialExpertAgent(db, tenant_id)
 
-    async def analyze(
+        # 合并分析智能体（fused 模式）
+        self.fused_analyst = FusedAnalysisAgent(db, tenant_id)
+
+    def _dimension_experts(self) -> List[tuple]:
+        """七个维度：(结果键, 专家智能体, 维度名称, 专家失败时的默认评分)"""
+        return [
+            ("skills", self.skills_expert, "技能匹配度", 50),
+            ("experience", self.experience_expert, "工作经验", 50),
+            ("education", self.education_expert, "教育背景", 60),
+            ("soft_skills", self.soft_skills_expert, "软技能", 60),
+            ("stability", self.stability_expert, "稳定性/忠诚度", 50),
+            ("work_attitude", self.work_attitude_expert, "工作态度/抗压", 50),
+            ("development_potential", self.development_potential_expert, "发展潜力", 50),
+        ]
+
+    async def _run_expert(self, key: str, expert: BaseAgent, name: str, default_score: int,
+                          resume_data: Dict[str, Any], deadline: float) -> tuple:
+        """执行一个专家分析，并确保维度包含所有必需字段
+
+        专家只接收简历中与该维度相关的段落（见 focus_resume_data）。
+        专家的时间预算为 ANALYSIS_EXPERT_TIMEOUT 与距分析截止时间的较小值，超时的维度标记为待定；
+        其他异常时返回默认评分。超时与失败的耗时同样计入对冲请求的耗时样本，慢专家的 p95 不会被低估。
+
+        Args:
+            key: 结果键
+            expert: 专家智能体
+            name: 维度名称
+            default_score: 专家失败时的默认评分
+            resume_data: 简历数据
+            deadline: 整个分析的截止时间（事件循环时间）
+
+        Returns:
+            (结果键, 维度结果)
+        """
+        loop = asyncio.get_running_loop()
+        budget = min(settings.ANALYSIS_EXPERT_TIMEOUT, deadline - loop.time())
+        started = loop.time()
+        try:
+            result = await asyncio.wait_for(
+                self._call_expert(expert, focus_resume_data(resume_data, key)), timeout=max(budget, 0)
+            )
+            _record_latency(expert, loop.time() - started)
+        except asyncio.TimeoutError:
+            _record_latency(expert, loop.time() - started)
+            logger.warning(f"{name}专家分析超时（{max(budget, 0):.0f}秒），标记为待定")
+            return key, self._pending_dimension(name, key)
+        except Exception as e:
+            _record_latency(expert, loop.time() - started)
+            logger.warning(f"{name}专家分析失败: {e}")
+            result = {"error": str(e), "score": default_score}
+            if key == "skills":
+                result["credibility_score"] = default_score
+        return key, self._ensure_dimension_complete(result, name)
+
+    async def _call_expert(self, expert: BaseAgent, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """调用专家；配置了 ANALYSIS_HEDGE_MODEL 且耗时超过该专家的 p95 时，
+        用备用模型发起对冲请求，取先成功的结果，另一个请求随即取消
+
+        Args:
+            expert: 专家智能体
+            resume_data: 简历数据
+
+        Returns:
+            专家分析结果
+        """
+        context = {"resume_data": resume_data}
+        if settings.ANALYSIS_HEDGE_MODEL:
+            # 先确定专家实际使用的模型：已是对冲模型时不再重复请求，耗时样本也按模型区分
+            await expert._initialize_llm()
+        hedge_after = _latency_p95(expert) if settings.ANALYSIS_HEDGE_MODEL else None
+        if hedge_after is None or expert.model_id == settings.ANALYSIS_HEDGE_MODEL:
+            return await expert.analyze(context)
+
+        primary = asyncio.ensure_future(expert.analyze(context))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if primary in done:
+                return primary.result()
+
+            logger.info(f"{type(expert).__name__} 耗时超过 p95（{hedge_after:.1f}秒），使用 {settings.ANALYSIS_HEDGE_MODEL} 发起对冲请求")
+            hedge_expert = type(expert)(self.db, self.tenant_id)
+            hedge_expert.pinned_model = settings.ANALYSIS_HEDGE_MODEL
+            pending.add(asyncio.ensure_future(hedge_expert.analyze(context)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+
+    async def _run_fused(self, resume_data: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+        """执行合并分析，时间预算为距分析截止时间的剩余时间
+
+        与完整模式的各专家一样只提供简历（不含职位要求），两种模式的维度评分基于相同的输入，可以直接对比。
+
+        Args:
+            resume_data: 简历数据
+            deadline: 整个分析的截止时间（事件循环时间）
+
+        Returns:
+            以维度键组织的合并分析结果；超时或失败时返回空字典，由各专家补齐
+        """
+        loop = asyncio.get_running_loop()
+        budget = max(deadline - loop.time(), 0)
+        context = {"resume_data": resume_data}
+        try:
+            return await asyncio.wait_for(self.fused_analyst.analyze(context), timeout=budget)
+        except asyncio.TimeoutError:
+            logger.warning(f"合并分析超时（{budget:.0f}秒）")
+        except Exception as e:
+            logger.warning(f"合并分析失败: {e}，改由各专家分析")
+        return {}
+
+    def _pending_dimension(self, name: str, key: Optional[str] = None) -> Dict[str, Any]:
+        """超时未完成的维度：不给出评分，不参与综合评分；结构化字段取中性默认值
+
+        Args:
+            name: 维度名称
+            key: 结果键，用于补齐该维度的结构化字段（见 DIMENSION_FIELD_DEFAULTS）
+
+        Returns:
+            占位的维度结果
+        """
+        return {
+            **DIMENSION_FIELD_DEFAULTS.get(key, {}),
+            "status": "pending",
+            "score": None,
+            "credibility_score": None,
+            "score_reason": f"{name}分析超时，结果待定",
+            "verified_claims": [],
+            "questionable_claims": [],
+            "logical_inconsistencies": [],
+            "interview_questions": [],
+            "constructive_feedback": [],
+            "recommendations": ""
+        }
+
+    def _skipped_dimension(self, key: str, name: str, provisional_score: int) -> Dict[str, Any]:
+        """级联初筛未通过而未分析的维度：不给出评分，不参与综合评分；结构化字段取中性默认值"""
+        return {
+            **self._pending_dimension(name, key),
+            "status": "skipped",
+            "score_reason": f"初筛评分 {provisional_score} 低于阈值 {self.cascade_threshold}，未分析{name}",
+        }
+
+    @staticmethod
+    def _below(result: Dict[str, Any], threshold: int) -> bool:
+        """维度评分是否低于阈值（待定维度不计）"""
+        score = result.get("score", 0)
+        return score is not None and score < threshold
+
+    @staticmethod
+    def _score_text(result: Dict[str, Any]) -> str:
+        """维度评分的展示文本，待定维度显示为“待定”，级联跳过的维度显示为“未分析”"""
+        status_text = {"pending": "待定", "skipped": "未分析"}
+        if result.get("status") in status_text:
+            return status_text[result["status"]]
+        return str(result.get("score", 0))
+
+    def _weighted_score(self, results: Dict[str, Dict[str, Any]]) -> int:
+        """按配置的权重计算综合评分（兼容批判性思维的credibility_score和传统score）
+
+        待定维度不参与计算，其余维度按各自权重重新归一化。
+        """
+        scores = {
+            "skills": results["skills"].get("credibility_score") or results["skills"].get("score", 0),
+            "experience": results["experience"].get("score", 0),
+            "education": results["education"].get("score", 0),
+            "soft_skills": results["soft_skills"].get("score", 0),
+            "stability": results["stability"].get("score", 0),
+            "attitude": results["work_attitude"].get("score", 0),
+            "potential": results["development_potential"].get("score", 0),
+        }
+        logger.info(f"各维度评分: {scores}")
+        completed = {weight_key: score for weight_key, score in scores.items() if score is not None}
+        total_weight = sum(self.weights[weight_key] for weight_key in completed)
+        if not total_weight:
+            return 0
+        return int(sum(score * self.weights[weight_key] for weight_key, score in completed.items()) / total_weight)
+
+    async def _expert_events(
+        self,
+        experts: List[tuple],
+        resume_data: Dict[str, Any],
+        deadline: float,
+        results: Dict[str, Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """并行执行一组专家，按完成顺序产出 dimension 事件并写入 results
+
+        调用方提前停止迭代时，未完成的专家任务会被取消。
+        """
+        tasks = [
+            asyncio.ensure_future(self._run_expert(key, expert, name, default_score, resume_data, deadline))
+            for key, expert, name, default_score in experts
+        ]
+        names = {key: name for key, _, name, _ in experts}
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, result = await next_done
+                results[key] = result
+                yield {"type": "dimension", "dimension": key, "name": names[key], "result": result}
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def analyze_stream(
         self,
         resume_data: Dict[str, Any],
         job_requirements: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """执行完整的简历分析 (7维度)
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """渐进式执行简历分析 (7维度)，按完成顺序逐步产出结果
+
+        事件依次为：
+        - {"type": "dimension", "dimension": 结果键, "name": 维度名称, "result": 维度结果}（每个专家完成时）
+        - {"type": "stage", "stage": "screen", "provisional_score": 初筛评分, "threshold": 阈值, "passed": 是否通过}（仅级联模式）
+        - {"type": "stage", "stage": "fused", "fallback_dimensions": 由专家补齐的维度}（仅合并模式）
+        - {"type": "overall_score", "overall_score": 综合评分, "weights": 权重, "pending_dimensions": 待定维度}
+        - {"type": "summary_token", "token": 摘要增量}（摘要流式生成）
+        - {"type": "result", "result": 与 analyze 返回值相同的完整结果}
+
+        级联模式先执行技能与经验两个专家，按权重计算初筛评分；低于阈值时其余维度标记为未分析
+        （status="skipped"），不调用摘要LLM，结果中 cascade_rejected 为 True。
+        合并模式用一次LLM调用得到七个维度与摘要，各维度同样经过 _ensure_dimension_complete 补全字段；
+        合并结果缺失或无效的维度由对应专家补齐，此时摘要重新生成。
+        结果的 stages_run 记录实际执行的阶段（screen / fused / experts / summary），用于区分部分报告与完整报告。
+
+        整个分析受 ANALYSIS_TIMEOUT 截止时间约束：超时的专家维度为待定（status="pending"，score 为 None），
+        结果中列入 pending_dimensions；摘要生成超时时使用评分摘要。
+        调用方提前停止迭代时，未完成的专家任务会被取消。
 
         Args:
             resume_data: 简历数据字典
             job_requirements: 职位要求字典
 
-        Returns:
-            完整的分析结果
+        Yields:
+            分析事件
         """
-        logger.info(f"开始简历分析 (7维度)，租户: {self.tenant_id}")
+        logger.info(f"开始简历分析 (7维度，{self.mode}模式)，租户: {self.tenant_id}")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ANALYSIS_TIMEOUT
+        experts = self._dimension_experts()
+        names = {key: name for key, _, name, _ in experts}
+        results: Dict[str, Dict[str, Any]] = {}
+        stages_run: List[str] = []
+        cascade_rejected = False
+        fused_summary = ""
+
+        if self.mode == MODE_FUSED:
+            fused = await self._run_fused(resume_data, deadline)
+            stages_run.append(STAGE_FUSED)
+            for key, _, name, _ in experts:
+                if isinstance(fused.get(key), dict) and fused[key].get("score") is not None:
+                    # 合并提示词要求给出结构化字段，模型遗漏时取中性默认值
+                    dimension = {**DIMENSION_FIELD_DEFAULTS.get(key, {}), **fused[key]}
+                    results[key] = self._ensure_dimension_complete(dimension, name)
+                    yield {"type": "dimension", "dimension": key, "name": name, "result": results[key]}
+
+            # 合并结果缺失的维度由对应专家补齐
+            experts = [item for item in experts if item[0] not in results]
+            if experts:
+                logger.warning(f"合并分析缺少维度 {[key for key, _, _, _ in experts]}，由对应专家补齐")
+            elif isinstance(fused.get("summary"), str):
+                fused_summary = fused["summary"].strip()
+            yield {
+                "type": "stage",
+                "stage": STAGE_FUSED,
+                "fallback_dimensions": [key for key, _, _, _ in experts],
+            }
 
-        try:
-            # 并行调用七个专家分析
-            (
-                skills_result,
-                experience_result,
-                education_result,
-                soft_skills_result,
-                stability_result,
-                work_attitude_result,
-                potential_result
-            ) = await asyncio.gather(
-                self.skills_expert.analyze({"resume_data": resume_data}),
-                self.experience_expert.analyze({"resume_data": resume_data}),
-                self.education_expert.analyze({"resume_data": resume_data}),
-                self.soft_skills_expert.analyze({"resume_data": resume_data}),
-                self.stability_expert.analyze({"resume_data": resume_data}),
-                self.work_attitude_expert.analyze({"resume_data": resume_data}),
-                self.development_potential_expert.analyze({"resume_data": resume_data}),
-                return_exceptions=True
-            )
+        if self.mode == MODE_CASCADE:
+            # 初筛：技能 + 经验
+            screen_experts = [item for item in experts if item[0] in CASCADE_SCREEN_DIMENSIONS]
+            experts = [item for item in experts if item[0] not in CASCADE_SCREEN_DIMENSIONS]
+            async for event in self._expert_events(screen_experts, resume_data, deadline, results):
+                yield event
+            stages_run.append(STAGE_SCREEN)
+
+            provisional_score = self._weighted_score({
+                key: results.get(key) or {"score": None}
+                for key, _, _, _ in self._dimension_experts()
+            })
+            # 初筛维度全部超时时无法判断，继续完整分析
+            screened = any(results[key].get("status") != "pending" for key, _, _, _ in screen_experts)
+            cascade_rejected = screened and provisional_score < self.cascade_threshold
+            yield {
+                "type": "stage",
+                "stage": STAGE_SCREEN,
+                "provisional_score": provisional_score,
+                "threshold": self.cascade_threshold,
+                "passed": not cascade_rejected,
+            }
 
-            # 处理可能的异常，并确保每个维度包含所有必需字段
-            skills_result = self._ensure_dimension_complete(
-                skills_result if not isinstance(skills_result, Exception) else {"error": str(skills_result), "credibility_score": 50, "score": 50},
-                "技能匹配度"
-            )
-            experience_result = self._ensure_dimension_complete(
-                experience_result if not isinstance(experience_result, Exception) else {"error": str(experience_result), "score": 50},
-                "工作经验"
-            )
-            education_result = self._ensure_dimension_complete(
-                education_result if not isinstance(education_result, Exception) else {"error": str(education_result), "score": 60},
-                "教育背景"
-            )
-            soft_skills_result = self._ensure_dimension_complete(
-                soft_skills_result if not isinstance(soft_skills_result, Exception) else {"error": str(soft_skills_result), "score": 60},
-                "软技能"
-            )
-            stability_result = self._ensure_dimension_complete(
-                stability_result if not isinstance(stability_result, Exception) else {"error": str(stability_result), "score": 50},
-                "稳定性/忠诚度"
-            )
-            work_attitude_result = self._ensure_dimension_complete(
-                work_attitude_result if not isinstance(work_attitude_result, Exception) else {"error": str(work_attitude_result), "score": 50},
-                "工作态度/抗压"
-            )
-            potential_result = self._ensure_dimension_complete(
-                potential_result if not isinstance(potential_result, Exception) else {"error": str(potential_result), "score": 50},
-                "发展潜力"
-            )
+            if cascade_rejected:
+                logger.info(f"级联初筛未通过: 初筛评分 {provisional_score} < {self.cascade_threshold}")
+                for key, _, name, _ in experts:
+                    results[key] = self._skipped_dimension(key, name, provisional_score)
+                experts = []
+
+        if experts:
+            async for event in self._expert_events(experts, resume_data, deadline, results):
+                yield event
+            stages_run.append(STAGE_EXPERTS)
+
+        pending_dimensions = [key for key, result in results.items() if result.get("status") == "pending"]
+        overall_score = self._weighted_score(results)
+        yield {
+            "type": "overall_score",
+            "overall_score": overall_score,
+            "weights": self.weights,
+            "pending_dimensions": pending_dimensions,
+        }
 
-            # 获取各个评分（兼容批判性思维的credibility_score和传统score）
-            skills_score = skills_result.get("credibility_score") or skills_result.get("score", 0)
-            experience_score = experience_result.get("score", 0)
-            education_score = education_result.get("score", 0)
-            soft_skills_score = soft_skills_result.get("score", 0)
-            stability_score = stability_result.get("score", 0)
-            attitude_score = work_attitude_result.get("score", 0)
-            potential_score = potential_result.get("score", 0)
-
-            # 调试日志
-            logger.info(f"各维度评分 - 技能: {skills_score}, 经验: {experience_score}, 教育: {education_score}, 软技能: {soft_skills_score}, 稳定: {stability_score}, 态度: {attitude_score}, 潜力: {potential_score}")
-            logger.info(f"教育原始结果: {education_result}")
-            logger.info(f"软技能原始结果: {soft_skills_result}")
-
-            # 计算综合评分（使用配置的权重）
-            overall_score = int(
-                skills_score * (self.weights['skills'] / 100) +
-                experience_score * (self.weights['experience'] / 100) +
-                education_score * (self.weights['education'] / 100) +
-                soft_skills_score * (self.weights['soft_skills'] / 100) +
-                stability_score * (self.weights['stability'] / 100) +
-                attitude_score * (self.weights['attitude'] / 100) +
-                potential_score * (self.weights['potential'] / 100)
-            )
+        summary_args = (
+            results["skills"], results["experience"], results["education"], results["soft_skills"],
+            results["stability"], results["work_attitude"], results["development_potential"],
+            overall_score
+        )
+        summary_parts: List[str] = []
+        if cascade_rejected:
+            # 初筛未通过：使用评分摘要，不调用LLM
+            fallback = self._fallback_summary(*summary_args)
+            summary_parts.append(fallback)
+            yield {"type": "summary_token", "token": fallback}
+        elif fused_summary:
+            # 合并分析已包含摘要，不再调用LLM
+            summary_parts.append(fused_summary)
+            yield {"type": "summary_token", "token": fused_summary}
+        else:
+            # 流式生成综合分析摘要
+            prompt = self._build_summary_prompt(resume_data, job_requirements, *summary_args)
+            summary_stream = self._stream_llm_cached(prompt)
+            try:
+                while True:
+                    delta = await asyncio.wait_for(summary_stream.__anext__(), timeout=max(deadline - loop.time(), 0))
+                    summary_parts.append(delta)
+                    yield {"type": "summary_token", "token": delta}
+            except StopAsyncIteration:
+                pass
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    logger.warning("生成摘要超过分析截止时间，使用评分摘要")
+                else:
+                    logger.error(f"生成摘要失败: {e}")
+                if not summary_parts:
+                    fallback = self._fallback_summary(*summary_args)
+                    summary_parts.append(fallback)
+                    yield {"type": "summary_token", "token": fallback}
+            finally:
+                await summary_stream.aclose()
+            stages_run.append(STAGE_SUMMARY)
+        summary = "".join(summary_parts)
+
+        recommendations = await self._generate_recommendations(*summary_args)
+        if pending_dimensions:
+            pending_names = "、".join(names[key] for key in pending_dimensions)
+            recommendations.insert(0, f"{pending_names}分析超时，结果待定，建议稍后重新分析")
+        if cascade_rejected:
+            recommendations.insert(0, "初筛评分低于阈值，仅分析了技能与经验维度，如需完整评估请重新进行完整分析")
+
+        logger.info(f"简历分析完成 (7维度，阶段: {stages_run})，综合评分: {overall_score}")
+
+        # 构建结果字典
+        result = {
+            "overall_score": overall_score,
+            # 原有4维度
+            "skills": results["skills"],
+            "experience": results["experience"],
+            "education": results["education"],
+            "soft_skills": results["soft_skills"],
+            # 新增3维度
+            "stability": results["stability"],
+            "work_attitude": results["work_attitude"],
+            "development_potential": results["development_potential"],
+            # 综合评估
+            "summary": summary,
+            "recommendations": recommendations,
+            # 元数据
+            "analysis_version": "2.0",
+            "dimension_count": 7,
+            "weights_used": self.weights,
+            "pending_dimensions": pending_dimensions,
+            "analysis_mode": self.mode,
+            "stages_run": stages_run,
+            "cascade_rejected": cascade_rejected
+        }
 
-            # 使用LLM生成综合分析报告
-            summary = await self._generate_summary(
-                resume_data,
-                job_requirements,
-                skills_result,
-                experience_result,
-                education_result,
-                soft_skills_result,
-                stability_result,
-                work_attitude_result,
-                potential_result,
-                overall_score
-            )
+        # 提升批判性思维字段到顶层（如果存在）
+        credibility_fields = [
+            "credibility_score", "risk_level",
+            "verified_claims", "questionable_claims",
+            "logical_inconsistencies", "exaggeration_indicators",
+            "interview_questions", "constructive_feedback"
+        ]
 
-            # 生成建议
-            recommendations = await self._generate_recommendations(
-                skills_result,
-                experience_result,
-                education_result,
-                soft_skills_result,
-                stability_result,
-                work_attitude_result,
-                potential_result,
-                overall_score
-            )
+        for field in credibility_fields:
+            if field in results["skills"]:
+                result[field] = results["skills"][field]
 
-            logger.info(f"简历分析完成 (7维度)，综合评分: {overall_score}")
-
-            # 构建结果字典
-            result = {
-                "overall_score": overall_score,
-                # 原有4维度
-                "skills": skills_result,
-                "experience": experience_result,
-                "education": education_result,
-                "soft_skills": soft_skills_result,
-                # 新增3维度
-                "stability": stability_result,
-                "work_attitude": work_attitude_result,
-                "development_potential": potential_result,
-                # 综合评估
-                "summary": summary,
-                "recommendations": recommendations,
-                # 元数据
-                "analysis_version": "2.0",
-                "dimension_count": 7,
-                "weights_used": self.weights
-            }
+        yield {"type": "result", "result": result}
 
-            # 提升批判性思维字段到顶层（如果存在）
-            credibility_fields = [
-                "credibility_score", "risk_level",
-                "verified_claims", "questionable_claims",
-                "logical_inconsistencies", "exaggeration_indicators",
-                "interview_questions", "constructive_feedback"
-            ]
+    async def analyze(
+        self,
+        resume_data: Dict[str, Any],
+        job_requirements: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """执行完整的简历分析 (7维度)
 
-            for field in credibility_fields:
-                if field in skills_result:
-                    result[field] = skills_result[field]
+        七个专家并行执行，全部完成后返回；需要逐步展示结果时使用 analyze_stream
 
-            return result
+        Args:
+            resume_data: 简历数据字典
+            job_requirements: 职位要求字典
+
+        Returns:
+            完整的分析结果
+        """
+        try:
+            async for event in self.analyze_stream(resume_data, job_requirements):
+                if event["type"] == "result":
+                    return event["result"]
+            raise RuntimeError("分析未产生结果")
 
         except Exception as e:
             logger.error(f"协调分析失败: {e}", exc_info=True)
@@ -244,7 +586,7 @@ class ResumeAnalysisCoordinator(BaseAgent):
                 "constructive_feedback": []
             }
 
-    async def _generate_summary(
+    def _build_summary_prompt(
         self,
         resume_data: Dict[str, Any],
         job_requirements: Dict[str, Any],
@@ -257,7 +599,7 @@ class ResumeAnalysisCoordinator(BaseAgent):
         potential_result: Dict[str, Any],
         overall_score: int
     ) -> str:
-        """使用LLM生成综合分析摘要 (7维度版本)
+        """构建综合分析摘要的提示词 (7维度版本)
 
         Args:
             resume_data: 简历数据
@@ -272,7 +614,7 @@ class ResumeAnalysisCoordinator(BaseAgent):
             overall_score: 综合评分
 
         Returns:
-            综合分析摘要
+            提示词
         """
         resume_text = self._format_resume_data(resume_data)
         job_text = self._format_job_requirements(job_requirements)
@@ -286,25 +628,25 @@ class ResumeAnalysisCoordinator(BaseAgent):
 {job_text}
 
 ## 专家分析结果
-### 技能分析（评分：{skills_result.get('score', 0)}）
+### 技能分析（评分：{self._score_text(skills_result)}）
 {json.dumps(skills_result, ensure_ascii=False, indent=2)}
 
-### 经验分析（评分：{experience_result.get('score', 0)}）
+### 经验分析（评分：{self._score_text(experience_result)}）
 {json.dumps(experience_result, ensure_ascii=False, indent=2)}
 
-### 教育分析（评分：{education_result.get('score', 0)}）
+### 教育分析（评分：{self._score_text(education_result)}）
 {json.dumps(education_result, ensure_ascii=False, indent=2)}
 
-### 软技能分析（评分：{soft_skills_result.get('score', 0)}）
+### 软技能分析（评分：{self._score_text(soft_skills_result)}）
 {json.dumps(soft_skills_result, ensure_ascii=False, indent=2)}
 
-### 稳定性分析（评分：{stability_result.get('score', 0)}）
+### 稳定性分析（评分：{self._score_text(stability_result)}）
 {json.dumps(stability_result, ensure_ascii=False, indent=2)}
 
-### 工作态度分析（评分：{work_attitude_result.get('score', 0)}）
+### 工作态度分析（评分：{self._score_text(work_attitude_result)}）
 {json.dumps(work_attitude_result, ensure_ascii=False, indent=2)}
 
-### 发展潜力分析（评分：{potential_result.get('score', 0)}）
+### 发展潜力分析（评分：{self._score_text(potential_result)}）
 {json.dumps(potential_result, ensure_ascii=False, indent=2)}
 
 ## 综合评分: {overall_score}/100
@@ -315,12 +657,25 @@ class ResumeAnalysisCoordinator(BaseAgent):
 3. 需要注意的方面
 
 摘要："""
+        return prompt
 
-        try:
-            return await self._invoke_llm(prompt)
-        except Exception as e:
-            logger.error(f"生成摘要失败: {e}")
-            return f"综合评分为{overall_score}分。技能匹配度{skills_result.get('score', 0)}分，工作经验{experience_result.get('score', 0)}分，教育背景{education_result.get('score', 0)}分，软技能{soft_skills_result.get('score', 0)}分，稳定性{stability_result.get('score', 0)}分，工作态度{work_attitude_result.get('score', 0)}分，发展潜力{potential_result.get('score', 0)}分。"
+    def _fallback_summary(
+        self,
+        skills_result: Dict[str, Any],
+        experience_result: Dict[str, Any],
+        education_result: Dict[str, Any],
+        soft_skills_result: Dict[str, Any],
+        stability_result: Dict[str, Any],
+        work_attitude_result: Dict[str, Any],
+        potential_result: Dict[str, Any],
+        overall_score: int
+    ) -> str:
+        """LLM 生成摘要失败时使用的评分摘要"""
+        def label(result: Dict[str, Any]) -> str:
+            text = self._score_text(result)
+            return text if result.get("status") in ("pending", "skipped") else f"{text}分"
+
+        return f"综合评分为{overall_score}分。技能匹配度{label(skills_result)}，工作经验{label(experience_result)}，教育背景{label(education_result)}，软技能{label(soft_skills_result)}，稳定性{label(stability_result)}，工作态度{label(work_attitude_result)}，发展潜力{label(potential_result)}。"
 
     async def _generate_recommendations(
         self,
@@ -351,25 +706,25 @@ class ResumeAnalysisCoordinator(BaseAgent):
         recommendations = []
 
         # 基于评分给出建议
-        if skills_result.get("score", 0) < 60:
+        if self._below(skills_result, 60):
             recommendations.append("建议重点考察候选人的技术能力，可通过在线编程测试或技术面试进一步评估")
 
-        if experience_result.get("score", 0) < 60:
+        if self._below(experience_result, 60):
             recommendations.append("建议详细了解候选人的项目经历，评估其实际工作能力和项目贡献度")
 
-        if education_result.get("score", 0) < 60:
+        if self._below(education_result, 60):
             recommendations.append("建议核实候选人的学历背景，关注其学习能力和专业发展潜力")
 
-        if soft_skills_result.get("score", 0) < 60:
+        if self._below(soft_skills_result, 60):
             recommendations.append("建议通过行为面试问题评估候选人的沟通能力、团队协作和问题解决能力")
 
-        if stability_result.get("score", 0) < 60:
+        if self._below(stability_result, 60):
             recommendations.append("建议关注候选人的工作稳定性，了解过往离职原因和职业规划")
 
-        if work_attitude_result.get("score", 0) < 60:
+        if self._below(work_attitude_result, 60):
             recommendations.append("建议通过面试评估候选人的工作态度、责任心和抗压能力")
 
-        if potential_result.get("score", 0) < 60:
+        if self._below(potential_result, 60):
             recommendations.append("建议评估候选人的学习能力和发展潜力，判断是否符合团队长期发展需求")
 
         if overall_score >= 80:
@@ -578,6 +933,15 @@ class ResumeAnalysisCoordinator(BaseAgent):
         # 添加各维度详情
         for key, (name, emoji) in dimension_mapping.items():
             dimension_data = result.get(key, {})
+            if dimension_data.get("status") == "pending":
+                report_parts.append(f"{emoji} **{name}**: 待定（分析超时）")
+                report_parts.append("")
+                continue
+            if dimension_data.get("status") == "skipped":
+                report_parts.append(f"{emoji} **{name}**: 未分析（初筛未通过）")
+                report_parts.append("")
+                continue
+
             score = dimension_data.get("score", 0)
             score_reason = dimension_data.get("score_reason", dimension_data.get("risk_level", ""))
 
@@ -10,6 +10,7 @@ from app.application.agents.experts.soft_skills_expert import SoftSkillsExpertAg
 from app.application.agents.experts.stability_expert import StabilityExpertAgent
 from app.application.agents.experts.work_attitude_expert import WorkAttitudeExpertAgent
 from app.application.agents.experts.development_potential_expert import DevelopmentPotentialExpertAgent
+from app.application.agents.experts.fused_expert import FusedAnalysisAgent
 
 __all__ = [
     # 原有4维度
@@ -21,4 +22,6 @@ __all__ = [
     "StabilityExpertAgent",
     "WorkAttitudeExpertAgent",
     "DevelopmentPotentialExpertAgent",
+    # 单次调用合并分析
+    "FusedAnalysisAgent",
 ]
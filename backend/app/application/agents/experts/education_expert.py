@@ -50,16 +50,12 @@ class EducationExpertAgent(BaseAgent):
         else:
             education_background = context.get("education_background") or context.get("resume_text", "")
 
-        # 构建提示词
-        prompt = get_education_prompt(education_background)
-
         try:
-            # 调用 LLM
-            response = await self._invoke_llm(prompt)
-            logger.info(f"教育分析LLM响应: {response[:500]}...")  # 记录响应前500字符
+            # 构建提示词（简历文本按模型的输入预算截断）
+            prompt = await self._fit_resume_prompt(get_education_prompt, education_background)
 
-            # 解析 JSON 响应
-            result = self._parse_json_response(response)
+            # 调用 LLM
+            result = await self._invoke_llm_cached(prompt)
             score = result.get('score', 0)
             logger.info(f"教育分析完成，评分: {score}")
             return result
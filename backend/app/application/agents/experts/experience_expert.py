@@ -56,16 +56,14 @@ class ExperienceExpertAgent(BaseAgent):
             work_experience = context.get("resume_text") or context.get("work_experience", "")
             project_experience = context.get("project_experience", "")
 
-        # 构建提示词
-        prompt = get_experience_prompt(work_experience, project_experience)
-
         try:
-            # 调用 LLM
-            response = await self._invoke_llm(prompt)
-            logger.info(f"经验分析LLM响应: {response[:500]}...")  # 记录响应前500字符
+            # 构建提示词（简历文本按模型的输入预算截断）
+            prompt = await self._fit_resume_prompt(
+                lambda text: get_experience_prompt(text, project_experience), work_experience
+            )
 
-            # 解析 JSON 响应
-            result = self._parse_json_response(response)
+            # 调用 LLM
+            result = await self._invoke_llm_cached(prompt)
             score = result.get('score', 0)
             logger.info(f"经验分析完成，评分: {score}")
             return result
@@ -0,0 +1,63 @@
+"""
+Fused Analysis Agent
+合并分析智能体 - 单次调用完成七个维度的评估
+"""
+
+import logging
+from typing import Dict, Any
+
+from app.application.agents.base import BaseAgent
+from app.application.agents.prompts.fused import get_fused_prompt
+
+logger = logging.getLogger(__name__)
+
+
+class FusedAnalysisAgent(BaseAgent):
+    """合并分析智能体
+
+    用一个精简的合并提示词代替七个专家各自的长提示词，简历全文只发送一次
+    """
+
+    def __init__(self, db, tenant_id: str):
+        """初始化合并分析智能体
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+        """
+        super().__init__(db, tenant_id, temperature=0.5)
+
+    async def analyze(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """一次性分析七个维度
+
+        与各专家不同，失败时不返回默认结构而是抛出异常，由协调器决定如何补齐。
+
+        Args:
+            context: 包含 resume_data 的上下文（与各专家相同，不含职位要求）
+
+        Returns:
+            以维度键（skills/experience/...）组织的分析结果，另含 summary
+
+        Raises:
+            ValueError: 响应无法解析为JSON对象
+        """
+        resume_data = context.get("resume_data", {})
+
+        if isinstance(resume_data, dict):
+            resume_text = (
+                resume_data.get("extracted_text") or
+                resume_data.get("resume_text") or
+                self._format_resume_data(resume_data)
+            )
+        else:
+            resume_text = str(resume_data)
+
+        # 简历文本按模型的输入预算截断
+        prompt = await self._fit_resume_prompt(get_fused_prompt, resume_text)
+
+        result = await self._invoke_llm_cached(prompt)
+        if not isinstance(result, dict):
+            raise ValueError("合并分析结果不是JSON对象")
+
+        logger.info(f"合并分析完成，返回维度: {[key for key, value in result.items() if isinstance(value, dict)]}")
+        return result
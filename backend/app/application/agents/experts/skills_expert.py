@@ -52,16 +52,12 @@ class SkillsExpertAgent(BaseAgent):
 
         job_skills = context.get("job_skills", "")
 
-        # 构建提示词
-        prompt = get_skills_prompt(resume_text, job_skills)
-
         try:
-            # 调用 LLM
-            response = await self._invoke_llm(prompt)
-            logger.info(f"技能分析LLM响应: {response[:500]}...")  # 记录响应前500字符
+            # 构建提示词（简历文本按模型的输入预算截断）
+            prompt = await self._fit_resume_prompt(lambda text: get_skills_prompt(text, job_skills), resume_text)
 
-            # 解析 JSON 响应
-            result = self._parse_json_response(response)
+            # 调用 LLM
+            result = await self._invoke_llm_cached(prompt)
             score = result.get('score', 0)
             logger.info(f"技能分析完成，评分: {score}")
             return result
@@ -39,15 +39,12 @@ class WorkAttitudeExpertAgent(BaseAgent):
         # 获取简历数据
         resume_data = context.get("resume_data", {})
 
-        # 构建提示词
-        prompt = get_work_attitude_prompt(resume_data)
-
         try:
-            # 调用 LLM
-            response = await self._invoke_llm(prompt)
+            # 构建提示词（简历文本按模型的输入预算截断）
+            prompt = await self._fit_resume_data_prompt(get_work_attitude_prompt, resume_data)
 
-            # 解析 JSON 响应
-            result = self._parse_json_response(response)
+            # 调用 LLM
+            result = await self._invoke_llm_cached(prompt)
             logger.info(f"工作态度分析完成，评分: {result.get('score', 0)}")
             return result
 
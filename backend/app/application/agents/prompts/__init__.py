@@ -3,6 +3,9 @@ Agent Prompt Templates
 智能体提示词模板
 """
 
+# 提示词模板版本：修改任何模板或结果结构后递增，使已缓存的分析结果失效
+PROMPT_TEMPLATE_VERSION = "2.0.3"
+
 from app.application.agents.prompts.coordinator import COORDINATOR_SYSTEM_PROMPT
 from app.application.agents.prompts.skills import SKILLS_EXPERT_PROMPT
 from app.application.agents.prompts.experience import EXPERIENCE_EXPERT_PROMPT
@@ -10,6 +13,7 @@ from app.application.agents.prompts.education import EDUCATION_EXPERT_PROMPT
 from app.application.agents.prompts.soft_skills import SOFT_SKILLS_EXPERT_PROMPT
 
 __all__ = [
+    "PROMPT_TEMPLATE_VERSION",
     "COORDINATOR_SYSTEM_PROMPT",
     "SKILLS_EXPERT_PROMPT",
     "EXPERIENCE_EXPERT_PROMPT",
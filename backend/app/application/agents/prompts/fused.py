@@ -0,0 +1,72 @@
+"""
+Fused Analysis Prompt
+单次调用的七维度合并分析提示词 - 精简版
+"""
+
+FUSED_ANALYSIS_PROMPT = """你是一位资深HR与技术面试官，请以批判性思维一次性完成候选人七个维度的评估。
+
+## 原则
+- 只依据简历实际内容，不要复制格式示例中的数据
+- 不轻信：对"精通"、"主导"、"大型项目"等缺少细节或量化的陈述要质疑
+- 注意逻辑矛盾：毕业时间与工作年限、项目时间重叠、实习生"主导"大项目等
+- 信息不足的维度给出50分，并在 score_reason 中说明"数据不足"
+
+## 维度与评分要点（0-100分）
+- skills 技能匹配度：技术栈的深度与广度、技能陈述的可信度；risk_level: A(90+)/B(70-89)/C(50-69)/D(<50)
+- experience 工作经验：年限、项目复杂度、角色与贡献、成果量化、职业轨迹
+- education 教育背景：学历层次、专业相关度、院校、持续学习
+- soft_skills 软技能：沟通、协作、领导力、问题解决，需有行为证据
+- stability 稳定性/忠诚度：全职平均任期（实习不计）、跳槽频率（<1年为频繁）、空窗期及原因
+- work_attitude 工作态度/抗压：责任心、投入度、高压场景表现、成果导向
+- development_potential 发展潜力：学习速度、技术栈演进、创新与主动性、职业规划
+
+## 输出要求
+只返回一个JSON对象，七个维度键缺一不可，每个维度字段如下（skills 额外包含 credibility_score 与 risk_level，且 credibility_score 与 score 相同；
+experience 额外包含 total_years 与 relevant_years；stability 额外包含 job_tenure_avg、job_changes_count 与 career_progression_score；
+简历中无法得出的数值填 null）：
+
+```json
+{
+  "skills": {
+    "score": <0-100>,
+    "credibility_score": <与score相同>,
+    "risk_level": "<A|B|C|D>",
+    "score_reason": "<2-3句评分依据>",
+    "verified_claims": [{"claim": "<可信陈述>", "evidence": "<依据>"}],
+    "questionable_claims": [{"claim": "<可疑陈述>", "concern": "<疑点>"}],
+    "logical_inconsistencies": [{"issue": "<矛盾>", "explanation": "<原因>"}],
+    "interview_questions": ["<验证问题>"],
+    "constructive_feedback": ["<改进建议>"],
+    "recommendations": "<一句话结论>"
+  },
+  "experience": {"score": <0-100>, "total_years": <总工作年限>, "relevant_years": <相关工作年限>, "score_reason": "...", "verified_claims": [], "questionable_claims": [], "logical_inconsistencies": [], "interview_questions": [], "constructive_feedback": [], "recommendations": "..."},
+  "education": {...同上},
+  "soft_skills": {...同上},
+  "stability": {"score": <0-100>, "job_tenure_avg": <全职平均任期，年>, "job_changes_count": <跳槽次数>, "career_progression_score": <0-100>, "score_reason": "...", ...其余同上},
+  "work_attitude": {...同上},
+  "development_potential": {...同上},
+  "summary": "<3-5句综合评估：整体匹配度、主要优势、需要注意的方面>"
+}
+```
+
+每个列表最多3项，问题与建议要针对本简历，保持简洁。
+"""
+
+
+def get_fused_prompt(resume_text: str) -> str:
+    """生成七维度合并分析的完整提示词
+
+    与完整模式的各专家一样只包含简历内容，两种模式的评分输入一致。
+
+    Args:
+        resume_text: 格式化后的简历文本
+
+    Returns:
+        完整的提示词
+    """
+    return f"""{FUSED_ANALYSIS_PROMPT}
+## 简历内容
+{resume_text}
+
+请基于以上信息完成七个维度的分析，返回JSON格式结果。
+"""
@@ -17,6 +17,7 @@ class ResumeAnalysisRequest(BaseModel):
     job_position_id: Optional[str] = Field(None, description="职位ID")
     job_requirements: Optional[Dict[str, Any]] = Field(None, description="职位要求（可选）")
     analysis_profile: Optional[str] = Field("standard", description="分析配置类型 (standard/tech_focused/leadership/junior/senior)")
+    analysis_mode: Optional[str] = Field("full", description="分析模式 (full: 完整分析 / cascade: 初筛未通过时只分析技能与经验 / fused: 单次调用完成七个维度)")
 
 
 class ConversationCreateRequest(BaseModel):
@@ -38,7 +39,7 @@ class SendMessageRequest(BaseModel):
 
 class SkillsAnalysis(BaseModel):
     """技能分析结果 (增强版)"""
-    score: int = Field(..., ge=0, le=100, description="技能评分")
+    score: Optional[int] = Field(..., ge=0, le=100, description="技能评分（超时待定时为空）")
     matched_skills: List[Dict[str, str]] = Field(default_factory=list, description="匹配的技能列表")
     missing_skills: List[str] = Field(default_factory=list, description="缺失的技能")
     strengths: List[str] = Field(default_factory=list, description="优势")
@@ -67,9 +68,9 @@ class SkillsAnalysis(BaseModel):
 
 class ExperienceAnalysis(BaseModel):
     """工作经验分析结果 (增强版)"""
-    score: int = Field(..., ge=0, le=100, description="经验评分")
-    total_years: float = Field(..., ge=0, description="总工作年限")
-    relevant_years: float = Field(..., ge=0, description="相关工作年限")
+    score: Optional[int] = Field(..., ge=0, le=100, description="经验评分（超时待定时为空）")
+    total_years: Optional[float] = Field(None, ge=0, description="总工作年限（专家未给出时为空）")
+    relevant_years: Optional[float] = Field(None, ge=0, description="相关工作年限（专家未给出时为空）")
     company_analysis: List[Dict[str, str]] = Field(default_factory=list, description="公司分析")
     career_progression: str = Field("", description="职业发展轨迹")
     project_highlights: List[str] = Field(default_factory=list, description="项目亮点")
@@ -93,7 +94,7 @@ class ExperienceAnalysis(BaseModel):
 
 class EducationAnalysis(BaseModel):
     """教育背景分析结果 (增强版)"""
-    score: int = Field(..., ge=0, le=100, description="教育评分")
+    score: Optional[int] = Field(..., ge=0, le=100, description="教育评分（超时待定时为空）")
     highest_degree: str = Field("", description="最高学历")
     university_tier: Optional[str] = Field(None, description="学校层次")
     major_relevance: str = Field("", description="专业相关性")
@@ -112,7 +113,7 @@ class EducationAnalysis(BaseModel):
 
 class SoftSkillsAnalysis(BaseModel):
     """软技能分析结果 (增强版)"""
-    score: int = Field(..., ge=0, le=100, description="软技能评分")
+    score: Optional[int] = Field(..., ge=0, le=100, description="软技能评分（超时待定时为空）")
     communication: str = Field("", description="沟通能力")
     teamwork: str = Field("", description="团队协作")
     leadership: str = Field("", description="领导力")
@@ -140,15 +141,15 @@ class SoftSkillsAnalysis(BaseModel):
 
 class StabilityAnalysis(BaseModel):
     """稳定性/忠诚度分析结果"""
-    score: int = Field(..., ge=0, le=100, description="稳定性评分")
+    score: Optional[int] = Field(..., ge=0, le=100, description="稳定性评分（超时待定时为空）")
 
     # 工作稳定性指标
-    job_tenure_avg: float = Field(..., description="平均每份工作时长（年）")
-    job_changes_count: int = Field(..., description="跳槽次数")
+    job_tenure_avg: Optional[float] = Field(None, description="平均每份工作时长（年，专家未给出时为空）")
+    job_changes_count: Optional[int] = Field(None, description="跳槽次数（专家未给出时为空）")
     frequent_hopper_flag: bool = Field(default=False, description="频繁跳槽标记")
 
     # 职业发展轨迹
-    career_progression_score: int = Field(..., ge=0, le=100, description="职业发展评分")
+    career_progression_score: Optional[int] = Field(None, ge=0, le=100, description="职业发展评分（专家未给出时为空）")
     promotion_history: List[str] = Field(default_factory=list, description="晋升历史")
     role_evolution: str = Field("", description="角色演变描述")
 
@@ -169,7 +170,7 @@ class StabilityAnalysis(BaseModel):
 
 class WorkAttitudeAnalysis(BaseModel):
     """工作态度/抗压性分析结果"""
-    score: int = Field(..., ge=0, le=100, description="工作态度评分")
+    score: Optional[int] = Field(..., ge=0, le=100, description="工作态度评分（超时待定时为空）")
 
     # 抗压能力
     stress_resistance: str = Field("", description="抗压能力描述")
@@ -200,7 +201,7 @@ class WorkAttitudeAnalysis(BaseModel):
 
 class DevelopmentPotentialAnalysis(BaseModel):
     """发展潜力分析结果"""
-    score: int = Field(..., ge=0, le=100, description="发展潜力评分")
+    score: Optional[int] = Field(..., ge=0, le=100, description="发展潜力评分（超时待定时为空）")
 
     # 学习能力
     learning_ability: str = Field("", description="学习能力描述")
@@ -254,6 +255,10 @@ class AnalysisResult(BaseModel):
     # 元数据
     analysis_version: str = Field(default="2.0", description="分析版本")
     dimension_count: int = Field(default=7, description="维度数量")
+    pending_dimensions: List[str] = Field(default_factory=list, description="超时待定的维度")
+    analysis_mode: str = Field(default="full", description="分析模式")
+    stages_run: List[str] = Field(default_factory=list, description="实际执行的分析阶段 (screen/experts/summary)")
+    cascade_rejected: bool = Field(default=False, description="是否因级联初筛未通过而只分析了部分维度")
 
 
 # ============================================================================
@@ -0,0 +1,30 @@
+"""批量筛选相关的Pydantic模式"""
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class ScreeningFilter(BaseModel):
+    """候选简历筛选条件（均为可选，只在租户已解析完成的简历中筛选）"""
+    candidate_location: Optional[str] = Field(None, description="候选人所在地（模糊匹配）")
+    keyword: Optional[str] = Field(None, description="关键词（匹配姓名、文件名与简历内容）")
+    uploaded_after: Optional[datetime] = Field(None, description="上传时间不早于")
+    uploaded_before: Optional[datetime] = Field(None, description="上传时间早于")
+
+
+class ScreeningJobCreateRequest(BaseModel):
+    """创建批量筛选任务请求"""
+    job_position_id: str = Field(..., description="职位ID")
+    resume_ids: Optional[List[str]] = Field(None, description="候选简历ID列表，为空时按 filter 筛选")
+    filter: Optional[ScreeningFilter] = Field(None, description="候选简历筛选条件")
+    analysis_profile: str = Field("standard", description="分析配置类型 (standard/tech_focused/leadership/junior/senior)")
+    analysis_mode: str = Field("cascade", description="分析模式 (cascade: 初筛未通过时只分析技能与经验 / full: 完整分析 / fused: 单次调用完成七个维度)")
+    cascade_threshold: Optional[int] = Field(None, ge=0, le=100, description="级联初筛阈值，默认使用系统配置")
+    token_budget: Optional[int] = Field(None, gt=0, description="token 预算，为空表示不限制")
+    reuse_existing: bool = Field(True, description="是否复用该职位已有的分析结果")
+
+
+class ScreeningJobResumeRequest(BaseModel):
+    """继续批量筛选任务请求"""
+    token_budget: Optional[int] = Field(None, gt=0, description="新的 token 预算（预算用尽时需提高后继续）")
@@ -0,0 +1,266 @@
+"""
+Conversation Memory
+对话记忆：每轮只向 LLM 发送“滚动摘要 + 最近若干条消息”，而不是整段历史
+
+未并入摘要的消息超过 CONVERSATION_MEMORY_BUFFER_TOKENS 时，较早的部分由 LLM 增量合并进摘要，
+只保留最近 CONVERSATION_MEMORY_RECENT_TOKENS 的原文。摘要与水位（已并入摘要的最后一条消息）
+保存在 Conversation.meta_data["memory"]，每轮只读取水位之后的消息。
+分析报告类消息在历史中用 meta_data["memory_ref"] 中的简短引用代替全文。
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.database.models import Conversation, Message
+from app.infrastructure.external_services.tokenizer import count_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Conversation.meta_data 中的记忆键
+MEMORY_KEY = "memory"
+
+# 历史中的 JSON 代码块（完整分析结果）用占位文字代替
+_JSON_BLOCK = re.compile(r"```json.*?```", re.DOTALL)
+_JSON_PLACEHOLDER = "[结构化分析数据已省略]"
+
+SUMMARY_PROMPT = """你负责维护一段HR助手对话的记忆摘要。请把“新增对话”合并进“已有摘要”，输出更新后的摘要。
+
+要求：
+1. 保留用户关心的候选人、职位、已给出的结论与评分、用户的偏好和尚未解决的问题
+2. 分析报告只保留报告ID、综合评分和关键结论，不复述细节
+3. 省略寒暄和重复内容，使用简洁的中文要点，不超过{max_chars}字
+4. 只输出摘要正文
+
+已有摘要：
+{summary}
+
+新增对话：
+{dialogue}
+"""
+
+
+def report_reference(analysis_id: Any, result: Dict[str, Any]) -> str:
+    """生成分析报告在对话历史中的简短引用
+
+    Args:
+        analysis_id: resume_analyses 记录ID
+        result: 协调智能体返回的完整分析结果
+
+    Returns:
+        形如“[分析报告 <id>] 综合评分 82/100；技能匹配度 85，...；结论：...”的引用文本
+    """
+    from app.core.analysis_weights import DIMENSION_NAMES
+    from app.infrastructure.repositories.resume_analysis_repository import DIMENSION_SCORE_COLUMNS
+
+    scores = []
+    for dimension in DIMENSION_SCORE_COLUMNS:
+        data = result.get(dimension)
+        if isinstance(data, dict) and data.get("score") is not None:
+            # 结果中的 work_attitude / development_potential 对应权重表中的 attitude / potential
+            name = DIMENSION_NAMES.get(dimension) or DIMENSION_NAMES.get(dimension.split("_")[-1], dimension)
+            scores.append(f"{name} {data['score']}")
+
+    reference = f"[分析报告 {analysis_id}] 综合评分 {result.get('overall_score', 'N/A')}/100"
+    if scores:
+        reference += "；" + "，".join(scores)
+    summary = result.get("summary")
+    if isinstance(summary, str) and summary:
+        reference += "；结论：" + truncate_tokens(summary, 120, mark="…")
+    return reference
+
+
+def compact_message(message: Message) -> str:
+    """历史消息的精简内容：有 memory_ref 时使用引用，去掉 JSON 代码块，超长时截断"""
+    meta = message.meta_data if isinstance(message.meta_data, dict) else {}
+    if meta.get("memory_ref"):
+        return meta["memory_ref"]
+
+    content = message.content or ""
+    if "```json" in content:
+        content = _JSON_BLOCK.sub(_JSON_PLACEHOLDER, content)
+    return truncate_tokens(content, settings.CONVERSATION_MEMORY_MESSAGE_TOKENS)
+
+
+class ConversationMemory:
+    """一个对话的滚动记忆"""
+
+    def __init__(self, db: AsyncSession, conversation_id: str):
+        """初始化对话记忆
+
+        Args:
+            db: 数据库会话
+            conversation_id: 对话ID
+        """
+        self.db = db
+        self.conversation_id = UUID(str(conversation_id))
+
+    async def _get_conversation(self) -> Optional[Conversation]:
+        result = await self.db.execute(select(Conversation).where(Conversation.id == self.conversation_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _state(conversation: Optional[Conversation]) -> Dict[str, Any]:
+        meta = conversation.meta_data if conversation and isinstance(conversation.meta_data, dict) else {}
+        state = meta.get(MEMORY_KEY)
+        return state if isinstance(state, dict) else {}
+
+    async def _unsummarized(self, state: Dict[str, Any]) -> List[Message]:
+        """读取水位之后的消息（按时间正序，最多 CONVERSATION_MEMORY_MAX_MESSAGES 条最新的）"""
+        query = select(Message).where(Message.conversation_id == self.conversation_id)
+        if state.get("until_at") and state.get("until_id"):
+            query = query.where(
+                tuple_(Message.created_at, Message.id) >
+                tuple_(datetime.fromisoformat(state["until_at"]), UUID(state["until_id"]))
+            )
+        query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(
+            settings.CONVERSATION_MEMORY_MAX_MESSAGES
+        )
+        result = await self.db.execute(query)
+        return list(reversed(result.scalars().all()))
+
+    @staticmethod
+    def _split(entries: List[Dict[str, Any]], keep_tokens: int) -> int:
+        """从最新的消息往前累计，返回保留原文部分的起始下标（最后一条消息总是保留）"""
+        total = 0
+        start = len(entries)
+        while start > 0:
+            total += entries[start - 1]["tokens"]
+            if total > keep_tokens and start < len(entries):
+                break
+            start -= 1
+        return start
+
+    def _entries(self, messages: List[Message]) -> List[Dict[str, Any]]:
+        entries = []
+        for index, message in enumerate(messages):
+            # 当前这条用户消息保留原文，由提示词预算统一裁剪
+            content = message.content if index == len(messages) - 1 else compact_message(message)
+            entries.append({
+                "message": message,
+                "role": message.role,
+                "content": content,
+                "tokens": count_tokens(content),
+            })
+        return entries
+
+    async def load(self) -> List[Dict[str, str]]:
+        """获取本轮发送给 LLM 的对话历史
+
+        Returns:
+            [{"role": "system", "content": 摘要}]（有摘要时）+ 未并入摘要的最近消息，
+            格式同 ConversationService.get_conversation_messages
+        """
+        conversation = await self._get_conversation()
+        state = self._state(conversation)
+        entries = self._entries(await self._unsummarized(state))
+
+        # 摘要合并失败或尚未执行时，只取缓冲区上限内的最新消息
+        start = self._split(entries, settings.CONVERSATION_MEMORY_BUFFER_TOKENS)
+        if start:
+            logger.warning(f"对话 {self.conversation_id} 未摘要消息超出缓冲区，本轮略去最早的 {start} 条")
+
+        history = []
+        if state.get("summary"):
+            history.append({"role": "system", "content": f"【此前对话摘要】\n{state['summary']}"})
+        history.extend({"role": entry["role"], "content": entry["content"]} for entry in entries[start:])
+        return history
+
+    async def refresh(self, llm: Any, tenant_id: str) -> bool:
+        """未摘要消息超过缓冲区上限时，把较早的消息合并进摘要并推进水位
+
+        在保存助手回复之后调用；失败时水位不变，下一轮重试。
+        生成摘要前先结束读事务，不在LLM调用期间占用数据库连接上的事务；写入前重新锁定对话行，
+        水位已被其他进程推进时放弃本次结果，避免用旧摘要覆盖新水位。
+
+        Args:
+            llm: 生成摘要使用的 ChatOpenAI 实例（通常是本轮对话的模型）
+            tenant_id: 租户ID（用于调度器记账）
+
+        Returns:
+            是否更新了摘要
+        """
+        from langchain_core.messages import HumanMessage
+        from app.infrastructure.external_services.llm_scheduler import (
+            PRIORITY_ANALYSIS,
+            estimate_tokens,
+            get_llm_scheduler,
+            provider_of,
+        )
+
+        conversation = await self._get_conversation()
+        if conversation is None:
+            return False
+        state = self._state(conversation)
+        entries = self._entries(await self._unsummarized(state))
+        if sum(entry["tokens"] for entry in entries) <= settings.CONVERSATION_MEMORY_BUFFER_TOKENS:
+            return False
+
+        split = self._split(entries, settings.CONVERSATION_MEMORY_RECENT_TOKENS)
+        folded = entries[:split]
+        if not folded:
+            return False
+
+        role_names = {"user": "用户", "assistant": "助手"}
+        dialogue = "\n".join(
+            f"{role_names.get(entry['role'], entry['role'])}：{entry['content']}" for entry in folded
+        )
+        summary_tokens = settings.CONVERSATION_MEMORY_SUMMARY_TOKENS
+        prompt = SUMMARY_PROMPT.format(
+            max_chars=summary_tokens,
+            summary=state.get("summary") or "（无）",
+            dialogue=dialogue,
+        )
+
+        last = folded[-1]["message"]
+        watermark = (state.get("until_at"), state.get("until_id"))
+        # 读取完成，结束读事务后再排队等待LLM
+        await self.db.commit()
+
+        messages = [HumanMessage(content=prompt)]
+        # 后台任务，优先级低于对话回复
+        async with get_llm_scheduler().slot(
+            tenant_id,
+            provider_of(llm),
+            estimated_tokens=estimate_tokens(messages) + summary_tokens,
+            priority=PRIORITY_ANALYSIS,
+        ) as lease:
+            response = await llm.ainvoke(messages)
+            lease.record_usage(response)
+
+        summary = truncate_tokens(str(response.content).strip(), summary_tokens)
+
+        result = await self.db.execute(
+            select(Conversation)
+            .where(Conversation.id == self.conversation_id)
+            .with_for_update()
+            # 会话未在提交时过期对象，需用数据库中的最新值覆盖已加载的属性
+            .execution_options(populate_existing=True)
+        )
+        conversation = result.scalar_one_or_none()
+        current = self._state(conversation)
+        if conversation is None or (current.get("until_at"), current.get("until_id")) != watermark:
+            await self.db.rollback()
+            logger.info(f"对话 {self.conversation_id} 的摘要已被其他任务更新，放弃本次结果")
+            return False
+
+        meta = dict(conversation.meta_data) if isinstance(conversation.meta_data, dict) else {}
+        meta[MEMORY_KEY] = {
+            "summary": summary,
+            "until_at": last.created_at.isoformat(),
+            "until_id": str(last.id),
+            "summarized_messages": int(current.get("summarized_messages", 0)) + len(folded),
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+        # JSON 列需整体赋值才会被识别为已修改
+        conversation.meta_data = meta
+        await self.db.commit()
+
+        logger.info(f"对话 {self.conversation_id} 已将 {len(folded)} 条消息合并进摘要（{count_tokens(summary)} tokens）")
+        return True
@@ -3,23 +3,48 @@ Conversation Service
 对话管理服务层
 """
 
+import asyncio
 import logging
 import json
 import uuid
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
-from sqlalchemy import select, delete, func, desc
+from sqlalchemy import select, delete, func, desc, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import keyset_condition
 from app.infrastructure.database.models import Conversation, Message, Resume
 from app.infrastructure.database.llm_models import Tenant
 from app.application.agents.coordinator import ResumeAnalysisCoordinator
 from app.application.agents.base import BaseAgent
-from langchain_openai import ChatOpenAI
+from app.application.services.conversation_memory import ConversationMemory
+from app.application.services.prompt_budget import PromptBudget
+from app.application.services.resume_content import lean_parsed_content
+from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
+from app.infrastructure.external_services.llm_scheduler import (
+    PRIORITY_INTERACTIVE,
+    estimate_tokens,
+    get_llm_scheduler,
+    provider_of,
+)
 
 logger = logging.getLogger(__name__)
 
+# 对话列表中最后一条消息的预览长度
+PREVIEW_LENGTH = 100
+
+# 后台更新摘要的任务：对话ID -> 任务（同一对话同时只执行一个，并保留引用避免任务被回收）
+_memory_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _refresh_memory_in_background(conversation_id: str, llm: Any, tenant_id: str):
+    """使用独立的数据库会话更新对话摘要（请求的会话在响应结束后即关闭）"""
+    from app.infrastructure.database.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        await ConversationService(db).update_conversation_memory(conversation_id, llm, tenant_id)
+
 
 class ConversationService:
     """对话管理服务"""
@@ -108,41 +133,58 @@ class ConversationService:
         self,
         tenant_id: str,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> tuple[List[Conversation], int]:
         """获取对话列表
 
         Args:
             tenant_id: 租户ID
             limit: 限制数量
-            offset: 偏移量
+            offset: 偏移量（兼容旧客户端，提供 cursor 时忽略）
+            cursor: 上一页返回的游标，按 (created_at, id) 倒序继续读取
 
         Returns:
             (对话列表, 总数)
+
+        Raises:
+            ValueError: 游标格式无效
         """
         try:
             from uuid import UUID
-            from sqlalchemy import select, func
 
-            # 获取总数
-            count_query = select(func.count()).where(
+            filters = [
                 Conversation.tenant_id == UUID(tenant_id),
                 Conversation.status == "active"
-            )
-            total_result = await self.db.execute(count_query)
-            total = total_result.scalar() or 0
+            ]
 
-            # 获取列表
-            query = select(Conversation).where(
-                Conversation.tenant_id == UUID(tenant_id),
-                Conversation.status == "active"
-            ).order_by(desc(Conversation.created_at)).limit(limit).offset(offset)
+            # 总数通过窗口函数随列表一并返回，单次查询命中 (tenant_id, status, created_at) 索引
+            query = select(Conversation, func.count().over().label("total")).where(*filters)
+            if cursor:
+                # 游标分页时窗口函数只能统计游标之后的行，总数单独统计
+                query = select(Conversation).where(
+                    *filters,
+                    keyset_condition(Conversation.created_at, Conversation.id, cursor)
+                )
+            else:
+                query = query.offset(offset)
+            query = query.order_by(desc(Conversation.created_at), desc(Conversation.id)).limit(limit)
 
             result = await self.db.execute(query)
-            conversations = result.scalars().all()
+            rows = result.all()
+            conversations = [row[0] for row in rows]
+
+            if rows and not cursor:
+                total = rows[0].total
+            else:
+                # 游标分页或偏移量超出末尾时，单独统计总数
+                count_query = select(func.count()).select_from(Conversation).where(*filters)
+                total = (await self.db.execute(count_query)).scalar() or 0
 
             return list(conversations), total
 
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"获取对话列表失败: {e}", exc_info=True)
             return [], 0
@@ -213,6 +255,18 @@ class ConversationService:
             )
 
             self.db.add(message)
+
+            # 与消息写入同一事务更新对话的消息统计，计数在数据库端自增，并发写入不会丢失
+            await self.db.execute(
+                update(Conversation)
+                .where(Conversation.id == UUID(conversation_id))
+                .values(
+                    message_count=Conversation.message_count + 1,
+                    last_message_preview=content[:PREVIEW_LENGTH],
+                    last_message_at=func.now(),
+                )
+                .execution_options(synchronize_session=False)
+            )
             await self.db.commit()
             await self.db.refresh(message)
 
@@ -227,29 +281,42 @@ class ConversationService:
         self,
         conversation_id: str,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Message]:
         """获取对话的消息列表
 
         Args:
             conversation_id: 对话ID
             limit: 限制数量
-            offset: 偏移量
+            offset: 偏移量（兼容旧客户端，提供 cursor 时忽略）
+            cursor: 上一页返回的游标，按 (created_at, id) 正序继续读取
 
         Returns:
             消息列表
+
+        Raises:
+            ValueError: 游标格式无效
         """
         try:
             from uuid import UUID
             from sqlalchemy import select
 
+            # 命中 (conversation_id, created_at, id) 索引
             query = select(Message).where(
                 Message.conversation_id == UUID(conversation_id)
-            ).order_by(Message.created_at).limit(limit).offset(offset)
+            )
+            if cursor:
+                query = query.where(keyset_condition(Message.created_at, Message.id, cursor, descending=False))
+            else:
+                query = query.offset(offset)
+            query = query.order_by(Message.created_at, Message.id).limit(limit)
 
             result = await self.db.execute(query)
             return list(result.scalars().all())
 
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"获取消息列表失败: {e}", exc_info=True)
             return []
@@ -286,6 +353,69 @@ class ConversationService:
             logger.error(f"获取对话消息历史失败: {e}", exc_info=True)
             return []
 
+    async def get_conversation_context(
+        self,
+        conversation_id: str
+    ) -> List[Dict[str, str]]:
+        """获取发送给LLM的对话历史：滚动摘要 + 最近的消息（分析报告以引用代替全文）
+
+        Args:
+            conversation_id: 对话ID
+
+        Returns:
+            消息历史列表，有摘要时第一条为 system 消息
+        """
+        try:
+            return await ConversationMemory(self.db, conversation_id).load()
+        except Exception as e:
+            logger.error(f"获取对话记忆失败，回退为完整历史: {e}", exc_info=True)
+            return await self.get_conversation_messages(conversation_id)
+
+    async def update_conversation_memory(
+        self,
+        conversation_id: str,
+        llm: Any,
+        tenant_id: str
+    ) -> None:
+        """保存助手回复后更新对话的滚动摘要（失败只记录日志，下一轮重试）
+
+        Args:
+            conversation_id: 对话ID
+            llm: 生成摘要使用的LLM实例
+            tenant_id: 租户ID
+        """
+        try:
+            await ConversationMemory(self.db, conversation_id).refresh(llm, tenant_id)
+        except Exception as e:
+            logger.error(f"更新对话摘要失败: {e}", exc_info=True)
+            await self.db.rollback()
+
+    @staticmethod
+    def schedule_memory_update(conversation_id: str, llm: Any, tenant_id: str) -> None:
+        """在后台更新对话的滚动摘要，不占用本轮回复的响应时间
+
+        摘要合并需要一次额外的LLM调用，放在后台执行，回复可以立即结束。
+        同一对话已有更新在执行时跳过，未合并的消息由下一轮处理。
+
+        Args:
+            conversation_id: 对话ID
+            llm: 生成摘要使用的LLM实例
+            tenant_id: 租户ID
+        """
+        key = str(conversation_id)
+        running = _memory_tasks.get(key)
+        if running is not None and not running.done():
+            return
+
+        task = asyncio.create_task(_refresh_memory_in_background(key, llm, tenant_id))
+        _memory_tasks[key] = task
+
+        def forget(done: asyncio.Task):
+            if _memory_tasks.get(key) is done:
+                del _memory_tasks[key]
+
+        task.add_done_callback(forget)
+
     async def process_user_message(
         self,
         conversation_id: str,
@@ -312,8 +442,8 @@ class ConversationService:
                 content=user_message
             )
 
-            # 2. 获取对话历史
-            history = await self.get_conversation_messages(conversation_id)
+            # 2. 获取对话历史（滚动摘要 + 最近消息）
+            history = await self.get_conversation_context(conversation_id)
 
             # 3. 获取关联的简历信息
             resume_context = ""
@@ -325,8 +455,9 @@ class ConversationService:
                 result = await self.db.execute(query)
                 resume = result.scalar_one_or_none()
 
-                if resume and resume.parsed_content:
-                    resume_context = f"\n\n关联简历信息:\n{json.dumps(resume.parsed_content, ensure_ascii=False, indent=2)}"
+                parsed_content = lean_parsed_content(resume.parsed_content) if resume else {}
+                if parsed_content:
+                    resume_context = f"\n\n关联简历信息:\n{json.dumps(parsed_content, ensure_ascii=False, indent=2)}"
 
             # 4. 构建LLM提示
             system_prompt = """你是一位专业的HR AI助手，帮助用户进行简历分析和招聘相关工作。
@@ -340,32 +471,34 @@ class ConversationService:
 请保持专业、友好的语气，提供有价值的见解。"""
 
             # 构建消息列表
+            # 历史的最后一条即刚保存的用户消息，替换为附带简历上下文的版本
             messages = [{"role": "system", "content": system_prompt}]
-            messages.extend(history)
+            messages.extend(history[:-1])
             messages.append({
                 "role": "user",
                 "content": user_message + resume_context
             })
 
             # 5. 调用LLM生成回复
-            from app.application.services.llm_service import TenantLLMService, TenantService
+            from app.application.services.model_config_cache import get_model_config_cache
             from app.core.config import settings
             from app.core.llm_init import DEFAULT_TENANT_ID
             import os
 
-            # 首先获取租户信息，看看租户配置了什么默认模型
-            tenant = await TenantService.get_by_id(self.db, tenant_id)
+            # 首先获取租户配置的默认模型（带缓存）
+            config_cache = get_model_config_cache()
+            tenant_llm_id = await config_cache.get_tenant_llm_id(self.db, tenant_id)
 
             # 确定要使用的模型
             model_to_use = settings.DEFAULT_AI_MODEL  # 默认值
-            if tenant and tenant.llm_id:
-                model_to_use = tenant.llm_id
+            if tenant_llm_id:
+                model_to_use = tenant_llm_id
             elif tenant_id == DEFAULT_TENANT_ID:
                 # 对于默认租户，尝试从初始化配置获取
                 model_to_use = "glm-4@ZHIPU-AI"  # 或从配置读取
 
             # 获取租户的LLM配置
-            llm_config = await TenantLLMService.get_api_key(
+            llm_config = await config_cache.get_model_config(
                 self.db, tenant_id, model_to_use
             )
 
@@ -395,20 +528,22 @@ class ConversationService:
                 return error_msg
 
             # 使用较低温度使回复更严谨
+            llm_pool = get_llm_client_pool()
             if llm_config:
-                llm = ChatOpenAI(
-                    model=llm_config.llm_name,
-                    openai_api_key=api_key,
-                    base_url=llm_config.api_base or None,
+                llm = llm_pool.get_client(
+                    tenant_id,
+                    llm_config.llm_name,
+                    api_key=api_key,
+                    api_base=llm_config.api_base,
                     temperature=0.3,
-                    max_tokens=llm_config.max_tokens or settings.DEFAULT_MAX_TOKENS,
+                    max_tokens=llm_config.max_tokens,
                 )
             else:
-                llm = ChatOpenAI(
-                    model=settings.DEFAULT_AI_MODEL,
-                    openai_api_key=api_key,
+                llm = llm_pool.get_client(
+                    tenant_id,
+                    settings.DEFAULT_AI_MODEL,
+                    api_key=api_key,
                     temperature=0.3,
-                    max_tokens=settings.DEFAULT_MAX_TOKENS,
                 )
 
             # 生成回复
@@ -427,7 +562,18 @@ class ConversationService:
                 elif msg["role"] == "assistant":
                     langchain_messages.append(AIMessage(content=msg["content"]))
 
-            response = await llm.ainvoke(langchain_messages)
+            # 超出模型输入预算时按优先级裁剪历史消息与简历上下文
+            langchain_messages = PromptBudget.for_llm(llm).fit_messages(langchain_messages)
+
+            max_tokens = getattr(llm, "max_tokens", None) or settings.DEFAULT_MAX_TOKENS
+            async with get_llm_scheduler().slot(
+                tenant_id,
+                provider_of(llm),
+                estimated_tokens=estimate_tokens(langchain_messages) + max_tokens,
+                priority=PRIORITY_INTERACTIVE,
+            ) as lease:
+                response = await llm.ainvoke(langchain_messages)
+                lease.record_usage(response)
             ai_reply = response.content
 
             # 6. 保存AI回复
@@ -437,6 +583,7 @@ class ConversationService:
                 content=ai_reply,
                 meta_data={"model": llm_config.llm_name if llm_config else settings.DEFAULT_AI_MODEL}
             )
+            self.schedule_memory_update(conversation_id, llm, tenant_id)
 
             return ai_reply
 
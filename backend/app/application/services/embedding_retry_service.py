@@ -0,0 +1,230 @@
+"""
+Embedding Retry Service
+向量生成失败的重试队列：按指数退避定时重试，支持管理员批量重试
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.database.models import Resume
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_PENDING = "pending"
+EMBEDDING_EMBEDDED = "embedded"
+EMBEDDING_FAILED = "failed"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def next_retry_delay(attempts: int) -> float:
+    """第 attempts 次失败后的退避时间（秒）"""
+    delay = settings.EMBEDDING_RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0))
+    return min(delay, settings.EMBEDDING_RETRY_MAX_DELAY)
+
+
+def mark_embedded(resume: Resume):
+    """标记简历向量已生成"""
+    resume.embedding_status = EMBEDDING_EMBEDDED
+    resume.embedding_error = None
+    resume.embedding_next_retry_at = None
+
+
+def mark_embedding_failed(resume: Resume, error: str):
+    """标记简历向量生成失败，并按退避策略安排下次重试（超过最大次数后不再自动重试）"""
+    attempts = (resume.embedding_attempts or 0) + 1
+    resume.embedding_status = EMBEDDING_FAILED
+    resume.embedding_attempts = attempts
+    resume.embedding_error = error[:2000]
+    if attempts < settings.EMBEDDING_MAX_ATTEMPTS:
+        resume.embedding_next_retry_at = _utcnow() + timedelta(seconds=next_retry_delay(attempts))
+    else:
+        resume.embedding_next_retry_at = None
+
+
+class EmbeddingRetryService:
+    """向量生成重试队列
+
+    队列即 resumes 表中 embedding_status = 'failed' 且到期的行（部分索引 ix_resumes_embedding_retry）。
+    每批先把 next_retry_at 推后一个租约时间来认领（FOR UPDATE SKIP LOCKED），多进程不会重复处理；
+    进程在处理中退出时，租约到期后由其他进程重新认领。
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def _claim_batch(self, db: AsyncSession, limit: int) -> List[Resume]:
+        """认领一批到期的失败简历"""
+        now = _utcnow()
+        due = (
+            select(Resume.id)
+            .where(and_(
+                Resume.embedding_status == EMBEDDING_FAILED,
+                Resume.embedding_next_retry_at <= now,
+            ))
+            .order_by(Resume.embedding_next_retry_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = await db.execute(
+            update(Resume)
+            .where(Resume.id.in_(due.scalar_subquery()))
+            .values(embedding_next_retry_at=now + timedelta(seconds=settings.EMBEDDING_RETRY_LEASE))
+            .returning(Resume.id)
+        )
+        ids = [row[0] for row in claimed.all()]
+        await db.commit()
+        if not ids:
+            return []
+
+        result = await db.execute(select(Resume).where(Resume.id.in_(ids)))
+        return list(result.scalars().all())
+
+    async def process_batch(self, db: AsyncSession, limit: Optional[int] = None) -> Dict[str, int]:
+        """处理一批到期的失败简历
+
+        Args:
+            db: 数据库会话
+            limit: 批次大小
+
+        Returns:
+            {"claimed": 认领数量, "embedded": 成功数量, "failed": 失败数量}
+        """
+        from app.application.services.embedding_service import EmbeddingService, VectorStoreService
+        from app.application.services.resume_upload_service import ResumeUploadService
+        from app.core.llm_init import DEFAULT_TENANT_ID
+
+        resumes = await self._claim_batch(db, limit or settings.EMBEDDING_REINDEX_BATCH_SIZE)
+        if not resumes:
+            return {"claimed": 0, "embedded": 0, "failed": 0}
+
+        # 同一租户的简历使用同一个模型配置，批量生成
+        by_tenant: Dict[str, List[Resume]] = {}
+        for resume in resumes:
+            tenant_id = str(resume.uploaded_by) if resume.uploaded_by else DEFAULT_TENANT_ID
+            by_tenant.setdefault(tenant_id, []).append(resume)
+
+        embedding_service = EmbeddingService(db)
+        embedded = 0
+        failed = 0
+
+        for tenant_id, group in by_tenant.items():
+            try:
+                config = await embedding_service._get_embedding_config(tenant_id)
+                texts = [ResumeUploadService._prepare_text_for_embedding(resume) for resume in group]
+                vectors = await embedding_service.embed_texts_batch(texts, tenant_id, config=config)
+            except Exception as e:
+                config, vectors = None, [None] * len(group)
+                error = str(e)
+            else:
+                error = "embedding 请求失败"
+
+            items = []
+            for resume, vector in zip(group, vectors):
+                # 全零向量无法归一化，同样视为失败
+                if vector and any(vector):
+                    items.append((resume.id, vector))
+                    resume.embedding_model = config["model"]
+                    mark_embedded(resume)
+                    embedded += 1
+                else:
+                    mark_embedding_failed(resume, error)
+                    failed += 1
+
+            if items:
+                await VectorStoreService.save_embeddings(db, config["model"], items)
+
+        await db.commit()
+        logger.info(f"向量重试批次完成: 认领={len(resumes)}, 成功={embedded}, 失败={failed}")
+        return {"claimed": len(resumes), "embedded": embedded, "failed": failed}
+
+    async def requeue_failed(self, db: AsyncSession, uploaded_by: Optional[Any] = None) -> int:
+        """将失败的简历重新放入队列并立即到期（重置重试次数）
+
+        Args:
+            db: 数据库会话
+            uploaded_by: 只重试该用户上传的简历，为空时重试全部
+
+        Returns:
+            重新入队的数量
+        """
+        conditions = [Resume.embedding_status == EMBEDDING_FAILED]
+        if uploaded_by is not None:
+            conditions.append(Resume.uploaded_by == uploaded_by)
+
+        result = await db.execute(
+            update(Resume)
+            .where(and_(*conditions))
+            .values(embedding_attempts=0, embedding_next_retry_at=_utcnow())
+        )
+        await db.commit()
+        self._wakeup.set()
+        return result.rowcount or 0
+
+    async def stats(self, db: AsyncSession, uploaded_by: Optional[Any] = None) -> Dict[str, int]:
+        """各 embedding 状态的简历数量"""
+        from sqlalchemy import func
+
+        query = select(Resume.embedding_status, func.count(Resume.id)).group_by(Resume.embedding_status)
+        if uploaded_by is not None:
+            query = query.where(Resume.uploaded_by == uploaded_by)
+        result = await db.execute(query)
+        return {status: count for status, count in result.all()}
+
+    async def run_forever(self):
+        """后台循环：有到期任务时连续处理，否则等待轮询间隔或被唤醒"""
+        from app.infrastructure.database.database import AsyncSessionLocal
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await self.process_batch(db)
+                if result["claimed"]:
+                    await asyncio.sleep(settings.EMBEDDING_REINDEX_THROTTLE)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"向量重试队列处理失败: {str(e)}", exc_info=True)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.EMBEDDING_RETRY_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """启动后台重试循环"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        """停止后台重试循环"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+# 全局单例
+_embedding_retry_service: Optional[EmbeddingRetryService] = None
+
+
+def get_embedding_retry_service() -> EmbeddingRetryService:
+    """获取向量重试队列单例"""
+    global _embedding_retry_service
+    if _embedding_retry_service is None:
+        _embedding_retry_service = EmbeddingRetryService()
+    return _embedding_retry_service
@@ -5,15 +5,29 @@ Embedding 服务
 
 import logging
 import asyncio
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
 from app.infrastructure.database.llm_models import TenantLLM, Tenant
 from app.core.llm_init import DEFAULT_TENANT_ID
+from app.core.config import settings
+from app.infrastructure.external_services.tokenizer import count_tokens
 
 logger = logging.getLogger(__name__)
 
+class EmbeddingError(Exception):
+    """Embedding 生成失败"""
+    pass
+
+
+# 租户未配置 embedding 模型时使用的默认配置
+DEFAULT_EMBEDDING_CONFIG = {
+    "model": "text-embedding-3-small",
+    "api_key": "",
+    "api_base": "https://api.openai.com/v1"
+}
+
 
 class EmbeddingService:
     """Embedding 服务"""
@@ -26,25 +40,79 @@ class EmbeddingService:
         self._api_base: Optional[str] = None
 
     async def _get_embedding_config(self, tenant_id: str = DEFAULT_TENANT_ID) -> Dict[str, str]:
-        """获取 embedding 模型配置"""
-        # 查询租户配置的 embedding 模型
-        result = await self.db.execute(
-            select(TenantLLM).where(
+        """获取 embedding 模型配置
+
+        优先使用租户系统模型设置中的 embd_id，其次使用任一启用的 embedding 模型，最后使用默认配置
+        """
+        config = None
+
+        embd_id = await self._get_tenant_embd_id(tenant_id)
+        if embd_id:
+            llm_name, _, factory = embd_id.partition("@")
+            query = select(TenantLLM).where(
                 (TenantLLM.tenant_id == tenant_id) &
-                (TenantLLM.model_type == 'embedding') &
-                (TenantLLM.status == '1')
+                (TenantLLM.llm_name == llm_name)
             )
-        )
-        config = result.scalar_one_or_none()
+            if factory:
+                query = query.where(TenantLLM.llm_factory == factory)
+            result = await self.db.execute(query.limit(1))
+            config = result.scalars().first()
+
+        if not config:
+            # 查询租户配置的 embedding 模型
+            result = await self.db.execute(
+                select(TenantLLM).where(
+                    (TenantLLM.tenant_id == tenant_id) &
+                    (TenantLLM.model_type == 'embedding') &
+                    (TenantLLM.status == '1')
+                ).limit(1)
+            )
+            config = result.scalars().first()
 
         if not config:
             # 使用默认配置
             logger.warning("未找到租户 embedding 配置，使用默认配置")
-            return {
-                "model": "text-embedding-3-small",
-                "api_key": "",
-                "api_base": "https://api.openai.com/v1"
-            }
+            return dict(DEFAULT_EMBEDDING_CONFIG)
+
+        return {
+            "model": config.llm_name,
+            "api_key": config.api_key or "",
+            "api_base": config.api_base or ""
+        }
+
+    async def _get_tenant_embd_id(self, tenant_id: str) -> Optional[str]:
+        """获取租户系统模型设置中的 embedding 模型 (Tenant.embd_id)"""
+        from uuid import UUID
+
+        try:
+            tenant_uuid = UUID(str(tenant_id))
+        except ValueError:
+            return None
+
+        result = await self.db.execute(select(Tenant.embd_id).where(Tenant.id == tenant_uuid))
+        return result.scalar_one_or_none()
+
+    async def get_model_config(self, tenant_id: str, model: str) -> Optional[Dict[str, str]]:
+        """获取指定 embedding 模型的调用配置（不要求模型处于启用状态，用于迁移期间的双读）
+
+        Args:
+            tenant_id: 租户ID
+            model: 模型名称（不含 @厂商）
+
+        Returns:
+            配置字典，租户未配置该模型时返回 None
+        """
+        result = await self.db.execute(
+            select(TenantLLM).where(
+                (TenantLLM.tenant_id == tenant_id) &
+                (TenantLLM.llm_name == model)
+            ).limit(1)
+        )
+        config = result.scalars().first()
+        if not config:
+            if model == DEFAULT_EMBEDDING_CONFIG["model"]:
+                return dict(DEFAULT_EMBEDDING_CONFIG)
+            return None
 
         return {
             "model": config.llm_name,
@@ -52,42 +120,76 @@ class EmbeddingService:
             "api_base": config.api_base or ""
         }
 
-    async def embed_text(self, text: str, tenant_id: str = DEFAULT_TENANT_ID) -> List[float]:
+    async def embed_text(
+        self,
+        text: str,
+        tenant_id: str = DEFAULT_TENANT_ID,
+        config: Optional[Dict[str, str]] = None
+    ) -> List[float]:
         """
         将文本转换为向量
 
         Args:
             text: 输入文本
             tenant_id: 租户ID
+            config: 指定的模型配置，为空时使用租户当前的 embedding 模型
 
         Returns:
             向量列表
+
+        Raises:
+            EmbeddingError: 重试后仍然失败
         """
-        config = await self._get_embedding_config(tenant_id)
-        model = config["model"]
+        config = config or await self._get_embedding_config(tenant_id)
 
         try:
-            # 根据模型类型选择调用方式
-            if "openai" in model.lower() or "embedding-3" in model.lower():
-                return await self._embed_openai(text, config)
-            elif "zhipu" in model.lower() or "embedding-2" in model.lower():
-                return await self._embed_zhipu(text, config)
-            elif "ollama" in model.lower():
-                return await self._embed_ollama(text, config)
-            else:
-                # 默认使用 OpenAI 格式
-                return await self._embed_openai(text, config)
+            vectors = await self._embed_chunk([text], config)
+            return vectors[0]
 
         except Exception as e:
             logger.error(f"Embedding 生成失败: {str(e)}")
-            # 返回零向量作为降级处理
-            return [0.0] * 1536  # OpenAI 默认维度
+            raise EmbeddingError(str(e)) from e
 
-    async def _embed_openai(self, text: str, config: Dict[str, str]) -> List[float]:
-        """使用 OpenAI 格式的 API"""
+    @staticmethod
+    def _provider(model: str) -> str:
+        """根据模型名称判断调用方式"""
+        model = model.lower()
+        if "openai" in model or "embedding-3" in model:
+            return "openai"
+        if "zhipu" in model or "embedding-2" in model:
+            return "zhipu"
+        if "ollama" in model:
+            return "ollama"
+        # 默认使用 OpenAI 格式
+        return "openai"
+
+    async def _embed_chunk(self, texts: List[str], config: Dict[str, str]) -> List[List[float]]:
+        """一次请求生成一组文本的向量，网络错误、429 和 5xx 按指数退避重试"""
+        from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+        provider = self._provider(config["model"])
+        if provider == "zhipu":
+            call = self._embed_zhipu
+        elif provider == "ollama":
+            call = self._embed_ollama
+        else:
+            call = self._embed_openai
+
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception(_is_retryable),
+            stop=stop_after_attempt(settings.EMBEDDING_MAX_RETRIES),
+            wait=wait_exponential(multiplier=1, min=1, max=20),
+            reraise=True,
+        ):
+            with attempt:
+                vectors = await call(texts, config)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"Embedding 返回数量不一致: 期望 {len(texts)}, 实际 {len(vectors)}")
+                return vectors
+
+    async def _embed_openai(self, texts: List[str], config: Dict[str, str]) -> List[List[float]]:
+        """使用 OpenAI 格式的 API（input 为数组，一次请求多条）"""
         try:
-            import httpx
-
             headers = {
                 "Content-Type": "application/json"
             }
@@ -95,28 +197,28 @@ class EmbeddingService:
                 headers["Authorization"] = f"Bearer {config['api_key']}"
 
             payload = {
-                "input": text,
+                "input": texts,
                 "model": config["model"]
             }
 
-            api_base = config.get("api_base", "https://api.openai.com/v1")
+            api_base = config.get("api_base") or "https://api.openai.com/v1"
             url = f"{api_base.rstrip('/')}/embeddings"
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                result = response.json()
+            response = await get_embedding_http_client().post(url, headers=headers, json=payload)
+            response.raise_for_status()
+            result = response.json()
 
-                return result["data"][0]["embedding"]
+            # 按 index 还原输入顺序
+            data = sorted(result["data"], key=lambda item: item.get("index", 0))
+            return [item["embedding"] for item in data]
 
         except Exception as e:
             logger.error(f"OpenAI embedding 调用失败: {str(e)}")
             raise
 
-    async def _embed_zhipu(self, text: str, config: Dict[str, str]) -> List[float]:
-        """使用智谱 AI 的 embedding API"""
+    async def _embed_zhipu(self, texts: List[str], config: Dict[str, str]) -> List[List[float]]:
+        """使用智谱 AI 的 embedding API（input 为数组，一次请求多条）"""
         try:
-            import httpx
             import jwt
             import time
 
@@ -140,65 +242,192 @@ class EmbeddingService:
             }
 
             payload = {
-                "input": text,
+                "input": texts,
                 "model": config["model"]
             }
 
             url = "https://open.bigmodel.cn/api/paas/v4/embeddings"
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                result = response.json()
+            response = await get_embedding_http_client().post(url, headers=headers, json=payload)
+            response.raise_for_status()
+            result = response.json()
 
-                return result["data"][0]["embedding"]
+            data = sorted(result["data"], key=lambda item: item.get("index", 0))
+            return [item["embedding"] for item in data]
 
         except Exception as e:
             logger.error(f"智谱 embedding 调用失败: {str(e)}")
             raise
 
-    async def _embed_ollama(self, text: str, config: Dict[str, str]) -> List[float]:
-        """使用 Ollama 本地 embedding"""
+    async def _embed_ollama(self, texts: List[str], config: Dict[str, str]) -> List[List[float]]:
+        """使用 Ollama 本地 embedding（/api/embed 接口，input 为数组）"""
         try:
-            import httpx
-
-            url = f"{config.get('api_base', 'http://localhost:11434')}/api/embeddings"
+            url = f"{(config.get('api_base') or 'http://localhost:11434').rstrip('/')}/api/embed"
 
             payload = {
                 "model": config.get("model", "nomic-embed-text"),
-                "prompt": text
+                "input": texts
             }
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                result = response.json()
+            response = await get_embedding_http_client().post(url, json=payload)
+            response.raise_for_status()
+            result = response.json()
 
-                return result.get("embedding", [])
+            return result.get("embeddings", [])
 
         except Exception as e:
             logger.error(f"Ollama embedding 调用失败: {str(e)}")
             raise
 
-    async def embed_texts_batch(self, texts: List[str], tenant_id: str = DEFAULT_TENANT_ID) -> List[List[float]]:
+    @staticmethod
+    def _chunk_texts(texts: List[str]) -> List[List[int]]:
+        """按 token 预算和条数上限将文本切分为批次
+
+        Args:
+            texts: 输入文本列表
+
+        Returns:
+            每个批次包含的文本下标
+        """
+        chunks: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for i, text in enumerate(texts):
+            tokens = count_tokens(text)
+            if current and (
+                current_tokens + tokens > settings.EMBEDDING_BATCH_MAX_TOKENS
+                or len(current) >= settings.EMBEDDING_BATCH_MAX_ITEMS
+            ):
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def embed_texts_batch(
+        self,
+        texts: List[str],
+        tenant_id: str = DEFAULT_TENANT_ID,
+        config: Optional[Dict[str, str]] = None
+    ) -> List[Optional[List[float]]]:
         """
         批量将文本转换为向量
 
+        按 token 预算切分批次，每个批次一次请求，批次之间有限并发；
+        单个批次重试仍失败时，该批次对应位置为 None，不影响其他批次。
+
         Args:
             texts: 输入文本列表
             tenant_id: 租户ID
+            config: 指定的模型配置，为空时使用租户当前的 embedding 模型
 
         Returns:
-            向量列表
+            向量列表（与输入顺序一致，失败的位置为 None）
         """
-        # 限制并发数量
-        semaphore = asyncio.Semaphore(5)
+        if not texts:
+            return []
+
+        config = config or await self._get_embedding_config(tenant_id)
+        chunks = self._chunk_texts(texts)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        errors: List[str] = []
 
-        async def embed_with_semaphore(text: str):
+        # 限制并发批次数量
+        semaphore = asyncio.Semaphore(settings.EMBEDDING_BATCH_CONCURRENCY)
+
+        async def embed_chunk(indexes: List[int]):
             async with semaphore:
-                return await self.embed_text(text, tenant_id)
+                try:
+                    chunk_vectors = await self._embed_chunk([texts[i] for i in indexes], config)
+                except Exception as e:
+                    logger.error(f"Embedding 批次失败（{len(indexes)} 条）: {str(e)}")
+                    errors.append(str(e))
+                    return
+                for i, vector in zip(indexes, chunk_vectors):
+                    vectors[i] = vector
+
+        await asyncio.gather(*[embed_chunk(indexes) for indexes in chunks])
+        logger.info(f"批量 Embedding 完成: {len(texts)} 条, {len(chunks)} 个批次, 失败批次 {len(errors)} 个")
+        return vectors
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """网络错误、限流和服务端错误可重试，其余（如 401/400）直接失败"""
+    import httpx
+
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+# 共享 HTTP 客户端，复用连接
+_embedding_http_client = None
+
+
+def get_embedding_http_client():
+    """获取 embedding 请求共享的 httpx.AsyncClient"""
+    import httpx
+
+    global _embedding_http_client
+    if _embedding_http_client is None or _embedding_http_client.is_closed:
+        _embedding_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.EMBEDDING_REQUEST_TIMEOUT, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _embedding_http_client
+
+
+async def close_embedding_http_client():
+    """关闭共享 HTTP 客户端（应用关闭时调用）"""
+    global _embedding_http_client
+    if _embedding_http_client is not None:
+        await _embedding_http_client.aclose()
+        _embedding_http_client = None
+
+
+# 会话 info 中待同步到进程内向量索引的写入
+_PENDING_INDEX_KEY = "vector_index_pending"
+_INDEX_LISTENER_KEY = "vector_index_listening"
+
+
+def _apply_pending_index_updates(session):
+    """事务提交后把本事务写入的向量同步到进程内索引"""
+    from app.infrastructure.search.vector_index import get_vector_index_registry
+
+    pending = session.info.pop(_PENDING_INDEX_KEY, None)
+    if not pending:
+        return
+    registry = get_vector_index_registry()
+    for model, resume_id, vector in pending:
+        registry.remove(resume_id)
+        registry.upsert(model, resume_id, vector)
+
+
+def _discard_pending_index_updates(session):
+    """事务回滚时丢弃待同步的向量，避免索引中出现数据库里不存在的向量"""
+    session.info.pop(_PENDING_INDEX_KEY, None)
+
+
+def _defer_index_updates(db: AsyncSession, model: str, items: List[Tuple[Any, List[float]]]):
+    """登记待同步的向量，在调用方提交事务后再写入进程内索引"""
+    from sqlalchemy import event
 
-        return await asyncio.gather(*[embed_with_semaphore(t) for t in texts])
+    session = db.sync_session
+    if not session.info.get(_INDEX_LISTENER_KEY):
+        event.listen(session, "after_commit", _apply_pending_index_updates)
+        event.listen(session, "after_rollback", _discard_pending_index_updates)
+        session.info[_INDEX_LISTENER_KEY] = True
+    session.info.setdefault(_PENDING_INDEX_KEY, []).extend(
+        (model, str(resume_id), vector) for resume_id, vector in items
+    )
 
 
 # 简单的向量存储（基于 PostgreSQL，生产环境建议使用专门的向量数据库）
@@ -262,3 +491,116 @@ class VectorStoreService:
         results.sort(key=lambda x: x["similarity"], reverse=True)
 
         return results[:top_k]
+
+    @staticmethod
+    async def save_embedding(
+        db: AsyncSession,
+        resume_id: Any,
+        model: str,
+        vector: List[float]
+    ) -> bool:
+        """
+        保存简历向量（存在则覆盖），事务提交后同步到进程内向量索引
+
+        Args:
+            db: 数据库会话（由调用方提交）
+            resume_id: 简历ID
+            model: embedding 模型名称
+            vector: 向量
+
+        Returns:
+            是否写入（零向量不写入）
+        """
+        return await VectorStoreService.save_embeddings(db, model, [(resume_id, vector)]) == 1
+
+    @staticmethod
+    async def save_embeddings(
+        db: AsyncSession,
+        model: str,
+        items: List[Tuple[Any, List[float]]]
+    ) -> int:
+        """
+        批量保存简历向量（一条 INSERT ... ON CONFLICT 语句），事务提交后同步到进程内向量索引
+
+        Args:
+            db: 数据库会话（由调用方提交）
+            model: embedding 模型名称
+            items: (简历ID, 向量) 列表
+
+        Returns:
+            写入数量（零向量不写入）
+        """
+        from sqlalchemy import func
+        from sqlalchemy.dialects.postgresql import insert
+        from app.infrastructure.database.models import ResumeEmbedding
+        from app.infrastructure.search.vector_index import encode_vector
+
+        rows = []
+        accepted = []
+        for resume_id, vector in items:
+            blob = encode_vector(vector)
+            if blob is None:
+                logger.warning(f"简历 {resume_id} 的向量为零向量，跳过写入向量索引")
+                continue
+            rows.append({
+                "resume_id": resume_id,
+                "embedding_model": model,
+                "dimension": len(vector),
+                "vector": blob,
+            })
+            accepted.append((resume_id, vector))
+
+        if not rows:
+            return 0
+
+        stmt = insert(ResumeEmbedding).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResumeEmbedding.resume_id],
+            set_={
+                "embedding_model": stmt.excluded.embedding_model,
+                "dimension": stmt.excluded.dimension,
+                "vector": stmt.excluded.vector,
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+
+        # 回滚时数据库中没有这些向量，进程内索引也不能提前写入
+        _defer_index_updates(db, model, accepted)
+        return len(rows)
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        model: str,
+        query_vector: List[float],
+        top_k: int = 10,
+        threshold: float = 0.7,
+        allowed: Optional[Set[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        在向量索引中检索最相似的简历
+
+        Args:
+            db: 数据库会话
+            model: embedding 模型名称（只检索同一模型生成的向量）
+            query_vector: 查询向量
+            top_k: 返回前K个结果
+            threshold: 相似度阈值
+            allowed: 只在这些简历ID中检索（元数据预过滤），为空表示不限
+
+        Returns:
+            [{"resume_id": str, "similarity": float}]，按相似度降序
+        """
+        from app.infrastructure.search.vector_index import get_vector_index_registry
+
+        index = await get_vector_index_registry().get_index(db, model)
+        hits = index.search(query_vector, top_k=top_k, threshold=threshold, allowed=allowed)
+        return [{"resume_id": resume_id, "similarity": similarity} for resume_id, similarity in hits]
+
+    @staticmethod
+    def remove_embedding(resume_id: Any):
+        """从进程内向量索引中移除简历（数据库行随简历级联删除）"""
+        from app.infrastructure.search.vector_index import get_vector_index_registry
+
+        get_vector_index_registry().remove(str(resume_id))
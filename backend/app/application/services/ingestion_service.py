@@ -0,0 +1,171 @@
+"""
+Resume Ingestion Service
+简历异步入库流水线：上传后立即返回，后台工作协程从队列取任务，进程池解析、批量向量化，并推送状态变化
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, select, update
+
+from app.core.config import settings
+from app.infrastructure.database.models import Resume
+from app.infrastructure.queue.ingestion_queue import get_ingestion_queue
+from app.infrastructure.queue.status_events import get_status_broadcaster
+
+logger = logging.getLogger(__name__)
+
+
+def status_event(resume: Resume, error: Optional[str] = None) -> Dict[str, Any]:
+    """构造简历状态事件"""
+    event = {
+        "type": "resume_status",
+        "resume_id": str(resume.id),
+        "filename": resume.filename,
+        "status": resume.status,
+        "embedding_status": resume.embedding_status,
+        "candidate_name": resume.candidate_name,
+    }
+    if error:
+        event["error"] = error
+    return event
+
+
+class IngestionService:
+    """简历入库流水线
+
+    状态流转：uploaded → parsing → completed / failed。
+    数据库中的状态是唯一事实来源：工作协程通过条件更新 (uploaded → parsing) 认领任务，
+    重复投递或多进程消费不会重复处理；进程退出时卡在 parsing 的简历在启动时重新入队。
+    """
+
+    def __init__(self):
+        self._workers: List[asyncio.Task] = []
+
+    async def enqueue(self, resume: Resume):
+        """将简历加入解析队列并推送 uploaded 状态
+
+        Args:
+            resume: 状态为 uploaded 的简历
+        """
+        await get_ingestion_queue().put(str(resume.id))
+        await get_status_broadcaster().publish(resume.uploaded_by, status_event(resume))
+        logger.info(f"简历已加入解析队列: {resume.id}")
+
+    async def requeue(self, db, resume: Resume) -> Resume:
+        """重新解析一份简历（解析中的简历不重复入队）
+
+        Args:
+            db: 数据库会话
+            resume: 简历记录
+
+        Returns:
+            更新后的简历记录
+        """
+        if resume.status != "parsing":
+            resume.status = "uploaded"
+            await db.commit()
+            await self.enqueue(resume)
+        return resume
+
+    async def _claim(self, db, resume_id: str) -> Optional[Resume]:
+        """认领解析任务：只有仍处于 uploaded 状态的简历会被处理"""
+        result = await db.execute(
+            update(Resume)
+            .where(and_(Resume.id == resume_id, Resume.status == "uploaded"))
+            .values(status="parsing", updated_at=datetime.now(timezone.utc))
+            .returning(Resume.id)
+        )
+        claimed = result.scalar_one_or_none()
+        await db.commit()
+        if claimed is None:
+            return None
+
+        result = await db.execute(select(Resume).where(Resume.id == claimed))
+        return result.scalar_one_or_none()
+
+    async def process(self, resume_id: str):
+        """处理一个解析任务"""
+        from app.application.services.resume_upload_service import ResumeUploadService
+        from app.infrastructure.database.database import AsyncSessionLocal
+
+        broadcaster = get_status_broadcaster()
+        async with AsyncSessionLocal() as db:
+            resume = await self._claim(db, resume_id)
+            if resume is None:
+                logger.debug(f"简历已被处理或不存在，跳过: {resume_id}")
+                return
+
+            await broadcaster.publish(resume.uploaded_by, status_event(resume))
+            try:
+                resume = await ResumeUploadService(db).process_resume(resume)
+                await broadcaster.publish(resume.uploaded_by, status_event(resume))
+            except Exception as e:
+                await broadcaster.publish(resume.uploaded_by, status_event(resume, error=str(e)))
+
+    async def _worker(self, index: int):
+        """工作协程：循环从队列取任务"""
+        queue = get_ingestion_queue()
+        while True:
+            try:
+                resume_id = await queue.get(timeout=5.0)
+                if resume_id:
+                    await self.process(resume_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"解析工作协程 {index} 处理失败: {str(e)}", exc_info=True)
+                await asyncio.sleep(1.0)
+
+    async def recover(self):
+        """重新入队未完成的任务：待解析的简历，以及长时间卡在 parsing 的简历（处理进程已退出）"""
+        from app.infrastructure.database.database import AsyncSessionLocal
+
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.INGESTION_STALE_AFTER)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Resume)
+                .where(and_(Resume.status == "parsing", Resume.updated_at < stale_before))
+                .values(status="uploaded")
+            )
+            await db.commit()
+
+            result = await db.execute(select(Resume.id).where(Resume.status == "uploaded"))
+            resume_ids = [str(row[0]) for row in result.all()]
+
+        queue = get_ingestion_queue()
+        for resume_id in resume_ids:
+            await queue.put(resume_id)
+        if resume_ids:
+            logger.info(f"已重新入队 {len(resume_ids)} 份待解析简历")
+
+    def start(self):
+        """启动工作协程"""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i))
+            for i in range(settings.INGESTION_CONCURRENCY)
+        ]
+        logger.info(f"简历解析工作协程已启动: {len(self._workers)} 个")
+
+    async def stop(self):
+        """停止工作协程"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+# 全局单例
+_ingestion_service: Optional[IngestionService] = None
+
+
+def get_ingestion_service() -> IngestionService:
+    """获取简历入库流水线单例"""
+    global _ingestion_service
+    if _ingestion_service is None:
+        _ingestion_service = IngestionService()
+    return _ingestion_service
@@ -14,6 +14,12 @@ from app.infrastructure.database.llm_models import LLM, LLMFactory, TenantLLM, T
 logger = logging.getLogger(__name__)
 
 
+def _invalidate_llm_clients(tenant_id: str, llm_name: Optional[str] = None):
+    """租户模型配置变更后，失效客户端池中对应的 LLM 实例"""
+    from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
+    get_llm_client_pool().invalidate(tenant_id, llm_name)
+
+
 class LLMFactoryService:
     """LLM 厂商服务"""
 
@@ -301,6 +307,7 @@ class TenantLLMService:
                 existing.max_tokens = max_tokens
             await db.commit()
             await db.refresh(existing)
+            _invalidate_llm_clients(tenant_id, llm_name)
             return existing
         else:
             # 新建
@@ -316,6 +323,7 @@ class TenantLLMService:
             db.add(tenant_llm)
             await db.commit()
             await db.refresh(tenant_llm)
+            _invalidate_llm_clients(tenant_id, llm_name)
             return tenant_llm
 
     @staticmethod
@@ -339,6 +347,7 @@ class TenantLLMService:
         if tenant_llm:
             await db.delete(tenant_llm)
             await db.commit()
+            _invalidate_llm_clients(tenant_id, llm_name)
             return True
         return False
 
@@ -364,6 +373,7 @@ class TenantLLMService:
         if tenant_llm:
             tenant_llm.status = status
             await db.commit()
+            _invalidate_llm_clients(tenant_id, llm_name)
             return True
         return False
 
@@ -389,6 +399,7 @@ class TenantLLMService:
             count += 1
 
         await db.commit()
+        _invalidate_llm_clients(tenant_id)
         return count
 
     @staticmethod
@@ -0,0 +1,178 @@
+"""
+Tenant Model Config Cache
+租户模型配置缓存：缓存 Tenant.llm_id 与 TenantLLM 配置，避免每个智能体重复查询
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """租户模型配置快照
+
+    与 TenantLLM 的字段同名，可直接替换 TenantLLMService.get_api_key 的返回值使用；
+    不持有 ORM 对象，可安全地跨 Session 共享。
+    """
+    llm_name: str
+    llm_factory: str
+    model_type: Optional[str]
+    api_key: Optional[str]
+    api_base: Optional[str]
+    max_tokens: Optional[int]
+    status: Optional[str]
+
+
+class TenantModelConfigCache:
+    """租户模型配置的进程级 TTL 缓存
+
+    - 同一个键的并发未命中只查询一次（单飞），协调器并行启动的 7 个专家共享一次查询结果，
+      也避免了在同一个 AsyncSession 上并发执行查询
+    - 未查到的结果同样缓存，直到 TTL 过期或被显式失效
+    """
+
+    def __init__(self, ttl: int = 300):
+        """
+        Args:
+            ttl: 缓存有效期（秒）
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._locks: Dict[Tuple, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Tuple) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    async def _get_or_load(self, key: Tuple, loader) -> Any:
+        found, value = self._get(key)
+        if found:
+            self.hits += 1
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # 等待锁期间可能已由其他协程加载
+            found, value = self._get(key)
+            if found:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            value = await loader()
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    async def get_tenant_llm_id(self, db: AsyncSession, tenant_id: str) -> Optional[str]:
+        """获取租户的全局聊天模型 (Tenant.llm_id)
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+
+        Returns:
+            模型ID字符串 (格式: "模型名@厂商") 或 None
+        """
+        async def load():
+            from uuid import UUID
+            from app.infrastructure.database.llm_models import Tenant
+
+            try:
+                tenant_uuid = UUID(tenant_id) if isinstance(tenant_id, str) else tenant_id
+            except ValueError:
+                logger.warning(f"无效的租户ID格式: {tenant_id}")
+                return None
+
+            result = await db.execute(select(Tenant.llm_id).where(Tenant.id == tenant_uuid))
+            return result.scalar_one_or_none()
+
+        return await self._get_or_load(("llm_id", str(tenant_id)), load)
+
+    async def get_model_config(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        model_name: str
+    ) -> Optional[ModelConfig]:
+        """获取租户某个模型的 API 配置
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+            model_name: 模型ID (格式: "模型名@厂商" 或 "模型名")
+
+        Returns:
+            模型配置快照，未配置时返回 None
+        """
+        async def load():
+            from app.application.services.llm_service import TenantLLMService
+
+            tenant_llm = await TenantLLMService.get_api_key(db, tenant_id, model_name)
+            if not tenant_llm:
+                return None
+            return ModelConfig(
+                llm_name=tenant_llm.llm_name,
+                llm_factory=tenant_llm.llm_factory,
+                model_type=tenant_llm.model_type,
+                api_key=tenant_llm.api_key,
+                api_base=tenant_llm.api_base,
+                max_tokens=tenant_llm.max_tokens,
+                status=tenant_llm.status,
+            )
+
+        return await self._get_or_load(("model", str(tenant_id), model_name), load)
+
+    def invalidate(self, tenant_id: str) -> int:
+        """失效租户的全部缓存项
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            被移除的缓存项数量
+        """
+        tenant_id = str(tenant_id)
+        keys = [key for key in self._entries if key[1] == tenant_id]
+        for key in keys:
+            del self._entries[key]
+            self._locks.pop(key, None)
+        if keys:
+            logger.info(f"租户模型配置缓存失效: tenant={tenant_id}, 数量={len(keys)}")
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# 全局单例
+_model_config_cache: Optional[TenantModelConfigCache] = None
+
+
+def get_model_config_cache() -> TenantModelConfigCache:
+    """获取租户模型配置缓存单例"""
+    global _model_config_cache
+    if _model_config_cache is None:
+        _model_config_cache = TenantModelConfigCache(ttl=settings.MODEL_CONFIG_CACHE_TTL)
+    return _model_config_cache
@@ -0,0 +1,149 @@
+"""
+Prompt Budget
+按模型的 token 预算组装提示词：输出预留取租户模型的 max_tokens，其余为输入预算，
+超出预算时按优先级裁剪（先裁剪简历等可截断内容、丢弃较早的历史消息，系统提示词与指令完整保留），
+避免请求在模型服务端因超长而失败
+"""
+
+import logging
+from typing import Any, Callable, List, Optional
+
+from app.core.config import settings
+from app.infrastructure.external_services.tokenizer import (
+    TRUNCATION_MARK,
+    count_tokens,
+    tail_tokens,
+    truncate_tokens,
+)
+
+logger = logging.getLogger(__name__)
+
+# 每条对话消息的格式开销（角色标记等）
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def context_window(model: Optional[str]) -> int:
+    """模型的上下文窗口：PROMPT_CONTEXT_WINDOW_OVERRIDES 中精确匹配或最长前缀匹配，否则为默认值"""
+    overrides = settings.PROMPT_CONTEXT_WINDOW_OVERRIDES
+    if model:
+        if model in overrides:
+            return overrides[model]
+        prefixes = [prefix for prefix in overrides if model.startswith(prefix)]
+        if prefixes:
+            return overrides[max(prefixes, key=len)]
+    return settings.PROMPT_CONTEXT_WINDOW
+
+
+class PromptBudget:
+    """一次LLM调用的 token 预算
+
+    输入预算 = 上下文窗口 - 输出预留 - 安全余量；输出预留取模型的 max_tokens，最多占窗口的一半
+    """
+
+    def __init__(self, model: Optional[str] = None, max_output_tokens: Optional[int] = None):
+        """初始化预算
+
+        Args:
+            model: 模型名
+            max_output_tokens: 输出预留（租户模型配置的 max_tokens），为空时使用 DEFAULT_MAX_TOKENS
+        """
+        self.model = model
+        self.context_window = context_window(model)
+        self.output_tokens = min(max_output_tokens or settings.DEFAULT_MAX_TOKENS, self.context_window // 2)
+        self.input_tokens = max(self.context_window - self.output_tokens - settings.PROMPT_SAFETY_MARGIN, 0)
+
+    @classmethod
+    def for_llm(cls, llm: Any) -> "PromptBudget":
+        """按 ChatOpenAI 实例的模型名和 max_tokens 创建预算"""
+        return cls(getattr(llm, "model_name", None), getattr(llm, "max_tokens", None))
+
+    def count(self, text: str) -> int:
+        """按该模型计算 token 数"""
+        return count_tokens(text, self.model)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """保留开头不超过 max_tokens 个 token 的部分"""
+        return truncate_tokens(text, max_tokens, self.model)
+
+    def fit_text(self, build_prompt: Callable[[str], str], text: str) -> str:
+        """组装“固定模板 + 可截断文本”的提示词
+
+        模板和指令完整保留，超出输入预算的部分从可截断文本的末尾裁掉
+        （分段后的简历按相关度排列段落，靠后的段落先被裁掉）。
+
+        Args:
+            build_prompt: 由可截断文本生成完整提示词的函数
+            text: 可截断文本（如简历内容）
+
+        Returns:
+            不超过输入预算的提示词（模板本身已超出预算时返回去掉可截断文本的提示词）
+        """
+        prompt = build_prompt(text)
+        overflow = self.count(prompt) - self.input_tokens
+        if overflow <= 0:
+            return prompt
+
+        keep = max(self.count(text) - overflow, 0)
+        logger.warning(f"提示词超出输入预算 {overflow} tokens（模型 {self.model}，预算 {self.input_tokens}），截断简历内容")
+        return build_prompt(self.truncate(text, keep))
+
+    def fit_prompt(self, prompt: str) -> str:
+        """未按 fit_text 组装的提示词的最后防线：超出预算时保留开头和结尾，裁掉中间部分
+
+        提示词开头通常是角色设定，结尾是输出要求，中间是简历与分析数据。
+        """
+        tokens = self.count(prompt)
+        if tokens <= self.input_tokens:
+            return prompt
+
+        logger.warning(f"提示词超出输入预算 {tokens - self.input_tokens} tokens（模型 {self.model}），裁掉中间部分")
+        mark = TRUNCATION_MARK + "\n"
+        tail = tail_tokens(prompt, self.input_tokens // 4, self.model)
+        head_budget = self.input_tokens - self.count(tail) - self.count(mark)
+        head = truncate_tokens(prompt, max(head_budget, 0), self.model, mark="")
+        return head + mark + tail
+
+    def fit_messages(self, messages: List[Any]) -> List[Any]:
+        """裁剪 LangChain 消息列表使其不超过输入预算
+
+        优先级：系统消息与最后一条消息完整保留；先从最早的历史消息开始丢弃，
+        仍超出时截断最后一条消息（附带的简历上下文在末尾，先被截掉）。
+
+        Args:
+            messages: SystemMessage / HumanMessage / AIMessage 列表
+
+        Returns:
+            裁剪后的消息列表（未超出预算时原样返回）
+        """
+        sizes = [self.count(_content(message)) + MESSAGE_OVERHEAD_TOKENS for message in messages]
+        total = sum(sizes)
+        if total <= self.input_tokens or not messages:
+            return messages
+
+        system_count = 0
+        while system_count < len(messages) - 1 and getattr(messages[system_count], "type", None) == "system":
+            system_count += 1
+
+        # 丢弃最早的历史消息
+        history_end = len(messages) - 1
+        drop_until = system_count
+        while total > self.input_tokens and drop_until < history_end:
+            total -= sizes[drop_until]
+            drop_until += 1
+        fitted = messages[:system_count] + messages[drop_until:]
+        if drop_until > system_count:
+            logger.warning(f"对话超出输入预算，丢弃最早的 {drop_until - system_count} 条历史消息（模型 {self.model}）")
+
+        # 截断最后一条消息
+        if total > self.input_tokens:
+            last = fitted[-1]
+            keep = max(sizes[-1] - MESSAGE_OVERHEAD_TOKENS - (total - self.input_tokens), 0)
+            logger.warning(f"最后一条消息超出输入预算，截断至 {keep} tokens（模型 {self.model}）")
+            fitted[-1] = type(last)(content=self.truncate(_content(last), keep))
+
+        return fitted
+
+
+def _content(message: Any) -> str:
+    content = getattr(message, "content", message)
+    return content if isinstance(content, str) else str(content)
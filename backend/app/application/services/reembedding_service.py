@@ -0,0 +1,343 @@
+"""
+Re-embedding Service
+租户切换 embedding 模型后的后台重建向量任务：按主键游标分批、批量生成与写入、可断点续跑
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.database.models import Resume, ResumeEmbedding, SystemConfig
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+STATUS_FAILED = "failed"
+STATUS_COMPLETED = "completed"
+
+# 未完成的任务：旧模型的向量仍然存在，检索需要双读
+UNFINISHED_STATUSES = (STATUS_RUNNING, STATUS_PAUSED, STATUS_FAILED)
+
+
+def _job_key(tenant_id: str) -> str:
+    return f"reembed_job:{tenant_id}"
+
+
+def _pending_condition(tenant_id: str, target_model: str):
+    """需要重建向量的简历：属于该租户、已完成解析，且没有目标模型的向量"""
+    return and_(
+        Resume.uploaded_by == tenant_id,
+        Resume.status == "completed",
+        Resume.extracted_text.isnot(None),
+        or_(ResumeEmbedding.id.is_(None), ResumeEmbedding.embedding_model != target_model),
+    )
+
+
+class ReembeddingService:
+    """向量重建任务管理
+
+    任务状态保存在 system_config 表（config_key = reembed_job:{租户ID}），包含游标位置与进度，
+    进程重启或任务暂停后从游标处继续。同一租户的任务通过 Postgres advisory lock 保证只有一个进程在执行。
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def get_status(self, db: AsyncSession, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """获取租户的任务状态
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+
+        Returns:
+            任务状态，没有任务时返回 None
+        """
+        result = await db.execute(
+            select(SystemConfig.config_value).where(SystemConfig.config_key == _job_key(tenant_id))
+        )
+        return result.scalar_one_or_none()
+
+    async def get_dual_read_models(self, db: AsyncSession, tenant_id: str) -> List[str]:
+        """任务未完成时，检索还需要覆盖的旧模型
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+
+        Returns:
+            旧模型名称列表，没有未完成的迁移时为空
+        """
+        state = await self.get_status(db, tenant_id)
+        if not state:
+            return []
+        # 已完成但有失败的简历时，这些简历仍只有旧模型的向量
+        if state.get("status") not in UNFINISHED_STATUSES and not state.get("failed"):
+            return []
+        return list(state.get("source_models") or [])
+
+    async def start(self, db: AsyncSession, tenant_id: str) -> Dict[str, Any]:
+        """启动（或继续）租户的向量重建任务
+
+        目标模型为租户当前的 embedding 模型。已有同一目标的未完成任务时从游标处继续，
+        目标变化时重新开始。
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+
+        Returns:
+            任务状态
+        """
+        from app.application.services.embedding_service import EmbeddingService
+
+        tenant_id = str(tenant_id)
+        config = await EmbeddingService(db)._get_embedding_config(tenant_id)
+        target_model = config["model"]
+
+        state = await self.get_status(db, tenant_id)
+        task = self._tasks.get(tenant_id)
+
+        if state and state.get("target_model") == target_model and state.get("status") in UNFINISHED_STATUSES:
+            if task and not task.done():
+                return state
+            state = {**state, "status": STATUS_RUNNING, "error": None, "updated_at": datetime.utcnow().isoformat()}
+        else:
+            # 目标模型变化：停止旧任务，从头开始
+            await self._stop_task(tenant_id)
+
+            base = (
+                select(func.count(Resume.id))
+                .select_from(Resume)
+                .outerjoin(ResumeEmbedding, ResumeEmbedding.resume_id == Resume.id)
+                .where(_pending_condition(tenant_id, target_model))
+            )
+            total = await db.scalar(base)
+
+            source_result = await db.execute(
+                select(ResumeEmbedding.embedding_model)
+                .join(Resume, Resume.id == ResumeEmbedding.resume_id)
+                .where(and_(Resume.uploaded_by == tenant_id, ResumeEmbedding.embedding_model != target_model))
+                .distinct()
+            )
+            now = datetime.utcnow().isoformat()
+            state = {
+                "status": STATUS_RUNNING if total else STATUS_COMPLETED,
+                "target_model": target_model,
+                "source_models": [row[0] for row in source_result.all()],
+                "last_id": None,
+                "total": total or 0,
+                "processed": 0,
+                "failed": 0,
+                "error": None,
+                "started_at": now,
+                "updated_at": now,
+                "finished_at": None if total else now,
+            }
+
+        await self._save_state(db, tenant_id, state)
+        await db.commit()
+
+        if state["status"] == STATUS_RUNNING:
+            self._spawn(tenant_id)
+            logger.info(f"向量重建任务已启动: tenant={tenant_id}, 目标模型={target_model}, 待处理={state['total']}")
+        return state
+
+    async def cancel(self, db: AsyncSession, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """暂停租户的向量重建任务（可通过 start 继续）
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+
+        Returns:
+            任务状态，没有任务时返回 None
+        """
+        tenant_id = str(tenant_id)
+        await self._stop_task(tenant_id)
+
+        state = await self.get_status(db, tenant_id)
+        if state and state.get("status") == STATUS_RUNNING:
+            state = {**state, "status": STATUS_PAUSED, "updated_at": datetime.utcnow().isoformat()}
+            await self._save_state(db, tenant_id, state)
+            await db.commit()
+        return state
+
+    async def resume_interrupted(self):
+        """应用启动时继续因进程退出而中断的任务"""
+        from app.infrastructure.database.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(SystemConfig.config_key, SystemConfig.config_value)
+                .where(SystemConfig.config_key.like("reembed_job:%"))
+            )
+            for key, state in result.all():
+                if state and state.get("status") == STATUS_RUNNING:
+                    tenant_id = key.split(":", 1)[1]
+                    logger.info(f"继续中断的向量重建任务: tenant={tenant_id}")
+                    self._spawn(tenant_id)
+
+    async def _stop_task(self, tenant_id: str):
+        task = self._tasks.get(tenant_id)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def _spawn(self, tenant_id: str):
+        task = self._tasks.get(tenant_id)
+        if task and not task.done():
+            return
+        self._tasks[tenant_id] = asyncio.create_task(self._run(tenant_id))
+
+    @staticmethod
+    async def _save_state(db: AsyncSession, tenant_id: str, state: Dict[str, Any]):
+        result = await db.execute(select(SystemConfig).where(SystemConfig.config_key == _job_key(tenant_id)))
+        row = result.scalar_one_or_none()
+        if row is None:
+            db.add(SystemConfig(
+                config_key=_job_key(tenant_id),
+                config_value=state,
+                description="embedding 模型切换后的向量重建任务",
+            ))
+        else:
+            # 整体赋值，JSON 列才会被标记为已修改
+            row.config_value = dict(state)
+
+    async def _run(self, tenant_id: str):
+        """执行任务主循环"""
+        from app.infrastructure.database.database import AsyncSessionLocal, engine
+
+        # advisory lock 绑定在连接上，任务执行期间一直持有
+        async with engine.connect() as lock_conn:
+            locked = await lock_conn.scalar(
+                text("SELECT pg_try_advisory_lock(hashtext(:key))"), {"key": _job_key(tenant_id)}
+            )
+            if not locked:
+                logger.info(f"向量重建任务已在其他进程执行: tenant={tenant_id}")
+                return
+
+            try:
+                while True:
+                    async with AsyncSessionLocal() as db:
+                        state = await self.get_status(db, tenant_id)
+                        if not state or state.get("status") != STATUS_RUNNING:
+                            return
+
+                        done = await self._run_batch(db, tenant_id, state)
+                        if done:
+                            logger.info(
+                                f"向量重建任务完成: tenant={tenant_id}, 处理={state['processed']}, 失败={state['failed']}"
+                            )
+                            return
+
+                    # 节流：给在线请求让出 embedding 配额和数据库连接
+                    await asyncio.sleep(settings.EMBEDDING_REINDEX_THROTTLE)
+
+            except asyncio.CancelledError:
+                logger.info(f"向量重建任务已暂停: tenant={tenant_id}")
+                raise
+            except Exception as e:
+                logger.error(f"向量重建任务失败: tenant={tenant_id}, 错误: {str(e)}", exc_info=True)
+                async with AsyncSessionLocal() as db:
+                    state = await self.get_status(db, tenant_id) or {}
+                    state = {**state, "status": STATUS_FAILED, "error": str(e), "updated_at": datetime.utcnow().isoformat()}
+                    await self._save_state(db, tenant_id, state)
+                    await db.commit()
+            finally:
+                await lock_conn.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": _job_key(tenant_id)}
+                )
+                self._tasks.pop(tenant_id, None)
+
+    async def _run_batch(self, db: AsyncSession, tenant_id: str, state: Dict[str, Any]) -> bool:
+        """处理一个批次，返回任务是否已完成（state 原地更新）"""
+        from uuid import UUID
+        from app.application.services.embedding_service import EmbeddingService, VectorStoreService
+        from app.application.services.resume_upload_service import ResumeUploadService
+
+        target_model = state["target_model"]
+        embedding_service = EmbeddingService(db)
+        config = await embedding_service.get_model_config(tenant_id, target_model)
+        if config is None:
+            raise ValueError(f"租户未配置 embedding 模型: {target_model}")
+
+        query = (
+            select(
+                Resume.id,
+                Resume.candidate_name,
+                Resume.candidate_email,
+                Resume.candidate_phone,
+                Resume.candidate_location,
+                Resume.extracted_text,
+            )
+            .outerjoin(ResumeEmbedding, ResumeEmbedding.resume_id == Resume.id)
+            .where(_pending_condition(tenant_id, target_model))
+            .order_by(Resume.id)
+            .limit(settings.EMBEDDING_REINDEX_BATCH_SIZE)
+        )
+        if state.get("last_id"):
+            query = query.where(Resume.id > UUID(state["last_id"]))
+
+        rows = (await db.execute(query)).all()
+        now = datetime.utcnow().isoformat()
+
+        if not rows:
+            state.update({"status": STATUS_COMPLETED, "updated_at": now, "finished_at": now})
+            await self._save_state(db, tenant_id, state)
+            await db.commit()
+            return True
+
+        texts = [ResumeUploadService._prepare_text_for_embedding(row) for row in rows]
+        vectors = await embedding_service.embed_texts_batch(texts, tenant_id, config=config)
+
+        # None 表示所在批次 embedding 失败，保留旧向量，计入失败数
+        items = [(row.id, vector) for row, vector in zip(rows, vectors) if vector]
+        saved = await VectorStoreService.save_embeddings(db, target_model, items)
+        if items:
+            await db.execute(
+                update(Resume)
+                .where(Resume.id.in_([resume_id for resume_id, _ in items]))
+                .values(
+                    embedding_model=target_model,
+                    embedding_status="embedded",
+                    embedding_error=None,
+                    embedding_next_retry_at=None,
+                )
+            )
+
+        state.update({
+            "last_id": str(rows[-1].id),
+            "processed": state.get("processed", 0) + saved,
+            "failed": state.get("failed", 0) + len(rows) - saved,
+            "updated_at": now,
+        })
+        await self._save_state(db, tenant_id, state)
+        await db.commit()
+
+        logger.info(
+            f"向量重建进度: tenant={tenant_id}, {state['processed'] + state['failed']}/{state['total']}"
+        )
+        return False
+
+
+# 全局单例
+_reembedding_service: Optional[ReembeddingService] = None
+
+
+def get_reembedding_service() -> ReembeddingService:
+    """获取向量重建服务单例"""
+    global _reembedding_service
+    if _reembedding_service is None:
+        _reembedding_service = ReembeddingService()
+    return _reembedding_service
@@ -0,0 +1,30 @@
+"""
+Resume Content Helpers
+简历解析内容的读取工具：构造提示词时只使用业务字段，不带向量等内部数据
+"""
+
+from typing import Any, Dict, Optional
+
+# parsed_content 中不属于简历内容的内部字段（历史数据中的向量字符串、处理状态、
+# 与 extracted_text 内容重复的段落切分结果等）
+INTERNAL_PARSED_KEYS = frozenset({
+    "embedding",
+    "embedding_error",
+    "parsed_at",
+    "error",
+    "sections",
+})
+
+
+def lean_parsed_content(parsed_content: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """返回去掉内部字段后的解析内容副本，所有提示词构造都应通过此函数读取 parsed_content
+
+    Args:
+        parsed_content: Resume.parsed_content
+
+    Returns:
+        只包含简历内容字段的新字典（原对象不会被修改）
+    """
+    if not parsed_content:
+        return {}
+    return {key: value for key, value in parsed_content.items() if key not in INTERNAL_PARSED_KEYS}
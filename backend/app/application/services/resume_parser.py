@@ -3,11 +3,17 @@
 从 PDF 和 Word 文档中提取文本内容
 """
 
+import asyncio
 import logging
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from app.application.services.resume_sections import segment_resume
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +28,27 @@ class ResumeParser:
         """
         解析简历文件
 
+        PyPDF2 / python-docx 的解析是 CPU 密集的同步调用，放到进程池执行，不阻塞事件循环
+
+        Args:
+            file_path: 文件路径
+            filename: 文件名
+
+        Returns:
+            解析结果字典
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(get_parse_executor(), parse_resume_file, file_path, filename)
+        except BrokenProcessPool:
+            # 子进程异常退出（如解析畸形文件时崩溃），丢弃进程池，下次调用重建
+            shutdown_parse_executor(wait=False)
+            raise
+
+    def parse_file_sync(self, file_path: str, filename: str) -> Dict[str, Any]:
+        """
+        同步解析简历文件（在进程池的工作进程中执行）
+
         Args:
             file_path: 文件路径
             filename: 文件名
@@ -36,11 +63,11 @@ class ResumeParser:
 
         # 根据文件类型选择解析方法
         if file_ext == '.pdf':
-            text = await self._parse_pdf(file_path)
+            text = self._parse_pdf(file_path)
         elif file_ext in ['.doc', '.docx']:
-            text = await self._parse_word(file_path)
+            text = self._parse_word(file_path)
         elif file_ext == '.txt':
-            text = await self._parse_txt(file_path)
+            text = self._parse_txt(file_path)
         else:
             raise ValueError(f"不支持的文件格式: {file_ext}")
 
@@ -49,13 +76,14 @@ class ResumeParser:
 
         return {
             "extracted_text": text,
+            "sections": segment_resume(text),
             "candidate_name": candidate_info.get("name"),
             "candidate_email": candidate_info.get("email"),
             "candidate_phone": candidate_info.get("phone"),
             "candidate_location": candidate_info.get("location"),
         }
 
-    async def _parse_pdf(self, file_path: str) -> str:
+    def _parse_pdf(self, file_path: str) -> str:
         """解析 PDF 文件"""
         try:
             import PyPDF2
@@ -87,7 +115,7 @@ class ResumeParser:
             logger.error(f"PDF 解析失败: {str(e)}")
             return ""
 
-    async def _parse_word(self, file_path: str) -> str:
+    def _parse_word(self, file_path: str) -> str:
         """解析 Word 文件"""
         try:
             from docx import Document
@@ -106,7 +134,7 @@ class ResumeParser:
             logger.error(f"Word 文档解析失败: {str(e)}")
             return ""
 
-    async def _parse_txt(self, file_path: str) -> str:
+    def _parse_txt(self, file_path: str) -> str:
         """解析纯文本文件"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -123,12 +151,18 @@ class ResumeParser:
                 return ""
 
     def _clean_text(self, text: str) -> str:
-        """清理提取的文本"""
+        """清理提取的文本
+
+        保留换行（段落切分依赖标题所在的行），只合并行内空白和连续空行
+        """
         if not text:
             return ""
 
-        # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
+        # 统一换行符，合并行内多余的空白字符
+        text = re.sub(r'\r\n?', '\n', text)
+        text = re.sub(r'[^\S\n]+', ' ', text)
+        text = re.sub(r' *\n *', '\n', text)
+        text = re.sub(r'\n{3,}', '\n\n', text)
 
         # 移除特殊字符
         text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', text)
@@ -235,3 +269,34 @@ def get_resume_parser() -> ResumeParser:
     if _resume_parser is None:
         _resume_parser = ResumeParser()
     return _resume_parser
+
+
+def parse_resume_file(file_path: str, filename: str) -> Dict[str, Any]:
+    """进程池任务入口：模块级函数，可被 pickle 传递到工作进程"""
+    return get_resume_parser().parse_file_sync(file_path, filename)
+
+
+# 解析进程池
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_executor() -> ProcessPoolExecutor:
+    """获取简历解析进程池"""
+    global _parse_executor
+    if _parse_executor is None:
+        from app.core.config import settings
+
+        # spawn 启动的工作进程不继承事件循环和数据库连接
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=settings.INGESTION_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_executor
+
+
+def shutdown_parse_executor(wait: bool = True):
+    """关闭简历解析进程池（应用关闭时调用）"""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=wait, cancel_futures=True)
+        _parse_executor = None
@@ -0,0 +1,188 @@
+"""
+Resume Section Segmenter
+简历分段：按“教育经历 / 工作经历 / 项目经历 / 专业技能 / 自我评价”等标题把简历文本切分为段落，
+分析时每个专家只接收与其维度相关的段落
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# 段落键
+SECTION_BASIC = "basic"  # 第一个标题之前的内容（姓名、联系方式、求职意向等）
+SECTION_EDUCATION = "education"
+SECTION_EXPERIENCE = "experience"
+SECTION_PROJECTS = "projects"
+SECTION_SKILLS = "skills"
+SECTION_SELF_EVALUATION = "self_evaluation"
+SECTION_OTHER = "other"  # 获奖、证书、语言、兴趣爱好等
+
+SECTION_TITLES = {
+    SECTION_BASIC: "基本信息",
+    SECTION_EDUCATION: "教育经历",
+    SECTION_EXPERIENCE: "工作经历",
+    SECTION_PROJECTS: "项目经历",
+    SECTION_SKILLS: "专业技能",
+    SECTION_SELF_EVALUATION: "自我评价",
+    SECTION_OTHER: "其他",
+}
+
+# 标题关键词（去掉空白和标点、转为小写后比较）
+_HEADINGS = {
+    SECTION_EDUCATION: (
+        "教育背景", "教育经历", "教育经验", "学历背景", "学习经历", "教育",
+        "education", "educationbackground", "academicbackground",
+    ),
+    SECTION_EXPERIENCE: (
+        "工作经历", "工作经验", "工作履历", "实习经历", "实习经验", "职业经历", "任职经历", "工作背景",
+        "experience", "workexperience", "professionalexperience", "employmenthistory", "internship", "internships",
+    ),
+    SECTION_PROJECTS: (
+        "项目经历", "项目经验", "项目背景", "主要项目", "项目",
+        "projects", "projectexperience", "personalprojects",
+    ),
+    SECTION_SKILLS: (
+        "专业技能", "技能特长", "个人技能", "技术技能", "技能清单", "技术栈", "掌握技能", "职业技能", "技能",
+        "skills", "technicalskills", "skillset", "techstack",
+    ),
+    SECTION_SELF_EVALUATION: (
+        "自我评价", "个人评价", "自我描述", "个人总结", "自我介绍", "个人优势", "个人简介",
+        "summary", "aboutme", "selfevaluation", "profile",
+    ),
+    SECTION_OTHER: (
+        "获奖情况", "获奖经历", "荣誉奖项", "荣誉证书", "证书", "资格证书", "语言能力", "兴趣爱好", "校园经历", "社会实践",
+        "awards", "honors", "certificates", "certifications", "languages", "interests", "hobbies",
+    ),
+}
+
+_KEYWORD_SECTIONS = {keyword: section for section, keywords in _HEADINGS.items() for keyword in keywords}
+
+# 关键词按长度降序，优先匹配更具体的标题（“项目经历”先于“项目”）
+_CJK_KEYWORDS = sorted(
+    (keyword for keyword in _KEYWORD_SECTIONS if not keyword.isascii()),
+    key=len,
+    reverse=True,
+)
+
+# 标题行的最大长度（超过即视为正文）
+_MAX_HEADING_LENGTH = 30
+
+_NON_WORD = re.compile(r"[\W_]+")
+_COLON_CONTENT = re.compile(r"[:：]\s*\S")
+_INLINE_HEADING = re.compile(r"^[\W_]*(%s)\s*[:：]\s*(\S.*)$" % "|".join(map(re.escape, _CJK_KEYWORDS)))
+
+# 各维度专家需要的段落；基本信息始终包含
+DIMENSION_SECTIONS = {
+    "skills": (SECTION_SKILLS, SECTION_PROJECTS),
+    "experience": (SECTION_EXPERIENCE, SECTION_PROJECTS),
+    "education": (SECTION_EDUCATION, SECTION_OTHER),
+    "soft_skills": (SECTION_EXPERIENCE, SECTION_PROJECTS, SECTION_SELF_EVALUATION),
+    "stability": (SECTION_EXPERIENCE, SECTION_EDUCATION),
+    "work_attitude": (SECTION_EXPERIENCE, SECTION_PROJECTS, SECTION_SELF_EVALUATION),
+    "development_potential": (SECTION_EDUCATION, SECTION_EXPERIENCE, SECTION_SKILLS, SECTION_SELF_EVALUATION, SECTION_OTHER),
+}
+
+
+def _is_english_word(text: str) -> bool:
+    return text.isascii() and text.isalpha()
+
+
+def _heading_section(line: str) -> Optional[str]:
+    """判断一行是否为段落标题，是则返回段落键
+
+    支持“教育背景”、“【工作经历】”、“项目经验 PROJECTS”、“EDUCATION 教育背景”等写法
+    """
+    if len(line) > _MAX_HEADING_LENGTH or _COLON_CONTENT.search(line):
+        return None
+    normalized = _NON_WORD.sub("", line).lower()
+    if not normalized:
+        return None
+    if normalized in _KEYWORD_SECTIONS:
+        return _KEYWORD_SECTIONS[normalized]
+    # 中文标题附带英文标题
+    for keyword in _CJK_KEYWORDS:
+        if normalized.startswith(keyword) and _is_english_word(normalized[len(keyword):]):
+            return _KEYWORD_SECTIONS[keyword]
+        if normalized.endswith(keyword) and _is_english_word(normalized[:-len(keyword)]):
+            return _KEYWORD_SECTIONS[keyword]
+    return None
+
+
+def segment_resume(text: str) -> Dict[str, str]:
+    """把简历文本切分为段落
+
+    按行识别标题，标题之后到下一个标题之前的内容归入该段落；同类段落出现多次时合并。
+    “专业技能：Python、Go”这类标题与内容同行的写法同样识别。文本需保留换行（见 ResumeParser._clean_text）。
+
+    Args:
+        text: 简历文本
+
+    Returns:
+        {段落键: 段落文本}，只包含非空段落；未识别到任何标题时只有 basic
+    """
+    if not text:
+        return {}
+
+    parts: Dict[str, List[str]] = {}
+    current = SECTION_BASIC
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        section = _heading_section(line)
+        if section:
+            current = section
+            continue
+
+        inline = _INLINE_HEADING.match(line)
+        # 只识别四字及以上的标题，避免把经历中的“项目：xxx”当成段落开始
+        if inline and len(inline.group(1)) >= 4:
+            current = _KEYWORD_SECTIONS[inline.group(1)]
+            line = inline.group(2)
+
+        parts.setdefault(current, []).append(line)
+
+    return {section: "\n".join(lines) for section, lines in parts.items()}
+
+
+def resume_sections(resume_data: Dict[str, Any]) -> Dict[str, str]:
+    """简历数据中的段落：优先使用解析时保存的 sections，否则即时切分"""
+    sections = resume_data.get("sections")
+    if isinstance(sections, dict) and sections:
+        return sections
+    return segment_resume(resume_data.get("extracted_text") or resume_data.get("resume_text") or "")
+
+
+def sections_text(sections: Dict[str, str], keys) -> str:
+    """按给定顺序拼接段落文本，每段带标题"""
+    blocks = []
+    for key in keys:
+        if sections.get(key):
+            blocks.append(f"【{SECTION_TITLES[key]}】\n{sections[key]}")
+    return "\n\n".join(blocks)
+
+
+def focus_resume_data(resume_data: Any, dimension: str) -> Any:
+    """只保留维度相关段落的简历数据，供单个专家使用
+
+    返回副本，其中 extracted_text 替换为基本信息 + 该维度需要的段落；
+    未识别出段落或相关段落均为空时原样返回，专家使用完整文本。
+
+    Args:
+        resume_data: 简历数据
+        dimension: 维度键（skills/experience/...）
+
+    Returns:
+        简历数据
+    """
+    if not isinstance(resume_data, dict) or dimension not in DIMENSION_SECTIONS:
+        return resume_data
+
+    sections = resume_sections(resume_data)
+    relevant = DIMENSION_SECTIONS[dimension]
+    if not any(sections.get(key) for key in relevant):
+        return resume_data
+
+    focused = dict(resume_data)
+    focused["extracted_text"] = sections_text(sections, (SECTION_BASIC,) + relevant)
+    return focused
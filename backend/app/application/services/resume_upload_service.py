@@ -13,8 +13,11 @@ from datetime import datetime
 
 from app.infrastructure.database.models import Resume
 from app.application.services.resume_parser import get_resume_parser
-from app.application.services.embedding_service import EmbeddingService
+from app.application.services.embedding_service import EmbeddingService, EmbeddingError, VectorStoreService
+from app.application.services.embedding_retry_service import mark_embedded, mark_embedding_failed
 from app.core.config import settings
+from app.infrastructure.external_services.tokenizer import truncate_tokens
+from app.infrastructure.search.fulltext import search_vector_expression
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +73,9 @@ class ResumeUploadService:
             parsed_content={},
             upload_time=datetime.utcnow(),
             status="uploaded",
-            uploaded_by=user_id
+            uploaded_by=user_id,
+            # 解析完成前先按文件名建立检索文档
+            search_vector=search_vector_expression(filename, None, None)
         )
 
         self.db.add(resume)
@@ -89,7 +94,7 @@ class ResumeUploadService:
         user_id: Optional[str] = None
     ) -> Resume:
         """
-        上传并处理简历文件
+        上传并同步处理简历文件（解析 + 向量化）
 
         Args:
             file_content: 文件内容
@@ -101,41 +106,35 @@ class ResumeUploadService:
         Returns:
             创建的简历记录
         """
-        from datetime import datetime
+        resume = await self.upload_file_only(file_content, filename, content_type, user_id=user_id)
 
-        # 1. 保存文件
-        file_id = str(uuid.uuid4())
-        file_ext = Path(filename).suffix
-        saved_filename = f"{file_id}{file_ext}"
-        file_path = os.path.abspath(os.path.join(self.upload_dir, saved_filename))
+        resume.status = "parsing"
+        await self.db.commit()
 
-        logger.info(f"保存文件到: {file_path}")
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        return await self.process_resume(resume, tenant_id)
 
-        # 2. 创建简历记录
-        import json
-        resume = Resume(
-            filename=filename,
-            file_path=file_path,
-            file_type=content_type,
-            file_size=len(file_content),
-            parsed_content={},
-            upload_time=datetime.utcnow(),
-            status="parsing",
-            uploaded_by=user_id
-        )
+    async def process_resume(self, resume: Resume, tenant_id: Optional[str] = None) -> Resume:
+        """
+        解析并向量化一份已处于 parsing 状态的简历，结果一次提交
 
-        self.db.add(resume)
-        await self.db.commit()
-        await self.db.refresh(resume)
+        文件解析在进程池中执行；向量化失败不影响解析结果，简历进入向量重试队列。
+
+        Args:
+            resume: 简历记录（状态为 parsing）
+            tenant_id: 租户ID，为空时使用上传者ID
+
+        Returns:
+            更新后的简历记录
+        """
+        from app.core.llm_init import DEFAULT_TENANT_ID
 
-        logger.info(f"简历记录已创建，ID: {resume.id}")
+        filename = resume.filename
+        tenant_id = tenant_id or (str(resume.uploaded_by) if resume.uploaded_by else DEFAULT_TENANT_ID)
 
         try:
-            # 3. 解析文件内容
+            # 1. 解析文件内容
             logger.info(f"开始解析简历文件: {filename}")
-            parsed_data = await self.parser.parse_file(file_path, filename)
+            parsed_data = await self.parser.parse_file(resume.file_path, filename)
 
             # 更新解析结果到各个字段
             resume.extracted_text = parsed_data.get("extracted_text")
@@ -143,57 +142,57 @@ class ResumeUploadService:
             resume.candidate_email = parsed_data.get("candidate_email")
             resume.candidate_phone = parsed_data.get("candidate_phone")
             resume.candidate_location = parsed_data.get("candidate_location")
+            resume.search_vector = search_vector_expression(filename, resume.candidate_name, resume.extracted_text)
 
-            # 同时保存完整的解析数据到 parsed_content
-            resume.parsed_content = parsed_data
-
-            resume.status = "embedding"
-
-            await self.db.commit()
-            logger.info(f"简历解析完成: {filename}, parsed_content已更新")
+            # 保存完整的解析数据到 parsed_content（整体赋值，JSON 列才会被标记为已修改）
+            parsed_content = dict(parsed_data)
+            parsed_content["parsed_at"] = datetime.utcnow().isoformat()
+            logger.info(f"简历解析完成: {filename}")
 
-            # 4. 生成向量（如果配置了 embedding 模型）
+            # 2. 生成向量（如果配置了 embedding 模型）
             try:
                 logger.info(f"开始生成向量: {filename}")
                 text_to_embed = self._prepare_text_for_embedding(resume)
-                embedding = await self.embedding_service.embed_text(text_to_embed, tenant_id or "default")
-
-                # 存储向量（简化版：存储为逗号分隔的字符串）
-                # 生产环境应使用专门的向量数据库
-                resume.embedding_id = file_id
-                resume.embedding_model = await self._get_embedding_model_name(tenant_id)
-                # 将向量存储在 parsed_content 中
-                if resume.parsed_content is None:
-                    resume.parsed_content = {}
-                resume.parsed_content["embedding"] = ",".join(str(x) for x in embedding)
-                resume.status = "completed"
+                config = await self.embedding_service._get_embedding_config(tenant_id)
+                embedding = await self.embedding_service.embed_text(text_to_embed, tenant_id, config=config)
+
+                # 向量只写入向量表（float32 二进制），不再放进 parsed_content
+                resume.embedding_id = Path(resume.file_path).stem
+                resume.embedding_model = config["model"]
+                # 保存点：写入失败不影响解析结果的提交
+                async with self.db.begin_nested():
+                    saved = await VectorStoreService.save_embedding(
+                        self.db, resume.id, resume.embedding_model, embedding
+                    )
+                if not saved:
+                    raise EmbeddingError("embedding 结果为零向量或无效向量")
+                mark_embedded(resume)
                 logger.info(f"向量生成完成: {filename}")
 
             except Exception as embedding_error:
-                # 如果 embedding 失败，仍然标记为完成，但不存储向量
-                logger.warning(f"向量生成失败（已跳过）: {str(embedding_error)}")
-                resume.status = "completed"
-                if resume.parsed_content is None:
-                    resume.parsed_content = {}
-                resume.parsed_content["embedding_error"] = str(embedding_error)
+                # 如果 embedding 失败，仍然标记为完成，放入重试队列稍后重新生成
+                logger.warning(f"向量生成失败（已加入重试队列）: {str(embedding_error)}")
+                mark_embedding_failed(resume, str(embedding_error))
 
+            resume.parsed_content = parsed_content
+            resume.status = "completed"
             await self.db.commit()
             await self.db.refresh(resume)
 
             logger.info(f"简历处理完成: {filename}")
-
             return resume
 
         except Exception as e:
             logger.error(f"简历处理失败: {filename}, 错误: {str(e)}", exc_info=True)
+            await self.db.rollback()
+            await self.db.refresh(resume)
             resume.status = "failed"
-            if resume.parsed_content is None:
-                resume.parsed_content = {}
-            resume.parsed_content["error"] = str(e)
+            resume.parsed_content = {**(resume.parsed_content or {}), "error": str(e)}
             await self.db.commit()
             raise
 
-    def _prepare_text_for_embedding(self, resume: Resume) -> str:
+    @staticmethod
+    def _prepare_text_for_embedding(resume: Resume) -> str:
         """准备用于 embedding 的文本"""
         parts = []
 
@@ -209,13 +208,10 @@ class ResumeUploadService:
 
         # 添加提取的文本内容
         if resume.extracted_text:
-            # 限制文本长度，避免超过 token 限制
-            text = resume.extracted_text
-            if len(text) > 8000:
-                text = text[:8000]
-            parts.append(text)
+            parts.append(resume.extracted_text)
 
-        return "\n\n".join(parts)
+        # 按 token 限制长度，避免超过 embedding 模型的输入上限（截断标记不写入向量文本）
+        return truncate_tokens("\n\n".join(parts), settings.EMBEDDING_MAX_INPUT_TOKENS, mark="")
 
     async def _get_embedding_model_name(self, tenant_id: Optional[str]) -> str:
         """获取当前使用的 embedding 模型名称"""
@@ -230,7 +226,7 @@ class ResumeUploadService:
 
     async def parse_resume(self, resume_id: str, tenant_id: Optional[str] = None) -> Resume:
         """
-        解析已上传的简历
+        同步解析已上传的简历（解析 + 向量化）
 
         Args:
             resume_id: 简历ID
@@ -256,40 +252,7 @@ class ResumeUploadService:
         resume.status = "parsing"
         await self.db.commit()
 
-        try:
-            # 1. 解析文件内容
-            logger.info(f"开始解析简历文件: {resume.filename}")
-            parsed_data = await self.parser.parse_file(resume.file_path, resume.filename)
-
-            # 更新解析结果
-            resume.extracted_text = parsed_data.get("extracted_text")
-            resume.candidate_name = parsed_data.get("candidate_name")
-            resume.candidate_email = parsed_data.get("candidate_email")
-            resume.candidate_phone = parsed_data.get("candidate_phone")
-            resume.candidate_location = parsed_data.get("candidate_location")
-
-            # 保存完整的解析数据到 parsed_content
-            if resume.parsed_content is None:
-                resume.parsed_content = {}
-            resume.parsed_content.update(parsed_data)
-            resume.parsed_content["parsed_at"] = datetime.utcnow().isoformat()
-
-            resume.status = "completed"
-
-            await self.db.commit()
-            await self.db.refresh(resume)
-
-            logger.info(f"简历解析完成: {resume.filename}, parsed_content keys: {list(resume.parsed_content.keys())}")
-            return resume
-
-        except Exception as e:
-            logger.error(f"简历解析失败: {resume.filename}, 错误: {str(e)}", exc_info=True)
-            resume.status = "failed"
-            if resume.parsed_content is None:
-                resume.parsed_content = {}
-            resume.parsed_content["error"] = str(e)
-            await self.db.commit()
-            raise
+        return await self.process_resume(resume, tenant_id)
 
 
 # 全局服务实例
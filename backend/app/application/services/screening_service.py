@@ -0,0 +1,591 @@
+"""
+Screening Service
+职位批量筛选任务：对一批候选人运行多智能体分析，有界并发、逐条断点续跑、token 预算与候选名单
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, insert, literal, or_, select, text, update
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.database.models import (
+    JobPosition,
+    Resume,
+    ResumeAnalysis,
+    ScreeningJob,
+    ScreeningJobItem,
+)
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_BUDGET_EXHAUSTED = "budget_exhausted"
+
+# 可以继续执行的任务状态
+RESUMABLE_STATUSES = (STATUS_PAUSED, STATUS_FAILED, STATUS_BUDGET_EXHAUSTED)
+
+# 候选人状态
+ITEM_PENDING = "pending"
+ITEM_COMPLETED = "completed"
+ITEM_FAILED = "failed"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lock_key(job_id: Any) -> str:
+    return f"screening_job:{job_id}"
+
+
+def job_to_dict(job: ScreeningJob) -> Dict[str, Any]:
+    """筛选任务的状态与进度"""
+    return {
+        "id": str(job.id),
+        "job_position_id": str(job.job_position_id),
+        "status": job.status,
+        "analysis_profile": job.analysis_profile,
+        "params": job.params or {},
+        "token_budget": job.token_budget,
+        "tokens_used": job.tokens_used or 0,
+        "total": job.total or 0,
+        "completed": job.completed or 0,
+        "failed": job.failed or 0,
+        "reused": job.reused or 0,
+        "pending": max((job.total or 0) - (job.completed or 0) - (job.failed or 0), 0),
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class ScreeningService:
+    """批量筛选任务管理
+
+    任务与候选人状态保存在 screening_jobs / screening_job_items 表，每分析完一位候选人提交一次，
+    进程重启、暂停或预算用尽后从未完成的候选人继续。同一任务通过 Postgres advisory lock
+    保证只有一个进程在执行；LLM 调用以批量优先级经全局调度器执行，不挤占对话与单份分析。
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def create_job(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        job_position_id: str,
+        *,
+        resume_ids: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        analysis_profile: str = "standard",
+        analysis_mode: str = "cascade",
+        cascade_threshold: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        reuse_existing: bool = True,
+    ) -> ScreeningJob:
+        """创建并启动筛选任务
+
+        候选人为租户已解析完成的简历：指定 resume_ids 时取其中的简历，否则按 filters 筛选
+        （candidate_location / keyword / uploaded_after / uploaded_before），最多 SCREENING_MAX_CANDIDATES 份。
+
+        Args:
+            db: 数据库会话
+            tenant_id: 租户ID
+            job_position_id: 职位ID
+            resume_ids: 候选简历ID列表（可选）
+            filters: 候选简历筛选条件（可选）
+            analysis_profile: 分析配置类型
+            analysis_mode: 分析模式（cascade 时初筛未通过的候选人只分析技能与经验；fused 时单次调用完成七个维度）
+            cascade_threshold: 级联初筛阈值（可选）
+            token_budget: token 预算，为空表示不限制
+            reuse_existing: 是否复用该职位已有的分析结果（非级联模式不复用级联初筛未通过的结果）
+
+        Returns:
+            筛选任务
+
+        Raises:
+            ValueError: 职位不存在或参数无效
+        """
+        from app.application.agents.coordinator import MODE_CASCADE, MODE_FULL, MODE_FUSED
+
+        if analysis_mode not in (MODE_FULL, MODE_CASCADE, MODE_FUSED):
+            raise ValueError(f"无效的分析模式: {analysis_mode}")
+        position = await self._get_position(db, tenant_id, job_position_id)
+        filters = filters or {}
+
+        candidates = select(Resume.id).where(and_(
+            Resume.uploaded_by == UUID(str(tenant_id)),
+            Resume.status == "completed",
+        ))
+        if resume_ids:
+            try:
+                ids = [UUID(str(resume_id)) for resume_id in resume_ids]
+            except ValueError:
+                raise ValueError("无效的简历ID")
+            candidates = candidates.where(Resume.id.in_(ids))
+        else:
+            if filters.get("candidate_location"):
+                candidates = candidates.where(Resume.candidate_location.ilike(f"%{filters['candidate_location']}%"))
+            if filters.get("keyword"):
+                keyword = f"%{filters['keyword']}%"
+                candidates = candidates.where(or_(
+                    Resume.candidate_name.ilike(keyword),
+                    Resume.filename.ilike(keyword),
+                    Resume.extracted_text.ilike(keyword),
+                ))
+            if filters.get("uploaded_after"):
+                candidates = candidates.where(Resume.upload_time >= filters["uploaded_after"])
+            if filters.get("uploaded_before"):
+                candidates = candidates.where(Resume.upload_time < filters["uploaded_before"])
+        candidates = candidates.order_by(Resume.upload_time.desc()).limit(settings.SCREENING_MAX_CANDIDATES).subquery()
+
+        now = _utcnow()
+        job = ScreeningJob(
+            tenant_id=UUID(str(tenant_id)),
+            job_position_id=position.id,
+            status=STATUS_RUNNING,
+            analysis_profile=analysis_profile or "standard",
+            params={
+                "resume_ids": [str(resume_id) for resume_id in resume_ids or []],
+                "filters": {key: str(value) for key, value in filters.items() if value is not None},
+                "reuse_existing": reuse_existing,
+                "analysis_mode": analysis_mode,
+                "cascade_threshold": cascade_threshold,
+            },
+            token_budget=token_budget,
+            tokens_used=0,
+            started_at=now,
+        )
+        db.add(job)
+        await db.flush()
+
+        await db.execute(
+            insert(ScreeningJobItem).from_select(
+                ["id", "job_id", "resume_id", "status"],
+                select(
+                    func.gen_random_uuid(),
+                    literal(job.id, PGUUID(as_uuid=True)),
+                    candidates.c.id,
+                    literal(ITEM_PENDING),
+                ),
+            )
+        )
+        job.total = await db.scalar(
+            select(func.count(ScreeningJobItem.id)).where(ScreeningJobItem.job_id == job.id)
+        ) or 0
+        if not job.total:
+            job.status = STATUS_COMPLETED
+            job.finished_at = now
+
+        await db.commit()
+        await db.refresh(job)
+
+        if job.status == STATUS_RUNNING:
+            self._spawn(str(job.id))
+            logger.info(f"筛选任务已启动: job={job.id}, 职位={position.title}, 候选人={job.total}")
+        return job
+
+    async def get_job(self, db: AsyncSession, tenant_id: str, job_id: str) -> Optional[ScreeningJob]:
+        """获取租户的筛选任务"""
+        try:
+            job = await db.get(ScreeningJob, UUID(str(job_id)))
+        except ValueError:
+            return None
+        if job is None or str(job.tenant_id) != str(tenant_id):
+            return None
+        return job
+
+    async def list_jobs(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        job_position_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[ScreeningJob]:
+        """租户最近的筛选任务"""
+        query = select(ScreeningJob).where(ScreeningJob.tenant_id == UUID(str(tenant_id)))
+        if job_position_id:
+            query = query.where(ScreeningJob.job_position_id == UUID(str(job_position_id)))
+        result = await db.execute(query.order_by(ScreeningJob.created_at.desc()).limit(limit))
+        return list(result.scalars().all())
+
+    async def pause(self, db: AsyncSession, job: ScreeningJob) -> ScreeningJob:
+        """暂停筛选任务（可通过 resume 继续），分析中的候选人保持待处理"""
+        await self._stop_task(str(job.id))
+        if job.status == STATUS_RUNNING:
+            job.status = STATUS_PAUSED
+            await db.commit()
+            await db.refresh(job)
+        return job
+
+    async def resume(self, db: AsyncSession, job: ScreeningJob, token_budget: Optional[int] = None) -> ScreeningJob:
+        """继续暂停、失败或预算用尽的筛选任务，分析失败的候选人重新排队
+
+        Args:
+            db: 数据库会话
+            job: 筛选任务
+            token_budget: 新的 token 预算（可选，预算用尽时需提高后继续）
+
+        Returns:
+            筛选任务
+        """
+        if token_budget is not None:
+            job.token_budget = token_budget
+        if job.status in RESUMABLE_STATUSES:
+            await db.execute(
+                update(ScreeningJobItem)
+                .where(and_(ScreeningJobItem.job_id == job.id, ScreeningJobItem.status == ITEM_FAILED))
+                .values(status=ITEM_PENDING)
+            )
+            job.failed = 0
+            job.status = STATUS_RUNNING
+            job.error = None
+            job.finished_at = None
+        await db.commit()
+        await db.refresh(job)
+
+        if job.status == STATUS_RUNNING:
+            self._spawn(str(job.id))
+        return job
+
+    async def shortlist(
+        self,
+        db: AsyncSession,
+        job: ScreeningJob,
+        limit: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """按综合评分排序的候选名单（ix_screening_job_items_score）
+
+        Args:
+            db: 数据库会话
+            job: 筛选任务
+            limit: 名单长度，默认 SCREENING_SHORTLIST_SIZE
+            min_score: 最低综合评分（可选）
+
+        Returns:
+            候选人列表，包含排名、评分、分析摘要与实际执行的分析阶段
+        """
+        query = (
+            select(
+                ScreeningJobItem.resume_id,
+                ScreeningJobItem.analysis_id,
+                ScreeningJobItem.overall_score,
+                Resume.candidate_name,
+                Resume.candidate_email,
+                Resume.candidate_location,
+                Resume.filename,
+                ResumeAnalysis.detailed_analysis["summary"].astext.label("summary"),
+                ResumeAnalysis.detailed_analysis["pending_dimensions"].label("pending_dimensions"),
+                ResumeAnalysis.detailed_analysis["stages_run"].label("stages_run"),
+                ResumeAnalysis.detailed_analysis["cascade_rejected"].as_boolean().label("cascade_rejected"),
+            )
+            .join(Resume, Resume.id == ScreeningJobItem.resume_id)
+            .outerjoin(ResumeAnalysis, ResumeAnalysis.id == ScreeningJobItem.analysis_id)
+            .where(and_(
+                ScreeningJobItem.job_id == job.id,
+                ScreeningJobItem.status == ITEM_COMPLETED,
+                ScreeningJobItem.overall_score.isnot(None),
+            ))
+            .order_by(ScreeningJobItem.overall_score.desc(), ScreeningJobItem.id)
+            .limit(limit or settings.SCREENING_SHORTLIST_SIZE)
+        )
+        if min_score is not None:
+            query = query.where(ScreeningJobItem.overall_score >= min_score)
+
+        rows = (await db.execute(query)).all()
+        return [
+            {
+                "rank": rank,
+                "resume_id": str(row.resume_id),
+                "analysis_id": str(row.analysis_id) if row.analysis_id else None,
+                "overall_score": row.overall_score,
+                "candidate_name": row.candidate_name,
+                "candidate_email": row.candidate_email,
+                "candidate_location": row.candidate_location,
+                "filename": row.filename,
+                "summary": row.summary or "",
+                "pending_dimensions": row.pending_dimensions or [],
+                "stages_run": row.stages_run or [],
+                "cascade_rejected": bool(row.cascade_rejected),
+            }
+            for rank, row in enumerate(rows, 1)
+        ]
+
+    async def resume_interrupted(self):
+        """应用启动时继续因进程退出而中断的任务"""
+        from app.infrastructure.database.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(ScreeningJob.id).where(ScreeningJob.status == STATUS_RUNNING))
+            for job_id in result.scalars().all():
+                logger.info(f"继续中断的筛选任务: job={job_id}")
+                self._spawn(str(job_id))
+
+    @staticmethod
+    async def _get_position(db: AsyncSession, tenant_id: str, job_position_id: str) -> JobPosition:
+        try:
+            position = await db.get(JobPosition, UUID(str(job_position_id)))
+        except ValueError:
+            position = None
+        if position is None or (position.created_by and str(position.created_by) != str(tenant_id)):
+            raise ValueError(f"职位不存在: {job_position_id}")
+        return position
+
+    async def _stop_task(self, job_id: str):
+        task = self._tasks.get(job_id)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def _spawn(self, job_id: str):
+        task = self._tasks.get(job_id)
+        if task and not task.done():
+            return
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id))
+
+    async def _run(self, job_id: str):
+        """执行任务主循环"""
+        from app.application.use_cases.resume_analysis import job_requirements_from_position
+        from app.infrastructure.database.database import AsyncSessionLocal, engine
+
+        # advisory lock 绑定在连接上，任务执行期间一直持有
+        async with engine.connect() as lock_conn:
+            locked = await lock_conn.scalar(
+                text("SELECT pg_try_advisory_lock(hashtext(:key))"), {"key": _lock_key(job_id)}
+            )
+            if not locked:
+                logger.info(f"筛选任务已在其他进程执行: job={job_id}")
+                return
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    job = await db.get(ScreeningJob, UUID(job_id))
+                    if job is None or job.status != STATUS_RUNNING:
+                        return
+                    position = await db.get(JobPosition, job.job_position_id)
+                    if position is None:
+                        raise ValueError(f"职位不存在: {job.job_position_id}")
+                    context = {
+                        "job_id": job.id,
+                        "tenant_id": str(job.tenant_id),
+                        "job_position_id": job.job_position_id,
+                        "job_requirements": job_requirements_from_position(position),
+                        "analysis_profile": job.analysis_profile,
+                        "reuse_existing": (job.params or {}).get("reuse_existing", True),
+                        "analysis_mode": (job.params or {}).get("analysis_mode", "full"),
+                        "cascade_threshold": (job.params or {}).get("cascade_threshold"),
+                        "token_budget": job.token_budget,
+                        "tokens_used": job.tokens_used or 0,
+                    }
+
+                outcome = await self._process(context)
+                if outcome is None:
+                    # 任务已在其他地方暂停，保持现有状态
+                    return
+
+                async with AsyncSessionLocal() as db:
+                    job = await db.get(ScreeningJob, UUID(job_id))
+                    job.status = outcome
+                    if outcome == STATUS_COMPLETED:
+                        job.finished_at = _utcnow()
+                    await db.commit()
+                    logger.info(
+                        f"筛选任务结束: job={job_id}, 状态={outcome}, 完成={job.completed}, "
+                        f"失败={job.failed}, token={job.tokens_used}"
+                    )
+
+            except asyncio.CancelledError:
+                logger.info(f"筛选任务已暂停: job={job_id}")
+                raise
+            except Exception as e:
+                logger.error(f"筛选任务失败: job={job_id}, 错误: {str(e)}", exc_info=True)
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(ScreeningJob)
+                        .where(ScreeningJob.id == UUID(job_id))
+                        .values(status=STATUS_FAILED, error=str(e)[:2000])
+                    )
+                    await db.commit()
+            finally:
+                await lock_conn.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": _lock_key(job_id)}
+                )
+                self._tasks.pop(job_id, None)
+
+    async def _process(self, context: Dict[str, Any]) -> Optional[str]:
+        """按主键分页读取待处理的候选人，由 SCREENING_CONCURRENCY 个工作协程并发分析
+
+        预算在每位候选人开始前检查，超出量不超过正在分析的候选人的消耗。
+
+        Returns:
+            任务结束状态（completed / budget_exhausted），任务被外部暂停时返回 None
+        """
+        from app.infrastructure.database.database import AsyncSessionLocal
+
+        concurrency = max(1, settings.SCREENING_CONCURRENCY)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        stop = asyncio.Event()
+        outcome = {"status": STATUS_COMPLETED}
+
+        async def produce():
+            last_id = None
+            while not stop.is_set():
+                async with AsyncSessionLocal() as db:
+                    status = await db.scalar(
+                        select(ScreeningJob.status).where(ScreeningJob.id == context["job_id"])
+                    )
+                    if status != STATUS_RUNNING:
+                        outcome["status"] = None
+                        stop.set()
+                        break
+
+                    query = (
+                        select(ScreeningJobItem.id, ScreeningJobItem.resume_id)
+                        .where(and_(
+                            ScreeningJobItem.job_id == context["job_id"],
+                            ScreeningJobItem.status == ITEM_PENDING,
+                        ))
+                        .order_by(ScreeningJobItem.id)
+                        .limit(settings.SCREENING_BATCH_SIZE)
+                    )
+                    if last_id is not None:
+                        query = query.where(ScreeningJobItem.id > last_id)
+                    rows = (await db.execute(query)).all()
+
+                if not rows:
+                    break
+                for row in rows:
+                    if stop.is_set():
+                        break
+                    await queue.put(row)
+                last_id = rows[-1].id
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                row = await queue.get()
+                if row is None:
+                    return
+                # 停止后继续取出队列中的候选人（不处理），避免生产者阻塞
+                if stop.is_set():
+                    continue
+                budget = context["token_budget"]
+                if budget is not None and context["tokens_used"] >= budget:
+                    logger.info(f"筛选任务 token 预算已用尽: job={context['job_id']}, 已用={context['tokens_used']}")
+                    outcome["status"] = STATUS_BUDGET_EXHAUSTED
+                    stop.set()
+                    continue
+                await self._screen_candidate(context, row.id, row.resume_id)
+
+        tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(work()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        return outcome["status"]
+
+    async def _screen_candidate(self, context: Dict[str, Any], item_id: UUID, resume_id: UUID):
+        """分析一位候选人并记录结果
+
+        分析记录只 flush 不提交，与候选人状态、任务进度在同一事务提交；
+        中途崩溃时三者都不落库，恢复后该候选人仍为待分析，进度不会重复计数或丢失。
+        """
+        from app.application.use_cases.resume_analysis import ResumeAnalysisUseCase
+        from app.infrastructure.database.database import AsyncSessionLocal
+        from app.infrastructure.external_services.llm_scheduler import (
+            PRIORITY_BULK,
+            llm_priority,
+            track_llm_usage,
+        )
+        from app.infrastructure.repositories.resume_analysis_repository import ResumeAnalysisRepository
+
+        async with AsyncSessionLocal() as db:
+            record = None
+            reused = False
+            tokens = 0
+            error = None
+            try:
+                if context["reuse_existing"]:
+                    record = await ResumeAnalysisRepository(db).get_latest(
+                        resume_id,
+                        job_position_id=context["job_position_id"],
+                        analysis_profile=context["analysis_profile"],
+                    )
+                    # 级联初筛未通过的结果只是部分报告，非级联模式时不复用
+                    if (
+                        record is not None
+                        and context["analysis_mode"] != "cascade"
+                        and (record.detailed_analysis or {}).get("cascade_rejected")
+                    ):
+                        record = None
+                    reused = record is not None
+
+                if record is None:
+                    with llm_priority(PRIORITY_BULK), track_llm_usage() as meter:
+                        try:
+                            record = await ResumeAnalysisUseCase(db).analyze_and_save(
+                                resume_id,
+                                context["job_requirements"],
+                                context["tenant_id"],
+                                job_position_id=context["job_position_id"],
+                                analysis_profile=context["analysis_profile"],
+                                mode=context["analysis_mode"],
+                                cascade_threshold=context["cascade_threshold"],
+                                commit=False,
+                            )
+                        finally:
+                            tokens = meter.tokens
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await db.rollback()
+                error = str(e)
+                logger.warning(f"筛选候选人失败: job={context['job_id']}, 简历={resume_id}, 错误: {error}")
+
+            context["tokens_used"] += tokens
+
+            item_values = {"tokens_used": tokens}
+            job_values = {"tokens_used": ScreeningJob.tokens_used + tokens}
+            if error is None:
+                item_values.update(status=ITEM_COMPLETED, analysis_id=record.id, overall_score=record.overall_score, error=None)
+                job_values["completed"] = ScreeningJob.completed + 1
+                if reused:
+                    job_values["reused"] = ScreeningJob.reused + 1
+            else:
+                item_values.update(status=ITEM_FAILED, error=error[:2000])
+                job_values["failed"] = ScreeningJob.failed + 1
+
+            await db.execute(update(ScreeningJobItem).where(ScreeningJobItem.id == item_id).values(**item_values))
+            await db.execute(update(ScreeningJob).where(ScreeningJob.id == context["job_id"]).values(**job_values))
+            await db.commit()
+
+
+# 全局单例
+_screening_service: Optional[ScreeningService] = None
+
+
+def get_screening_service() -> ScreeningService:
+    """获取批量筛选服务单例"""
+    global _screening_service
+    if _screening_service is None:
+        _screening_service = ScreeningService()
+    return _screening_service
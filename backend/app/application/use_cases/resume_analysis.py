@@ -1,8 +1,9 @@
 """Resume analysis use case - 多智能体系统实现"""
 
+import json
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -12,11 +13,44 @@ from app.application.schemas.agent_analysis import (
     ResumeAnalysisResponse,
     AnalysisResult
 )
-from app.infrastructure.database.models import Resume
+from app.application.services.resume_content import lean_parsed_content
+from app.infrastructure.database.models import JobPosition, Resume, ResumeAnalysis
+from app.infrastructure.repositories.resume_analysis_repository import ResumeAnalysisRepository
 
 logger = logging.getLogger(__name__)
 
 
+def job_requirements_from_position(position: JobPosition) -> Dict[str, Any]:
+    """将职位转换为协调智能体使用的职位要求
+
+    Args:
+        position: 职位
+
+    Returns:
+        {"position", "description", "requirements", "skills", "experience_level"}
+    """
+    requirements = position.requirements
+    if isinstance(requirements, list):
+        requirements = "\n".join(str(item) for item in requirements)
+    elif isinstance(requirements, dict):
+        requirements = json.dumps(requirements, ensure_ascii=False)
+
+    skills = []
+    for skill in position.skills_required or []:
+        if isinstance(skill, dict):
+            skill = skill.get("name") or skill.get("skill")
+        if skill:
+            skills.append(str(skill))
+
+    return {
+        "position": position.title,
+        "description": position.description or "",
+        "requirements": requirements or "",
+        "skills": skills,
+        "experience_level": position.experience_level,
+    }
+
+
 class ResumeAnalysisUseCase:
     """简历分析用例 - 使用多智能体系统"""
 
@@ -46,17 +80,20 @@ class ResumeAnalysisUseCase:
 
         try:
             # 1. 获取简历数据
-            resume_data = await self._get_resume_data(request.resume_id)
+            resume_data = await self._get_resume_data(request.resume_id, tenant_id)
             if not resume_data:
                 raise ValueError(f"简历不存在: {request.resume_id}")
 
             logger.info(f"开始分析简历: {request.resume_id}")
 
             # 2. 准备职位要求
-            job_requirements = request.job_requirements or self._get_default_job_requirements()
+            job_requirements = await self._get_job_requirements(request, tenant_id)
 
             # 3. 创建协调智能体
-            coordinator = ResumeAnalysisCoordinator(self.db, tenant_id)
+            analysis_profile = request.analysis_profile or "standard"
+            coordinator = ResumeAnalysisCoordinator(
+                self.db, tenant_id, analysis_profile=analysis_profile, mode=request.analysis_mode or "full"
+            )
 
             # 4. 执行分析
             analysis_result = await coordinator.analyze(resume_data, job_requirements)
@@ -65,17 +102,21 @@ class ResumeAnalysisUseCase:
             processing_time = time.time() - start_time
             message_id = f"msg_{request.resume_id}_{int(start_time)}"
 
-            # 6. 保存分析结果（可选）
+            # 6. 保存分析结果
             await self._save_analysis_result(
                 resume_id=request.resume_id,
                 analysis=analysis_result,
-                processing_time=processing_time
+                processing_time=processing_time,
+                tenant_id=tenant_id,
+                job_position_id=request.job_position_id,
+                analysis_profile=analysis_profile,
+                model_name=coordinator.model_id or coordinator.skills_expert.model_id,
             )
 
             logger.info(f"简历分析完成，评分: {analysis_result.get('overall_score', 0)}, 耗时: {processing_time:.2f}秒")
 
             return ResumeAnalysisResponse(
-                analysis=AnalysisResult(**analysis_result),
+                analysis=self._to_analysis_result(analysis_result),
                 message_id=message_id,
                 processing_time=processing_time
             )
@@ -87,11 +128,75 @@ class ResumeAnalysisUseCase:
             logger.error(f"简历分析失败（系统错误）: {e}", exc_info=True)
             raise RuntimeError(f"分析失败: {str(e)}")
 
-    async def _get_resume_data(self, resume_id: str) -> Optional[Dict[str, Any]]:
+    async def analyze_with_agents_stream(
+        self,
+        request: ResumeAnalysisRequest,
+        tenant_id: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """使用多智能体系统渐进式分析简历
+
+        依次产出协调智能体的 dimension / overall_score / summary_token 事件，
+        分析结束保存结果后产出 {"type": "done", "analysis", "message_id", "processing_time"}
+
+        Args:
+            request: 分析请求
+            tenant_id: 租户ID
+
+        Yields:
+            分析事件
+        """
+        start_time = time.time()
+
+        resume_data = await self._get_resume_data(request.resume_id, tenant_id)
+        if not resume_data:
+            raise ValueError(f"简历不存在: {request.resume_id}")
+
+        logger.info(f"开始渐进式分析简历: {request.resume_id}")
+
+        job_requirements = await self._get_job_requirements(request, tenant_id)
+        analysis_profile = request.analysis_profile or "standard"
+        coordinator = ResumeAnalysisCoordinator(
+            self.db, tenant_id, analysis_profile=analysis_profile, mode=request.analysis_mode or "full"
+        )
+
+        analysis_result = None
+        async for event in coordinator.analyze_stream(resume_data, job_requirements):
+            if event["type"] == "result":
+                analysis_result = event["result"]
+            else:
+                yield event
+
+        processing_time = time.time() - start_time
+        await self._save_analysis_result(
+            resume_id=request.resume_id,
+            analysis=analysis_result,
+            processing_time=processing_time,
+            tenant_id=tenant_id,
+            job_position_id=request.job_position_id,
+            analysis_profile=analysis_profile,
+            model_name=coordinator.model_id or coordinator.skills_expert.model_id,
+        )
+
+        logger.info(f"简历分析完成，评分: {analysis_result.get('overall_score', 0)}, 耗时: {processing_time:.2f}秒")
+
+        yield {
+            "type": "done",
+            "analysis": analysis_result,
+            "message_id": f"msg_{request.resume_id}_{int(start_time)}",
+            "processing_time": processing_time,
+        }
+
+    @staticmethod
+    def _to_analysis_result(analysis: Dict[str, Any]) -> AnalysisResult:
+        """协调智能体输出的 overall_score 即响应中的综合评分 score"""
+        return AnalysisResult(**{"score": analysis.get("overall_score", 0), **analysis})
+
+    async def _get_resume_data(self, resume_id: str, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """获取简历数据
 
         Args:
             resume_id: 简历ID
+            tenant_id: 租户ID，只读取该租户上传的简历
 
         Returns:
             简历数据字典
@@ -107,6 +212,8 @@ class ResumeAnalysisUseCase:
 
             # 查询数据库
             query = select(Resume).where(Resume.id == resume_uuid)
+            if tenant_id:
+                query = query.where(Resume.uploaded_by == UUID(str(tenant_id)))
             result = await self.db.execute(query)
             resume = result.scalar_one_or_none()
 
@@ -125,19 +232,112 @@ class ResumeAnalysisUseCase:
             }
 
             # 添加解析内容
-            if resume.parsed_content:
-                resume_data.update(resume.parsed_content)
+            resume_data.update(lean_parsed_content(resume.parsed_content))
 
             # 添加原始文本
             if resume.extracted_text:
                 resume_data["extracted_text"] = resume.extracted_text
 
+            # 解析时保存的段落，专家只接收相关段落
+            sections = (resume.parsed_content or {}).get("sections")
+            if sections:
+                resume_data["sections"] = sections
+
             return resume_data
 
         except Exception as e:
             logger.error(f"获取简历数据失败: {e}", exc_info=True)
             return None
 
+    async def analyze_and_save(
+        self,
+        resume_id: Any,
+        job_requirements: Dict[str, Any],
+        tenant_id: str,
+        *,
+        job_position_id: Any = None,
+        analysis_profile: str = "standard",
+        mode: str = "full",
+        cascade_threshold: Optional[int] = None,
+        commit: bool = True
+    ) -> ResumeAnalysis:
+        """分析一份简历并保存结果（批量筛选使用）
+
+        Args:
+            resume_id: 简历ID
+            job_requirements: 职位要求
+            tenant_id: 租户ID
+            job_position_id: 职位ID
+            analysis_profile: 分析配置类型
+            mode: 分析模式 (full/cascade/fused)
+            cascade_threshold: 级联模式的初筛阈值（可选）
+            commit: 是否立即提交；为 False 时由调用方提交
+
+        Returns:
+            保存的分析记录
+
+        Raises:
+            ValueError: 简历不存在
+            RuntimeError: 分析失败
+        """
+        start_time = time.time()
+
+        resume_data = await self._get_resume_data(str(resume_id), tenant_id)
+        if not resume_data:
+            raise ValueError(f"简历不存在: {resume_id}")
+
+        coordinator = ResumeAnalysisCoordinator(
+            self.db, tenant_id, analysis_profile=analysis_profile, mode=mode, cascade_threshold=cascade_threshold
+        )
+        analysis_result = await coordinator.analyze(resume_data, job_requirements)
+        if analysis_result.get("error"):
+            raise RuntimeError(analysis_result["error"])
+
+        return await ResumeAnalysisRepository(self.db).save(
+            resume_id,
+            analysis_result,
+            tenant_id=tenant_id,
+            job_position_id=job_position_id,
+            analysis_profile=analysis_profile,
+            model_name=coordinator.model_id or coordinator.skills_expert.model_id,
+            duration_ms=int((time.time() - start_time) * 1000),
+            commit=commit,
+        )
+
+    async def _get_job_requirements(self, request: ResumeAnalysisRequest, tenant_id: str) -> Dict[str, Any]:
+        """请求中的职位要求，其次为 job_position_id 对应职位的要求，最后为默认要求
+
+        Args:
+            request: 分析请求
+            tenant_id: 租户ID
+
+        Returns:
+            职位要求
+
+        Raises:
+            ValueError: job_position_id 对应的职位属于其他租户（分析记录会保存该职位ID，不能回退为默认要求）
+        """
+        position = None
+        if request.job_position_id:
+            try:
+                from uuid import UUID
+                position = await self.db.get(JobPosition, UUID(str(request.job_position_id)))
+            except ValueError:
+                logger.warning(f"无效的职位ID: {request.job_position_id}，使用默认职位要求")
+            # 与批量筛选相同：创建者不是当前租户的职位视为不存在
+            if position is not None and position.created_by and str(position.created_by) != str(tenant_id):
+                raise ValueError(f"职位不存在: {request.job_position_id}")
+
+        if request.job_requirements:
+            return request.job_requirements
+
+        if position is not None:
+            return job_requirements_from_position(position)
+        if request.job_position_id:
+            logger.warning(f"职位不存在: {request.job_position_id}，使用默认职位要求")
+
+        return self._get_default_job_requirements()
+
     def _get_default_job_requirements(self) -> Dict[str, Any]:
         """获取默认职位要求
 
@@ -155,28 +355,85 @@ class ResumeAnalysisUseCase:
         self,
         resume_id: str,
         analysis: Dict[str, Any],
-        processing_time: float
+        processing_time: float,
+        tenant_id: Optional[str] = None,
+        job_position_id: Optional[str] = None,
+        analysis_profile: str = "standard",
+        model_name: Optional[str] = None
     ):
-        """保存分析结果
+        """保存分析结果到 resume_analyses 表
 
         Args:
             resume_id: 简历ID
             analysis: 分析结果
             processing_time: 处理时间
+            tenant_id: 租户ID
+            job_position_id: 职位ID
+            analysis_profile: 分析配置类型
+            model_name: 实际使用的模型
         """
+        if analysis.get("error"):
+            # 整体失败的结果不落库，避免覆盖上一次有效的分析
+            logger.warning(f"分析失败，不保存结果，简历ID: {resume_id}")
+            return
+
         try:
-            # TODO: 实现保存到数据库的逻辑
-            # 可以创建新的表或更新现有的 resume_analyses 表
-            logger.info(f"分析结果已准备保存，简历ID: {resume_id}")
+            await ResumeAnalysisRepository(self.db).save(
+                resume_id,
+                analysis,
+                tenant_id=tenant_id,
+                job_position_id=job_position_id,
+                analysis_profile=analysis_profile,
+                model_name=model_name,
+                duration_ms=int(processing_time * 1000),
+            )
+            logger.info(f"分析结果已保存，简历ID: {resume_id}")
         except Exception as e:
+            await self.db.rollback()
             logger.error(f"保存分析结果失败: {e}", exc_info=True)
             # 保存失败不影响分析结果返回
 
-    async def get_resume_by_id(self, resume_id: str) -> Optional[Resume]:
+    async def get_saved_analysis(
+        self,
+        resume_id: str,
+        job_position_id: Optional[str] = None,
+        analysis_profile: Optional[str] = None,
+        tenant_id: Optional[str] = None
+    ) -> Optional[ResumeAnalysisResponse]:
+        """获取已保存的最新分析结果
+
+        Args:
+            resume_id: 简历ID
+            tenant_id: 租户ID，只返回该租户的分析结果
+            job_position_id: 职位ID（可选）
+            analysis_profile: 分析配置类型（可选）
+
+        Returns:
+            分析响应，没有保存的结果时返回 None
+        """
+        record = await ResumeAnalysisRepository(self.db).get_latest(
+            resume_id,
+            tenant_id=tenant_id,
+            job_position_id=job_position_id,
+            analysis_profile=analysis_profile,
+        )
+        if record is None or not record.detailed_analysis:
+            return None
+
+        created_at = int(record.created_at.timestamp()) if record.created_at else 0
+        return ResumeAnalysisResponse(
+            analysis=self._to_analysis_result(record.detailed_analysis),
+            message_id=f"msg_{resume_id}_{created_at}",
+            processing_time=(record.analysis_duration or 0) / 1000,
+            conversation_id=str(record.conversation_id) if record.conversation_id else None
+        )
+
+    async def get_resume_by_id(self, resume_id: str, tenant_id: Optional[str] = None) -> Optional[Resume]:
         """根据ID获取简历
 
         Args:
             resume_id: 简历ID
+            tenant_id: 租户ID，只返回该租户上传的简历
 
         Returns:
             简历对象
@@ -186,6 +443,8 @@ class ResumeAnalysisUseCase:
             resume_uuid = UUID(resume_id) if isinstance(resume_id, str) else resume_id
 
             query = select(Resume).where(Resume.id == resume_uuid)
+            if tenant_id:
+                query = query.where(Resume.uploaded_by == UUID(str(tenant_id)))
             result = await self.db.execute(query)
             return result.scalar_one_or_none()
         except Exception as e:
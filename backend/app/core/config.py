@@ -1,7 +1,7 @@
 """应用配置管理"""
 
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import AnyHttpUrl, EmailStr, field_validator
 from pydantic_settings import BaseSettings
 
@@ -55,10 +55,94 @@ class Settings(BaseSettings):
     DEFAULT_TEMPERATURE: float = 0.7
     DEFAULT_MAX_TOKENS: int = 2000
 
+    # LLM 客户端池配置
+    LLM_CLIENT_POOL_SIZE: int = 128  # 最多缓存的 LLM 客户端数量
+    LLM_HTTP_MAX_CONNECTIONS: int = 100  # 每个 API 地址的最大连接数
+    LLM_HTTP_MAX_KEEPALIVE: int = 20  # 每个 API 地址保持的长连接数
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 60.0  # 空闲长连接保持时间（秒）
+    MODEL_CONFIG_CACHE_TTL: int = 300  # 租户模型配置缓存有效期（秒）
+
     # 智能体配置
     # 注意：模型配置优先使用租户全局配置 (Tenant.llm_id)
-    MAX_PARALLEL_AGENTS: int = 4  # 最大并行智能体数量
-    ANALYSIS_TIMEOUT: int = 300  # 分析超时时间（秒）
+    MAX_PARALLEL_AGENTS: int = 16  # 进程内同时执行的 LLM 调用上限（智能体分析与对话共用）
+    ANALYSIS_TIMEOUT: int = 300  # 一次完整分析的截止时间（秒），超时未完成的维度标记为待定
+    ANALYSIS_EXPERT_TIMEOUT: int = 120  # 单个专家的时间预算（秒），不超过剩余的分析时间
+    ANALYSIS_CASCADE_THRESHOLD: int = 50  # 级联模式下初筛（技能 + 经验）评分低于该值时，不再执行其余专家与摘要
+    ANALYSIS_HEDGE_MODEL: str = ""  # 对冲请求使用的备用模型（模型名@厂商，需在租户模型中配置），为空不启用
+    ANALYSIS_HEDGE_MIN_SAMPLES: int = 20  # 专家耗时样本达到该数量后，超过其 p95 耗时才发起对冲请求
+
+    # LLM 调度配置
+    LLM_SCHEDULER_BACKEND: str = "memory"  # memory / redis（厂商 token 预算在多个进程之间共享）
+    LLM_PROVIDER_MAX_CONCURRENCY: int = 8  # 每个厂商（API 地址）的并发上限
+    LLM_PROVIDER_CONCURRENCY_OVERRIDES: Dict[str, int] = {}  # 按厂商主机名覆盖并发上限
+    LLM_PROVIDER_TPM: int = 0  # 每个厂商每分钟的 token 预算，0 表示不限制
+    LLM_PROVIDER_TPM_OVERRIDES: Dict[str, int] = {}  # 按厂商主机名覆盖 token 预算
+    LLM_TENANT_MAX_CONCURRENCY: int = 8  # 每个租户的并发上限（一次完整的 7 维度分析 + 预留给对话的名额）
+    LLM_INTERACTIVE_RESERVED: int = 2  # 全局名额中只给对话使用的数量
+    LLM_TENANT_INTERACTIVE_RESERVED: int = 1  # 每个租户的名额中只给对话使用的数量，租户的批量任务占满其余名额时对话仍可执行
+
+    # 提示词预算配置
+    PROMPT_CONTEXT_WINDOW: int = 32768  # 模型上下文窗口（token），输入预算 = 窗口 - 输出预留（租户模型的 max_tokens）
+    PROMPT_CONTEXT_WINDOW_OVERRIDES: Dict[str, int] = {}  # 按模型名（或前缀）覆盖上下文窗口，如 {"gpt-4o": 128000}
+    PROMPT_SAFETY_MARGIN: int = 256  # 输入预算的安全余量（token），抵消非 OpenAI 模型分词器的计数误差
+    PROMPT_RESUME_EXCERPT_TOKENS: int = 1500  # 综合摘要等提示词中简历摘录的 token 上限
+    TOKENIZER_DEFAULT_ENCODING: str = "cl100k_base"  # tiktoken 不认识的模型名使用的编码
+
+    # 对话记忆配置
+    CONVERSATION_MEMORY_RECENT_TOKENS: int = 2000  # 合并摘要后保留原文的最近消息 token 数
+    CONVERSATION_MEMORY_BUFFER_TOKENS: int = 4000  # 未摘要消息超过该 token 数时把较早的消息合并进摘要
+    CONVERSATION_MEMORY_SUMMARY_TOKENS: int = 600  # 滚动摘要的 token 上限
+    CONVERSATION_MEMORY_MESSAGE_TOKENS: int = 800  # 历史中单条消息的 token 上限（当前这条用户消息不受限）
+    CONVERSATION_MEMORY_MAX_MESSAGES: int = 60  # 每轮最多读取的未摘要消息条数
+
+    # 批量筛选配置
+    SCREENING_CONCURRENCY: int = 4  # 每个筛选任务同时分析的候选人数量（LLM 调用仍受调度器的租户并发上限约束）
+    SCREENING_BATCH_SIZE: int = 100  # 每次从数据库读取的待分析候选人数量
+    SCREENING_MAX_CANDIDATES: int = 5000  # 单个筛选任务的候选人上限
+    SCREENING_SHORTLIST_SIZE: int = 20  # 默认候选名单长度
+
+    # 分析结果缓存配置
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_BACKEND: str = "redis"  # redis（不可用时自动回退进程内 LRU）/ memory
+    ANALYSIS_CACHE_TTL: int = 7 * 24 * 3600  # 缓存有效期（秒）
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 2048  # 进程内 LRU 最大条目数
+
+    # Embedding 配置
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100000  # 单次请求的 token 预算
+    EMBEDDING_MAX_INPUT_TOKENS: int = 8000  # 单条文本的 token 上限，超出部分截断
+    EMBEDDING_BATCH_MAX_ITEMS: int = 256  # 单次请求的最大文本条数
+    EMBEDDING_BATCH_CONCURRENCY: int = 4  # 并发请求的批次数量
+    EMBEDDING_MAX_RETRIES: int = 4  # 单个批次的最大尝试次数（指数退避）
+    EMBEDDING_REQUEST_TIMEOUT: float = 120.0  # 单次请求超时（秒）
+    EMBEDDING_REINDEX_BATCH_SIZE: int = 100  # 重建向量任务每批处理的简历数量
+    EMBEDDING_REINDEX_THROTTLE: float = 0.5  # 重建向量任务批次之间的间隔（秒）
+    EMBEDDING_MAX_ATTEMPTS: int = 8  # 向量生成失败后自动重试的最大次数
+    EMBEDDING_RETRY_BASE_DELAY: float = 60.0  # 首次重试的退避时间（秒），之后逐次翻倍
+    EMBEDDING_RETRY_MAX_DELAY: float = 6 * 3600  # 最大退避时间（秒）
+    EMBEDDING_RETRY_INTERVAL: float = 30.0  # 重试队列轮询间隔（秒）
+    EMBEDDING_RETRY_LEASE: float = 600.0  # 认领重试任务的租约时间（秒）
+
+    # 简历入库流水线配置
+    INGESTION_QUEUE_BACKEND: str = "redis"  # redis（使用 CELERY_BROKER_URL，不可用时回退进程内队列）/ memory
+    INGESTION_CONCURRENCY: int = 4  # 每个进程的解析工作协程数量
+    INGESTION_PARSE_WORKERS: int = 2  # 文件解析进程池大小
+    INGESTION_STALE_AFTER: int = 600  # 启动时将超过该时长仍处于 parsing 的简历重新入队（秒）
+
+    # 向量检索配置
+    VECTOR_INDEX_IVF_MIN_SIZE: int = 20000  # 向量数量达到该值后使用 IVF 近似检索，否则精确检索
+    VECTOR_INDEX_NPROBE: int = 16  # IVF 检索时扫描的簇数量
+    VECTOR_INDEX_REFRESH_INTERVAL: float = 30.0  # 从数据库增量同步索引的间隔（秒）
+    VECTOR_INDEX_REFRESH_OVERLAP: float = 600.0  # 增量同步窗口向前重叠的时长（秒），覆盖写入事务从开始到提交的耗时
+
+    # 关键词检索配置
+    RESUME_SEARCH_MAX_CANDIDATES: int = 2000  # 参与相关度排序的命中简历上限，常见词命中过多时只对最近上传的 N 条排序
+
+    # 混合检索配置
+    HYBRID_SEARCH_CANDIDATES: int = 100  # 关键词与向量两路各自召回的候选数量
+    HYBRID_RRF_K: int = 60  # 倒数排名融合的平滑常数，越大排名靠后的结果权重衰减越慢
+
+    # 流式响应配置
+    SSE_CHECKPOINT_INTERVAL: int = 64  # v2 增量协议首个 checkpoint 的 token 序号，之后间隔逐次翻倍
 
     # Celery配置
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -0,0 +1,85 @@
+"""
+Keyset Pagination
+基于游标的分页：游标编码上一页最后一行的 (排序时间, id)，下一页从该位置之后继续读取，
+深分页不再像 OFFSET 那样扫描并丢弃前面的行。id 作为排序时间相同时的决胜列。
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    """编码游标
+
+    Args:
+        sort_value: 行的排序时间
+        row_id: 行ID
+
+    Returns:
+        URL 安全的不透明游标字符串
+    """
+    payload = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """解码游标
+
+    Args:
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        (排序时间, 行ID)
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}")
+
+
+def keyset_condition(sort_column: Any, id_column: Any, cursor: str, descending: bool = True) -> Any:
+    """生成“位于游标之后”的过滤条件，排序须为 (sort_column, id_column) 同向
+
+    Args:
+        sort_column: 排序时间列
+        id_column: 主键列
+        cursor: 游标
+        descending: 是否倒序
+
+    Returns:
+        SQLAlchemy 过滤条件（行值比较，可使用以排序列结尾的复合索引）
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    sort_value, row_id = decode_cursor(cursor)
+    key = tuple_(sort_column, id_column)
+    bound = tuple_(sort_value, row_id)
+    return key < bound if descending else key > bound
+
+
+def next_cursor(rows: list, limit: int, sort_attr: str) -> Optional[str]:
+    """本页已满时返回下一页游标，否则返回 None
+
+    Args:
+        rows: 本页的 ORM 对象列表
+        limit: 每页数量
+        sort_attr: 排序时间属性名
+
+    Returns:
+        下一页游标或 None
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
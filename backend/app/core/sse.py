@@ -0,0 +1,119 @@
+"""
+SSE Stream Protocol
+流式对话的 SSE 事件编码与协议协商
+"""
+
+import json
+from typing import Dict, List, Optional
+
+# v1: 兼容协议，每个 token 事件附带截至当前的完整文本 (accumulated)
+PROTOCOL_V1 = "v1"
+# v2: 增量协议，token 事件只携带增量和序号，并周期性发送 checkpoint 事件供客户端校准
+PROTOCOL_V2 = "v2"
+
+DEFAULT_PROTOCOL = PROTOCOL_V1
+PROTOCOL_HEADER = "X-SSE-Protocol"
+
+_PROTOCOL_ALIASES = {
+    "v1": PROTOCOL_V1,
+    "1": PROTOCOL_V1,
+    "legacy": PROTOCOL_V1,
+    "v2": PROTOCOL_V2,
+    "2": PROTOCOL_V2,
+    "delta": PROTOCOL_V2,
+}
+
+DEFAULT_CHECKPOINT_INTERVAL = 64
+
+
+def negotiate_protocol(query_value: Optional[str] = None, header_value: Optional[str] = None) -> str:
+    """根据查询参数或请求头协商 SSE 协议版本
+
+    查询参数优先于请求头，无法识别的值回退到兼容协议。
+
+    Args:
+        query_value: 查询参数 ?protocol= 的值
+        header_value: 请求头 X-SSE-Protocol 的值
+
+    Returns:
+        协议版本 (v1 / v2)
+    """
+    for value in (query_value, header_value):
+        if value:
+            protocol = _PROTOCOL_ALIASES.get(value.strip().lower())
+            if protocol:
+                return protocol
+    return DEFAULT_PROTOCOL
+
+
+def encode_event(payload: Dict) -> str:
+    """编码一条 SSE 事件"""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+class SSEStreamEncoder:
+    """单次流式回复的事件编码器
+
+    负责按协商的协议版本编码 token 事件，同时缓存已发送的文本，
+    回复结束后通过 content 一次性取得完整内容用于持久化。
+    """
+
+    def __init__(self, protocol: str = DEFAULT_PROTOCOL, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Args:
+            protocol: 协议版本
+            checkpoint_interval: v2 协议下首个 checkpoint 的 token 序号，
+                之后间隔逐次翻倍（64, 128, 256, ...），使 checkpoint 总字节数不超过回复长度的两倍
+        """
+        self.protocol = protocol
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self._next_checkpoint = self.checkpoint_interval
+        self._parts: List[str] = []
+        self._accumulated = ""
+        self._seq = 0
+        self._length = 0
+
+    @property
+    def content(self) -> str:
+        """截至目前已发送的完整文本"""
+        if self.protocol == PROTOCOL_V1:
+            return self._accumulated
+        return "".join(self._parts)
+
+    def event(self, payload: Dict) -> str:
+        """编码非 token 类事件（user_message / json_data / done / error）"""
+        return encode_event(payload)
+
+    def token(self, delta: str) -> str:
+        """编码一段增量文本
+
+        Args:
+            delta: 本次收到的增量
+
+        Returns:
+            SSE 文本，v2 协议到达 checkpoint 序号时会在 token 事件之后追加一条 checkpoint 事件
+        """
+        self._seq += 1
+        self._length += len(delta)
+
+        if self.protocol == PROTOCOL_V1:
+            self._accumulated += delta
+            return encode_event({'type': 'token', 'token': delta, 'accumulated': self._accumulated})
+
+        self._parts.append(delta)
+        data = encode_event({'type': 'token', 'seq': self._seq, 'token': delta})
+        if self._seq >= self._next_checkpoint:
+            self._next_checkpoint *= 2
+            data += self.checkpoint()
+        return data
+
+    def checkpoint(self) -> str:
+        """编码 checkpoint 事件，携带完整文本与长度，客户端据此校准本地缓冲"""
+        content = "".join(self._parts)
+        self._parts = [content]
+        return encode_event({
+            'type': 'checkpoint',
+            'seq': self._seq,
+            'length': self._length,
+            'content': content,
+        })
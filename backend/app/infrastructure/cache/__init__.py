@@ -0,0 +1 @@
+"""Cache infrastructure package"""
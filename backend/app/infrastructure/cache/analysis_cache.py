@@ -0,0 +1,238 @@
+"""
+Analysis Result Cache
+专家分析结果缓存：按内容寻址，Redis 存储，进程内 LRU 兜底
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.infrastructure.cache.redis_client import get_redis, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "ai_hr:analysis"
+
+
+class MemoryLRUBackend:
+    """进程内 LRU 存储，带 TTL 和租户索引"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._tenant_keys: Dict[str, Set[str]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, tenant_id, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, tenant_id: str, key: str, value: str, ttl: int):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, tenant_id, value)
+        self._tenant_keys.setdefault(tenant_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def evict_tenant(self, tenant_id: str) -> int:
+        keys = self._tenant_keys.pop(tenant_id, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        return len(keys)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            keys = self._tenant_keys.get(entry[1])
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._tenant_keys[entry[1]]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AnalysisResultCache:
+    """专家分析结果缓存
+
+    缓存键为 hash(提示词模板版本, 专家名称, 模型ID, 温度, 完整提示词)。
+    完整提示词由模板与简历文本渲染而成，因此简历内容或模板任一变化都会得到新的键。
+    值以 JSON 字符串保存，每次读取都反序列化为新对象，调用方修改结果不会污染缓存。
+
+    优先写入 Redis（多进程共享），Redis 不可用时使用进程内 LRU。
+    """
+
+    def __init__(self, ttl: int, max_entries: int, use_redis: bool = True):
+        """
+        Args:
+            ttl: 缓存有效期（秒）
+            max_entries: 进程内 LRU 的最大条目数
+            use_redis: 是否使用 Redis 作为主存储
+        """
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._memory = MemoryLRUBackend(max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(expert_name: str, prompt: str, model_id: Optional[str], temperature: float) -> str:
+        """计算内容寻址的缓存键
+
+        Args:
+            expert_name: 专家（智能体）名称
+            prompt: 渲染后的完整提示词（包含简历文本）
+            model_id: 实际使用的模型ID
+            temperature: 温度参数
+
+        Returns:
+            sha256 十六进制摘要
+        """
+        from app.application.agents.prompts import PROMPT_TEMPLATE_VERSION
+
+        material = json.dumps(
+            [PROMPT_TEMPLATE_VERSION, expert_name, model_id or "", round(float(temperature), 3), prompt],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _redis_key(tenant_id: str, key: str) -> str:
+        return f"{_KEY_PREFIX}:{tenant_id}:{key}"
+
+    @staticmethod
+    def _tenant_index_key(tenant_id: str) -> str:
+        return f"{_KEY_PREFIX}:tenant:{tenant_id}"
+
+    @staticmethod
+    def _memory_key(tenant_id: str, key: str) -> str:
+        # 进程内缓存同样按租户隔离，相同提示词在不同租户之间不共享结果
+        return f"{tenant_id}:{key}"
+
+    async def get(self, tenant_id: str, key: str) -> Optional[Any]:
+        """读取缓存
+
+        Args:
+            tenant_id: 租户ID
+            key: make_key 生成的缓存键
+
+        Returns:
+            缓存的结果，未命中返回 None
+        """
+        tenant_id = str(tenant_id)
+        memory_key = self._memory_key(tenant_id, key)
+        raw = self._memory.get(memory_key)
+
+        if raw is None and self.use_redis:
+            redis = await get_redis()
+            if redis is not None:
+                try:
+                    raw = await redis.get(self._redis_key(tenant_id, key))
+                    if raw is not None:
+                        # 回填进程内缓存，下次直接命中
+                        self._memory.set(tenant_id, memory_key, raw, self.ttl)
+                except Exception as e:
+                    mark_redis_unavailable(e)
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, tenant_id: str, key: str, value: Any):
+        """写入缓存
+
+        Args:
+            tenant_id: 租户ID
+            key: make_key 生成的缓存键
+            value: 可 JSON 序列化的结果
+        """
+        tenant_id = str(tenant_id)
+        raw = json.dumps(value, ensure_ascii=False)
+        self._memory.set(tenant_id, self._memory_key(tenant_id, key), raw, self.ttl)
+
+        if self.use_redis:
+            redis = await get_redis()
+            if redis is not None:
+                try:
+                    index_key = self._tenant_index_key(tenant_id)
+                    pipe = redis.pipeline(transaction=False)
+                    pipe.set(self._redis_key(tenant_id, key), raw, ex=self.ttl)
+                    pipe.sadd(index_key, key)
+                    pipe.expire(index_key, self.ttl)
+                    await pipe.execute()
+                except Exception as e:
+                    mark_redis_unavailable(e)
+
+    async def evict_tenant(self, tenant_id: str) -> int:
+        """清除某个租户的全部缓存
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            清除的条目数量（Redis 与进程内取较大值）
+        """
+        tenant_id = str(tenant_id)
+        evicted = self._memory.evict_tenant(tenant_id)
+
+        if self.use_redis:
+            redis = await get_redis()
+            if redis is not None:
+                try:
+                    index_key = self._tenant_index_key(tenant_id)
+                    keys = await redis.smembers(index_key)
+                    if keys:
+                        await redis.delete(*[self._redis_key(tenant_id, k) for k in keys])
+                    await redis.delete(index_key)
+                    evicted = max(evicted, len(keys))
+                except Exception as e:
+                    mark_redis_unavailable(e)
+
+        logger.info(f"已清除租户 {tenant_id} 的分析缓存: {evicted} 条")
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "ttl": self.ttl,
+            "use_redis": self.use_redis,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# 全局单例
+_analysis_cache: Optional[AnalysisResultCache] = None
+
+
+def get_analysis_cache() -> Optional[AnalysisResultCache]:
+    """获取分析结果缓存单例，未启用时返回 None"""
+    global _analysis_cache
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return None
+    if _analysis_cache is None:
+        _analysis_cache = AnalysisResultCache(
+            ttl=settings.ANALYSIS_CACHE_TTL,
+            max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+            use_redis=settings.ANALYSIS_CACHE_BACKEND == "redis",
+        )
+    return _analysis_cache
@@ -0,0 +1,67 @@
+"""
+Redis Client
+共享的 Redis 异步客户端，不可用时返回 None 由调用方回退到进程内实现
+"""
+
+import logging
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 连接失败后的重试冷却时间（秒），避免每次调用都等待连接超时
+_RETRY_COOLDOWN = 30.0
+
+_redis_client = None
+_unavailable_until = 0.0
+
+
+async def get_redis():
+    """获取 Redis 客户端
+
+    Returns:
+        redis.asyncio.Redis 实例；未安装 redis 依赖或连接失败时返回 None
+    """
+    global _redis_client, _unavailable_until
+
+    if _redis_client is not None:
+        return _redis_client
+    if time.monotonic() < _unavailable_until:
+        return None
+
+    try:
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=5,
+        )
+        await client.ping()
+        _redis_client = client
+        logger.info(f"已连接 Redis: {settings.REDIS_URL}")
+        return _redis_client
+    except Exception as e:
+        _unavailable_until = time.monotonic() + _RETRY_COOLDOWN
+        logger.warning(f"Redis 不可用，使用进程内回退实现: {e}")
+        return None
+
+
+def mark_redis_unavailable(error: Optional[Exception] = None):
+    """运行中 Redis 调用失败时调用，丢弃当前连接并进入冷却期"""
+    global _redis_client, _unavailable_until
+    if error:
+        logger.warning(f"Redis 调用失败，暂时回退到进程内实现: {error}")
+    _redis_client = None
+    _unavailable_until = time.monotonic() + _RETRY_COOLDOWN
+
+
+async def close_redis():
+    """关闭 Redis 连接（应用关闭时调用）"""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
@@ -1,7 +1,7 @@
 """数据库模型定义"""
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, ForeignKey, LargeBinary, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -53,10 +53,16 @@ class Resume(BaseModel):
 
     # 提取的文本内容（用于 embedding）
     extracted_text = Column(Text)
+    # 关键词检索的倒排索引文档（中文二元切分，见 app/infrastructure/search/fulltext.py）
+    search_vector = Column(TSVECTOR)
 
     # 向量存储相关
     embedding_id = Column(String(255))  # 向量库中的ID
     embedding_model = Column(String(100))  # 使用的 embedding 模型名称
+    embedding_status = Column(String(20), default="pending", nullable=False)  # pending, embedded, failed
+    embedding_attempts = Column(Integer, default=0, nullable=False)
+    embedding_error = Column(Text)
+    embedding_next_retry_at = Column(DateTime(timezone=True))
 
     # 简历基本信息（从解析结果中提取）
     candidate_name = Column(String(255))
@@ -71,6 +77,37 @@ class Resume(BaseModel):
     analyses = relationship("ResumeAnalysis", back_populates="resume")
     uploader = relationship("User")
 
+    __table_args__ = (
+        # 重试队列只扫描失败的简历
+        Index(
+            "ix_resumes_embedding_retry",
+            "embedding_next_retry_at",
+            postgresql_where=text("embedding_status = 'failed'"),
+        ),
+        # 简历列表按上传者过滤、按上传时间倒序（游标分页）
+        Index("ix_resumes_uploaded_by_upload_time", "uploaded_by", "upload_time"),
+        # 关键词检索
+        Index("ix_resumes_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+class ResumeEmbedding(BaseModel):
+    """简历向量模型
+
+    向量以 L2 归一化后的 float32 小端序二进制存储，检索时由进程内向量索引加载
+    """
+    __tablename__ = "resume_embeddings"
+
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    embedding_model = Column(String(100), nullable=False)
+    dimension = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_resume_embeddings_model_updated", "embedding_model", "updated_at"),
+    )
+
 
 class JobPosition(BaseModel):
     """职位模型"""
@@ -108,19 +145,40 @@ class AIModel(BaseModel):
 
 
 class ResumeAnalysis(BaseModel):
-    """简历分析结果模型"""
+    """简历分析结果模型
+
+    各维度评分单独成列，完整的维度详情保存在 detailed_analysis (JSONB)；
+    按 简历 + 职位 + 分析配置 + 模型 取最新一条结果
+    """
     __tablename__ = "resume_analyses"
 
     resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), nullable=False)
-    job_position_id = Column(UUID(as_uuid=True), ForeignKey("job_positions.id"), nullable=False)
-    ai_model_id = Column(UUID(as_uuid=True), ForeignKey("ai_models.id"), nullable=False)
+    job_position_id = Column(UUID(as_uuid=True), ForeignKey("job_positions.id"), nullable=True)
+    ai_model_id = Column(UUID(as_uuid=True), ForeignKey("ai_models.id"), nullable=True)
+    tenant_id = Column(UUID(as_uuid=True), index=True)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="SET NULL"), nullable=True)
+    analysis_profile = Column(String(50), default="standard", nullable=False)
+    model_name = Column(String(255))  # 实际使用的模型（模型名@厂商）
     overall_score = Column(Float)
     skill_score = Column(Float)
     experience_score = Column(Float)
+    education_score = Column(Float)
+    soft_skills_score = Column(Float)
+    stability_score = Column(Float)
+    work_attitude_score = Column(Float)
+    potential_score = Column(Float)
     culture_fit_score = Column(Float)
-    detailed_analysis = Column(JSON)
+    detailed_analysis = Column(JSONB)
     analysis_duration = Column(Integer)  # 分析耗时（毫秒）
 
+    __table_args__ = (
+        Index(
+            "ix_resume_analyses_lookup",
+            "resume_id", "job_position_id", "analysis_profile", "model_name", "created_at",
+        ),
+        Index("ix_resume_analyses_conversation", "conversation_id", "created_at"),
+    )
+
     # 关系
     resume = relationship("Resume", back_populates="analyses")
     job_position = relationship("JobPosition", back_populates="analyses")
@@ -128,6 +186,60 @@ class ResumeAnalysis(BaseModel):
     skill_matches = relationship("SkillMatch", back_populates="resume_analysis")
 
 
+class ScreeningJob(BaseModel):
+    """批量筛选任务模型
+
+    对一个职位批量分析候选人简历；进度按候选人逐条记录在 screening_job_items，
+    进程重启或暂停后从未完成的候选人继续
+    """
+    __tablename__ = "screening_jobs"
+
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    job_position_id = Column(UUID(as_uuid=True), ForeignKey("job_positions.id"), nullable=False)
+    status = Column(String(20), default="running", nullable=False)  # running, paused, completed, failed, budget_exhausted
+    analysis_profile = Column(String(50), default="standard", nullable=False)
+    params = Column(JSONB)  # 创建参数（候选人筛选条件、是否复用已有结果）
+    token_budget = Column(Integer)  # token 预算，为空表示不限制
+    tokens_used = Column(Integer, default=0, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    reused = Column(Integer, default=0, nullable=False)  # 复用已有分析结果的数量
+    error = Column(Text)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    # 关系
+    job_position = relationship("JobPosition")
+    items = relationship("ScreeningJobItem", back_populates="job", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class ScreeningJobItem(BaseModel):
+    """批量筛选任务中的候选人"""
+    __tablename__ = "screening_job_items"
+
+    job_id = Column(UUID(as_uuid=True), ForeignKey("screening_jobs.id", ondelete="CASCADE"), nullable=False)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), default="pending", nullable=False)  # pending, completed, failed
+    analysis_id = Column(UUID(as_uuid=True), ForeignKey("resume_analyses.id", ondelete="SET NULL"), nullable=True)
+    overall_score = Column(Float)
+    tokens_used = Column(Integer)
+    error = Column(Text)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "resume_id", name="uq_screening_job_items_resume"),
+        # 续跑时按主键扫描未完成的候选人
+        Index("ix_screening_job_items_status", "job_id", "status", "id"),
+        # 候选名单按评分排序
+        Index("ix_screening_job_items_score", "job_id", "overall_score"),
+    )
+
+    # 关系
+    job = relationship("ScreeningJob", back_populates="items")
+    resume = relationship("Resume")
+    analysis = relationship("ResumeAnalysis")
+
+
 class SkillMatch(BaseModel):
     """技能匹配模型"""
     __tablename__ = "skill_matches"
@@ -201,6 +313,10 @@ class Conversation(BaseModel):
     model_name = Column(String(255))  # 使用的AI模型
     status = Column(String(50), default="active")  # active, archived, deleted
     meta_data = Column(JSON)  # 额外的对话元数据
+    # 消息统计（由 ConversationService.create_message 在写入消息的同一事务中维护）
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_message_preview = Column(String(200))  # 最后一条消息的前100个字符
+    last_message_at = Column(DateTime(timezone=True))
 
     # 关系
     tenant = relationship("Tenant", back_populates="conversations")
@@ -209,6 +325,11 @@ class Conversation(BaseModel):
     job_position = relationship("JobPosition")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # 对话列表按租户和状态过滤、按创建时间倒序
+        Index("ix_conversations_tenant_status_created", "tenant_id", "status", "created_at"),
+    )
+
 
 class Message(BaseModel):
     """消息模型"""
@@ -221,4 +342,9 @@ class Message(BaseModel):
     tokens_used = Column(Integer)  # 使用的token数量
 
     # 关系
-    conversation = relationship("Conversation", back_populates="messages")
\ No newline at end of file
+    conversation = relationship("Conversation", back_populates="messages")
+
+    __table_args__ = (
+        # 消息历史按对话读取、按 (created_at, id) 排序（游标分页、对话记忆的水位查询）
+        Index("ix_messages_conversation_created", "conversation_id", "created_at", "id"),
+    )
@@ -0,0 +1,169 @@
+"""
+LLM Client Pool
+进程级 LLM 客户端池：复用 ChatOpenAI 实例及其底层 HTTP 连接
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (tenant_id, model, api_base, temperature, max_tokens)
+ClientKey = Tuple[str, str, str, float, int]
+
+
+def _http2_available() -> bool:
+    """HTTP/2 需要 h2 依赖 (httpx[http2])，缺失时回退到 HTTP/1.1 keep-alive"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class LLMClientPool:
+    """有界 LRU 的 LLM 客户端池
+
+    - ChatOpenAI 实例按 (租户, 模型, api_base, 温度, max_tokens) 缓存
+    - 同一 api_base 的所有实例共享一个 httpx.AsyncClient，连接保持长连接 (HTTP/2 可用时多路复用)，
+      避免每次请求重新建立连接和 TLS 握手
+    - 租户修改 API Key 或模型状态时通过 invalidate 失效
+    """
+
+    def __init__(self, max_size: int = 128):
+        """
+        Args:
+            max_size: 最多缓存的 ChatOpenAI 实例数量
+        """
+        self.max_size = max_size
+        self._clients: "OrderedDict[ClientKey, Tuple[str, ChatOpenAI]]" = OrderedDict()
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._http2 = _http2_available()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_http_client(self, api_base: str) -> httpx.AsyncClient:
+        """获取（或创建）某个 api_base 共享的 HTTP 客户端"""
+        client = self._http_clients.get(api_base)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(settings.ANALYSIS_TIMEOUT, connect=10.0),
+            )
+            self._http_clients[api_base] = client
+            logger.info(f"创建共享 HTTP 客户端: api_base={api_base or 'default'}, http2={self._http2}")
+        return client
+
+    def get_client(
+        self,
+        tenant_id: str,
+        model: str,
+        api_key: Optional[str] = None,
+        api_base: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ) -> ChatOpenAI:
+        """获取 LLM 客户端，命中则复用，否则创建并放入池中
+
+        Args:
+            tenant_id: 租户ID
+            model: 模型名称（不含 @厂商）
+            api_key: API 密钥，为空时由 ChatOpenAI 读取 OPENAI_API_KEY
+            api_base: API 地址，为空时使用默认地址
+            temperature: 温度参数
+            max_tokens: 最大输出 token 数
+
+        Returns:
+            ChatOpenAI 实例
+        """
+        api_base = api_base or ""
+        max_tokens = max_tokens or settings.DEFAULT_MAX_TOKENS
+        key: ClientKey = (str(tenant_id), model, api_base, float(temperature), int(max_tokens))
+
+        cached = self._clients.get(key)
+        # API Key 不在键中（避免密钥进入日志/指标），但密钥变化时不能复用旧实例
+        if cached and cached[0] == (api_key or ""):
+            self._clients.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        kwargs = dict(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            http_async_client=self._get_http_client(api_base),
+        )
+        if api_key:
+            kwargs["openai_api_key"] = api_key
+        if api_base:
+            kwargs["base_url"] = api_base
+        llm = ChatOpenAI(**kwargs)
+
+        self._clients[key] = (api_key or "", llm)
+        self._clients.move_to_end(key)
+        while len(self._clients) > self.max_size:
+            evicted_key, _ = self._clients.popitem(last=False)
+            logger.debug(f"LLM 客户端池已满，淘汰: tenant={evicted_key[0]}, model={evicted_key[1]}")
+        return llm
+
+    def invalidate(self, tenant_id: str, model: Optional[str] = None) -> int:
+        """失效租户的客户端
+
+        Args:
+            tenant_id: 租户ID
+            model: 模型名称，为空时失效该租户的全部客户端
+
+        Returns:
+            被移除的实例数量
+        """
+        tenant_id = str(tenant_id)
+        keys = [
+            key for key in self._clients
+            if key[0] == tenant_id and (model is None or key[1] == model)
+        ]
+        for key in keys:
+            del self._clients[key]
+        if keys:
+            logger.info(f"LLM 客户端池失效: tenant={tenant_id}, model={model or '*'}, 数量={len(keys)}")
+        return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """池的统计信息"""
+        return {
+            "size": len(self._clients),
+            "max_size": self.max_size,
+            "http_clients": len(self._http_clients),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    async def aclose(self):
+        """关闭所有共享 HTTP 客户端（应用关闭时调用）"""
+        self._clients.clear()
+        for client in self._http_clients.values():
+            await client.aclose()
+        self._http_clients.clear()
+
+
+# 全局单例
+_llm_client_pool: Optional[LLMClientPool] = None
+
+
+def get_llm_client_pool() -> LLMClientPool:
+    """获取 LLM 客户端池单例"""
+    global _llm_client_pool
+    if _llm_client_pool is None:
+        _llm_client_pool = LLMClientPool(max_size=settings.LLM_CLIENT_POOL_SIZE)
+    return _llm_client_pool
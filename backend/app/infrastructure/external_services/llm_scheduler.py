@@ -0,0 +1,487 @@
+"""
+LLM Scheduler
+进程级 LLM 调用调度器：全局 / 厂商 / 租户并发上限、厂商每分钟 token 预算与优先级排队
+
+所有 LLM 调用（智能体分析、对话）先通过 slot() 申请执行名额。名额不足时按优先级排队，
+对话请求优先于分析，分析优先于批量任务；全局名额与每个租户的名额中都预留一部分只给对话使用，
+批量分析（包括同一租户自己的批量筛选）占满时对话仍可立即执行。配置 LLM_SCHEDULER_BACKEND=redis 时，
+厂商 token 预算额外通过 Redis 按分钟计数，在多个进程之间共享。
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 优先级（数值越小越优先）
+PRIORITY_INTERACTIVE = 0  # 对话
+PRIORITY_ANALYSIS = 1  # 单份简历分析
+PRIORITY_BULK = 2  # 批量筛选等后台任务
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_ANALYSIS: "analysis",
+    PRIORITY_BULK: "bulk",
+}
+
+DEFAULT_PROVIDER = "api.openai.com"
+
+# 每个优先级保留的最近等待时间样本数（用于 p95）
+_WAIT_SAMPLES = 512
+
+_current_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_ANALYSIS)
+_usage_meter: ContextVar[Optional["LLMUsageMeter"]] = ContextVar("llm_usage_meter", default=None)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """在当前上下文（及其创建的任务）中设置 LLM 调用的默认优先级
+
+    用法:
+        with llm_priority(PRIORITY_BULK):
+            await coordinator.analyze(...)
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    """当前上下文的 LLM 调用优先级"""
+    return _current_priority.get()
+
+
+class LLMUsageMeter:
+    """统计一段上下文内 LLM 调用消耗的 token（无实际用量时按预估值计）"""
+
+    def __init__(self):
+        self.tokens = 0
+        self.calls = 0
+
+    def add(self, tokens: int):
+        self.tokens += tokens
+        self.calls += 1
+
+
+@contextmanager
+def track_llm_usage():
+    """统计当前上下文（及其创建的任务）中的 LLM token 消耗
+
+    用法:
+        with track_llm_usage() as meter:
+            await coordinator.analyze(...)
+        meter.tokens
+    """
+    meter = LLMUsageMeter()
+    token = _usage_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _usage_meter.reset(token)
+
+
+def provider_of(llm: Any) -> str:
+    """LLM 客户端对应的厂商标识（API 地址的主机名）"""
+    base = getattr(llm, "openai_api_base", None)
+    if base:
+        host = urlparse(str(base)).netloc
+        if host:
+            return host
+    return DEFAULT_PROVIDER
+
+
+def estimate_tokens(text: Any) -> int:
+    """估算提示词（文本或消息列表）的 token 数，按默认编码计数，用于调度器的 token 预算"""
+    from app.infrastructure.external_services.tokenizer import count_tokens
+
+    if not isinstance(text, str):
+        text = "".join(str(getattr(m, "content", m)) for m in text) if text else ""
+    return count_tokens(text)
+
+
+class _TokenBucket:
+    """每分钟 token 预算（令牌桶，按秒平滑补充）"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: int, now: float) -> float:
+        """取得 amount 个 token 需要等待的秒数，0 表示可立即取得"""
+        self._refill(now)
+        # 单次请求超过桶容量时按满桶放行，避免永远等待
+        amount = min(float(amount), self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: int):
+        self.tokens -= min(float(amount), self.capacity)
+
+    def refund(self, amount: int):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Waiter:
+    """排队中的调用"""
+
+    __slots__ = ("priority", "seq", "tenant_id", "provider", "tokens", "future", "enqueued_at", "cancelled")
+
+    def __init__(self, priority: int, seq: int, tenant_id: str, provider: str, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.tenant_id = tenant_id
+        self.provider = provider
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMLease:
+    """一次调用持有的执行名额，调用结束后可上报实际 token 用量"""
+
+    def __init__(self, tenant_id: str, provider: str, priority: int, tokens: int, waited: float):
+        self.tenant_id = tenant_id
+        self.provider = provider
+        self.priority = priority
+        self.tokens = tokens
+        self.waited = waited
+        self.used_tokens: Optional[int] = None
+
+    def record_usage(self, response: Any):
+        """从 LLM 响应的 usage_metadata 中记录实际 token 用量"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        total = usage.get("total_tokens") if isinstance(usage, dict) else None
+        if total:
+            self.used_tokens = int(total)
+
+
+class LLMScheduler:
+    """LLM 调用调度器"""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        provider_concurrency: int,
+        tenant_concurrency: int,
+        provider_tpm: int = 0,
+        interactive_reserved: int = 0,
+        tenant_interactive_reserved: int = 0,
+        provider_concurrency_overrides: Optional[Dict[str, int]] = None,
+        provider_tpm_overrides: Optional[Dict[str, int]] = None,
+        use_redis: bool = False,
+    ):
+        """
+        Args:
+            max_concurrency: 全局并发上限
+            provider_concurrency: 每个厂商的默认并发上限
+            tenant_concurrency: 每个租户的并发上限
+            provider_tpm: 每个厂商的默认每分钟 token 预算，0 表示不限制
+            interactive_reserved: 全局名额中只给对话使用的数量
+            tenant_interactive_reserved: 每个租户的名额中只给对话使用的数量
+            provider_concurrency_overrides: 按厂商覆盖并发上限
+            provider_tpm_overrides: 按厂商覆盖 token 预算
+            use_redis: 是否通过 Redis 在多个进程之间共享 token 预算
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.provider_concurrency = max(1, provider_concurrency)
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.provider_tpm = max(0, provider_tpm)
+        self.interactive_reserved = min(max(0, interactive_reserved), self.max_concurrency - 1)
+        self.tenant_interactive_reserved = min(max(0, tenant_interactive_reserved), self.tenant_concurrency - 1)
+        self.provider_concurrency_overrides = provider_concurrency_overrides or {}
+        self.provider_tpm_overrides = provider_tpm_overrides or {}
+        self.use_redis = use_redis
+
+        self._in_flight = 0
+        self._provider_in_flight: Dict[str, int] = {}
+        self._tenant_in_flight: Dict[str, int] = {}
+        self._priority_in_flight: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        # 统计
+        self._granted: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._wait_total: Dict[int, float] = {p: 0.0 for p in PRIORITY_NAMES}
+        self._wait_max: Dict[int, float] = {p: 0.0 for p in PRIORITY_NAMES}
+        self._wait_samples: Dict[int, Deque[float]] = {p: deque(maxlen=_WAIT_SAMPLES) for p in PRIORITY_NAMES}
+        self._tpm_throttled = 0
+
+    # ------------------------------------------------------------------
+    # 限额
+    # ------------------------------------------------------------------
+
+    def _provider_limit(self, provider: str) -> int:
+        return self.provider_concurrency_overrides.get(provider, self.provider_concurrency)
+
+    def _provider_tpm(self, provider: str) -> int:
+        return self.provider_tpm_overrides.get(provider, self.provider_tpm)
+
+    def _bucket(self, provider: str) -> Optional[_TokenBucket]:
+        tpm = self._provider_tpm(provider)
+        if tpm <= 0:
+            return None
+        bucket = self._buckets.get(provider)
+        if bucket is None or bucket.capacity != tpm:
+            bucket = _TokenBucket(tpm)
+            self._buckets[provider] = bucket
+        return bucket
+
+    def _global_limit(self, priority: int) -> int:
+        if priority == PRIORITY_INTERACTIVE:
+            return self.max_concurrency
+        return self.max_concurrency - self.interactive_reserved
+
+    def _tenant_limit(self, priority: int) -> int:
+        if priority == PRIORITY_INTERACTIVE:
+            return self.tenant_concurrency
+        return self.tenant_concurrency - self.tenant_interactive_reserved
+
+    # ------------------------------------------------------------------
+    # 排队与分派
+    # ------------------------------------------------------------------
+
+    def _dispatch(self):
+        """按优先级顺序放行可执行的排队调用
+
+        全局名额不足时停止（后面的调用优先级不更高）；厂商、租户名额或 token 预算不足时
+        跳过该调用，让其他厂商 / 租户的调用先执行，token 不足时在补足时刻重新分派。
+        """
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        now = time.monotonic()
+        retry_after: Optional[float] = None
+        remaining: List[_Waiter] = []
+
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled or waiter.future.done():
+                continue
+
+            if self._in_flight >= self._global_limit(waiter.priority):
+                remaining.append(waiter)
+                break
+
+            if (
+                self._provider_in_flight.get(waiter.provider, 0) >= self._provider_limit(waiter.provider)
+                or self._tenant_in_flight.get(waiter.tenant_id, 0) >= self._tenant_limit(waiter.priority)
+            ):
+                remaining.append(waiter)
+                continue
+
+            bucket = self._bucket(waiter.provider)
+            if bucket is not None:
+                wait = bucket.wait_time(waiter.tokens, now)
+                if wait > 0:
+                    retry_after = wait if retry_after is None else min(retry_after, wait)
+                    remaining.append(waiter)
+                    continue
+                bucket.take(waiter.tokens)
+
+            self._acquire(waiter.tenant_id, waiter.provider, waiter.priority)
+            self._record_wait(waiter.priority, now - waiter.enqueued_at)
+            waiter.future.set_result(now - waiter.enqueued_at)
+
+        for waiter in remaining:
+            heapq.heappush(self._waiters, waiter)
+
+        if retry_after is not None:
+            loop = asyncio.get_running_loop()
+            self._wakeup = loop.call_later(retry_after, self._dispatch)
+
+    def _acquire(self, tenant_id: str, provider: str, priority: int):
+        self._in_flight += 1
+        self._provider_in_flight[provider] = self._provider_in_flight.get(provider, 0) + 1
+        self._tenant_in_flight[tenant_id] = self._tenant_in_flight.get(tenant_id, 0) + 1
+        self._priority_in_flight[priority] += 1
+
+    def _release(self, tenant_id: str, provider: str, priority: int):
+        self._in_flight -= 1
+        self._priority_in_flight[priority] -= 1
+        for counter, key in ((self._provider_in_flight, provider), (self._tenant_in_flight, tenant_id)):
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+        self._dispatch()
+
+    def _record_wait(self, priority: int, waited: float):
+        self._granted[priority] += 1
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+        self._wait_samples[priority].append(waited)
+
+    async def _acquire_shared_tokens(self, provider: str, tokens: int, priority: int):
+        """多进程共享的厂商 token 预算：Redis 按分钟计数，超出时等到下一分钟
+
+        在排队申请名额之前调用，等待期间不占用任何并发名额。对话请求只计数不等待，
+        批量任务用完本分钟的预算时不会让对话延后。Redis 不可用时直接返回，仅依赖进程内令牌桶。
+        """
+        tpm = self._provider_tpm(provider)
+        if not self.use_redis or tpm <= 0 or tokens <= 0:
+            return
+
+        from app.infrastructure.cache.redis_client import get_redis, mark_redis_unavailable
+
+        tokens = min(tokens, tpm)
+        while True:
+            client = await get_redis()
+            if client is None:
+                return
+
+            now = time.time()
+            key = f"ai_hr:llm_tpm:{provider}:{int(now // 60)}"
+            try:
+                used = await client.incrby(key, tokens)
+                if used == tokens:
+                    await client.expire(key, 120)
+                if used <= tpm or priority == PRIORITY_INTERACTIVE:
+                    return
+                await client.decrby(key, tokens)
+            except Exception as e:
+                mark_redis_unavailable(e)
+                return
+
+            self._tpm_throttled += 1
+            await asyncio.sleep(60 - now % 60 + 0.05)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        tenant_id: Any,
+        provider: str = DEFAULT_PROVIDER,
+        estimated_tokens: int = 0,
+        priority: Optional[int] = None,
+    ) -> AsyncIterator[LLMLease]:
+        """申请一次 LLM 调用的执行名额，退出上下文时释放
+
+        Args:
+            tenant_id: 租户ID
+            provider: 厂商标识（见 provider_of）
+            estimated_tokens: 预计消耗的 token 数（提示词 + 最大输出）
+            priority: 优先级，默认取当前上下文的 llm_priority
+
+        Yields:
+            LLMLease，调用方可通过 record_usage 上报实际用量
+        """
+        tenant_id = str(tenant_id)
+        priority = current_priority() if priority is None else priority
+        estimated_tokens = max(0, int(estimated_tokens))
+
+        # 先取得共享 token 预算再排队，等待下一分钟时不占用全局 / 厂商 / 租户名额
+        shared_started = time.monotonic()
+        await self._acquire_shared_tokens(provider, estimated_tokens, priority)
+        shared_wait = time.monotonic() - shared_started
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), tenant_id, provider, estimated_tokens, loop.create_future())
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+
+        try:
+            waited = await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 已分配名额但调用方被取消，归还名额
+                self._release(tenant_id, provider, priority)
+            else:
+                waiter.cancelled = True
+            raise
+
+        lease = LLMLease(tenant_id, provider, priority, estimated_tokens, waited + shared_wait)
+        try:
+            yield lease
+        finally:
+            meter = _usage_meter.get()
+            if meter is not None:
+                meter.add(lease.used_tokens if lease.used_tokens is not None else estimated_tokens)
+            bucket = self._buckets.get(provider)
+            if bucket is not None and lease.used_tokens is not None and lease.used_tokens < estimated_tokens:
+                bucket.refund(estimated_tokens - lease.used_tokens)
+            self._release(tenant_id, provider, priority)
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """调度器统计信息：并发占用、各优先级的排队深度与等待时间"""
+        queued: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        for waiter in self._waiters:
+            if not waiter.cancelled and not waiter.future.done():
+                queued[waiter.priority] += 1
+
+        priorities = {}
+        for priority, name in PRIORITY_NAMES.items():
+            granted = self._granted[priority]
+            samples = sorted(self._wait_samples[priority])
+            priorities[name] = {
+                "queued": queued[priority],
+                "in_flight": self._priority_in_flight[priority],
+                "granted": granted,
+                "avg_wait_ms": round(self._wait_total[priority] / granted * 1000, 1) if granted else 0.0,
+                "p95_wait_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1) if samples else 0.0,
+                "max_wait_ms": round(self._wait_max[priority] * 1000, 1),
+            }
+
+        return {
+            "backend": "redis" if self.use_redis else "memory",
+            "max_concurrency": self.max_concurrency,
+            "interactive_reserved": self.interactive_reserved,
+            "tenant_concurrency": self.tenant_concurrency,
+            "tenant_interactive_reserved": self.tenant_interactive_reserved,
+            "in_flight": self._in_flight,
+            "queued": sum(queued.values()),
+            "providers": dict(self._provider_in_flight),
+            "tenants_in_flight": len(self._tenant_in_flight),
+            "tokens_available": {p: int(b.tokens) for p, b in self._buckets.items()},
+            "tpm_throttled": self._tpm_throttled,
+            "priorities": priorities,
+        }
+
+
+# 全局单例
+_llm_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """获取 LLM 调度器单例"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler(
+            max_concurrency=settings.MAX_PARALLEL_AGENTS,
+            provider_concurrency=settings.LLM_PROVIDER_MAX_CONCURRENCY,
+            tenant_concurrency=settings.LLM_TENANT_MAX_CONCURRENCY,
+            provider_tpm=settings.LLM_PROVIDER_TPM,
+            interactive_reserved=settings.LLM_INTERACTIVE_RESERVED,
+            tenant_interactive_reserved=settings.LLM_TENANT_INTERACTIVE_RESERVED,
+            provider_concurrency_overrides=settings.LLM_PROVIDER_CONCURRENCY_OVERRIDES,
+            provider_tpm_overrides=settings.LLM_PROVIDER_TPM_OVERRIDES,
+            use_redis=settings.LLM_SCHEDULER_BACKEND == "redis",
+        )
+    return _llm_scheduler
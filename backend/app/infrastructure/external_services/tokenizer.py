@@ -0,0 +1,138 @@
+"""
+Tokenizer
+基于 tiktoken 的 token 计数与截断，按模型缓存编码器
+
+tiktoken 不认识的模型（GLM、Qwen、DeepSeek 等）使用 TOKENIZER_DEFAULT_ENCODING 计数；
+这些模型对中文的切分通常比 cl100k_base 更紧凑，计数结果偏保守。
+tiktoken 未安装或编码文件无法加载时退回按字符估算。
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 截断时追加的标记
+TRUNCATION_MARK = "\n...（内容过长，已截断）"
+
+
+@lru_cache(maxsize=64)
+def get_encoder(model: Optional[str] = None) -> Any:
+    """获取模型对应的 tiktoken 编码器（进程内缓存），不可用时返回 None
+
+    Args:
+        model: 模型名（如 gpt-4o、glm-4），为空时使用默认编码
+
+    Returns:
+        tiktoken.Encoding 或 None
+    """
+    from app.core.config import settings
+
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken 未安装，token 数按字符估算")
+        return None
+
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except Exception:
+            # 未知模型名或编码文件加载失败，使用默认编码
+            pass
+
+    try:
+        return tiktoken.get_encoding(settings.TOKENIZER_DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"加载 tiktoken 编码 {settings.TOKENIZER_DEFAULT_ENCODING} 失败: {e}，token 数按字符估算")
+        return None
+
+
+def _estimate(text: str) -> int:
+    """按字符估算：非 ASCII 字符每个计 1 个，ASCII 字符每 4 个计 1 个"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """计算文本的 token 数
+
+    Args:
+        text: 文本
+        model: 模型名（可选）
+
+    Returns:
+        token 数
+    """
+    if not text:
+        return 0
+    encoder = get_encoder(model)
+    if encoder is None:
+        return _estimate(text)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None, mark: str = TRUNCATION_MARK) -> str:
+    """保留文本开头不超过 max_tokens 个 token 的部分，截断时追加标记
+
+    Args:
+        text: 文本
+        max_tokens: token 上限
+        model: 模型名（可选）
+        mark: 截断标记（计入上限）
+
+    Returns:
+        截断后的文本；未超过上限时原样返回
+    """
+    if not text or count_tokens(text, model) <= max_tokens:
+        return text
+
+    budget = max(max_tokens - count_tokens(mark, model), 0)
+    encoder = get_encoder(model)
+    if encoder is not None:
+        head = encoder.decode(encoder.encode(text, disallowed_special=())[:budget])
+        # 多字节字符被截在中间时解码结果末尾是替换字符
+        head = head.rstrip("\ufffd")
+    else:
+        # end 为放得下的字符数：加上下一个字符会超出预算时停止，该字符不计入
+        used = 0.0
+        end = 0
+        for ch in text:
+            cost = 1 if ord(ch) > 127 else 0.25
+            if used + cost > budget:
+                break
+            used += cost
+            end += 1
+        head = text[:end]
+    return head + mark if budget else ""
+
+
+def tail_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """保留文本结尾不超过 max_tokens 个 token 的部分
+
+    Args:
+        text: 文本
+        max_tokens: token 上限
+        model: 模型名（可选）
+
+    Returns:
+        文本结尾部分；未超过上限时原样返回
+    """
+    if not text or count_tokens(text, model) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    encoder = get_encoder(model)
+    if encoder is not None:
+        return encoder.decode(encoder.encode(text, disallowed_special=())[-max_tokens:]).lstrip("\ufffd")
+
+    used = 0
+    start = len(text)
+    while start > 0:
+        used += 1 if ord(text[start - 1]) > 127 else 0.25
+        if used > max_tokens:
+            break
+        start -= 1
+    return text[start:]
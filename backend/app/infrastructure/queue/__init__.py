@@ -0,0 +1 @@
+"""Queue infrastructure package"""
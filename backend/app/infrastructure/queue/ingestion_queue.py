@@ -0,0 +1,136 @@
+"""
+Ingestion Queue
+简历解析任务队列：Redis 列表（CELERY_BROKER_URL），不可用时回退到进程内 asyncio.Queue
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_KEY = "ai_hr:ingestion"
+
+# 连接失败后的重试冷却时间（秒）
+_RETRY_COOLDOWN = 30.0
+
+
+class IngestionQueue:
+    """简历解析任务队列
+
+    队列中只存放简历ID；任务状态以数据库中的 Resume.status 为准，
+    因此重复投递是安全的（消费者认领时只处理仍处于 uploaded 状态的简历）。
+    """
+
+    def __init__(self, use_redis: bool = True):
+        self.use_redis = use_redis
+        self._local: asyncio.Queue = asyncio.Queue()
+        self._redis = None
+        self._unavailable_until = 0.0
+
+    async def _get_redis(self):
+        """获取队列专用的 Redis 连接（BRPOP 会占用连接，不与缓存共用）"""
+        if not self.use_redis:
+            return None
+        if self._redis is not None:
+            return self._redis
+        if time.monotonic() < self._unavailable_until:
+            return None
+
+        try:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(
+                settings.CELERY_BROKER_URL,
+                decode_responses=True,
+                socket_connect_timeout=2,
+            )
+            await client.ping()
+            self._redis = client
+            logger.info(f"解析队列使用 Redis: {settings.CELERY_BROKER_URL}")
+            return client
+        except Exception as e:
+            self._mark_unavailable(e)
+            return None
+
+    def _mark_unavailable(self, error: Exception):
+        logger.warning(f"解析队列 Redis 不可用，使用进程内队列: {error}")
+        self._redis = None
+        self._unavailable_until = time.monotonic() + _RETRY_COOLDOWN
+
+    async def put(self, resume_id: str):
+        """投递解析任务
+
+        Args:
+            resume_id: 简历ID
+        """
+        resume_id = str(resume_id)
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                await redis.lpush(_QUEUE_KEY, resume_id)
+                return
+            except Exception as e:
+                self._mark_unavailable(e)
+        await self._local.put(resume_id)
+
+    async def get(self, timeout: float = 5.0) -> Optional[str]:
+        """取出一个解析任务，超时返回 None
+
+        进程内队列优先（Redis 不可用期间投递的任务），其次阻塞等待 Redis。
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            简历ID 或 None
+        """
+        try:
+            return self._local.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                item = await redis.brpop(_QUEUE_KEY, timeout=max(1, int(timeout)))
+                return item[1] if item else None
+            except Exception as e:
+                self._mark_unavailable(e)
+
+        try:
+            return await asyncio.wait_for(self._local.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def size(self) -> int:
+        """队列中等待的任务数量"""
+        size = self._local.qsize()
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                size += await redis.llen(_QUEUE_KEY)
+            except Exception as e:
+                self._mark_unavailable(e)
+        return size
+
+    async def close(self):
+        """关闭 Redis 连接"""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+# 全局单例
+_ingestion_queue: Optional[IngestionQueue] = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    """获取解析任务队列单例"""
+    global _ingestion_queue
+    if _ingestion_queue is None:
+        _ingestion_queue = IngestionQueue(use_redis=settings.INGESTION_QUEUE_BACKEND == "redis")
+    return _ingestion_queue
@@ -0,0 +1,130 @@
+"""
+Resume Status Events
+简历处理状态事件的发布订阅：Redis Pub/Sub 跨进程广播，同时直接投递给本进程的订阅者
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app.infrastructure.cache.redis_client import get_redis, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL_PREFIX = "ai_hr:resume_status"
+
+
+class ResumeStatusBroadcaster:
+    """按用户分频道的简历状态广播
+
+    本进程发布的事件直接放入本进程订阅者的队列；同时发布到 Redis，
+    其他进程的订阅者通过 Pub/Sub 收到（带来源标记，本进程收到自己发布的事件时忽略）。
+    Redis 不可用时只在本进程内广播。
+    """
+
+    def __init__(self):
+        self._origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    @staticmethod
+    def _channel(user_id: str) -> str:
+        return f"{_CHANNEL_PREFIX}:{user_id}"
+
+    async def publish(self, user_id: Any, event: Dict[str, Any]):
+        """发布状态事件
+
+        Args:
+            user_id: 简历上传者ID
+            event: 事件内容
+        """
+        if user_id is None:
+            return
+        user_id = str(user_id)
+
+        for queue in list(self._subscribers.get(user_id, ())):
+            if queue.full():
+                # 慢消费者丢弃最旧事件，客户端收到后续事件时会重新拉取列表
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                message = json.dumps({"origin": self._origin, "event": event}, ensure_ascii=False)
+                await redis.publish(self._channel(user_id), message)
+            except Exception as e:
+                mark_redis_unavailable(e)
+
+    async def subscribe(self, user_id: Any) -> AsyncIterator[Dict[str, Any]]:
+        """订阅某个用户的状态事件
+
+        Args:
+            user_id: 用户ID
+
+        Yields:
+            事件内容
+        """
+        user_id = str(user_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+
+        pubsub = None
+        relay = None
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self._channel(user_id))
+                relay = asyncio.create_task(self._relay(pubsub, queue))
+            except Exception as e:
+                mark_redis_unavailable(e)
+                pubsub = None
+
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[user_id]
+            if relay:
+                relay.cancel()
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _relay(self, pubsub, queue: asyncio.Queue):
+        """将 Redis 频道中其他进程发布的事件转入本地队列"""
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                payload = json.loads(message["data"])
+                if payload.get("origin") == self._origin:
+                    continue
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(payload["event"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"简历状态订阅中断，仅接收本进程事件: {e}")
+
+
+# 全局单例
+_broadcaster: Optional[ResumeStatusBroadcaster] = None
+
+
+def get_status_broadcaster() -> ResumeStatusBroadcaster:
+    """获取简历状态广播单例"""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = ResumeStatusBroadcaster()
+    return _broadcaster
@@ -0,0 +1,179 @@
+"""简历分析结果仓库"""
+
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database.models import ResumeAnalysis
+
+# 分析结果中的维度 -> 评分列
+DIMENSION_SCORE_COLUMNS = {
+    "skills": "skill_score",
+    "experience": "experience_score",
+    "education": "education_score",
+    "soft_skills": "soft_skills_score",
+    "stability": "stability_score",
+    "work_attitude": "work_attitude_score",
+    "development_potential": "potential_score",
+}
+
+
+def _to_uuid(value: Any) -> Optional[UUID]:
+    if value is None or isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _dimension_score(dimension: Any) -> Optional[float]:
+    """维度评分（技能维度兼容批判性思维的 credibility_score）"""
+    if not isinstance(dimension, dict):
+        return None
+    score = dimension.get("credibility_score") or dimension.get("score")
+    try:
+        return float(score) if score is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ResumeAnalysisRepository:
+    """简历分析结果数据仓库"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save(
+        self,
+        resume_id: Any,
+        analysis: Dict[str, Any],
+        *,
+        tenant_id: Any = None,
+        job_position_id: Any = None,
+        analysis_profile: str = "standard",
+        model_name: Optional[str] = None,
+        conversation_id: Any = None,
+        duration_ms: Optional[int] = None,
+        commit: bool = True,
+    ) -> ResumeAnalysis:
+        """保存一次分析结果
+
+        Args:
+            resume_id: 简历ID
+            analysis: 协调智能体返回的完整分析结果
+            tenant_id: 租户ID
+            job_position_id: 职位ID
+            analysis_profile: 分析配置类型
+            model_name: 实际使用的模型
+            conversation_id: 产生该结果的对话ID
+            duration_ms: 分析耗时（毫秒）
+            commit: 是否立即提交；为 False 时只 flush，由调用方与其他写入一起提交
+
+        Returns:
+            新建的分析记录
+        """
+        record = ResumeAnalysis(
+            resume_id=_to_uuid(resume_id),
+            tenant_id=_to_uuid(tenant_id),
+            job_position_id=_to_uuid(job_position_id),
+            conversation_id=_to_uuid(conversation_id),
+            analysis_profile=analysis_profile or "standard",
+            model_name=model_name,
+            overall_score=_dimension_score({"score": analysis.get("overall_score")}),
+            detailed_analysis=analysis,
+            analysis_duration=duration_ms,
+        )
+        for dimension, column in DIMENSION_SCORE_COLUMNS.items():
+            setattr(record, column, _dimension_score(analysis.get(dimension)))
+
+        self.db.add(record)
+        if not commit:
+            await self.db.flush()
+            return record
+        await self.db.commit()
+        await self.db.refresh(record)
+        return record
+
+    async def get_latest(
+        self,
+        resume_id: Any,
+        *,
+        tenant_id: Any = None,
+        job_position_id: Any = None,
+        analysis_profile: Optional[str] = None,
+        model_name: Optional[str] = None,
+    ) -> Optional[ResumeAnalysis]:
+        """获取简历最新的分析结果（ix_resume_analyses_lookup）
+
+        Args:
+            resume_id: 简历ID
+            tenant_id: 只匹配该租户的分析结果
+            job_position_id: 只匹配该职位
+            analysis_profile: 只匹配该分析配置
+            model_name: 只匹配该模型
+
+        Returns:
+            分析记录，没有时返回 None
+        """
+        stmt = select(ResumeAnalysis).where(ResumeAnalysis.resume_id == _to_uuid(resume_id))
+        if tenant_id is not None:
+            stmt = stmt.where(ResumeAnalysis.tenant_id == _to_uuid(tenant_id))
+        if job_position_id is not None:
+            stmt = stmt.where(ResumeAnalysis.job_position_id == _to_uuid(job_position_id))
+        if analysis_profile:
+            stmt = stmt.where(ResumeAnalysis.analysis_profile == analysis_profile)
+        if model_name:
+            stmt = stmt.where(ResumeAnalysis.model_name == model_name)
+
+        stmt = stmt.order_by(ResumeAnalysis.created_at.desc()).limit(1)
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def get_latest_for_conversation(self, conversation_id: Any) -> Optional[ResumeAnalysis]:
+        """获取对话中最新的分析结果（ix_resume_analyses_conversation）"""
+        stmt = (
+            select(ResumeAnalysis)
+            .where(ResumeAnalysis.conversation_id == _to_uuid(conversation_id))
+            .order_by(ResumeAnalysis.created_at.desc())
+            .limit(1)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def count_for_tenant(self, tenant_id: Any) -> int:
+        """租户的分析次数"""
+        result = await self.db.execute(
+            select(func.count(ResumeAnalysis.id)).where(ResumeAnalysis.tenant_id == _to_uuid(tenant_id))
+        )
+        return result.scalar() or 0
+
+    @staticmethod
+    def to_report_context(record: ResumeAnalysis) -> Dict[str, Any]:
+        """转换为对话中报告解读使用的上下文
+
+        Args:
+            record: 分析记录
+
+        Returns:
+            {"overall_score": 综合评分, "dimensions": {维度: {"score", "score_reason"}}, ...}
+        """
+        detail = record.detailed_analysis or {}
+        dimensions = {}
+        for dimension, column in DIMENSION_SCORE_COLUMNS.items():
+            data = detail.get(dimension) or {}
+            score = getattr(record, column)
+            dimensions[dimension] = {
+                "score": int(score) if score is not None else "N/A",
+                "score_reason": str(data.get("score_reason", "")) if isinstance(data, dict) else "",
+            }
+
+        return {
+            "analysis_id": str(record.id),
+            "overall_score": int(record.overall_score) if record.overall_score is not None else "N/A",
+            "dimensions": dimensions,
+            "summary": detail.get("summary", ""),
+            "recommendations": detail.get("recommendations", []),
+        }
@@ -0,0 +1 @@
+"""Search infrastructure package"""
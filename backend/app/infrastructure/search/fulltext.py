@@ -0,0 +1,204 @@
+"""
+Full-text Search
+简历关键词检索：Postgres tsvector 倒排索引（GIN）+ 中文二元切分
+
+Postgres 自带的分词器会把连续的中文当成一个词，无法按子串检索。这里在写入时由 Python 切分：
+中文按相邻两字切成二元组（“产品经理” -> “产品 品经 经理”），英文与数字按单词切分并转小写，
+切分结果用 simple 配置写入 resumes.search_vector；检索词按同样规则切分，同一段中文的二元组以 <->（相邻）连接，
+保持子串语义，各段之间以 AND 组成 tsquery。
+文件名与候选人姓名的权重（A）高于正文（D）。
+"""
+
+import html
+import re
+import unicodedata
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import func, literal_column, select
+
+# 中文字符连续片段，或以字母数字开头的英文单词（保留 c++ / c# / node.js 等写法）
+_TOKEN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+|[a-z0-9][a-z0-9+#.]*")
+_CJK = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")
+
+# 不经过词典处理的文本检索配置
+_CONFIG = literal_column("'simple'::regconfig")
+
+# 高亮片段中关键词前后保留的字符数
+SNIPPET_CONTEXT = 40
+
+
+def _normalize(text: str) -> str:
+    """全角转半角并转小写"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def _segments(text: str) -> List[List[str]]:
+    """按中文片段 / 英文单词分段切分，每段为该片段的词元列表"""
+    segments = []
+    for match in _TOKEN.finditer(_normalize(text)):
+        piece = match.group()
+        if _CJK.match(piece):
+            if len(piece) == 1:
+                segments.append([piece])
+            else:
+                segments.append([piece[i:i + 2] for i in range(len(piece) - 1)])
+        else:
+            piece = piece.rstrip(".")
+            if piece:
+                segments.append([piece])
+    return segments
+
+
+def tokenize(text: str) -> List[str]:
+    """切分文本：中文相邻两字组成二元组（单个汉字保留原字），英文与数字按单词切分
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        按出现顺序排列的词元列表
+    """
+    return [token for segment in _segments(text) for token in segment]
+
+
+def search_vector_expression(filename: Optional[str], candidate_name: Optional[str], text: Optional[str]):
+    """生成 resumes.search_vector 的 SQL 表达式（可直接赋值给 ORM 属性或用于 UPDATE）
+
+    Args:
+        filename: 文件名
+        candidate_name: 候选人姓名
+        text: 简历正文（extracted_text）
+
+    Returns:
+        tsvector 表达式
+    """
+    title = " ".join(tokenize(f"{filename or ''} {candidate_name or ''}"))
+    body = " ".join(tokenize(text or ""))
+    return func.setweight(func.to_tsvector(_CONFIG, title), "A").op("||")(
+        func.setweight(func.to_tsvector(_CONFIG, body), "D")
+    )
+
+
+def build_tsquery(keyword: str) -> Optional[str]:
+    """把检索词转换为 to_tsquery 的查询串
+
+    同一段中文的二元组以 <-> 连接，要求在正文中相邻出现（“产品经理”不会命中分处两处的“产品”和“经理”）；
+    各段之间以 AND 连接。单个汉字与最后一个英文单词按前缀匹配（输入过程中的不完整词也能命中）。
+
+    Args:
+        keyword: 用户输入的检索词
+
+    Returns:
+        查询串；没有可检索的词元时返回 None
+    """
+    segments = _segments(keyword)
+    if not segments:
+        return None
+
+    terms = []
+    for index, segment in enumerate(segments):
+        token = segment[0]
+        if len(segment) > 1:
+            terms.append("(" + " <-> ".join(f"'{bigram}'" for bigram in segment) + ")")
+            continue
+        prefix = (len(token) == 1 and _CJK.match(token)) or (index == len(segments) - 1 and not _CJK.match(token))
+        terms.append(f"'{token}'" + (":*" if prefix else ""))
+    return " & ".join(dict.fromkeys(terms))
+
+
+def ts_query(keyword: str):
+    """检索词对应的 tsquery 表达式，没有可检索的词元时返回 None"""
+    query = build_tsquery(keyword)
+    if query is None:
+        return None
+    return func.to_tsquery(_CONFIG, query)
+
+
+def ranked_matches(tsquery, filters: Sequence[Any], limit: int):
+    """命中检索词的简历及其相关度（子查询，列为 id / rank）
+
+    内层查询由 GIN 索引取出命中的简历，只选 id，按上传时间倒序（id 决胜）取最近的 limit 条；
+    外层查询再对这不超过 limit 条简历计算 ts_rank_cd，常见词命中大量简历时排序开销仍然有界。相关度只在这个窗口内比较：命中超过 limit 条时，
+    更早上传的简历即使更相关也不会出现在结果中；窗口按确定的顺序选取，skip 分页的结果是稳定的。
+
+    Args:
+        tsquery: ts_query 返回的表达式
+        filters: 额外的过滤条件（上传者、状态等）
+        limit: 参与排序的命中数量上限
+
+    Returns:
+        SQLAlchemy 子查询
+    """
+    from app.infrastructure.database.models import Resume
+
+    window = (
+        select(Resume.id)
+        .where(*filters, Resume.search_vector.op("@@")(tsquery))
+        .order_by(Resume.upload_time.desc(), Resume.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return (
+        select(window.c.id, func.ts_rank_cd(Resume.search_vector, tsquery).label("rank"))
+        .join_from(window, Resume, Resume.id == window.c.id)
+        .subquery()
+    )
+
+
+def highlight(text: Optional[str], keyword: str, context: int = SNIPPET_CONTEXT) -> Optional[str]:
+    """截取关键词所在的片段并用 <mark> 标记命中部分
+
+    优先匹配完整检索词，找不到时匹配其中最长的词；片段内容已做 HTML 转义，可直接渲染。
+
+    Args:
+        text: 简历正文
+        keyword: 检索词
+        context: 命中位置前后保留的字符数
+
+    Returns:
+        高亮片段；正文中没有命中时返回 None
+    """
+    if not text or not keyword:
+        return None
+
+    lowered = _normalize(text)
+    # NFKC 可能改变长度（如连字），此时退回仅转小写，保证下标与原文一致
+    if len(lowered) != len(text):
+        lowered = text.lower()
+
+    terms = sorted({term for term in _normalize(keyword).split() if term}, key=len, reverse=True)
+    candidates = [_normalize(keyword).strip()] + terms
+    position = -1
+    for term in candidates:
+        position = lowered.find(term) if term else -1
+        if position >= 0:
+            break
+    if position < 0:
+        return None
+
+    start = max(position - context, 0)
+    end = min(position + len(term) + context, len(text))
+    window = lowered[start:end]
+
+    # 标记片段内所有检索词的出现位置（长词优先，不重叠）
+    spans = []
+    for item in candidates:
+        if not item:
+            continue
+        offset = window.find(item)
+        while offset >= 0:
+            if all(offset >= e or offset + len(item) <= s for s, e in spans):
+                spans.append((offset, offset + len(item)))
+            offset = window.find(item, offset + len(item))
+    spans.sort()
+
+    pieces = []
+    cursor = 0
+    for s, e in spans:
+        pieces.append(html.escape(text[start + cursor:start + s]))
+        pieces.append(f"<mark>{html.escape(text[start + s:start + e])}</mark>")
+        cursor = e
+    pieces.append(html.escape(text[start + cursor:end]))
+
+    snippet = "".join(pieces).replace("\n", " ")
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
@@ -0,0 +1,186 @@
+"""
+Hybrid Retrieval
+混合检索：关键词（resumes.search_vector 倒排索引）与向量（进程内向量索引）两路召回，
+按倒数排名融合（RRF）合并。关键词一路保证“Kubernetes Go 5年”这类精确技能词的命中，
+向量一路补充同义表达；两路只比较排名，不需要把 ts_rank 与余弦相似度归一化到同一尺度。
+
+元数据过滤（租户范围、状态、所在地、上传者）在关键词一路直接作为 SQL 条件。向量索引是全局的，
+向量一路总是先按所有者范围（uploaded_by 有索引，转换为ID的开销小）取出简历ID，在这个范围内再应用其余
+元数据条件，然后在索引中做子集检索；不对全局召回结果做后过滤，简历多的租户也不会因召回被其他租户占满而漏检。
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.infrastructure.database.models import Resume
+from app.infrastructure.search.fulltext import ranked_matches, ts_query
+from app.infrastructure.search.vector_index import get_vector_index_registry
+
+logger = logging.getLogger(__name__)
+
+
+def metadata_filters(
+    status: Optional[str] = None,
+    location: Optional[str] = None,
+    uploaded_by: Any = None,
+) -> List[Any]:
+    """构建元数据过滤条件
+
+    Args:
+        status: 简历状态
+        location: 所在地（包含匹配）
+        uploaded_by: 上传者ID
+
+    Returns:
+        SQLAlchemy 条件列表
+    """
+    filters = []
+    if status:
+        filters.append(Resume.status == status)
+    if location:
+        filters.append(Resume.candidate_location.ilike(f"%{location}%"))
+    if uploaded_by:
+        filters.append(Resume.uploaded_by == uploaded_by)
+    return filters
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """倒数排名融合：每路结果中排名 r 的条目得分 1 / (k + r)，多路得分相加
+
+    Args:
+        rankings: 各路召回的ID列表（按相关度降序）
+        k: 平滑常数
+
+    Returns:
+        [(id, 融合得分)]，按得分降序
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+async def lexical_search(db, query: str, filters: Sequence[Any], limit: int) -> List[Tuple[str, float]]:
+    """关键词召回
+
+    Args:
+        db: 数据库会话
+        query: 检索词
+        filters: 元数据过滤条件
+        limit: 召回数量
+
+    Returns:
+        [(resume_id, ts_rank_cd)]，按相关度降序；检索词没有可检索的词元时为空
+    """
+    tsquery = ts_query(query)
+    if tsquery is None:
+        return []
+
+    matched = ranked_matches(tsquery, filters, settings.RESUME_SEARCH_MAX_CANDIDATES)
+    result = await db.execute(
+        select(matched.c.id, matched.c.rank).order_by(matched.c.rank.desc()).limit(limit)
+    )
+    return [(str(resume_id), float(rank or 0.0)) for resume_id, rank in result.all()]
+
+
+async def scoped_ids(db, scope: Sequence[Any], filters: Sequence[Any] = ()) -> Set[str]:
+    """所有者范围内满足元数据条件的简历ID，用于在向量索引中做子集检索
+
+    所有者条件由 uploaded_by 索引定位，其余条件只在该范围内的简历上计算。
+
+    Args:
+        db: 数据库会话
+        scope: 所有者范围条件（如 Resume.uploaded_by == 当前用户），不能为空
+        filters: 其余元数据过滤条件
+
+    Returns:
+        简历ID集合
+    """
+    if not scope:
+        raise ValueError("向量子集检索需要所有者范围条件")
+    result = await db.execute(select(Resume.id).where(*scope, *filters))
+    return {str(resume_id) for resume_id in result.scalars().all()}
+
+
+async def hybrid_search(
+    db,
+    query: str,
+    embed_query: Callable[[], Awaitable[List[Tuple[str, List[float]]]]],
+    *,
+    scope: Sequence[Any],
+    top_k: int = 10,
+    filters: Sequence[Any] = (),
+    threshold: float = 0.0,
+    candidates: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """混合检索
+
+    查询向量的生成（远程调用）与关键词召回、范围内简历ID的查询并发执行；查询向量生成失败时只返回关键词结果。
+
+    Args:
+        db: 数据库会话
+        query: 检索词
+        embed_query: 生成查询向量的协程函数，返回 [(embedding 模型, 查询向量)]；
+            不得使用 db（与关键词召回并发执行）
+        scope: 所有者范围条件，两路召回都只在该范围内进行
+        top_k: 返回数量
+        filters: 其余元数据过滤条件（metadata_filters 的返回值）
+        threshold: 向量一路的相似度阈值
+        candidates: 每路召回数量，默认 HYBRID_SEARCH_CANDIDATES
+
+    Returns:
+        [{"resume_id", "score", "lexical_rank", "lexical_score", "vector_rank", "similarity"}]，按融合得分降序；
+        某一路未召回的条目对应字段为 None
+    """
+    candidates = candidates or settings.HYBRID_SEARCH_CANDIDATES
+
+    async def lexical_and_scope():
+        lexical = await lexical_search(db, query, [*scope, *filters], candidates)
+        allowed = await scoped_ids(db, scope, filters)
+        return lexical, allowed
+
+    async def embed():
+        try:
+            return await embed_query()
+        except Exception as e:
+            logger.warning(f"查询向量生成失败，只使用关键词召回: {e}")
+            return []
+
+    (lexical, allowed), query_vectors = await asyncio.gather(lexical_and_scope(), embed())
+
+    # 向量召回：只在范围内的简历中检索；多个模型（切换模型期间的双读）取各简历的最高相似度
+    similarity_of: Dict[str, float] = {}
+    registry = get_vector_index_registry()
+    if allowed:
+        for model, vector in query_vectors:
+            index = await registry.get_index(db, model)
+            for resume_id, similarity in index.search(vector, top_k=candidates, threshold=threshold, allowed=allowed):
+                similarity_of[resume_id] = max(similarity, similarity_of.get(resume_id, 0.0))
+    vector_ranking = sorted(similarity_of, key=similarity_of.get, reverse=True)[:candidates]
+
+    lexical_ranking = [resume_id for resume_id, _ in lexical]
+    lexical_score = dict(lexical)
+    lexical_rank = {resume_id: rank for rank, resume_id in enumerate(lexical_ranking, 1)}
+    vector_rank = {resume_id: rank for rank, resume_id in enumerate(vector_ranking, 1)}
+
+    fused = reciprocal_rank_fusion([lexical_ranking, vector_ranking], settings.HYBRID_RRF_K)[:top_k]
+    logger.info(
+        f"混合检索: 关键词召回 {len(lexical_ranking)}，向量召回 {len(vector_ranking)}，范围内简历 {len(allowed)}"
+    )
+
+    return [
+        {
+            "resume_id": resume_id,
+            "score": score,
+            "lexical_rank": lexical_rank.get(resume_id),
+            "lexical_score": lexical_score.get(resume_id),
+            "vector_rank": vector_rank.get(resume_id),
+            "similarity": similarity_of.get(resume_id),
+        }
+        for resume_id, score in fused
+    ]
@@ -0,0 +1,438 @@
+"""
+Vector Index
+简历向量的进程内 NumPy 索引：小规模精确检索，大规模使用 IVF 倒排近似检索
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def encode_vector(vector: Sequence[float]) -> Optional[bytes]:
+    """将向量 L2 归一化后编码为 float32 二进制
+
+    Args:
+        vector: 原始向量
+
+    Returns:
+        float32 小端序字节串；零向量或空向量返回 None
+    """
+    arr = np.asarray(vector, dtype=np.float32)
+    if arr.ndim != 1 or arr.size == 0:
+        return None
+    norm = float(np.linalg.norm(arr))
+    if not np.isfinite(norm) or norm == 0.0:
+        return None
+    return (arr / norm).astype("<f4").tobytes()
+
+
+def decode_vector(blob: bytes) -> np.ndarray:
+    """将 float32 二进制解码为向量"""
+    return np.frombuffer(blob, dtype="<f4")
+
+
+def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(arr))
+    if not np.isfinite(norm) or norm == 0.0:
+        return None
+    return arr / norm
+
+
+def _spherical_kmeans(data: np.ndarray, nlist: int, iterations: int = 10, seed: int = 42) -> np.ndarray:
+    """球面 k-means（向量已归一化，用内积作为相似度）"""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # 空簇重新随机取点
+        if empty.any():
+            sums[empty] = data[rng.choice(len(data), size=int(empty.sum()), replace=False)]
+            norms[empty] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+class VectorIndex:
+    """单个 embedding 模型的向量索引
+
+    - 主体 (base)：连续的 float32 矩阵。规模达到 ivf_min_size 后训练 IVF，
+      行按所属簇排序存放，查询时只扫描 nprobe 个最近簇的连续切片
+    - 增量 (delta)：构建后新增/更新的向量，查询时精确扫描，积累到一定数量后合并重建
+    - 删除通过墓碑集合过滤，重建时清理
+    """
+
+    def __init__(self, model: str, ivf_min_size: int = 20000, nprobe: int = 16):
+        self.model = model
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self.dim: Optional[int] = None
+
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+
+        self._delta: Dict[str, np.ndarray] = {}
+        self._deleted: Set[str] = set()
+
+        self.built_at = 0.0
+
+    @property
+    def size(self) -> int:
+        """当前有效向量数量"""
+        base_alive = len(self._ids) - len(self._deleted.intersection(self._row_of))
+        return base_alive + len(self._delta)
+
+    def build(self, items: Iterable[Tuple[str, np.ndarray]]):
+        """用全量向量重建索引
+
+        Args:
+            items: (resume_id, 归一化向量) 序列
+        """
+        ids: List[str] = []
+        vectors: List[np.ndarray] = []
+        for resume_id, vector in items:
+            if self.dim is None:
+                self.dim = int(vector.shape[0])
+            if vector.shape[0] != self.dim:
+                logger.warning(f"向量维度不一致，已跳过: model={self.model}, resume={resume_id}")
+                continue
+            ids.append(resume_id)
+            vectors.append(vector)
+
+        matrix = np.vstack(vectors).astype(np.float32) if vectors else np.zeros((0, self.dim or 0), dtype=np.float32)
+        centroids = None
+        offsets = None
+
+        if len(ids) >= self.ivf_min_size:
+            nlist = max(16, int(np.sqrt(len(ids))))
+            sample_size = min(len(ids), nlist * 64)
+            sample = matrix[np.random.default_rng(0).choice(len(ids), size=sample_size, replace=False)]
+            centroids = _spherical_kmeans(sample, nlist)
+
+            # 分块分配，避免 n × nlist 的临时矩阵过大
+            assign = np.empty(len(ids), dtype=np.int32)
+            for start in range(0, len(ids), 65536):
+                block = matrix[start:start + 65536]
+                assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+            order = np.argsort(assign, kind="stable")
+            matrix = np.ascontiguousarray(matrix[order])
+            ids = [ids[i] for i in order]
+            counts = np.bincount(assign, minlength=nlist)
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        self._ids = ids
+        self._row_of = {resume_id: row for row, resume_id in enumerate(ids)}
+        self._matrix = matrix
+        self._centroids = centroids
+        self._offsets = offsets
+        self._delta = {}
+        self._deleted = set()
+        self.built_at = time.monotonic()
+
+        logger.info(
+            f"向量索引已构建: model={self.model}, 数量={len(ids)}, 维度={self.dim}, "
+            f"类型={'IVF' if centroids is not None else 'Flat'}"
+        )
+
+    def upsert(self, resume_id: str, vector: np.ndarray):
+        """新增或更新单个向量"""
+        if self.dim is None:
+            self.dim = int(vector.shape[0])
+        if vector.shape[0] != self.dim:
+            logger.warning(f"向量维度不一致，已跳过: model={self.model}, resume={resume_id}")
+            return
+        if resume_id in self._row_of:
+            self._deleted.add(resume_id)
+        self._delta[resume_id] = vector.astype(np.float32, copy=False)
+
+        if len(self._delta) > max(1000, len(self._ids) // 10):
+            self.compact()
+
+    def remove(self, resume_id: str):
+        """删除单个向量"""
+        self._delta.pop(resume_id, None)
+        if resume_id in self._row_of:
+            self._deleted.add(resume_id)
+
+    def compact(self):
+        """合并增量与主体并重建"""
+        alive = (
+            (resume_id, self._matrix[row])
+            for resume_id, row in self._row_of.items()
+            if resume_id not in self._deleted
+        )
+        delta = list(self._delta.items())
+        self.build(list(alive) + delta)
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        threshold: float = 0.0,
+        allowed: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """检索最相似的向量
+
+        Args:
+            query: 查询向量
+            top_k: 返回数量
+            threshold: 余弦相似度阈值
+            allowed: 只在这些简历中检索（元数据预过滤），为空表示不限
+
+        Returns:
+            [(resume_id, similarity)]，按相似度降序
+        """
+        q = _normalize(query)
+        if q is None or self.dim is None or q.shape[0] != self.dim:
+            return []
+        if allowed is not None:
+            return self._search_subset(q, allowed, top_k, threshold)
+
+        # 过量召回，抵消墓碑过滤
+        fetch = top_k + len(self._deleted)
+        # (相似度, ID 列表, 是否需要按墓碑过滤)
+        candidates: List[Tuple[np.ndarray, List[str], bool]] = []
+
+        if len(self._ids):
+            if self._centroids is None:
+                candidates.append((self._matrix @ q, self._ids, True))
+            else:
+                nprobe = min(self.nprobe, len(self._centroids))
+                probe = np.argpartition(-(self._centroids @ q), nprobe - 1)[:nprobe]
+                for lst in probe:
+                    start, end = int(self._offsets[lst]), int(self._offsets[lst + 1])
+                    if end > start:
+                        candidates.append((self._matrix[start:end] @ q, self._ids[start:end], True))
+
+        if self._delta:
+            delta_ids = list(self._delta.keys())
+            candidates.append((np.vstack(list(self._delta.values())) @ q, delta_ids, False))
+
+        results: List[Tuple[str, float]] = []
+        for scores, ids, filter_deleted in candidates:
+            if len(scores) > fetch:
+                top = np.argpartition(-scores, fetch - 1)[:fetch]
+            else:
+                top = np.arange(len(scores))
+            for i in top:
+                score = float(scores[i])
+                if score < threshold:
+                    continue
+                # 被更新的向量在主体中已墓碑，只保留增量中的新值
+                if filter_deleted and ids[i] in self._deleted:
+                    continue
+                results.append((ids[i], score))
+
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results[:top_k]
+
+    def _search_subset(self, q: np.ndarray, allowed: Set[str], top_k: int, threshold: float) -> List[Tuple[str, float]]:
+        """在给定的简历子集中精确检索（不经过 IVF，子集内不会漏召回）"""
+        ids: List[str] = []
+        rows: List[int] = []
+        delta_ids: List[str] = []
+        for resume_id in allowed:
+            if resume_id in self._delta:
+                delta_ids.append(resume_id)
+            elif resume_id in self._row_of and resume_id not in self._deleted:
+                ids.append(resume_id)
+                rows.append(self._row_of[resume_id])
+
+        parts = []
+        if rows:
+            parts.append(self._matrix[np.asarray(rows, dtype=np.int64)] @ q)
+        if delta_ids:
+            parts.append(np.vstack([self._delta[resume_id] for resume_id in delta_ids]) @ q)
+        if not parts:
+            return []
+
+        ids.extend(delta_ids)
+        scores = np.concatenate(parts)
+        if len(scores) > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(len(scores))
+
+        results = [(ids[i], float(scores[i])) for i in top if scores[i] >= threshold]
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        """索引统计信息"""
+        return {
+            "model": self.model,
+            "size": self.size,
+            "dimension": self.dim,
+            "type": "ivf" if self._centroids is not None else "flat",
+            "lists": int(len(self._centroids)) if self._centroids is not None else 0,
+            "delta": len(self._delta),
+            "deleted": len(self._deleted),
+        }
+
+
+class VectorIndexRegistry:
+    """按 embedding 模型管理向量索引
+
+    - 首次查询时从 resume_embeddings 表流式加载全量向量
+    - 之后每隔 refresh_interval 秒按 updated_at 增量拉取其他进程写入的向量，
+      数量对不上（有删除）时全量重建
+    - updated_at 是写入事务的开始时间，较早开始的事务可能晚于已同步的行提交，
+      因此增量窗口向前重叠 refresh_overlap 秒，窗口内已同步的行按 (id, updated_at) 去重
+    - 本进程写入/删除在事务提交后通过 upsert/remove 生效
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 30.0,
+        ivf_min_size: int = 20000,
+        nprobe: int = 16,
+        refresh_overlap: float = 600.0,
+    ):
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._watermarks: Dict[str, object] = {}
+        # 重叠窗口内已同步的行：resume_id -> updated_at
+        self._recent: Dict[str, Dict[str, object]] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_index(self, db, model: str) -> VectorIndex:
+        """获取某个模型的索引，必要时加载或增量刷新
+
+        Args:
+            db: 数据库会话
+            model: embedding 模型名称
+
+        Returns:
+            向量索引
+        """
+        index = self._indexes.get(model)
+        if index is not None and time.monotonic() - self._refreshed_at.get(model, 0.0) < self.refresh_interval:
+            return index
+
+        lock = self._locks.setdefault(model, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(model)
+            if index is None:
+                index = await self._load(db, model)
+            elif time.monotonic() - self._refreshed_at.get(model, 0.0) >= self.refresh_interval:
+                index = await self._refresh(db, model, index)
+            return index
+
+    async def _load(self, db, model: str) -> VectorIndex:
+        from sqlalchemy import select
+        from app.infrastructure.database.models import ResumeEmbedding
+
+        start = time.monotonic()
+        items: List[Tuple[str, np.ndarray]] = []
+        watermark = None
+        stream = await db.stream(
+            select(ResumeEmbedding.resume_id, ResumeEmbedding.vector, ResumeEmbedding.updated_at)
+            .where(ResumeEmbedding.embedding_model == model)
+            .execution_options(yield_per=2000)
+        )
+        async for resume_id, blob, updated_at in stream:
+            items.append((str(resume_id), decode_vector(blob)))
+            if updated_at is not None and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+
+        index = VectorIndex(model, ivf_min_size=self.ivf_min_size, nprobe=self.nprobe)
+        index.build(items)
+        self._indexes[model] = index
+        self._watermarks[model] = watermark
+        self._recent[model] = {}
+        self._refreshed_at[model] = time.monotonic()
+        logger.info(f"向量索引加载完成: model={model}, 数量={len(items)}, 耗时={time.monotonic() - start:.2f}s")
+        return index
+
+    async def _refresh(self, db, model: str, index: VectorIndex) -> VectorIndex:
+        from sqlalchemy import func, select
+        from app.infrastructure.database.models import ResumeEmbedding
+
+        watermark = self._watermarks.get(model)
+        recent = self._recent.get(model, {})
+        query = select(
+            ResumeEmbedding.resume_id, ResumeEmbedding.vector, ResumeEmbedding.updated_at
+        ).where(ResumeEmbedding.embedding_model == model)
+        if watermark is not None:
+            query = query.where(ResumeEmbedding.updated_at >= watermark - self.refresh_overlap)
+
+        result = await db.execute(query)
+        for resume_id, blob, updated_at in result.all():
+            resume_id = str(resume_id)
+            if updated_at is not None and recent.get(resume_id) == updated_at:
+                continue
+            index.upsert(resume_id, decode_vector(blob))
+            recent[resume_id] = updated_at
+            if updated_at is not None and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+        self._watermarks[model] = watermark
+        if watermark is not None:
+            floor = watermark - self.refresh_overlap
+            recent = {k: v for k, v in recent.items() if v is not None and v >= floor}
+        self._recent[model] = recent
+
+        total = await db.scalar(
+            select(func.count()).select_from(ResumeEmbedding).where(ResumeEmbedding.embedding_model == model)
+        )
+        if total != index.size:
+            # 其他进程删除了向量，增量无法感知，全量重建
+            logger.info(f"向量索引数量不一致 (db={total}, index={index.size})，重新加载: model={model}")
+            return await self._load(db, model)
+
+        self._refreshed_at[model] = time.monotonic()
+        return index
+
+    def upsert(self, model: str, resume_id: str, vector: Sequence[float]):
+        """写入单个向量（索引未加载时忽略，首次查询会全量加载）"""
+        index = self._indexes.get(model)
+        if index is None:
+            return
+        normalized = _normalize(vector)
+        if normalized is not None:
+            index.upsert(str(resume_id), normalized)
+
+    def remove(self, resume_id: str):
+        """从所有模型的索引中删除某份简历"""
+        for index in self._indexes.values():
+            index.remove(str(resume_id))
+
+    def stats(self) -> List[Dict[str, object]]:
+        """所有索引的统计信息"""
+        return [index.stats() for index in self._indexes.values()]
+
+
+# 全局单例
+_vector_index_registry: Optional[VectorIndexRegistry] = None
+
+
+def get_vector_index_registry() -> VectorIndexRegistry:
+    """获取向量索引注册表单例"""
+    global _vector_index_registry
+    if _vector_index_registry is None:
+        from app.core.config import settings
+
+        _vector_index_registry = VectorIndexRegistry(
+            refresh_interval=settings.VECTOR_INDEX_REFRESH_INTERVAL,
+            refresh_overlap=settings.VECTOR_INDEX_REFRESH_OVERLAP,
+            ivf_min_size=settings.VECTOR_INDEX_IVF_MIN_SIZE,
+            nprobe=settings.VECTOR_INDEX_NPROBE,
+        )
+    return _vector_index_registry
@@ -23,11 +23,58 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    # 继续因重启而中断的向量重建任务
+    from app.application.services.reembedding_service import get_reembedding_service
+    try:
+        await get_reembedding_service().resume_interrupted()
+    except Exception as e:
+        print(f"继续向量重建任务失败: {e}")
+
+    # 继续因重启而中断的批量筛选任务
+    from app.application.services.screening_service import get_screening_service
+    try:
+        await get_screening_service().resume_interrupted()
+    except Exception as e:
+        print(f"继续批量筛选任务失败: {e}")
+
+    # 启动向量生成失败的重试队列
+    from app.application.services.embedding_retry_service import get_embedding_retry_service
+    get_embedding_retry_service().start()
+
+    # 启动简历解析流水线，并重新入队上次未处理完的简历
+    from app.application.services.ingestion_service import get_ingestion_service
+    get_ingestion_service().start()
+    try:
+        await get_ingestion_service().recover()
+    except Exception as e:
+        print(f"重新入队待解析简历失败: {e}")
+
     yield
 
     # 关闭时执行
     print("AI招聘系统后端服务关闭...")
 
+    await get_embedding_retry_service().stop()
+
+    # 停止简历解析流水线
+    await get_ingestion_service().stop()
+    from app.infrastructure.queue.ingestion_queue import get_ingestion_queue
+    await get_ingestion_queue().close()
+    from app.application.services.resume_parser import shutdown_parse_executor
+    shutdown_parse_executor()
+
+    # 关闭 LLM 客户端池的共享连接
+    from app.infrastructure.external_services.llm_client_pool import get_llm_client_pool
+    await get_llm_client_pool().aclose()
+
+    # 关闭 Embedding 共享连接
+    from app.application.services.embedding_service import close_embedding_http_client
+    await close_embedding_http_client()
+
+    # 关闭 Redis 连接
+    from app.infrastructure.cache.redis_client import close_redis
+    await close_redis()
+
 
 # 创建FastAPI应用实例
 app = FastAPI(
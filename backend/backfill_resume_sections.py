@@ -0,0 +1,99 @@
+"""
+为已解析的简历补充段落切分结果 parsed_content["sections"]
+旧版解析会把换行合并为空格，段落标题无法识别，因此优先从原文件重新提取保留换行的文本（同时更新 extracted_text）；
+原文件不存在时用现有 extracted_text 切分
+运行方式: python backfill_resume_sections.py
+"""
+
+import asyncio
+import json
+import os
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+from app.application.services.resume_parser import get_resume_parser
+from app.application.services.resume_sections import segment_resume
+
+BATCH_SIZE = 100
+
+
+def _reextract(file_path: str, filename: str):
+    """从原文件重新提取文本，失败时返回 None"""
+    if not file_path or not os.path.exists(file_path):
+        return None
+    try:
+        return get_resume_parser().parse_file_sync(file_path, filename).get("extracted_text") or None
+    except Exception as e:
+        print(f"❌ 重新解析失败: {filename}, {str(e)}")
+        return None
+
+
+async def backfill():
+    """按主键分批处理尚无 sections 的已完成简历，每批独立事务，可重复执行"""
+    last_id = None
+    updated = 0
+    reextracted = 0
+
+    while True:
+        async with engine.begin() as conn:
+            params = {"limit": BATCH_SIZE}
+            where = ""
+            if last_id is not None:
+                where = "AND id > :last_id"
+                params["last_id"] = last_id
+
+            result = await conn.execute(text(f"""
+                SELECT id, file_path, filename, extracted_text
+                FROM resumes
+                WHERE status = 'completed'
+                AND (parsed_content IS NULL OR json_typeof(parsed_content) != 'object' OR parsed_content->'sections' IS NULL)
+                {where}
+                ORDER BY id
+                LIMIT :limit
+            """), params)
+            rows = result.fetchall()
+
+            if not rows:
+                break
+
+            for resume_id, file_path, filename, extracted_text in rows:
+                # 文件解析是同步调用，放到线程中执行
+                new_text = await asyncio.to_thread(_reextract, file_path, filename)
+                if new_text:
+                    extracted_text = new_text
+                    reextracted += 1
+
+                sections = segment_resume(extracted_text or "")
+                await conn.execute(text("""
+                    UPDATE resumes
+                    SET extracted_text = :extracted_text,
+                        parsed_content = (
+                            CASE WHEN parsed_content IS NULL OR json_typeof(parsed_content) != 'object'
+                                 THEN '{}'::jsonb ELSE parsed_content::jsonb END
+                            || jsonb_build_object('sections', CAST(:sections AS jsonb))
+                        )::json
+                    WHERE id = :id
+                """), {
+                    "id": resume_id,
+                    "extracted_text": extracted_text,
+                    "sections": json.dumps(sections, ensure_ascii=False),
+                })
+                updated += 1
+
+            last_id = rows[-1][0]
+            print(f"📝 已处理 {updated} 份简历（重新提取文本 {reextracted} 份）...")
+
+    print(f"✅ 段落回填完成: {updated} 份，其中 {reextracted} 份从原文件重新提取")
+
+
+async def migrate():
+    try:
+        await backfill()
+        print("\n🎉 数据库迁移完成！")
+    except Exception as e:
+        print(f"❌ 迁移失败: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(migrate())
@@ -0,0 +1,77 @@
+"""
+SSE 协议基准测试
+对比 v1（全量 accumulated）与 v2（增量 + checkpoint）两种协议下，
+一条 1k token 回复在线路上的字节数和服务端编码 CPU 时间。
+
+用法:
+    python benchmark_sse_protocol.py [--tokens 1000] [--runs 50] [--checkpoint 64]
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.sse import SSEStreamEncoder, PROTOCOL_V1, PROTOCOL_V2
+
+# 模拟模型输出：中英文混合的增量片段，长度分布接近真实 token
+_SAMPLE_DELTAS = [
+    "候选人", "在", "后端", "开发", "方面", "具有", "扎实", "的", "经验", "，",
+    " Python", " FastAPI", " PostgreSQL", " Redis", "。", "\n\n", "### ", "技能", "匹配度",
+    "：", "85", "/100", "\n- ", "熟练", "掌握", "分布式", "系统", "设计", " and", " testing",
+]
+
+
+def build_reply(tokens: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [rng.choice(_SAMPLE_DELTAS) for _ in range(tokens)]
+
+
+def run_protocol(protocol: str, deltas, checkpoint_interval: int):
+    encoder = SSEStreamEncoder(protocol, checkpoint_interval)
+    wire_bytes = 0
+    for delta in deltas:
+        wire_bytes += len(encoder.token(delta).encode("utf-8"))
+    content = encoder.content
+    wire_bytes += len(encoder.event({'type': 'done', 'message': {'role': 'assistant', 'content': content}}).encode("utf-8"))
+    return wire_bytes
+
+
+def benchmark(protocol: str, deltas, runs: int, checkpoint_interval: int):
+    wire_bytes = run_protocol(protocol, deltas, checkpoint_interval)
+    start = time.process_time()
+    for _ in range(runs):
+        run_protocol(protocol, deltas, checkpoint_interval)
+    cpu_ms = (time.process_time() - start) * 1000 / runs
+    return wire_bytes, cpu_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE 协议基准测试")
+    parser.add_argument("--tokens", type=int, default=1000, help="每条回复的 token 数")
+    parser.add_argument("--runs", type=int, default=50, help="重复次数")
+    parser.add_argument("--checkpoint", type=int, default=64, help="v2 首个 checkpoint 的 token 序号")
+    args = parser.parse_args()
+
+    deltas = build_reply(args.tokens)
+    reply_bytes = len("".join(deltas).encode("utf-8"))
+
+    print(f"📝 回复长度: {args.tokens} tokens, {reply_bytes} bytes (UTF-8), 重复 {args.runs} 次")
+    print(f"{'协议':<6}{'线路字节':>14}{'放大倍数':>10}{'CPU/回复(ms)':>16}")
+
+    results = {}
+    for protocol in (PROTOCOL_V1, PROTOCOL_V2):
+        wire_bytes, cpu_ms = benchmark(protocol, deltas, args.runs, args.checkpoint)
+        results[protocol] = (wire_bytes, cpu_ms)
+        print(f"{protocol:<6}{wire_bytes:>14,}{wire_bytes / reply_bytes:>10.1f}x{cpu_ms:>15.2f}")
+
+    v1_bytes, v1_cpu = results[PROTOCOL_V1]
+    v2_bytes, v2_cpu = results[PROTOCOL_V2]
+    print(f"✅ v2 相比 v1: 字节减少 {1 - v2_bytes / v1_bytes:.1%}, CPU 减少 {1 - v2_cpu / v1_cpu:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+简历分析模式对比
+对同一批简历分别执行七专家完整分析（full）与单次调用合并分析（fused），
+对比 token 消耗、耗时和各维度评分的一致性。运行期间关闭分析结果缓存，保证每次都实际调用LLM。
+
+用法:
+    python compare_analysis_modes.py --tenant <租户ID> [--resume-ids ID ...] [--limit 10]
+        [--job-position-id ID] [--profile standard] [--tolerance 10]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.application.agents.coordinator import MODE_FULL, MODE_FUSED, ResumeAnalysisCoordinator
+from app.application.use_cases.resume_analysis import ResumeAnalysisUseCase, job_requirements_from_position
+from app.infrastructure.database.database import AsyncSessionLocal
+from app.infrastructure.database.models import JobPosition, Resume
+from app.infrastructure.external_services.llm_scheduler import track_llm_usage
+
+DIMENSIONS = [
+    ("skills", "技能"),
+    ("experience", "经验"),
+    ("education", "教育"),
+    ("soft_skills", "软技能"),
+    ("stability", "稳定性"),
+    ("work_attitude", "工作态度"),
+    ("development_potential", "发展潜力"),
+]
+
+
+def _score(result, key=None):
+    value = result.get(key) if key else result
+    if isinstance(value, dict):
+        value = value.get("score")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ranks(values):
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2
+        i = j + 1
+    return ranks
+
+
+def spearman(xs, ys):
+    """Spearman 秩相关系数，样本不足或无方差时返回 None"""
+    if len(xs) < 3:
+        return None
+    rx, ry = _ranks(xs), _ranks(ys)
+    mx, my = sum(rx) / len(rx), sum(ry) / len(ry)
+    cov = sum((a - mx) * (b - my) for a, b in zip(rx, ry))
+    vx = sum((a - mx) ** 2 for a in rx)
+    vy = sum((b - my) ** 2 for b in ry)
+    if not vx or not vy:
+        return None
+    return cov / (vx * vy) ** 0.5
+
+
+def p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+async def run_mode(db, tenant_id, resume_data, job_requirements, profile, mode):
+    coordinator = ResumeAnalysisCoordinator(db, tenant_id, analysis_profile=profile, mode=mode)
+    start = time.perf_counter()
+    with track_llm_usage() as meter:
+        result = await coordinator.analyze(resume_data, job_requirements)
+    return {
+        "result": result,
+        "seconds": time.perf_counter() - start,
+        "tokens": meter.tokens,
+        "calls": meter.calls,
+    }
+
+
+async def load_resume_ids(db, tenant_id, limit):
+    result = await db.execute(
+        select(Resume.id)
+        .where(Resume.uploaded_by == tenant_id, Resume.extracted_text.isnot(None))
+        .order_by(Resume.created_at.desc())
+        .limit(limit)
+    )
+    return [str(resume_id) for resume_id in result.scalars().all()]
+
+
+async def compare(args):
+    # 关闭分析结果缓存，两种模式都实际调用LLM
+    settings.ANALYSIS_CACHE_ENABLED = False
+
+    runs = []
+    async with AsyncSessionLocal() as db:
+        use_case = ResumeAnalysisUseCase(db)
+        job_requirements = use_case._get_default_job_requirements()
+        if args.job_position_id:
+            position = await db.get(JobPosition, args.job_position_id)
+            if position is None:
+                print(f"❌ 职位不存在: {args.job_position_id}")
+                return
+            job_requirements = job_requirements_from_position(position)
+
+        resume_ids = args.resume_ids or await load_resume_ids(db, args.tenant, args.limit)
+        if not resume_ids:
+            print("❌ 没有可对比的简历")
+            return
+
+        print(f"📝 对比 {len(resume_ids)} 份简历，分析配置: {args.profile}\n")
+        for index, resume_id in enumerate(resume_ids, 1):
+            resume_data = await use_case._get_resume_data(resume_id)
+            if not resume_data:
+                print(f"❌ [{index}] 简历不存在: {resume_id}")
+                continue
+
+            full = await run_mode(db, args.tenant, resume_data, job_requirements, args.profile, MODE_FULL)
+            fused = await run_mode(db, args.tenant, resume_data, job_requirements, args.profile, MODE_FUSED)
+            if full["result"].get("error") or fused["result"].get("error"):
+                print(f"❌ [{index}] {resume_id} 分析失败: {full['result'].get('error') or fused['result'].get('error')}")
+                continue
+
+            fallback = "experts" in fused["result"].get("stages_run", [])
+            runs.append({"resume_id": resume_id, "full": full, "fused": fused})
+            print(
+                f"✅ [{index}] {resume_id}  "
+                f"full: {_score(full['result'], 'overall_score'):.0f}分 {full['tokens']} tokens {full['seconds']:.1f}s  "
+                f"fused: {_score(fused['result'], 'overall_score'):.0f}分 {fused['tokens']} tokens {fused['seconds']:.1f}s"
+                + ("  (合并结果不完整，专家补齐)" if fallback else "")
+            )
+
+    if not runs:
+        return
+    report(runs, args.tolerance)
+
+
+def report(runs, tolerance):
+    n = len(runs)
+    print(f"\n{'模式':<8}{'平均tokens':>12}{'平均调用':>10}{'平均耗时(s)':>14}{'p95耗时(s)':>13}")
+    for mode in ("full", "fused"):
+        tokens = [run[mode]["tokens"] for run in runs]
+        calls = [run[mode]["calls"] for run in runs]
+        seconds = [run[mode]["seconds"] for run in runs]
+        print(f"{mode:<8}{sum(tokens) / n:>12.0f}{sum(calls) / n:>10.1f}{sum(seconds) / n:>14.1f}{p95(seconds):>13.1f}")
+
+    full_tokens = sum(run["full"]["tokens"] for run in runs)
+    fused_tokens = sum(run["fused"]["tokens"] for run in runs)
+    full_seconds = sum(run["full"]["seconds"] for run in runs)
+    fused_seconds = sum(run["fused"]["seconds"] for run in runs)
+    if full_tokens and full_seconds:
+        print(f"\nfused / full: tokens {fused_tokens / full_tokens:.0%}，耗时 {fused_seconds / full_seconds:.0%}")
+
+    print(f"\n{'维度':<10}{'样本':>6}{'平均绝对差':>12}{f'±{tolerance}以内':>12}{'秩相关':>10}")
+    for key, name in DIMENSIONS + [("overall_score", "综合评分")]:
+        pairs = [
+            (_score(run["full"]["result"], key), _score(run["fused"]["result"], key))
+            for run in runs
+        ]
+        # 待定维度没有评分，不参与比较
+        pairs = [(a, b) for a, b in pairs if a is not None and b is not None]
+        if not pairs:
+            print(f"{name:<10}{0:>6}{'-':>12}{'-':>12}{'-':>10}")
+            continue
+        diffs = [abs(a - b) for a, b in pairs]
+        within = sum(1 for diff in diffs if diff <= tolerance) / len(diffs)
+        rho = spearman([a for a, _ in pairs], [b for _, b in pairs])
+        rho_text = f"{rho:.2f}" if rho is not None else "-"
+        print(f"{name:<10}{len(pairs):>6}{sum(diffs) / len(diffs):>12.1f}{within:>12.0%}{rho_text:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比七专家分析与单次调用合并分析")
+    parser.add_argument("--tenant", required=True, help="租户ID（用于选择模型配置，未指定简历时取该租户的简历）")
+    parser.add_argument("--resume-ids", nargs="*", help="要对比的简历ID")
+    parser.add_argument("--limit", type=int, default=10, help="未指定简历ID时取最近上传的简历数")
+    parser.add_argument("--job-position-id", help="职位ID（默认使用通用职位要求）")
+    parser.add_argument("--profile", default="standard", help="分析配置类型")
+    parser.add_argument("--tolerance", type=int, default=10, help="评分一致的容差（分）")
+    args = parser.parse_args()
+
+    asyncio.run(compare(args))
+
+
+if __name__ == "__main__":
+    main()
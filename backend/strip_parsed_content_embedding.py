@@ -0,0 +1,69 @@
+"""
+将 parsed_content["embedding"] 中残留的向量迁移到 resume_embeddings 表，并从 parsed_content 中删除
+运行方式: python strip_parsed_content_embedding.py
+"""
+
+import asyncio
+from sqlalchemy import text
+from app.infrastructure.database.database import engine
+from add_resume_embeddings_table import backfill, create_table
+
+BATCH_SIZE = 500
+
+
+async def strip_embedding():
+    """按主键分批删除 parsed_content 中的向量字段，每批独立事务，可重复执行"""
+    last_id = None
+    stripped = 0
+
+    while True:
+        async with engine.begin() as conn:
+            params = {"limit": BATCH_SIZE}
+            where = ""
+            if last_id is not None:
+                where = "AND id > :last_id"
+                params["last_id"] = last_id
+
+            result = await conn.execute(text(f"""
+                SELECT id
+                FROM resumes
+                WHERE parsed_content IS NOT NULL
+                AND json_typeof(parsed_content) = 'object'
+                AND parsed_content->>'embedding' IS NOT NULL
+                {where}
+                ORDER BY id
+                LIMIT :limit
+            """), params)
+            ids = [row[0] for row in result.fetchall()]
+
+            if not ids:
+                break
+
+            await conn.execute(text("""
+                UPDATE resumes
+                SET parsed_content = (parsed_content::jsonb - 'embedding')::json
+                WHERE id = ANY(:ids)
+            """), {"ids": ids})
+
+            stripped += len(ids)
+            last_id = ids[-1]
+            print(f"📝 已清理 {stripped} 条...")
+
+    print(f"✅ 清理完成: {stripped} 条")
+
+
+async def migrate():
+    try:
+        # 先确保向量已写入 resume_embeddings，再删除 JSON 中的副本
+        await create_table()
+        await backfill()
+        await strip_embedding()
+        print("\n🎉 数据库迁移完成！")
+    except Exception as e:
+        print(f"❌ 迁移失败: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    print("开始数据库迁移...\n")
+    asyncio.run(migrate())
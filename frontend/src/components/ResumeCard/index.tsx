@@ -17,6 +17,8 @@ const ResumeCard: React.FC<ResumeCardProps> = ({ resume, onDelete, showSimilarit
     switch (resume.status) {
       case 'completed':
         return <span className="px-2 py-1 text-xs font-medium bg-green-100 text-green-800 rounded-full">已完成</span>;
+      case 'uploaded':
+        return <span className="px-2 py-1 text-xs font-medium bg-gray-100 text-gray-800 rounded-full">排队中</span>;
       case 'parsing':
         return <span className="px-2 py-1 text-xs font-medium bg-yellow-100 text-yellow-800 rounded-full">解析中</span>;
       case 'embedding':
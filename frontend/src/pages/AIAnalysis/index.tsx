@@ -504,6 +504,7 @@ const AIAnalysis: React.FC = () => {
       );
 
       let accumulatedText = '';
+      let progressText = '';  // 完整分析的渐进输出（维度结果、综合评分、摘要），正式回复到达后被替换
       let responseReceived = false;
 
       // 设置超时机制：如果 30 秒内没有收到任何回复，提供模拟回复
@@ -574,7 +575,8 @@ const AIAnalysis: React.FC = () => {
                   responseReceived = true;
                   clearTimeout(timeoutId);
 
-                  accumulatedText = event.accumulated || '';
+                  // v2 增量协议：拼接增量；兼容 v1 的全量 accumulated
+                  accumulatedText = event.accumulated ?? accumulatedText + (event.token || '');
                   setConversations(prev =>
                     prev.map(conv => {
                       if (conv.id === activeConversationId) {
@@ -593,6 +595,50 @@ const AIAnalysis: React.FC = () => {
                   );
                   break;
 
+              case 'analysis_dimension':
+              case 'analysis_overall_score':
+              case 'analysis_summary_token':
+                // 完整分析进度：专家逐个完成即展示
+                responseReceived = true;
+                clearTimeout(timeoutId);
+
+                if (event.type === 'analysis_dimension') {
+                  progressText += event.result?.status === 'pending'
+                    ? `⏳ ${event.name}: 待定（分析超时）\n`
+                    : `✅ ${event.name}: ${event.result?.score ?? 0}/100\n`;
+                } else if (event.type === 'analysis_overall_score') {
+                  progressText += `\n**综合评分**: ${event.overall_score}/100\n\n`;
+                } else {
+                  progressText += event.token || '';
+                }
+
+                if (!accumulatedText) {
+                  setConversations(prev =>
+                    prev.map(conv => {
+                      if (conv.id === activeConversationId) {
+                        const messages = [...conv.messages];
+                        const lastMsg = messages[messages.length - 1];
+                        if (lastMsg && lastMsg.role === 'assistant' && lastMsg.isStreaming) {
+                          messages[messages.length - 1] = {
+                            ...lastMsg,
+                            content: progressText
+                          };
+                        }
+                        return { ...conv, messages };
+                      }
+                      return conv;
+                    })
+                  );
+                }
+                break;
+
+              case 'checkpoint':
+                // 以服务端完整文本校准本地缓冲
+                if (typeof event.content === 'string') {
+                  accumulatedText = event.content;
+                }
+                break;
+
               case 'done':
                 // 流式完成
                 clearTimeout(timeoutId);
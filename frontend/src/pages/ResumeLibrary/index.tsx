@@ -1,8 +1,8 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { Sparkles } from 'lucide-react';
-import { getResumeList, uploadResume, deleteResume, searchResumes, parseResume, getResumeDetail, Resume } from '@/services/resume';
+import { getResumeList, uploadResume, deleteResume, searchResumes, parseResume, getResumeDetail, subscribeResumeEvents, Resume } from '@/services/resume';
 import { conversationsService } from '@/services/conversations';
 import ResumeCard from '@/components/ResumeCard';
 import UploadModal from '@/components/UploadModal';
@@ -25,6 +25,15 @@ const ResumeLibrary: React.FC = () => {
     queryFn: () => getResumeList(),
   });
 
+  // 订阅简历解析状态：解析在后台进行，状态变化时刷新列表和详情
+  useEffect(() => {
+    return subscribeResumeEvents((event) => {
+      if (event.type !== 'resume_status') return;
+      queryClient.invalidateQueries({ queryKey: ['resumes'] });
+      queryClient.invalidateQueries({ queryKey: ['resume', event.resume_id] });
+    });
+  }, [queryClient]);
+
   // 上传简历 mutation
   const uploadMutation = useMutation({
     mutationFn: uploadResume,
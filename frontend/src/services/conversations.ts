@@ -64,13 +64,25 @@ export interface SendMessageResponse {
 // 流式响应事件类型
 // ============================================================================
 
+// SSE 协议版本：v1 的 token 事件附带全量 accumulated；v2 只发送增量，并周期性发送 checkpoint
+export const SSE_PROTOCOL_VERSION = 'v2';
+
 export interface StreamEvent {
-  type: 'user_message' | 'token' | 'done' | 'error' | 'json_data';
+  type: 'user_message' | 'token' | 'checkpoint' | 'done' | 'error' | 'json_data'
+    | 'analysis_dimension' | 'analysis_overall_score' | 'analysis_summary_token';
   message?: Message;
   token?: string;
-  accumulated?: string;
+  accumulated?: string;  // 仅 v1 协议
+  seq?: number;          // v2 协议：token / checkpoint 序号
+  length?: number;       // v2 协议：checkpoint 时的完整文本长度
+  content?: string;      // v2 协议：checkpoint 时的完整文本
   error?: string;
   data?: string;  // 用于存储JSON字符串
+  // 完整分析的渐进事件
+  dimension?: string;       // analysis_dimension：维度键
+  name?: string;            // analysis_dimension：维度名称
+  result?: { score?: number | null; status?: 'pending'; [key: string]: any };  // analysis_dimension：维度结果（超时为 pending）
+  overall_score?: number;   // analysis_overall_score：综合评分
 }
 
 export type StreamEventHandler = (event: StreamEvent) => void;
@@ -151,6 +163,7 @@ class ConversationsService {
     const token = localStorage.getItem('token');
     const headers: Record<string, string> = {
       'Content-Type': 'application/json',
+      'X-SSE-Protocol': SSE_PROTOCOL_VERSION,
     };
     if (token) {
       headers.Authorization = `Bearer ${token}`;
@@ -178,6 +191,7 @@ class ConversationsService {
       }
 
       // 读取流
+      let buffer = '';
       const readStream = async (): Promise<void> => {
         try {
           while (true) {
@@ -188,9 +202,10 @@ class ConversationsService {
               break;
             }
 
-            // 解码数据
-            const chunk = decoder.decode(value, { stream: true });
-            const lines = chunk.split('\n');
+            // 解码数据（保留被截断的最后一行，等待下一个分块补全）
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop() ?? '';
 
             for (const line of lines) {
               if (line.startsWith('data: ')) {
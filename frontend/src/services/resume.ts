@@ -11,6 +11,7 @@ export interface Resume {
   file_size: number;
   upload_time: string;
   status: string;
+  embedding_status?: string;
   candidate_name?: string;
   candidate_email?: string;
   candidate_phone?: string;
@@ -19,6 +20,16 @@ export interface Resume {
   parsed_content?: any;
 }
 
+export interface ResumeStatusEvent {
+  type: 'connected' | 'resume_status';
+  resume_id?: string;
+  filename?: string;
+  status?: string;
+  embedding_status?: string;
+  candidate_name?: string;
+  error?: string;
+}
+
 export interface ResumeUploadResponse {
   code: number;
   data: {
@@ -106,3 +117,63 @@ export const deleteResume = async (id: string): Promise<{ code: number; message:
   const response = await api.delete<{ code: number; message: string }>(`/resumes/${id}`);
   return response.data;
 };
+
+/**
+ * 订阅简历处理状态事件（SSE）
+ * 上传后解析在后台进行，状态变化（uploaded → parsing → completed / failed）通过该事件流推送
+ * @returns 取消订阅函数
+ */
+export const subscribeResumeEvents = (onEvent: (event: ResumeStatusEvent) => void): (() => void) => {
+  const controller = new AbortController();
+  const baseUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+  const token = localStorage.getItem('token');
+  const headers: Record<string, string> = {};
+  if (token) {
+    headers.Authorization = `Bearer ${token}`;
+  }
+
+  const connect = async (): Promise<void> => {
+    try {
+      const response = await fetch(`${baseUrl}/api/v1/resumes/events`, {
+        headers,
+        signal: controller.signal,
+      });
+      const reader = response.body?.getReader();
+      if (!response.ok || !reader) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() ?? '';
+
+        for (const line of lines) {
+          if (line.startsWith('data: ')) {
+            try {
+              onEvent(JSON.parse(line.slice(6)));
+            } catch (e) {
+              console.error('Failed to parse resume event:', line, e);
+            }
+          }
+        }
+      }
+    } catch (error) {
+      if (controller.signal.aborted) return;
+      console.error('Resume event stream error:', error);
+    }
+
+    // 连接断开后延迟重连
+    if (!controller.signal.aborted) {
+      setTimeout(connect, 3000);
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};